@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк разбора строк ингредиентов (ingredient_tokenizer.py).
+
+Прогоняет IngredientTokenizer.tokenize_batch по строкам ингредиентов из
+результата parse_recipes.py (или по синтетическому набору) и печатает
+строк/с без кэша разобранных строк (cold) и с ним (warm), а также долю
+строк, в которых нашлись количество и единица измерения.
+
+Единицы загружаются из GET /measure_unit, если указан --base-url, иначе
+используется встроенный набор, совпадающий по формам с рабочей базой:
+
+    python3 bench_ingredient_tokenizer.py --input parsed_recipes.json
+    python3 bench_ingredient_tokenizer.py --base-url http://localhost:8888 --lines 200000
+"""
+
+import argparse
+import random
+import sys
+import time
+
+from import_recipes import load_recipes
+from ingredient_tokenizer import IngredientTokenizer, fetch_units
+
+SAMPLE_UNITS = [
+    {'id': 1, 'one': 'грамм', 'few': 'грамма', 'many': 'граммов'},
+    {'id': 2, 'one': 'килограмм', 'few': 'килограмма', 'many': 'килограммов'},
+    {'id': 3, 'one': 'столовая ложка', 'few': 'столовые ложки', 'many': 'столовых ложек'},
+    {'id': 4, 'one': 'чайная ложка', 'few': 'чайные ложки', 'many': 'чайных ложек'},
+    {'id': 5, 'one': 'штука', 'few': 'штуки', 'many': 'штук'},
+    {'id': 6, 'one': 'миллилитр', 'few': 'миллилитра', 'many': 'миллилитров'},
+    {'id': 7, 'one': 'литр', 'few': 'литра', 'many': 'литров'},
+    {'id': 8, 'one': 'стакан', 'few': 'стакана', 'many': 'стаканов'},
+    {'id': 9, 'one': 'зубчик', 'few': 'зубчика', 'many': 'зубчиков'},
+]
+
+SAMPLE_NAMES = ['мука пшеничная', 'сахар', 'молоко', 'яйца', 'сливочное масло', 'соль',
+                'чеснок', 'лук репчатый', 'сметана', 'картофель', 'говядина', 'рис']
+SAMPLE_AMOUNTS = ['200', '1,5', '1/2', '1 1/2', '½', '2-3', '0.5', '3']
+SAMPLE_UNIT_FORMS = ['гр.', 'г', 'кг', 'мл', 'л', 'шт.', 'ст. л.', 'ч. л.', 'стакана',
+                     'зубчика', 'граммов', '']
+
+
+def synthetic_lines(count, seed=42):
+    """Строки вида "Мука — 200 гр." и "200 гр. муки" в случайном порядке"""
+    rng = random.Random(seed)
+    lines = []
+    for _ in range(count):
+        name = rng.choice(SAMPLE_NAMES)
+        amount = f"{rng.choice(SAMPLE_AMOUNTS)} {rng.choice(SAMPLE_UNIT_FORMS)}".strip()
+        lines.append(f"{name.capitalize()} — {amount}" if rng.random() < 0.7 else f"{amount} {name}")
+    return lines
+
+
+def corpus_lines(path, count):
+    lines = [line for r in load_recipes(path) for line in r.get('ingredients', [])]
+    if not lines:
+        return []
+    return (lines * (count // len(lines) + 1))[:count]
+
+
+def run_batch(units, lines, repeat, warm):
+    """Секунды на repeat прогонов; cold — новый токенизатор (пустой кэш) на каждый прогон"""
+    tokenizer = IngredientTokenizer(units)
+    if warm:
+        tokenizer.tokenize_batch(lines)
+    results = []
+    started = time.perf_counter()
+    for _ in range(repeat):
+        if not warm:
+            tokenizer = IngredientTokenizer(units)
+        results = tokenizer.tokenize_batch(lines)
+    return time.perf_counter() - started, results
+
+
+def main():
+    ap = argparse.ArgumentParser(description='Benchmark ingredient line tokenizer')
+    ap.add_argument('--input', help='Результат parse_recipes.py (.json или .ndjson)')
+    ap.add_argument('--base-url', help='Загрузить единицы из GET /measure_unit')
+    ap.add_argument('--lines', type=int, default=100_000, help='Размер набора строк')
+    ap.add_argument('--repeat', type=int, default=3, help='Сколько раз прогонять набор')
+    args = ap.parse_args()
+
+    lines = corpus_lines(args.input, args.lines) if args.input else synthetic_lines(args.lines)
+    if not lines:
+        print('В файле нет строк ингредиентов')
+        sys.exit(1)
+    units = fetch_units(args.base_url) if args.base_url else SAMPLE_UNITS
+
+    unique = len(set(lines))
+    print(f"Строк: {len(lines)} (уникальных {unique}), единиц: {len(units)}, повторов: {args.repeat}")
+    print(f"{'mode':<6} {'lines/s':>12} {'qty %':>7} {'unit %':>7}")
+    for mode, warm in (('cold', False), ('warm', True)):
+        elapsed, results = run_batch(units, lines, args.repeat, warm)
+        with_qty = sum(1 for r in results if r.quantity is not None) / len(results) * 100
+        with_unit = sum(1 for r in results if r.unit_id is not None) / len(results) * 100
+        print(f"{mode:<6} {len(lines) * args.repeat / elapsed:>12.0f} {with_qty:>7.1f} {with_unit:>7.1f}")
+
+
+if __name__ == '__main__':
+    main()
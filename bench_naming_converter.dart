@@ -0,0 +1,124 @@
+/// Бенчмарк NamingConverter: текущая версия (кеш ключей, копирование только
+/// изменившихся веток, KeyMap) против прежней на RegExp.
+///
+/// Три сценария на списке из --rows строк:
+///   camel  — ответ, уже в camelCase (Ingredient.asMap() с единицей измерения);
+///   snake  — строки из SQL в snake_case, которые надо перевести в camelCase;
+///   request — тело запроса camelCase → snake_case.
+///
+///     dart run bench_naming_converter.dart
+///     dart run bench_naming_converter.dart --rows 10000 --repeat 20
+import 'package:foodapi/utils/naming_converter.dart';
+
+void main(List<String> args) {
+  final rows = _option(args, '--rows', 5000);
+  final repeat = _option(args, '--repeat', 10);
+
+  final camel = <Map<String, dynamic>>[
+    for (var i = 0; i < rows; i++)
+      {
+        'id': i,
+        'name': 'Ингредиент $i',
+        'caloriesForUnit': 1.5,
+        'measureunit': {'id': i % 7, 'one': 'грамм', 'few': 'грамма', 'many': 'граммов'},
+      },
+  ];
+  final snake = <Map<String, dynamic>>[
+    for (var i = 0; i < rows; i++)
+      {
+        'id': i,
+        'first_name': 'Имя',
+        'last_name': 'Фамилия',
+        'avatar_url': null,
+        'recipe_links': [
+          {'recipe_id': i, 'step_number': 1},
+          {'recipe_id': i + 1, 'step_number': 2},
+        ],
+      },
+  ];
+  final request = <Map<String, dynamic>>[
+    for (var i = 0; i < rows; i++) {'login': 'user$i', 'firstName': 'Имя', 'avatarUrl': null, 'measureUnitId': i},
+  ];
+  final keys = KeyMap(['id', 'name', 'caloriesForUnit', 'measureunit', 'one', 'few', 'many']);
+
+  print('rows=$rows repeat=$repeat');
+  print('${'case'.padRight(28)}${'legacy ms'.padLeft(12)}${'current ms'.padLeft(12)}${'speedup'.padLeft(10)}');
+  _compare('camel (response)', repeat, () => _Legacy.convertResponseToCamelCase(camel),
+      () => NamingConverter.convertResponseToCamelCase(camel));
+  _compare('camel (response, KeyMap)', repeat, () => _Legacy.convertResponseToCamelCase(camel),
+      () => NamingConverter.convertResponseToCamelCase(camel, keys: keys));
+  _compare('snake -> camel', repeat, () => _Legacy.convertResponseToCamelCase(snake),
+      () => NamingConverter.convertResponseToCamelCase(snake));
+  _compare('request camel -> snake', repeat, () => _Legacy.convertRequestToSnakeCase(request),
+      () => NamingConverter.convertRequestToSnakeCase(request));
+}
+
+int _option(List<String> args, String name, int fallback) {
+  final i = args.indexOf(name);
+  return i >= 0 && i + 1 < args.length ? int.parse(args[i + 1]) : fallback;
+}
+
+void _compare(String name, int repeat, Object? Function() legacy, Object? Function() current) {
+  // Результаты должны совпадать, иначе замер не имеет смысла
+  if (legacy().toString() != current().toString()) {
+    throw StateError('$name: results differ');
+  }
+  final legacyMs = _measure(repeat, legacy);
+  final currentMs = _measure(repeat, current);
+  print('${name.padRight(28)}${legacyMs.toStringAsFixed(2).padLeft(12)}'
+      '${currentMs.toStringAsFixed(2).padLeft(12)}${'${(legacyMs / currentMs).toStringAsFixed(1)}x'.padLeft(10)}');
+}
+
+/// Медиана из [repeat] прогонов после прогрева, мс
+double _measure(int repeat, Object? Function() body) {
+  for (var i = 0; i < 3; i++) {
+    body();
+  }
+  final times = <double>[];
+  for (var i = 0; i < repeat; i++) {
+    final watch = Stopwatch()..start();
+    body();
+    times.add(watch.elapsedMicroseconds / 1000);
+  }
+  times.sort();
+  return times[times.length ~/ 2];
+}
+
+/// NamingConverter до кеша ключей: RegExp на каждый ключ и новая карта на
+/// каждый уровень
+class _Legacy {
+  static String camelToSnake(String camelCase) {
+    return camelCase.replaceAllMapped(
+      RegExp(r'([A-Z])'),
+      (match) => '_${match.group(1)!.toLowerCase()}',
+    );
+  }
+
+  static String snakeToCamel(String snakeCase) {
+    if (!snakeCase.contains('_')) return snakeCase;
+    final parts = snakeCase.split('_');
+    return parts.first +
+        parts.skip(1).map((part) => part.isNotEmpty ? '${part[0].toUpperCase()}${part.substring(1)}' : '').join();
+  }
+
+  static Map<String, dynamic> convertMap(Map<String, dynamic> input, String Function(String) convert) {
+    final result = <String, dynamic>{};
+    input.forEach((key, value) {
+      final converted = convert(key);
+      if (value is Map<String, dynamic>) {
+        result[converted] = convertMap(value, convert);
+      } else if (value is List) {
+        result[converted] = value.map((item) => item is Map<String, dynamic> ? convertMap(item, convert) : item).toList();
+      } else {
+        result[converted] = value;
+      }
+    });
+    return result;
+  }
+
+  static dynamic convertResponseToCamelCase(List data) =>
+      data.map((item) => item is Map<String, dynamic> ? convertMap(item, snakeToCamel) : item).toList();
+
+  static dynamic convertRequestToSnakeCase(List data) =>
+      data.map((item) => item is Map<String, dynamic> ? convertMap(item, camelToSnake) : item).toList();
+}
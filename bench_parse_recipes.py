@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк парсеров страниц рецептов из parse_recipes.py.
+
+Прогоняет classic, fast и (если установлен lxml) fast+lxml по сохранённому
+корпусу HTML-страниц и печатает страниц/с, МБ/с и пиковую память. Заодно
+сверяет результат каждого парсера с classic и считает расхождения.
+
+Корпус берётся из HTTP-кэша парсера (см. scraper_cache.py) или из каталога
+с файлами *.html. Выгрузить кэш в каталог для воспроизводимых замеров:
+
+    python3 bench_parse_recipes.py --save-corpus bench_corpus
+    python3 bench_parse_recipes.py --corpus bench_corpus --repeat 5
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+import tracemalloc
+from urllib.parse import quote
+
+import parse_recipes
+from scraper_cache import DEFAULT_CACHE_PATH, HttpCache
+
+
+def load_corpus(args):
+    """Возвращает список (url, body) для страниц рецептов"""
+    if args.corpus:
+        pages = []
+        for name in sorted(os.listdir(args.corpus)):
+            if name.endswith('.html'):
+                with open(os.path.join(args.corpus, name), 'rb') as f:
+                    pages.append((name, f.read()))
+        return pages
+    category_urls = {c['url'] for c in parse_recipes.CATEGORIES}
+    with HttpCache(args.cache) as cache:
+        return [(url, body) for url, body in cache.iter_pages() if url not in category_urls]
+
+
+def save_corpus(pages, directory):
+    os.makedirs(directory, exist_ok=True)
+    for url, body in pages:
+        with open(os.path.join(directory, quote(url, safe='') + '.html'), 'wb') as f:
+            f.write(body)
+    print(f"Сохранено {len(pages)} страниц в {directory}")
+
+
+def run_parser(parser, pages, repeat):
+    """Время и результаты разбора всего корпуса repeat раз"""
+    results = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        started = time.perf_counter()
+        for _ in range(repeat):
+            results = [parser(body, url) for url, body in pages]
+        elapsed = time.perf_counter() - started
+    return elapsed, results
+
+
+def peak_memory(parser, pages):
+    """Пиковая память (байт) при разборе корпуса"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        tracemalloc.start()
+        for url, body in pages:
+            parser(body, url)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return peak
+
+
+def main():
+    ap = argparse.ArgumentParser(description='Benchmark recipe page parsers')
+    ap.add_argument('--cache', default=DEFAULT_CACHE_PATH, help='HTTP-кэш парсера (SQLite)')
+    ap.add_argument('--corpus', help='Каталог с *.html вместо кэша')
+    ap.add_argument('--save-corpus', metavar='DIR', help='Выгрузить корпус в каталог и выйти')
+    ap.add_argument('--repeat', type=int, default=3, help='Сколько раз прогонять корпус')
+    args = ap.parse_args()
+
+    pages = load_corpus(args)
+    if not pages:
+        print('Корпус пуст: сначала запустите parse_recipes.py с кэшем или укажите --corpus')
+        sys.exit(1)
+    if args.save_corpus:
+        save_corpus(pages, args.save_corpus)
+        return
+
+    parsers = [
+        ('classic', parse_recipes.select_recipe_parser('classic')),
+        ('fast', parse_recipes.select_recipe_parser('fast')),
+    ]
+    if parse_recipes.lxml is not None:
+        parsers.append(('fast+lxml', parse_recipes.select_recipe_parser('fast', use_lxml=True)))
+
+    total_bytes = sum(len(body) for _, body in pages)
+    print(f"Корпус: {len(pages)} страниц, {total_bytes / 1024 / 1024:.2f} МБ, повторов: {args.repeat}")
+    print(f"{'parser':<10} {'pages/s':>10} {'MB/s':>8} {'peak MB':>8} {'diffs':>6}")
+
+    reference = None
+    for name, parser in parsers:
+        elapsed, results = run_parser(parser, pages, args.repeat)
+        if reference is None:
+            reference = results
+        diffs = sum(1 for a, b in zip(reference, results) if a != b)
+        peak = peak_memory(parser, pages)
+        pages_per_s = len(pages) * args.repeat / elapsed
+        mb_per_s = total_bytes * args.repeat / 1024 / 1024 / elapsed
+        print(f"{name:<10} {pages_per_s:>10.1f} {mb_per_s:>8.2f} {peak / 1024 / 1024:>8.2f} {diffs:>6}")
+
+
+if __name__ == '__main__':
+    main()
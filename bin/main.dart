@@ -2,15 +2,53 @@ import 'dart:io';
 
 import 'package:conduit_core/conduit_core.dart';
 import 'package:foodapi/foodapi.dart';
+import 'package:foodapi/utils/database_config.dart';
+import 'package:foodapi/utils/shutdown_coordinator.dart';
+
+/// SERVER_ISOLATES: число isolate с FoodapiChannel ("auto" — по числу ядер).
+/// По умолчанию 1 — сервер работает в текущем isolate, как раньше.
+int serverIsolateCount() {
+  final value = Platform.environment['SERVER_ISOLATES'] ?? '1';
+  if (value == 'auto') {
+    return Platform.numberOfProcessors;
+  }
+  final count = int.parse(value);
+  if (count < 1) {
+    throw ArgumentError.value(value, 'SERVER_ISOLATES', 'must be a positive number or "auto"');
+  }
+  return count;
+}
 
 Future main() async {
+  final isolates = serverIsolateCount();
+  final database = DatabaseConfig.fromEnvironment();
+  try {
+    final budget = await database.checkConnectionBudget(isolates);
+    print("Database connections: ${budget.required} of ${budget.available} available "
+        "($isolates isolate(s) x pool ${database.poolSize})");
+  } on ConnectionBudgetException catch (e) {
+    stderr.writeln(e.message);
+    exit(1);
+  } catch (e) {
+    // База ещё недоступна — лимит проверить нельзя, пулы откроются лениво
+    print("Warning: could not check max_connections: $e");
+  }
+
+  final drainTimeout = Duration(seconds: int.parse(Platform.environment['DRAIN_TIMEOUT'] ?? '20'));
+  final shutdown = ShutdownCoordinator();
   final app = Application<FoodapiChannel>()
     ..options.configurationFilePath = "config.yaml"
     ..options.port = int.parse(Platform.environment['PORT'] ?? '8888')
-    ..options.address = InternetAddress.anyIPv4;
+    ..options.address = InternetAddress.anyIPv4
+    ..options.context['shutdownPort'] = shutdown.sendPort;
 
-  await app.startOnCurrentIsolate();
+  if (isolates == 1) {
+    await app.startOnCurrentIsolate();
+  } else {
+    await app.start(numberOfInstances: isolates);
+  }
+  shutdown.listen(app.stop, timeout: drainTimeout + const Duration(seconds: 5));
 
-  print("Application started on 0.0.0.0:${app.options.port}.");
-  print("Use Ctrl-C (SIGINT) to stop running the application.");
+  print("Application started on 0.0.0.0:${app.options.port} ($isolates isolate(s)).");
+  print("Use Ctrl-C (SIGINT) or SIGTERM to drain and stop the application.");
 }
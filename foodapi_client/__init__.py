@@ -0,0 +1,53 @@
+"""
+Общий Python-клиент Food API для тестов, импорта рецептов и сервисов.
+
+    from foodapi_client import FoodApiClient
+
+    with FoodApiClient("http://localhost:8888") as api:
+        recipe = api.create_recipe("Блины", duration=1800)
+        api.create_step_links(recipe.id, [step.id for step in api.steps()[:3]])
+"""
+
+from .client import DEFAULT_BASE_URL, ApiError, FoodApiClient
+from .models import (
+    Comment,
+    Favorite,
+    FreezerItem,
+    FreezerMatch,
+    FreezerMatchPage,
+    Ingredient,
+    MeasureUnit,
+    MissingIngredient,
+    Pagination,
+    Recipe,
+    RecipeIngredient,
+    RecipePage,
+    RecipeStep,
+    RecipeStepLink,
+    Ref,
+    User,
+    decode,
+)
+
+__all__ = [
+    'DEFAULT_BASE_URL',
+    'ApiError',
+    'FoodApiClient',
+    'Comment',
+    'Favorite',
+    'FreezerItem',
+    'FreezerMatch',
+    'FreezerMatchPage',
+    'Ingredient',
+    'MeasureUnit',
+    'MissingIngredient',
+    'Pagination',
+    'Recipe',
+    'RecipeIngredient',
+    'RecipePage',
+    'RecipeStep',
+    'RecipeStepLink',
+    'Ref',
+    'User',
+    'decode',
+]
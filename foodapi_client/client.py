@@ -0,0 +1,437 @@
+"""
+HTTP-клиент Food API с общим пулом keep-alive соединений.
+
+Один FoodApiClient держит requests.Session, поэтому TCP/TLS-соединение с
+сервером устанавливается один раз и переиспользуется всеми запросами.
+Идемпотентные запросы (GET, HEAD, PUT, DELETE) повторяются с
+экспоненциальной задержкой при обрыве соединения и ответах 502/503/504;
+POST не повторяется, чтобы не создать запись дважды.
+
+Типизированные методы возвращают модели из foodapi_client.models и бросают
+ApiError на ответы 4xx/5xx. Для проверок кодов ответа (интеграционные
+тесты) есть низкоуровневые get/post/put/delete, возвращающие
+requests.Response как есть.
+"""
+
+import json
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Union
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from .models import (
+    Comment,
+    Favorite,
+    FreezerItem,
+    FreezerMatchPage,
+    Ingredient,
+    MeasureUnit,
+    Recipe,
+    RecipeIngredient,
+    RecipePage,
+    RecipeStep,
+    RecipeStepLink,
+    User,
+    _camel,
+    decode,
+)
+
+DEFAULT_BASE_URL = "https://foodapi.dzolotov.pro"
+DEFAULT_TIMEOUT = 30
+DEFAULT_POOL_SIZE = 10
+DEFAULT_RETRIES = 3
+DEFAULT_BACKOFF = 0.2
+IDEMPOTENT_METHODS = frozenset({'GET', 'HEAD', 'PUT', 'DELETE', 'OPTIONS'})
+RETRY_STATUSES = (502, 503, 504)
+
+
+class ApiError(Exception):
+    """Ответ API с кодом 4xx/5xx"""
+
+    def __init__(self, response: requests.Response):
+        self.response = response
+        self.status = response.status_code
+        try:
+            self.body = response.json()
+        except ValueError:
+            self.body = response.text
+        super().__init__(f"{response.request.method} {response.url}: {self.status} {self.body}")
+
+
+def _clean(data: Mapping) -> Dict:
+    """Убирает None, чтобы не отправлять незаданные поля"""
+    return {k: v for k, v in data.items() if v is not None}
+
+
+class FoodApiClient:
+    def __init__(self, base_url: str = DEFAULT_BASE_URL, token: Optional[str] = None,
+                 pool_size: int = DEFAULT_POOL_SIZE, retries: int = DEFAULT_RETRIES,
+                 backoff: float = DEFAULT_BACKOFF, timeout: float = DEFAULT_TIMEOUT):
+        self.base_url = base_url.rstrip('/')
+        self.token = token
+        self.timeout = timeout
+        self.session = requests.Session()
+        retry = Retry(total=retries, connect=retries, read=retries, status=retries,
+                      backoff_factor=backoff, status_forcelist=RETRY_STATUSES,
+                      allowed_methods=IDEMPOTENT_METHODS, raise_on_status=False)
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def close(self):
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # --- низкоуровневые запросы ---
+
+    def request(self, method: str, path: str, token: Optional[str] = None, **kwargs) -> requests.Response:
+        token = token or self.token
+        if token:
+            kwargs['headers'] = {'Authorization': f"Bearer {token}", **kwargs.get('headers', {})}
+        kwargs.setdefault('timeout', self.timeout)
+        return self.session.request(method, f"{self.base_url}{path}", **kwargs)
+
+    def get(self, path: str, **kwargs) -> requests.Response:
+        return self.request('GET', path, **kwargs)
+
+    def post(self, path: str, **kwargs) -> requests.Response:
+        return self.request('POST', path, **kwargs)
+
+    def put(self, path: str, **kwargs) -> requests.Response:
+        return self.request('PUT', path, **kwargs)
+
+    def delete(self, path: str, **kwargs) -> requests.Response:
+        return self.request('DELETE', path, **kwargs)
+
+    def _call(self, method: str, path: str, model=None, **kwargs):
+        r = self.request(method, path, **kwargs)
+        if r.status_code >= 400:
+            raise ApiError(r)
+        data = r.json() if r.content else None
+        return decode(model, data) if model is not None else data
+
+    def stream(self, path: str, model=None, **params) -> Iterator[Any]:
+        """Вся коллекция (/comment, /freezer, /ingredient, ...) построчно в
+        NDJSON: объекты разбираются по мере чтения ответа, не дожидаясь конца"""
+        r = self.request('GET', path, params={**_clean(params), 'format': 'ndjson'}, stream=True)
+        with r:
+            if r.status_code >= 400:
+                raise ApiError(r)
+            for line in r.iter_lines():
+                if line:
+                    item = json.loads(line)
+                    yield decode(model, item) if model is not None else item
+
+    def page(self, path: str, limit: int = 50, cursor: Optional[str] = None, **params) -> Dict:
+        """Одна страница коллекции: {'data': [...], 'pagination': {'limit', 'nextCursor'}}"""
+        return self._call('GET', path, params=_clean({**params, 'limit': limit, 'cursor': cursor}))
+
+    # --- health ---
+
+    def health(self) -> bool:
+        return self.get('/healthz').status_code == 200
+
+    # --- рецепты ---
+
+    def recipes(self, page: Optional[int] = 1, limit: int = 20, search: Optional[str] = None,
+                min_time: Optional[int] = None, max_time: Optional[int] = None,
+                cursor: Optional[str] = None, total: Optional[str] = None) -> RecipePage:
+        """cursor — pagination.next_cursor предыдущей страницы (page тогда игнорируется);
+        total — exact, estimate или none"""
+        params = _clean({'page': None if cursor else page, 'limit': limit, 'search': search,
+                         'minTime': min_time, 'maxTime': max_time, 'cursor': cursor, 'total': total})
+        return self._call('GET', '/recipe', RecipePage, params=params)
+
+    def iter_recipes(self, limit: int = 100, **filters) -> Iterator[Recipe]:
+        """Все рецепты по курсору, без подсчёта total"""
+        cursor = None
+        while True:
+            result = self.recipes(limit=limit, cursor=cursor, total='none', **filters)
+            yield from result.data
+            cursor = result.pagination.next_cursor if result.pagination else None
+            if not cursor:
+                return
+
+    def search_recipes(self, q: Optional[str] = None, ingredients: Optional[Iterable[str]] = None,
+                       max_time: Optional[int] = None, page: Optional[int] = 1, limit: int = 20,
+                       cursor: Optional[str] = None, total: Optional[str] = None,
+                       ingredient_ids: Optional[Iterable[int]] = None,
+                       ingredient_mode: Optional[str] = None) -> RecipePage:
+        """ingredients — части названий, ingredient_ids — id ингредиентов;
+        ingredient_mode — any (по умолчанию), all или none"""
+        params = _clean({'q': q, 'ingredients': ','.join(ingredients) if ingredients else None,
+                         'ingredientIds': ','.join(map(str, ingredient_ids)) if ingredient_ids else None,
+                         'ingredientMode': ingredient_mode,
+                         'maxTime': max_time, 'page': None if cursor else page, 'limit': limit,
+                         'cursor': cursor, 'total': total})
+        return self._call('GET', '/recipe/search', RecipePage, params=params)
+
+    def recipe(self, recipe_id: int, comments_limit: Optional[int] = None) -> Recipe:
+        """comments — последние comments_limit (по умолчанию 20), всего — comment_count"""
+        return self._call('GET', f'/recipe/{recipe_id}', Recipe, params=_clean({'commentsLimit': comments_limit}))
+
+    def create_recipe(self, name: str, duration: int = 0, photo: Optional[str] = None) -> Recipe:
+        return self._call('POST', '/recipe', Recipe, json=_clean({'name': name, 'duration': duration, 'photo': photo}))
+
+    def update_recipe(self, recipe_id: int, name: Optional[str] = None, duration: Optional[int] = None,
+                      photo: Optional[str] = None) -> Recipe:
+        return self._call('PUT', f'/recipe/{recipe_id}', Recipe,
+                          json=_clean({'name': name, 'duration': duration, 'photo': photo}))
+
+    def delete_recipe(self, recipe_id: int):
+        return self._call('DELETE', f'/recipe/{recipe_id}')
+
+    def delete_recipes(self, ids: Optional[Iterable[int]] = None, search: Optional[str] = None,
+                       min_time: Optional[int] = None, max_time: Optional[int] = None) -> List[int]:
+        """Удаляет рецепты одним запросом по списку id и/или фильтрам; возвращает удалённые id"""
+        ids = list(ids) if ids is not None else []
+        params = _clean({'ids': ','.join(map(str, ids)) or None, 'search': search,
+                         'minTime': min_time, 'maxTime': max_time})
+        if not params:
+            return []
+        return self._call('DELETE', '/recipe', params=params)['ids']
+
+    # --- шаги ---
+
+    def steps(self) -> List[RecipeStep]:
+        return self._call('GET', '/steps', RecipeStep)
+
+    def step(self, step_id: int) -> RecipeStep:
+        return self._call('GET', f'/steps/{step_id}', RecipeStep)
+
+    def create_step(self, name: str, duration: int = 0) -> RecipeStep:
+        return self._call('POST', '/steps', RecipeStep, json={'name': name, 'duration': duration})
+
+    def update_step(self, step_id: int, name: Optional[str] = None, duration: Optional[int] = None) -> RecipeStep:
+        return self._call('PUT', f'/steps/{step_id}', RecipeStep, json=_clean({'name': name, 'duration': duration}))
+
+    def delete_step(self, step_id: int):
+        return self._call('DELETE', f'/steps/{step_id}')
+
+    # --- связи рецепт → шаг ---
+
+    def step_links(self, recipe_id: Optional[int] = None, step_id: Optional[int] = None) -> List[RecipeStepLink]:
+        return self._call('GET', '/recipe-step-links', RecipeStepLink,
+                          params=_clean({'recipeId': recipe_id, 'stepId': step_id}))
+
+    def step_link(self, link_id: int) -> RecipeStepLink:
+        return self._call('GET', f'/recipe-step-links/{link_id}', RecipeStepLink)
+
+    def recipe_step_links(self, recipe_id: int) -> List[RecipeStepLink]:
+        return self._call('GET', f'/recipe-step-links/recipe/{recipe_id}', RecipeStepLink)
+
+    def create_step_link(self, recipe_id: int, step_id: int, number: int) -> RecipeStepLink:
+        return self._call('POST', '/recipe-step-links', RecipeStepLink,
+                          json={'recipeId': recipe_id, 'stepId': step_id, 'number': number})
+
+    def create_step_links(self, recipe_id: int, step_ids: Iterable[int], start: int = 1) -> List[RecipeStepLink]:
+        """Привязывает шаги к рецепту одним batch-запросом, нумеруя их по порядку"""
+        links = [{'recipeId': recipe_id, 'stepId': sid, 'number': n}
+                 for n, sid in enumerate(step_ids, start=start)]
+        if not links:
+            return []
+        return self._call('POST', '/recipe-step-links/batch', RecipeStepLink, json=links)
+
+    def update_step_link(self, link_id: int, number: int) -> RecipeStepLink:
+        return self._call('PUT', f'/recipe-step-links/{link_id}', RecipeStepLink, json={'number': number})
+
+    def reorder_steps(self, recipe_id: int, order: Union[Mapping[int, int], Iterable[int]]):
+        """Новые номера шагов: {link_id: number} или список link_id в нужном порядке"""
+        if not isinstance(order, Mapping):
+            order = {link_id: n for n, link_id in enumerate(order, start=1)}
+        orders = [{'linkId': link_id, 'number': number} for link_id, number in order.items()]
+        return self._call('PUT', '/recipe-step-links/reorder', json={'recipeId': recipe_id, 'stepOrders': orders})
+
+    def move_step(self, recipe_id: int, link_id: int, before: Optional[int] = None,
+                  after: Optional[int] = None, gap: Optional[int] = None):
+        """Переносит шаг link_id перед before или после after (ровно одно из двух)"""
+        move = _clean({'linkId': link_id, 'before': before, 'after': after})
+        return self._call('PUT', '/recipe-step-links/reorder',
+                          json=_clean({'recipeId': recipe_id, 'move': move, 'gap': gap}))
+
+    def renumber_steps(self, recipe_id: int, gap: int = 1):
+        """Перенумеровывает шаги в текущем порядке: gap, 2 * gap, ..."""
+        return self._call('PUT', '/recipe-step-links/reorder',
+                          json={'recipeId': recipe_id, 'renumber': True, 'gap': gap})
+
+    def delete_step_link(self, link_id: int):
+        return self._call('DELETE', f'/recipe-step-links/{link_id}')
+
+    def delete_recipe_step_links(self, recipe_id: int):
+        return self._call('DELETE', f'/recipe-step-links/recipe/{recipe_id}')
+
+    # --- связи рецепт → ингредиент ---
+
+    def recipe_ingredients(self, recipe_id: Optional[int] = None,
+                           ingredient_id: Optional[int] = None) -> List[RecipeIngredient]:
+        return self._call('GET', '/recipe-ingredients', RecipeIngredient,
+                          params=_clean({'recipeId': recipe_id, 'ingredientId': ingredient_id}))
+
+    def recipe_ingredient(self, link_id: int) -> RecipeIngredient:
+        return self._call('GET', f'/recipe-ingredients/{link_id}', RecipeIngredient)
+
+    def ingredients_for_recipe(self, recipe_id: int) -> List[RecipeIngredient]:
+        return self._call('GET', f'/recipe-ingredients/recipe/{recipe_id}', RecipeIngredient)
+
+    def create_recipe_ingredient(self, recipe_id: int, ingredient_id: int, count: float) -> RecipeIngredient:
+        return self._call('POST', '/recipe-ingredients', RecipeIngredient,
+                          json={'recipe': {'id': recipe_id}, 'ingredient': {'id': ingredient_id}, 'count': count})
+
+    def create_recipe_ingredients(self, recipe_id: int,
+                                  counts: Mapping[int, float]) -> List[RecipeIngredient]:
+        """Привязывает ингредиенты {ingredient_id: count} к рецепту одним batch-запросом"""
+        items = [{'recipe': {'id': recipe_id}, 'ingredient': {'id': iid}, 'count': count}
+                 for iid, count in counts.items()]
+        if not items:
+            return []
+        return self._call('POST', '/recipe-ingredients/batch', RecipeIngredient, json=items)
+
+    def update_recipe_ingredient(self, link_id: int, count: float) -> RecipeIngredient:
+        return self._call('PUT', f'/recipe-ingredients/{link_id}', RecipeIngredient, json={'count': count})
+
+    def delete_recipe_ingredient(self, link_id: int):
+        return self._call('DELETE', f'/recipe-ingredients/{link_id}')
+
+    # --- единицы измерения и ингредиенты ---
+
+    def measure_units(self) -> List[MeasureUnit]:
+        return self._call('GET', '/measure_unit', MeasureUnit)
+
+    def measure_unit(self, unit_id: int) -> MeasureUnit:
+        return self._call('GET', f'/measure_unit/{unit_id}', MeasureUnit)
+
+    def create_measure_unit(self, one: str, few: str, many: str) -> MeasureUnit:
+        return self._call('POST', '/measure_unit', MeasureUnit, json={'one': one, 'few': few, 'many': many})
+
+    def update_measure_unit(self, unit_id: int, one: Optional[str] = None, few: Optional[str] = None,
+                            many: Optional[str] = None) -> MeasureUnit:
+        return self._call('PUT', f'/measure_unit/{unit_id}', MeasureUnit,
+                          json=_clean({'one': one, 'few': few, 'many': many}))
+
+    def delete_measure_unit(self, unit_id: int):
+        return self._call('DELETE', f'/measure_unit/{unit_id}')
+
+    def ingredients(self) -> List[Ingredient]:
+        return self._call('GET', '/ingredient', Ingredient)
+
+    def ingredient(self, ingredient_id: int) -> Ingredient:
+        return self._call('GET', f'/ingredient/{ingredient_id}', Ingredient)
+
+    def create_ingredient(self, name: str, calories_for_unit: float = 0,
+                          measure_unit_id: Optional[int] = None) -> Ingredient:
+        return self._call('POST', '/ingredient', Ingredient, json=_clean({
+            'name': name, 'caloriesForUnit': calories_for_unit, 'measureUnitId': measure_unit_id}))
+
+    def update_ingredient(self, ingredient_id: int, name: Optional[str] = None,
+                          calories_for_unit: Optional[float] = None,
+                          measure_unit_id: Optional[int] = None) -> Ingredient:
+        return self._call('PUT', f'/ingredient/{ingredient_id}', Ingredient, json=_clean({
+            'name': name, 'caloriesForUnit': calories_for_unit, 'measureUnitId': measure_unit_id}))
+
+    def delete_ingredient(self, ingredient_id: int):
+        return self._call('DELETE', f'/ingredient/{ingredient_id}')
+
+    # --- избранное, морозилка, комментарии ---
+
+    def favorites(self, user_id: Optional[int] = None, recipe_id: Optional[int] = None) -> List[Favorite]:
+        return self._call('GET', '/favorite', Favorite, params=_clean({'userId': user_id, 'recipeId': recipe_id}))
+
+    def favorite(self, favorite_id: int) -> Favorite:
+        return self._call('GET', f'/favorite/{favorite_id}', Favorite)
+
+    def create_favorite(self, user_id: int, recipe_id: int) -> Favorite:
+        return self._call('POST', '/favorite', Favorite, json={'userId': user_id, 'recipeId': recipe_id})
+
+    def delete_favorite(self, favorite_id: int):
+        return self._call('DELETE', f'/favorite/{favorite_id}')
+
+    def freezer(self, user_id: Optional[int] = None, ingredient_id: Optional[int] = None) -> List[FreezerItem]:
+        return self._call('GET', '/freezer', FreezerItem,
+                          params=_clean({'userId': user_id, 'ingredientId': ingredient_id}))
+
+    def freezer_item(self, item_id: int) -> FreezerItem:
+        return self._call('GET', f'/freezer/{item_id}', FreezerItem)
+
+    def create_freezer_item(self, user_id: int, ingredient_id: int, count: float) -> FreezerItem:
+        return self._call('POST', '/freezer', FreezerItem,
+                          json={'userId': user_id, 'ingredientId': ingredient_id, 'count': count})
+
+    def update_freezer_item(self, item_id: int, count: float) -> FreezerItem:
+        return self._call('PUT', f'/freezer/{item_id}', FreezerItem, json={'count': count})
+
+    def delete_freezer_item(self, item_id: int):
+        return self._call('DELETE', f'/freezer/{item_id}')
+
+    def comments(self, recipe_id: Optional[int] = None, user_id: Optional[int] = None) -> List[Comment]:
+        return self._call('GET', '/comment', Comment, params=_clean({'recipeId': recipe_id, 'userId': user_id}))
+
+    def comment(self, comment_id: int) -> Comment:
+        return self._call('GET', f'/comment/{comment_id}', Comment)
+
+    def create_comment(self, recipe_id: int, text: str, user_id: Optional[int] = None,
+                       photo: Optional[str] = None) -> Comment:
+        return self._call('POST', '/comment', Comment,
+                          json=_clean({'recipeId': recipe_id, 'text': text, 'userId': user_id, 'photo': photo}))
+
+    def update_comment(self, comment_id: int, text: Optional[str] = None, photo: Optional[str] = None) -> Comment:
+        return self._call('PUT', f'/comment/{comment_id}', Comment, json=_clean({'text': text, 'photo': photo}))
+
+    def delete_comment(self, comment_id: int):
+        return self._call('DELETE', f'/comment/{comment_id}')
+
+    # --- пользователь ---
+
+    def register(self, login: str, password: str) -> User:
+        return decode(User, self._call('POST', '/user', json={'login': login, 'password': password})['user'])
+
+    def authenticate(self, login: str, password: str) -> str:
+        """Получает токен и запоминает его для следующих запросов клиента"""
+        self.token = self._call('PUT', '/user', json={'login': login, 'password': password})['token']
+        return self.token
+
+    def user(self, user_id: int) -> User:
+        return self._call('GET', f'/user/{user_id}', User)
+
+    def profile(self) -> User:
+        return self._call('GET', '/user/profile', User)
+
+    def update_profile(self, **fields) -> User:
+        """Поля в snake_case: first_name, last_name, phone, avatar_url, birthday, password"""
+        return self._call('PUT', '/user/profile', User, json={_camel(k): v for k, v in fields.items()})
+
+    def logout(self):
+        result = self._call('POST', '/user/profile/logout')
+        self.token = None
+        return result
+
+    def my_favorites(self) -> List[Recipe]:
+        return self._call('GET', '/user/favorites', Recipe)
+
+    def add_my_favorite(self, recipe_id: int):
+        return self._call('POST', f'/user/favorites/{recipe_id}')
+
+    def remove_my_favorite(self, recipe_id: int):
+        return self._call('DELETE', f'/user/favorites/{recipe_id}')
+
+    def cookable_recipes(self, max_missing: Optional[int] = None, check_quantity: bool = False,
+                         page: Optional[int] = 1, limit: int = 20,
+                         cursor: Optional[str] = None) -> FreezerMatchPage:
+        """Рецепты по покрытию морозилки текущего пользователя"""
+        params = _clean({'maxMissing': max_missing, 'checkQuantity': 'true' if check_quantity else None,
+                         'page': None if cursor else page, 'limit': limit, 'cursor': cursor})
+        return self._call('GET', '/user/freezer/recipes', FreezerMatchPage, params=params)
+
+    def my_comments(self) -> List[Comment]:
+        return self._call('GET', '/user/comments', Comment)
+
+    def create_my_comment(self, recipe_id: int, text: str) -> Comment:
+        return self._call('POST', '/user/comments', Comment, json={'recipeId': recipe_id, 'text': text})
+
+    def delete_my_comment(self, comment_id: int):
+        return self._call('DELETE', f'/user/comments/{comment_id}')
@@ -0,0 +1,187 @@
+"""
+Модели ответов Food API.
+
+Классы — dataclass со __slots__: ответы со списками рецептов и связей
+декодируются в тысячи объектов, и без __dict__ на каждом они занимают
+заметно меньше памяти. Поля называются в snake_case, ключи JSON — в
+camelCase, как их отдаёт API; неизвестные ключи игнорируются, отсутствующие
+становятся None.
+"""
+
+from dataclasses import dataclass, field, fields
+from typing import Any, Dict, List, Optional
+
+
+def nested(model, many=False):
+    """Поле со вложенным объектом (или списком объектов) model"""
+    return field(default=None, metadata={'model': model, 'many': many})
+
+
+def _camel(name: str) -> str:
+    head, *rest = name.split('_')
+    return head + ''.join(part.title() for part in rest)
+
+
+_DECODERS: Dict[type, list] = {}
+
+
+def _decoder(cls):
+    plan = _DECODERS.get(cls)
+    if plan is None:
+        plan = [(f.name, _camel(f.name), f.metadata.get('model'), f.metadata.get('many', False))
+                for f in fields(cls)]
+        _DECODERS[cls] = plan
+    return plan
+
+
+def decode(cls, data: Any):
+    """dict → cls, list → [cls]; вложенные поля декодируются рекурсивно"""
+    if data is None:
+        return None
+    if isinstance(data, list):
+        return [decode(cls, item) for item in data]
+    kwargs = {}
+    for name, key, model, many in _decoder(cls):
+        value = data.get(key, data.get(name))
+        if value is not None and model is not None:
+            value = decode(model, value) if not many else [decode(model, item) for item in value]
+        kwargs[name] = value
+    return cls(**kwargs)
+
+
+@dataclass(slots=True)
+class Ref:
+    """Ссылка на связанный объект: {"id": 1, "name": "..."}"""
+    id: int
+    name: Optional[str] = None
+
+
+@dataclass(slots=True)
+class MeasureUnit:
+    id: int
+    one: Optional[str] = None
+    few: Optional[str] = None
+    many: Optional[str] = None
+
+
+@dataclass(slots=True)
+class Ingredient:
+    id: int
+    name: Optional[str] = None
+    calories_for_unit: Optional[float] = None
+    measureunit: Optional[MeasureUnit] = nested(MeasureUnit)
+
+
+@dataclass(slots=True)
+class RecipeStep:
+    id: int
+    name: Optional[str] = None
+    duration: Optional[int] = None
+
+
+@dataclass(slots=True)
+class RecipeStepLink:
+    id: int
+    number: Optional[int] = None
+    recipe: Optional[Ref] = nested(Ref)
+    step: Optional[RecipeStep] = nested(RecipeStep)
+
+
+@dataclass(slots=True)
+class RecipeIngredient:
+    id: int
+    count: Optional[float] = None
+    ingredient: Optional[Ingredient] = nested(Ingredient)
+    recipe: Optional[Ref] = nested(Ref)
+
+
+@dataclass(slots=True)
+class Comment:
+    id: int
+    text: Optional[str] = None
+    photo: Optional[str] = None
+    date_time: Optional[str] = None
+    user: Optional[Ref] = nested(Ref)
+    recipe: Optional[Ref] = nested(Ref)
+
+
+@dataclass(slots=True)
+class Favorite:
+    id: int
+    user: Optional[Ref] = nested(Ref)
+    recipe: Optional[Ref] = nested(Ref)
+
+
+@dataclass(slots=True)
+class FreezerItem:
+    id: int
+    count: Optional[float] = None
+    user: Optional[Ref] = nested(Ref)
+    ingredient: Optional[Ref] = nested(Ref)
+
+
+@dataclass(slots=True)
+class Recipe:
+    id: int
+    name: Optional[str] = None
+    duration: Optional[int] = None
+    photo: Optional[str] = None
+    recipe_ingredients: Optional[List[RecipeIngredient]] = nested(RecipeIngredient, many=True)
+    recipe_step_links: Optional[List[RecipeStepLink]] = nested(RecipeStepLink, many=True)
+    comments: Optional[List[Comment]] = nested(Comment, many=True)
+    comment_count: Optional[int] = None
+
+
+@dataclass(slots=True)
+class Pagination:
+    """page/total_pages есть только без cursor, total — если не запрошен total=none"""
+    limit: int
+    page: Optional[int] = None
+    total: Optional[int] = None
+    total_pages: Optional[int] = None
+    total_is_estimate: Optional[bool] = None
+    next_cursor: Optional[str] = None
+
+
+@dataclass(slots=True)
+class RecipePage:
+    data: List[Recipe] = nested(Recipe, many=True)
+    pagination: Optional[Pagination] = nested(Pagination)
+
+
+@dataclass(slots=True)
+class MissingIngredient:
+    id: Optional[int] = None
+    name: Optional[str] = None
+    count: Optional[float] = None
+    in_freezer: Optional[float] = None
+
+
+@dataclass(slots=True)
+class FreezerMatch:
+    """Рецепт из /user/freezer/recipes: coverage = matched / ingredient_count"""
+    id: int
+    name: Optional[str] = None
+    duration: Optional[int] = None
+    photo: Optional[str] = None
+    matched: Optional[int] = None
+    ingredient_count: Optional[int] = None
+    coverage: Optional[float] = None
+    missing: Optional[List[MissingIngredient]] = nested(MissingIngredient, many=True)
+
+
+@dataclass(slots=True)
+class FreezerMatchPage:
+    data: List[FreezerMatch] = nested(FreezerMatch, many=True)
+    pagination: Optional[Pagination] = nested(Pagination)
+
+
+@dataclass(slots=True)
+class User:
+    id: int
+    login: Optional[str] = None
+    first_name: Optional[str] = None
+    last_name: Optional[str] = None
+    phone: Optional[str] = None
+    avatar_url: Optional[str] = None
+    birthday: Optional[str] = None
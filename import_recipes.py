@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+"""
+Импорт рецептов, собранных parse_recipes.py, в Food API.
+
+Строки ингредиентов разбираются IngredientTokenizer (ingredient_tokenizer.py)
+на название, количество и единицу измерения из GET /measure_unit.
+Ингредиенты и шаги дедуплицируются по имени через индекс имя → id, который
+строится один раз из GET /ingredient и GET /steps; недостающие создаются
+заранее. Рецепты создаются параллельно через общий пул keep-alive
+соединений FoodApiClient (foodapi_client), а ингредиенты и шаги привязываются к каждому рецепту двумя
+batch-запросами (/recipe-ingredients/batch и /recipe-step-links/batch).
+
+Количество ингредиента в рецепте хранится целым числом в единице самого
+ингредиента: количества одного ингредиента суммируются, только если строка
+записана в этой единице (или без единицы), и затем округляются
+(stored_count). Строки без названия ("200 гр.") и строки в другой единице
+("1 стакан муки" при муке в граммах) пропускаются и попадают в отчёт.
+
+Повторный запуск безопасен: id созданного рецепта сразу записывается в файл
+состояния по URL источника, а после загрузки связей рецепт отмечается
+завершённым. Рецепт, созданный прошлым запуском, но не завершённый, не
+создаётся заново — к нему только догружаются недостающие связи. Названия
+для этого не используются: в собранных данных они не уникальны.
+
+Пример:
+    python3 import_recipes.py parsed_recipes.json http://localhost:8888 --workers 16
+"""
+
+import argparse
+import json
+import math
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from foodapi_client import DEFAULT_BASE_URL, FoodApiClient
+from ingredient_tokenizer import IngredientTokenizer
+
+DEFAULT_STATE_PATH = "import_state.json"
+
+
+def stored_count(quantity):
+    """Количество для _recipeingredient.count (INTEGER).
+
+    Дробные количества («½ ложки», «1-2 ложки» → 1.5) округляются до
+    ближайшего целого, но не меньше 1, — иначе сервер отбросил бы дробную
+    часть и «½ ложки» сохранилась бы как 0.
+    """
+    return max(1, math.floor(quantity + 0.5))
+
+
+SKIP_NO_NAME = 'без названия'
+SKIP_UNIT = 'другая единица'
+
+
+def ingredient_counts(items, ingredient_ids, unit_of):
+    """({ingredient_id: count}, [(строка, причина пропуска)]) для разобранных
+    строк одного рецепта.
+
+    ingredient_ids — индекс имя в нижнем регистре → id, unit_of(id) —
+    единица ингредиента. Количества пересчитывать между единицами не из чего,
+    поэтому строка в чужой единице пропускается, а не прибавляется к сумме.
+    """
+    totals = {}
+    skipped = []
+    for item in items:
+        key = item.name.strip().lower()
+        if not key:
+            if item.line.strip():
+                skipped.append((item.line, SKIP_NO_NAME))
+            continue
+        ingredient_id = ingredient_ids[key]
+        if item.unit_id is not None and item.unit_id != unit_of(ingredient_id):
+            skipped.append((item.line, SKIP_UNIT))
+            continue
+        totals[ingredient_id] = totals.get(ingredient_id, 0) + (item.quantity or 1)
+    return {ingredient_id: stored_count(total) for ingredient_id, total in totals.items()}, skipped
+
+
+def load_recipes(path):
+    """Читает результат парсера: JSON-массив или NDJSON"""
+    with open(path, encoding='utf-8') as f:
+        if path.endswith('.ndjson'):
+            return [json.loads(line) for line in f if line.strip()]
+        return json.load(f)
+
+
+class ImportStats:
+    def __init__(self, total):
+        self.total = total
+        self.started = time.perf_counter()
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.created = 0
+        self.resumed = 0
+        self.skipped = 0
+        self.failed = 0
+        self.skipped_lines = {}
+        self.skipped_examples = []
+
+    def skip_lines(self, skipped):
+        with self.lock:
+            for line, reason in skipped:
+                self.skipped_lines[reason] = self.skipped_lines.get(reason, 0) + 1
+                if len(self.skipped_examples) < 10:
+                    self.skipped_examples.append(f"{reason}: {line.strip()}")
+
+    def count_request(self, n=1):
+        with self.lock:
+            self.requests += n
+
+    def done(self):
+        return self.created + self.resumed + self.skipped + self.failed
+
+    def progress(self):
+        elapsed = max(time.perf_counter() - self.started, 1e-9)
+        print(f"  {self.done()}/{self.total} рецептов, "
+              f"{self.done() / elapsed:.1f} рец/с, {self.requests / elapsed:.1f} запр/с")
+        if self.skipped_lines:
+            reasons = ', '.join(f"{reason} {n}" for reason, n in self.skipped_lines.items())
+            print(f"Пропущено строк ингредиентов: {reasons}")
+            for example in self.skipped_examples:
+                print(f"  {example}")
+
+    def report(self):
+        elapsed = max(time.perf_counter() - self.started, 1e-9)
+        print("\n" + "=" * 60)
+        print(f"Создано: {self.created}, дополнено: {self.resumed}, "
+              f"пропущено: {self.skipped}, ошибок: {self.failed}")
+        print(f"Запросов: {self.requests}, время: {elapsed:.2f} с, "
+              f"{self.done() / elapsed:.1f} рец/с, {self.requests / elapsed:.1f} запр/с")
+        if self.skipped_lines:
+            reasons = ', '.join(f"{reason} {n}" for reason, n in self.skipped_lines.items())
+            print(f"Пропущено строк ингредиентов: {reasons}")
+            for example in self.skipped_examples:
+                print(f"  {example}")
+
+
+class RecipeImporter:
+    def __init__(self, base_url, workers=8, measure_unit_id=1, state_path=DEFAULT_STATE_PATH):
+        self.base_url = base_url.rstrip('/')
+        self.workers = workers
+        self.measure_unit_id = measure_unit_id
+        self.state_path = state_path
+        self.api = FoodApiClient(base_url, pool_size=workers)
+        self.api.session.hooks['response'].append(lambda r, *args, **kwargs: self.stats.count_request())
+        self.ingredient_ids = {}
+        self.step_ids = {}
+        self.ingredient_units = {}
+        self.ingredient_unit_ids = {}
+        self.tokenizer = None
+        self.state = self._load_state()
+        self.state_lock = threading.Lock()
+        self.stats = None
+
+    # --- состояние между запусками ---
+
+    def _load_state(self):
+        """{url: {"recipeId": id, "done": bool}}; в старом формате url → id
+        записывались только завершённые рецепты"""
+        if not os.path.exists(self.state_path):
+            return {}
+        with open(self.state_path, encoding='utf-8') as f:
+            state = json.load(f)
+        return {url: entry if isinstance(entry, dict) else {'recipeId': entry, 'done': True}
+                for url, entry in state.items()}
+
+    def _save_state(self, url, recipe_id, done):
+        with self.state_lock:
+            self.state[url] = {'recipeId': recipe_id, 'done': done}
+            tmp = self.state_path + '.tmp'
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump(self.state, f, ensure_ascii=False)
+            os.replace(tmp, self.state_path)
+
+    # --- индексы имя → id ---
+
+    def load_indexes(self):
+        self.tokenizer = IngredientTokenizer.from_api(self.base_url, self.api.session)
+        for item in self.api.ingredients():
+            key = item.name.strip().lower()
+            if key not in self.ingredient_ids:
+                self.ingredient_ids[key] = item.id
+                self.ingredient_unit_ids[item.id] = item.measureunit.id if item.measureunit else None
+        for item in self.api.steps():
+            self.step_ids.setdefault(item.name.strip().lower(), item.id)
+        print(f"Индекс: {len(self.ingredient_ids)} ингредиентов, {len(self.step_ids)} шагов")
+
+    def _create_missing(self, names, index, create):
+        missing = {}
+        for name in names:
+            key = name.strip().lower()
+            if key and key not in index:
+                missing.setdefault(key, name.strip())
+        if not missing:
+            return
+        with ThreadPoolExecutor(self.workers) as pool:
+            for key, item in zip(missing, pool.map(create, missing.values())):
+                index[key] = item.id
+        print(f"Создано {len(missing)} новых записей")
+
+    def create_ingredients_and_steps(self, recipes):
+        parsed = self.tokenizer.tokenize_batch(line for r in recipes for line in r.get('ingredients', []))
+        for item in parsed:
+            # Новый ингредиент получает единицу из первой строки, где она указана
+            if item.unit_id is not None and item.name.strip():
+                self.ingredient_units.setdefault(item.name.strip().lower(), item.unit_id)
+        step_names = [s for r in recipes for s in r.get('steps', [])]
+        self._create_missing([item.name for item in parsed], self.ingredient_ids, self._create_ingredient)
+        self._create_missing(step_names, self.step_ids, lambda name: self.api.create_step(name, 0))
+
+    def _create_ingredient(self, name):
+        unit_id = self.ingredient_units.get(name.lower(), self.measure_unit_id)
+        item = self.api.create_ingredient(name, 0, unit_id)
+        self.ingredient_unit_ids[item.id] = unit_id
+        return item
+
+    def _unit_of(self, ingredient_id):
+        # У старых ингредиентов без единицы считаем её той же, что у новых по умолчанию
+        return self.ingredient_unit_ids.get(ingredient_id) or self.measure_unit_id
+
+    # --- рецепты ---
+
+    def _ingredient_counts(self, recipe):
+        counts, skipped = ingredient_counts(self.tokenizer.tokenize_batch(recipe.get('ingredients', [])),
+                                            self.ingredient_ids, self._unit_of)
+        if self.stats is not None:
+            self.stats.skip_lines(skipped)
+        return counts
+
+    def _step_ids(self, recipe):
+        return [self.step_ids[s.strip().lower()] for s in recipe.get('steps', [])]
+
+    def import_recipe(self, recipe):
+        """Импортирует один рецепт; возвращает 'created', 'resumed' или 'skipped'"""
+        url = recipe.get('url') or recipe['title']
+        entry = self.state.get(url)
+        if entry is not None and entry['done']:
+            return 'skipped'
+        if entry is None:
+            recipe_id = self.api.create_recipe(
+                recipe['title'], int(recipe.get('duration') or 0), recipe.get('photo') or None).id
+            self._save_state(url, recipe_id, done=False)
+            outcome = 'created'
+            has_ingredients = has_steps = False
+        else:
+            # Рецепт создан прошлым запуском, но связи могли не догрузиться
+            recipe_id = entry['recipeId']
+            outcome = 'resumed'
+            has_ingredients = bool(self.api.ingredients_for_recipe(recipe_id))
+            has_steps = bool(self.api.recipe_step_links(recipe_id))
+
+        if not has_ingredients:
+            self.api.create_recipe_ingredients(recipe_id, self._ingredient_counts(recipe))
+        if not has_steps:
+            self.api.create_step_links(recipe_id, self._step_ids(recipe))
+
+        self._save_state(url, recipe_id, done=True)
+        return outcome
+
+    def run(self, recipes, progress_every=50):
+        recipes = [r for r in recipes if r.get('title')]
+        self.stats = ImportStats(len(recipes))
+        self.load_indexes()
+        self.create_ingredients_and_steps(recipes)
+
+        with ThreadPoolExecutor(self.workers) as pool:
+            futures = {pool.submit(self.import_recipe, r): r for r in recipes}
+            for future in as_completed(futures):
+                try:
+                    outcome = future.result()
+                except Exception as e:
+                    print(f"Ошибка импорта «{futures[future]['title']}»: {e}")
+                    self.stats.failed += 1
+                else:
+                    setattr(self.stats, outcome, getattr(self.stats, outcome) + 1)
+                if self.stats.done() % progress_every == 0:
+                    self.stats.progress()
+        self.stats.report()
+        return self.stats.failed == 0
+
+
+def main():
+    ap = argparse.ArgumentParser(description='Import scraped recipes into Food API')
+    ap.add_argument('input', nargs='?', default='parsed_recipes.json',
+                    help='Результат parse_recipes.py (.json или .ndjson)')
+    ap.add_argument('base_url', nargs='?', default=DEFAULT_BASE_URL)
+    ap.add_argument('--workers', type=int, default=8, help='Параллельных запросов')
+    ap.add_argument('--measure-unit-id', type=int, default=1,
+                    help='Единица измерения для новых ингредиентов, если в строке её нет')
+    ap.add_argument('--state', default=DEFAULT_STATE_PATH,
+                    help='Файл с уже импортированными рецептами')
+    args = ap.parse_args()
+
+    recipes = load_recipes(args.input)
+    importer = RecipeImporter(args.base_url, args.workers, args.measure_unit_id, args.state)
+    ok = importer.run(recipes)
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main()
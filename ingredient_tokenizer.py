@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Разбор строк ингредиентов вида "200 гр. муки" в структуру
+(количество, id единицы измерения, название).
+
+Единицы берутся из GET /measure_unit: все три формы (one, few, many) и
+распространённые сокращения ("гр.", "ст. л.", "шт.") складываются в
+префиксное дерево, поэтому единица после числа находится одним проходом по
+символам без перебора списка. Количество понимает целые и десятичные числа
+(1,5), дроби (1/2, ½), смешанные дроби (1 1/2) и диапазоны (2-3, 2–3).
+
+Количеством считается число перед известной единицей, а если такого нет —
+последнее число в строке. Проценты ("Молоко 3,2%") и числа, приклеенные к
+буквам ("Яйцо С1"), остаются частью названия; тире в пробелах
+("Сливки — 200 мл") отделяет название, а не задаёт диапазон. Строка из
+одного количества ("200 гр.") даёт пустое название.
+
+Пример:
+    tokenizer = IngredientTokenizer.from_api("http://localhost:8888")
+    tokenizer.tokenize_batch(["200 гр. муки", "Яйца — 2-3 шт."])
+"""
+
+import re
+import sys
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+import requests
+
+# Сокращение → каноническая форма "one" единицы из _measureunit
+UNIT_ALIASES = {
+    'г': 'грамм',
+    'гр': 'грамм',
+    'кг': 'килограмм',
+    'мл': 'миллилитр',
+    'л': 'литр',
+    'шт': 'штука',
+    'ст. л': 'столовая ложка',
+    'ст.л': 'столовая ложка',
+    'ст л': 'столовая ложка',
+    'ч. л': 'чайная ложка',
+    'ч.л': 'чайная ложка',
+    'ч л': 'чайная ложка',
+}
+
+VULGAR_FRACTIONS = {
+    '½': 0.5, '⅓': 1 / 3, '⅔': 2 / 3, '¼': 0.25, '¾': 0.75, '⅕': 0.2, '⅛': 0.125,
+}
+
+_VULGAR = '[' + ''.join(VULGAR_FRACTIONS) + ']'
+_AMOUNT = (r'(?:\d+\s+\d+\s*/\s*\d+'        # 1 1/2
+           r'|\d+\s*/\s*\d+'                # 1/2
+           r'|\d+(?:[.,]\d+)?(?:\s*' + _VULGAR + r')?'  # 1,5 или 1½
+           r'|' + _VULGAR + r')')           # ½
+# Диапазон — только дефис или короткое тире без пробелов: " — " отделяет название
+QUANTITY_RE = re.compile(r'(?P<low>' + _AMOUNT + r')(?:[-–](?P<high>' + _AMOUNT + r'))?')
+PERCENT_RE = re.compile(r'\s*%')
+SEPARATORS = ' \t-–—:,.;'
+MEMO_LIMIT = 100_000   # строки в корпусе часто повторяются — кэшируем результаты
+
+
+class ParsedIngredient(NamedTuple):
+    name: str
+    quantity: Optional[float]       # середина диапазона, если указан диапазон
+    quantity_max: Optional[float]   # верхняя граница диапазона (или то же число)
+    unit_id: Optional[int]
+    unit: Optional[str]             # единица в том виде, как она записана в строке
+    line: str
+
+
+def parse_amount(text: str) -> float:
+    """'1 1/2' → 1.5, '1,5' → 1.5, '½' → 0.5, '2½' → 2.5"""
+    text = text.strip()
+    total = 0.0
+    if text and text[-1] in VULGAR_FRACTIONS:
+        total += VULGAR_FRACTIONS[text[-1]]
+        text = text[:-1].strip()
+    if not text:
+        return total
+    if '/' in text:
+        head, _, denominator = text.rpartition('/')
+        parts = head.split()
+        whole = int(parts[0]) if len(parts) > 1 else 0
+        denominator = int(denominator)
+        return total + whole + (int(parts[-1]) / denominator if denominator else 0.0)
+    return total + float(text.replace(',', '.'))
+
+
+def fetch_units(base_url: str, session=None) -> List[dict]:
+    """Единицы измерения из GET /measure_unit"""
+    http = session or requests
+    r = http.get(f"{base_url.rstrip('/')}/measure_unit", timeout=30)
+    r.raise_for_status()
+    return r.json()
+
+
+class UnitTrie:
+    """Префиксное дерево форм единиц измерения (в нижнем регистре)"""
+
+    _END = ''
+
+    def __init__(self):
+        self.root: Dict[str, dict] = {}
+
+    def add(self, form: str, unit_id: int):
+        node = self.root
+        for ch in form.lower():
+            node = node.setdefault(ch, {})
+        node[self._END] = unit_id
+
+    def match(self, text: str, pos: int):
+        """Самое длинное совпадение с границей слова; возвращает (id, конец) или None"""
+        node = self.root
+        best = None
+        i = pos
+        length = len(text)
+        while i < length:
+            node = node.get(text[i])
+            if node is None:
+                break
+            i += 1
+            if self._END in node and (i == length or not text[i].isalpha()):
+                best = (node[self._END], i)
+        return best
+
+
+class IngredientTokenizer:
+    def __init__(self, units: Iterable[dict]):
+        self.trie = UnitTrie()
+        by_one = {}
+        for unit in units:
+            for key in ('one', 'few', 'many'):
+                form = (unit.get(key) or '').strip()
+                if form:
+                    self.trie.add(form, unit['id'])
+            by_one[(unit.get('one') or '').strip().lower()] = unit['id']
+        for alias, one in UNIT_ALIASES.items():
+            if one in by_one:
+                self.trie.add(alias, by_one[one])
+        self._memo: Dict[str, ParsedIngredient] = {}
+
+    @classmethod
+    def from_api(cls, base_url: str, session=None):
+        return cls(fetch_units(base_url, session))
+
+    def tokenize(self, line: str) -> ParsedIngredient:
+        cached = self._memo.get(line)
+        if cached is not None:
+            return cached
+        result = self._tokenize(line)
+        if len(self._memo) >= MEMO_LIMIT:
+            self._memo.clear()
+        self._memo[line] = result
+        return result
+
+    def tokenize_batch(self, lines: Iterable[str]) -> List[ParsedIngredient]:
+        tokenize = self.tokenize
+        return [tokenize(line) for line in lines]
+
+    def _tokenize(self, line: str) -> ParsedIngredient:
+        text = line.strip()
+        lower = text.lower()
+        match = None
+        unit_match = None
+        for candidate in QUANTITY_RE.finditer(text):
+            start, end = candidate.span()
+            if start > 0 and text[start - 1].isalpha() or PERCENT_RE.match(text, end):
+                continue
+            found = self._unit_after(lower, end)
+            if end < len(text) and text[end].isalpha() and found is None:
+                continue    # "3D", "5кор" — часть слова, а не количество
+            match = candidate
+            if found is not None:
+                unit_match = found
+                break
+        if match is None:
+            return ParsedIngredient(text.strip(SEPARATORS), None, None, None, None, line)
+
+        low = parse_amount(match.group('low'))
+        high = parse_amount(match.group('high')) if match.group('high') else low
+        start, end = match.span()
+
+        unit_id = None
+        unit = None
+        if unit_match is not None:
+            unit_id, pos, unit_end = unit_match
+            if unit_end < len(text) and text[unit_end] == '.':
+                unit_end += 1
+            unit = text[pos:unit_end]
+            end = unit_end
+
+        name = (text[:start].strip(SEPARATORS) + ' ' + text[end:].strip(SEPARATORS)).strip()
+        return ParsedIngredient(name, (low + high) / 2, high, unit_id, unit, line)
+
+    def _unit_after(self, lower: str, pos: int):
+        """(id, начало, конец) единицы сразу после количества или None"""
+        while pos < len(lower) and lower[pos] == ' ':
+            pos += 1
+        found = self.trie.match(lower, pos)
+        return None if found is None else (found[0], pos, found[1])
+
+
+def main():
+    base_url = sys.argv[1] if len(sys.argv) > 1 else "https://foodapi.dzolotov.pro"
+    tokenizer = IngredientTokenizer.from_api(base_url)
+    for parsed in tokenizer.tokenize_batch(line.rstrip('\n') for line in sys.stdin):
+        print(f"{parsed.quantity!s:>6} | {parsed.unit_id!s:>4} | {parsed.unit or '':<8} | {parsed.name}")
+
+
+if __name__ == '__main__':
+    main()
@@ -37,8 +37,8 @@ CREATE TABLE IF NOT EXISTS "_recipestep" (
 CREATE TABLE IF NOT EXISTS "_recipesteplink" (
     id BIGSERIAL PRIMARY KEY,
     number INTEGER NOT NULL,
-    recipe_id BIGINT REFERENCES "_recipe"(id) ON DELETE SET NULL,
-    step_id BIGINT REFERENCES "_recipestep"(id) ON DELETE SET NULL
+    recipe_id BIGINT REFERENCES "_recipe"(id) ON DELETE CASCADE,
+    step_id BIGINT REFERENCES "_recipestep"(id) ON DELETE CASCADE
 );
 
 CREATE TABLE IF NOT EXISTS "_measureunit" (
@@ -59,7 +59,7 @@ CREATE TABLE IF NOT EXISTS "_recipeingredient" (
     id BIGSERIAL PRIMARY KEY,
     count INTEGER NOT NULL,
     ingredient_id BIGINT REFERENCES "_ingredient"(id) ON DELETE SET NULL,
-    recipe_id BIGINT REFERENCES "_recipe"(id) ON DELETE SET NULL
+    recipe_id BIGINT REFERENCES "_recipe"(id) ON DELETE CASCADE
 );
 
 CREATE TABLE IF NOT EXISTS "_freezer" (
@@ -75,11 +75,11 @@ CREATE TABLE IF NOT EXISTS "_comment" (
     "dateTime" TIMESTAMP NOT NULL,
     photo VARCHAR NULL,
     user_id BIGINT REFERENCES "_user"(id) ON DELETE SET NULL,
-    recipe_id BIGINT REFERENCES "_recipe"(id) ON DELETE SET NULL
+    recipe_id BIGINT REFERENCES "_recipe"(id) ON DELETE CASCADE
 );
 
 CREATE TABLE IF NOT EXISTS "_favorite" (
     id BIGSERIAL PRIMARY KEY,
-    recipe_id BIGINT REFERENCES "_recipe"(id) ON DELETE SET NULL,
+    recipe_id BIGINT REFERENCES "_recipe"(id) ON DELETE CASCADE,
     user_id BIGINT REFERENCES "_user"(id) ON DELETE SET NULL
 );
\ No newline at end of file
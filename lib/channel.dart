@@ -1,3 +1,4 @@
+import 'dart:isolate';
 
 import 'package:conduit_common/conduit_common.dart';
 import 'package:conduit_core/conduit_core.dart';
@@ -24,6 +25,12 @@ import 'controller/recipe_ingredient_controller.dart';
 // User & auth controllers
 import 'controllers/user_profile_controller.dart';
 import 'middleware/auth_middleware.dart';
+import 'middleware/drain_middleware.dart';
+import 'model/user.dart';
+import 'utils/count_cache.dart';
+import 'utils/database_config.dart';
+import 'utils/response_cache.dart';
+import 'utils/token_cache.dart';
 
 // Health check controller
 import 'controllers/health_controller.dart';
@@ -31,6 +38,10 @@ import 'controllers/health_controller.dart';
 
 class FoodapiChannel extends ApplicationChannel {
   late ManagedContext context;
+  late TokenCache<User> tokenCache;
+  late DrainController drainController;
+  late CountCache recipeTotals;
+  late ResponseCache responseCache;
 
   @override
   Future<APIDocument> documentAPI(Map<String, dynamic> projectSpec) async {
@@ -119,6 +130,7 @@ class FoodapiChannel extends ApplicationChannel {
       'photo': APISchemaObject.string(),
     }));
     // Пагинация для списка рецептов
+    // page/totalPages — только без cursor, total — если не запрошен total=none
     registry.schema.register('PaginatedRecipes', APISchemaObject.object({
       'data': APISchemaObject.array(ofSchema: registry.schema['Recipe']),
       'pagination': APISchemaObject.object({
@@ -126,6 +138,8 @@ class FoodapiChannel extends ApplicationChannel {
         'limit': APISchemaObject.integer(),
         'total': APISchemaObject.integer(),
         'totalPages': APISchemaObject.integer(),
+        'totalIsEstimate': APISchemaObject.boolean(),
+        'nextCursor': APISchemaObject.string()..isNullable = true,
       })
     }));
     
@@ -185,29 +199,69 @@ class FoodapiChannel extends ApplicationChannel {
         (rec) => print("$rec ${rec.error ?? ""} ${rec.stackTrace ?? ""}"));
     final dataModel = ManagedDataModel.fromCurrentMirrorSystem();
     
-    final dbHost = Platform.environment['DATABASE_HOST'] ?? 'localhost';
-    final dbPort = int.parse(Platform.environment['DATABASE_PORT'] ?? '5433');
-    final dbUser = Platform.environment['DATABASE_USER'] ?? 'food';
-    final dbPassword = Platform.environment['DATABASE_PASSWORD'] ?? 'yaigoo2E';
-    final dbName = Platform.environment['DATABASE_NAME'] ?? 'food';
-    
-    final persistence = PostgreSQLPersistentStore(
-      dbUser,
-      dbPassword,
-      dbHost,
-      dbPort,
-      dbName,
-      useSSL: false,
-    );
+    // Свой пул соединений на каждый isolate (DATABASE_POOL_SIZE)
+    final persistence = DatabaseConfig.fromEnvironment().createStore();
     context = ManagedContext(dataModel, persistence);
+
+    // SIGTERM в главном isolate: перестаём принимать соединения,
+    // дожидаемся текущих запросов и закрываем пул
+    drainController = DrainController(
+      timeout: Duration(seconds: int.parse(Platform.environment['DRAIN_TIMEOUT'] ?? '20')),
+    );
+    drainController.attach(
+      options?.context['shutdownPort'] as SendPort?,
+      stopListening: () => server.server.close(),
+      onDrained: () => context.close(),
+    );
+
+    // Кеш токенов AuthMiddleware; инвалидации рассылаются остальным isolate
+    tokenCache = TokenCache<User>(
+      maxEntries: int.parse(Platform.environment['AUTH_CACHE_SIZE'] ?? '10000'),
+      ttl: Duration(seconds: int.parse(Platform.environment['AUTH_CACHE_TTL'] ?? '60')),
+      negativeTtl: Duration(seconds: int.parse(Platform.environment['AUTH_CACHE_NEGATIVE_TTL'] ?? '10')),
+    );
+    tokenCache.onUserInvalidated = (userId) {
+      messageHub.add({'event': 'auth.invalidate', 'userId': userId});
+    };
+    messageHub.listen((event) {
+      if (event is Map && event['event'] == 'auth.invalidate') {
+        tokenCache.invalidateUser(event['userId'] as int, broadcast: false);
+      } else if (event is Map && event['event'] == 'responses.invalidate') {
+        responseCache.invalidate((event['tags'] as List).cast<String>(), broadcast: false);
+      }
+    });
+
+    // COUNT(*) для пагинации рецептов; в других isolate устаревает по TTL
+    recipeTotals = CountCache(
+      ttl: Duration(seconds: int.parse(Platform.environment['RECIPE_TOTALS_TTL'] ?? '30')),
+    );
+
+    // Готовые GET-ответы с ETag; инвалидации рассылаются остальным isolate
+    responseCache = ResponseCache(
+      maxBytes: int.parse(Platform.environment['RESPONSE_CACHE_BYTES'] ?? '${64 * 1024 * 1024}'),
+      ttl: Duration(seconds: int.parse(Platform.environment['RESPONSE_CACHE_TTL'] ?? '300')),
+    );
+    responseCache.onInvalidated = (tags) {
+      messageHub.add({'event': 'responses.invalidate', 'tags': tags});
+    };
+  }
+
+  @override
+  Future close() async {
+    drainController.close();
+    if (!drainController.isDraining) {
+      await context.close();
+    }
+    await super.close();
   }
 
   @override
   Controller get entryPoint {
     final router = Router();
+    drainController.link(() => router);
     
     // Health check endpoint (no auth required, no logging)
-    router.route("/healthz").link(() => HealthController(context));
+    router.route("/healthz").link(() => HealthController(context, tokenCache: tokenCache, responseCache: responseCache));
     
     // Logging middleware
     router.route("/[:path(.*)]")
@@ -222,53 +276,57 @@ class FoodapiChannel extends ApplicationChannel {
       });
 
     // Recipe endpoints
-    router.route("/recipe/search").link(() => RecipeSearchController(context));
-    router.route("/recipe[/:id]").link(() => RecipeController(context));
+    router.route("/recipe/search").link(() => RecipeSearchController(context, recipeTotals));
+    router.route("/recipe[/:id]").link(() => RecipeController(context, recipeTotals, responseCache));
     
     // Recipe steps
-    router.route("/steps[/:id]").link(() => RecipeStepController(context));
+    router.route("/steps[/:id]").link(() => RecipeStepController(context, responseCache));
     
     // Recipe step links
-    router.route("/recipe-step-links[/:id]").link(() => RecipeStepLinkController(context));
-    router.route("/recipe-step-links/recipe/:recipeId").link(() => RecipeStepLinkController(context));
-    router.route("/recipe-step-links/batch").link(() => RecipeStepLinkController(context));
-    router.route("/recipe-step-links/reorder").link(() => RecipeStepLinkController(context));
+    router.route("/recipe-step-links[/:id]").link(() => RecipeStepLinkController(context, responseCache));
+    router.route("/recipe-step-links/recipe/:recipeId").link(() => RecipeStepLinkController(context, responseCache));
+    router.route("/recipe-step-links/batch").link(() => RecipeStepLinkController(context, responseCache));
+    router.route("/recipe-step-links/reorder").link(() => RecipeStepLinkController(context, responseCache));
     
     // Recipe ingredients
-    router.route("/recipe-ingredients[/:id]").link(() => RecipeIngredientController(context));
-    router.route("/recipe-ingredients/batch").link(() => RecipeIngredientController(context));
-    router.route("/recipe-ingredients/recipe/:recipeId").link(() => RecipeIngredientController(context));
+    router.route("/recipe-ingredients[/:id]").link(() => RecipeIngredientController(context, responseCache));
+    router.route("/recipe-ingredients/batch").link(() => RecipeIngredientController(context, responseCache));
+    router.route("/recipe-ingredients/recipe/:recipeId").link(() => RecipeIngredientController(context, responseCache));
     
     // Entity endpoints
-    router.route("/measure_unit[/:id]").link(() => MeasureUnitController(context));
-    router.route("/ingredient[/:id]").link(() => IngredientController(context));
+    router.route("/measure_unit[/:id]").link(() => MeasureUnitController(context, responseCache));
+    router.route("/ingredient[/:id]").link(() => IngredientController(context, responseCache));
     router.route("/favorite[/:id]").link(() => FavoriteController(context));
     router.route("/freezer[/:id]").link(() => FreezerController(context));
-    router.route("/comment[/:id]").link(() => CommentController(context));
+    router.route("/comment[/:id]").link(() => CommentController(context, responseCache));
     
     // Authentication endpoints (no auth required)
-    router.route("/user").link(() => UserController(context));
+    router.route("/user").link(() => UserController(context, tokenCache));
     router.route("/user/:id").link(() => UserInfoController(context));
     
     // User-specific endpoints (authentication required)
     router.route("/user/profile[/:path]")
-      .link(() => AuthMiddleware(context))!
-      .link(() => UserProfileController(context));
+      .link(() => AuthMiddleware(context, tokenCache))!
+      .link(() => UserProfileController(context, tokenCache));
     // Explicit logout endpoint for clarity
     router.route("/user/profile/logout")
-      .link(() => AuthMiddleware(context))!
-      .link(() => UserProfileController(context));
+      .link(() => AuthMiddleware(context, tokenCache))!
+      .link(() => UserProfileController(context, tokenCache));
     
     router.route("/user/favorites[/:recipeId]")
-      .link(() => AuthMiddleware(context))!
+      .link(() => AuthMiddleware(context, tokenCache))!
       .link(() => UserFavoritesController(context));
     
     router.route("/user/comments[/:id]")
-      .link(() => AuthMiddleware(context))!
-      .link(() => UserCommentsController(context));
+      .link(() => AuthMiddleware(context, tokenCache))!
+      .link(() => UserCommentsController(context, responseCache));
+    
+    router.route("/user/freezer/recipes")
+      .link(() => AuthMiddleware(context, tokenCache))!
+      .link(() => UserFreezerRecipesController(context));
     
     // Все тестовые endpoints удалены
 
-    return router;
+    return drainController;
   }
 }
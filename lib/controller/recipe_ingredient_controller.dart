@@ -5,11 +5,17 @@ import 'package:conduit_open_api/src/v3/response.dart';
 import 'package:conduit_open_api/v3.dart';
 import 'package:foodapi/model/ingredient.dart';
 import 'package:foodapi/model/recipe.dart';
+import 'package:foodapi/utils/collection_page.dart';
+import 'package:foodapi/utils/response_cache.dart';
 
 class RecipeIngredientController extends ResourceController {
-  RecipeIngredientController(this.context);
+  RecipeIngredientController(this.context, this.responses);
 
   final ManagedContext context;
+  final ResponseCache responses;
+
+  /// Предел строк в одном batch-запросе: по три параметра на строку
+  static const int maxBatchSize = 1000;
 
   @override
   Map<String, APIResponse> documentOperationResponses(
@@ -89,29 +95,32 @@ class RecipeIngredientController extends ResourceController {
   @Operation.get()
   Future<Response> getAllRecipeIngredients() async {
     final store = context.persistentStore as PostgreSQLPersistentStore;
-    final where = <String>[];
-    final values = <String, dynamic>{};
     final qp = request!.raw.uri.queryParameters;
     final recipeId = int.tryParse(qp['recipeId'] ?? '');
     final ingredientId = int.tryParse(qp['ingredientId'] ?? '');
-    if (recipeId != null) { where.add('ri.recipe_id = @rid'); values['rid'] = recipeId; }
-    if (ingredientId != null) { where.add('ri.ingredient_id = @iid'); values['iid'] = ingredientId; }
-    final rows = await store.execute(
-      'SELECT ri.id, ri.count, i.id, i.name, r.id, r.name '
-      'FROM _recipeingredient ri '
-      'JOIN _ingredient i ON i.id = ri.ingredient_id '
-      'JOIN _recipe r ON r.id = ri.recipe_id '
-      '${where.isNotEmpty ? 'WHERE ' + where.join(' AND ') : ''} '
-      'ORDER BY ri.id',
-      substitutionValues: values,
-    ) as List<List<dynamic>>;
-    final list = rows.map((row) => {
-      'id': row[0],
-      'count': row[1],
-      'ingredient': {'id': row[2], 'name': row[3]},
-      'recipe': {'id': row[4], 'name': row[5]},
-    }).toList();
-    return Response.ok(list);
+    final page = CollectionPage(fetch: (after, limit) async {
+      final where = <String>[];
+      final values = <String, dynamic>{'limit': limit};
+      if (recipeId != null) { where.add('ri.recipe_id = @rid'); values['rid'] = recipeId; }
+      if (ingredientId != null) { where.add('ri.ingredient_id = @iid'); values['iid'] = ingredientId; }
+      if (after != null) { where.add('ri.id > @afterId'); values['afterId'] = after.id; }
+      final rows = await store.execute(
+        'SELECT ri.id, ri.count, i.id, i.name, r.id, r.name '
+        'FROM _recipeingredient ri '
+        'JOIN _ingredient i ON i.id = ri.ingredient_id '
+        'JOIN _recipe r ON r.id = ri.recipe_id '
+        '${where.isNotEmpty ? 'WHERE ' + where.join(' AND ') : ''} '
+        'ORDER BY ri.id LIMIT @limit',
+        substitutionValues: values,
+      ) as List<List<dynamic>>;
+      return rows.map((row) => {
+        'id': row[0],
+        'count': row[1],
+        'ingredient': {'id': row[2], 'name': row[3]},
+        'recipe': {'id': row[4], 'name': row[5]},
+      }).toList();
+    });
+    return page.respond(request!);
   }
 
   @Operation.get('id')
@@ -168,6 +177,7 @@ class RecipeIngredientController extends ResourceController {
         return Response.serverError(body: {'error': 'Failed to insert recipe ingredient'});
       }
       final newId = inserted.first.first as int;
+      responses.invalidateRecipes([recipeId]);
 
       // Загружаем полные данные с join'ами
       final selectSql =
@@ -200,8 +210,9 @@ class RecipeIngredientController extends ResourceController {
 
     // Проверяем существование
     final store = context.persistentStore as PostgreSQLPersistentStore;
-    final exists = await store.execute('SELECT id FROM _recipeingredient WHERE id=@id', substitutionValues: {'id': id}) as List<List<dynamic>>;
+    final exists = await store.execute('SELECT id, recipe_id FROM _recipeingredient WHERE id=@id', substitutionValues: {'id': id}) as List<List<dynamic>>;
     if (exists.isEmpty) return Response.notFound(body: {'error': 'RecipeIngredient not found'});
+    final previousRecipeId = exists.first[1] as int?;
 
     // Формируем SET
     final updates = <String>[];
@@ -237,6 +248,8 @@ class RecipeIngredientController extends ResourceController {
     try {
       final sql = 'UPDATE _recipeingredient SET ${updates.join(', ')} WHERE id = @id';
       await store.execute(sql, substitutionValues: values);
+      // Связь может переехать в другой рецепт: сбрасываем и старый, и новый
+      responses.invalidateRecipes([previousRecipeId, values['recipe_id'] as int?]);
 
       final selectSql = 'SELECT ri.id, ri.count, i.id, i.name, r.id, r.name '
           'FROM _recipeingredient ri '
@@ -261,70 +274,77 @@ class RecipeIngredientController extends ResourceController {
 
   @Operation.delete('id')
   Future<Response> deleteRecipeIngredient(@Bind.path('id') int id) async {
-    final query = Query<RecipeIngredient>(context)
-      ..where((ri) => ri.id).equalTo(id);
-    
-    final deletedCount = await query.delete();
+    final store = context.persistentStore as PostgreSQLPersistentStore;
+    final deleted = await store.execute(
+      'DELETE FROM _recipeingredient WHERE id = @id RETURNING recipe_id',
+      substitutionValues: {'id': id},
+    ) as List<List<dynamic>>;
     
-    if (deletedCount == 0) {
+    if (deleted.isEmpty) {
       return Response.notFound(body: {'error': 'RecipeIngredient not found'});
     }
+    responses.invalidateRecipes(deleted.map((row) => row.first as int?));
     
     return Response.ok({'message': 'RecipeIngredient deleted successfully'});
   }
 
+  /// Ингредиенты рецептов пачкой: весь массив проверяется до записи, затем
+  /// один INSERT ... VALUES на все строки. Вставка и выборка связанных
+  /// рецептов/ингредиентов идут одним запросом, то есть в одной транзакции:
+  /// ошибка в любой строке (например, несуществующий id) откатывает всю пачку.
   @Operation.post('batch')
   Future<Response> batchCreateRecipeIngredients() async {
     // Читаем JSON array вручную для поддержки вложенных объектов
     final List<dynamic> ingredients = await request!.body.decode();
+    if (ingredients.length > maxBatchSize) {
+      return Response.badRequest(body: {'error': 'At most $maxBatchSize items per batch'});
+    }
+
+    final values = <String, dynamic>{};
+    final rows = <String>[];
+    final recipeIds = <int>{};
+    for (var i = 0; i < ingredients.length; i++) {
+      final item = ingredients[i];
+      final recipeId = item is Map ? int.tryParse(item['recipe']?['id']?.toString() ?? '') : null;
+      final ingredientId = item is Map ? int.tryParse(item['ingredient']?['id']?.toString() ?? '') : null;
+      final dynamic rawCount = item is Map ? item['count'] : null;
+      final num? countNum = rawCount is num ? rawCount : (rawCount is String ? num.tryParse(rawCount) : null);
+      if (recipeId == null || ingredientId == null || countNum == null) {
+        return Response.badRequest(body: {'error': 'recipe.id, ingredient.id and count are required', 'index': i});
+      }
+      values['count$i'] = countNum.toInt();
+      values['ingredient$i'] = ingredientId;
+      values['recipe$i'] = recipeId;
+      rows.add('(CAST(@count$i AS int4), CAST(@ingredient$i AS int4), CAST(@recipe$i AS int4))');
+      recipeIds.add(recipeId);
+    }
+    if (rows.isEmpty) {
+      return Response.ok([]);
+    }
 
     try {
       final store = context.persistentStore as PostgreSQLPersistentStore;
-      final insertedIds = <int>[];
-      for (final item in ingredients) {
-        final recipeId = int.tryParse(item['recipe']?['id']?.toString() ?? '');
-        final ingredientId = int.tryParse(item['ingredient']?['id']?.toString() ?? '');
-        final num? countNum = () {
-          final rc = item['count'];
-          if (rc is num) return rc;
-          if (rc is String) return num.tryParse(rc);
-          return null;
-        }();
-        if (recipeId == null || ingredientId == null || countNum == null) {
-          return Response.badRequest(body: {'error': 'recipe.id, ingredient.id and count are required'});
-        }
-        final values = <String, dynamic>{
-          'count': countNum.toInt(),
-          'ingredient_id': ingredientId,
-          'recipe_id': recipeId,
-        };
-        final insertSql = 'INSERT INTO _recipeingredient (count, ingredient_id, recipe_id) '
-            'VALUES (CAST(@count AS int4), CAST(@ingredient_id AS int4), CAST(@recipe_id AS int4)) RETURNING id';
-        final inserted = await store.execute(insertSql, substitutionValues: values) as List<List<dynamic>>;
-        if (inserted.isNotEmpty) {
-          insertedIds.add(inserted.first.first as int);
-        }
-      }
+      // id из sequence выдаются в порядке VALUES, поэтому ORDER BY id
+      // возвращает строки в порядке запроса
+      final inserted = await store.execute(
+        'WITH inserted AS ('
+        'INSERT INTO _recipeingredient (count, ingredient_id, recipe_id) VALUES ${rows.join(', ')} '
+        'RETURNING id, count, ingredient_id, recipe_id) '
+        'SELECT ri.id, ri.count, i.id, i.name, r.id, r.name '
+        'FROM inserted ri '
+        'JOIN _ingredient i ON i.id = ri.ingredient_id '
+        'JOIN _recipe r ON r.id = ri.recipe_id '
+        'ORDER BY ri.id',
+        substitutionValues: values,
+      ) as List<List<dynamic>>;
+      responses.invalidateRecipes(recipeIds);
 
-      final results = <Map<String, dynamic>>[];
-      for (final rid in insertedIds) {
-        final selectSql = 'SELECT ri.id, ri.count, i.id, i.name, r.id, r.name '
-            'FROM _recipeingredient ri '
-            'JOIN _ingredient i ON i.id = ri.ingredient_id '
-            'JOIN _recipe r ON r.id = ri.recipe_id '
-            'WHERE ri.id = @id';
-        final rows = await store.execute(selectSql, substitutionValues: {'id': rid}) as List<List<dynamic>>;
-        if (rows.isNotEmpty) {
-          final row = rows.first;
-          results.add({
-            'id': row[0],
-            'count': row[1],
-            'ingredient': {'id': row[2], 'name': row[3]},
-            'recipe': {'id': row[4], 'name': row[5]},
-          });
-        }
-      }
-      return Response.ok(results);
+      return Response.ok(inserted.map((row) => {
+        'id': row[0],
+        'count': row[1],
+        'ingredient': {'id': row[2], 'name': row[3]},
+        'recipe': {'id': row[4], 'name': row[5]},
+      }).toList());
     } catch (e) {
       return Response.badRequest(body: {'error': e.toString()});
     }
@@ -336,6 +356,7 @@ class RecipeIngredientController extends ResourceController {
       ..where((ri) => ri.recipe!.id).equalTo(recipeId);
     
     final deletedCount = await query.delete();
+    responses.invalidateRecipes([recipeId]);
     
     return Response.ok({'message': 'Deleted $deletedCount ingredients for recipe'});
   }
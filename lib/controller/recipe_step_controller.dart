@@ -4,11 +4,15 @@ import 'package:conduit_open_api/src/v3/response.dart';
 import 'package:conduit_open_api/v3.dart';
 import 'package:conduit_postgresql/conduit_postgresql.dart';
 import 'package:foodapi/model/recipe.dart';
+import 'package:foodapi/utils/collection_page.dart';
+import 'package:foodapi/utils/recipe_search.dart';
+import 'package:foodapi/utils/response_cache.dart';
 
 class RecipeStepController extends ResourceController {
-  RecipeStepController(this.context);
+  RecipeStepController(this.context, this.responses);
 
   final ManagedContext context;
+  final ResponseCache responses;
 
   @override
   Map<String, APIResponse> documentOperationResponses(
@@ -45,16 +49,38 @@ class RecipeStepController extends ResourceController {
   Future<Response> getAllSteps({
     @Bind.query('name') String? name,
   }) async {
-    final query = Query<RecipeStep>(context)
-      ..join(set: (s) => s.recipeStepLinks);
-    
-    // Добавляем поиск по имени если параметр передан
-    if (name != null && name.isNotEmpty) {
-      query.where((s) => s.name).contains(name, caseSensitive: false);
-    }
-    
-    final steps = await query.fetch();
-    return Response.ok(steps);
+    final store = context.persistentStore as PostgreSQLPersistentStore;
+    // Связи шага собираются в той же строке: пачка шагов — один запрос
+    final page = CollectionPage(fetch: (after, limit) async {
+      final where = <String>[];
+      final values = <String, dynamic>{'limit': limit};
+      // Добавляем поиск по имени если параметр передан
+      if (name != null && name.isNotEmpty) {
+        where.add('s.name ILIKE @name');
+        values['name'] = '%${RecipeSearch.escapeLike(name)}%';
+      }
+      if (after != null) {
+        where.add('s.id > @afterId');
+        values['afterId'] = after.id;
+      }
+      final rows = await store.execute(
+        'SELECT s.id, s.name, s.duration, '
+        "(SELECT COALESCE(json_agg(json_build_object('id', l.id, 'recipe', json_build_object('id', l.recipe_id), "
+        "'step', json_build_object('id', l.step_id), 'number', l.number) ORDER BY l.id), '[]') "
+        'FROM _recipesteplink l WHERE l.step_id = s.id) '
+        'FROM _recipestep s '
+        '${where.isNotEmpty ? 'WHERE ' + where.join(' AND ') : ''} '
+        'ORDER BY s.id LIMIT @limit',
+        substitutionValues: values,
+      ) as List<List<dynamic>>;
+      return rows.map((r) => {
+        'id': r[0],
+        'name': r[1],
+        'duration': r[2],
+        'recipeStepLinks': r[3],
+      }).toList();
+    });
+    return page.respond(request!);
   }
 
   @Operation.get('id')
@@ -133,6 +159,8 @@ class RecipeStepController extends ResourceController {
       ) as List<List<dynamic>>;
       if (res.isEmpty) return Response.notFound(body: {'error': 'Step not found'});
       final r = res.first;
+      // Шаг может входить в любые рецепты: сбрасываем все GET /recipe/{id}
+      responses.invalidate(const [ResponseCache.steps]);
       return Response.ok({'id': r[0], 'name': r[1], 'duration': r[2]});
     } catch (e) {
       return Response.badRequest(body: {'error': e.toString()});
@@ -4,11 +4,19 @@ import 'package:conduit_open_api/src/v3/response.dart';
 import 'package:conduit_open_api/v3.dart';
 import 'package:conduit_postgresql/conduit_postgresql.dart';
 import 'package:foodapi/model/recipe.dart';
+import 'package:foodapi/utils/collection_page.dart';
+import 'package:foodapi/utils/pooled_store.dart';
+import 'package:foodapi/utils/response_cache.dart';
+import 'package:foodapi/utils/step_order.dart';
 
 class RecipeStepLinkController extends ResourceController {
-  RecipeStepLinkController(this.context);
+  RecipeStepLinkController(this.context, this.responses);
 
   final ManagedContext context;
+  final ResponseCache responses;
+
+  /// Предел строк в одном batch-запросе: по три параметра на строку
+  static const int maxBatchSize = 1000;
 
   @override
   Map<String, APIResponse> documentOperationResponses(
@@ -84,6 +92,13 @@ class RecipeStepLinkController extends ResourceController {
                 "number": APISchemaObject.integer(),
               })
             ),
+            "move": APISchemaObject.object({
+              "linkId": APISchemaObject.integer(),
+              "before": APISchemaObject.integer(),
+              "after": APISchemaObject.integer(),
+            }),
+            "renumber": APISchemaObject.boolean(),
+            "gap": APISchemaObject.integer(),
           }),
           description: "Данные для переупорядочивания шагов",
         );
@@ -99,27 +114,49 @@ class RecipeStepLinkController extends ResourceController {
     return null;
   }
 
+  /// Шаги рецепта (recipeId) идут по номеру, остальные выборки — по id
   @Operation.get()
   Future<Response> getAllRecipeStepLinks(
     @Bind.query('recipeId') int? recipeId,
     @Bind.query('stepId') int? stepId,
   ) async {
-    final query = Query<RecipeStepLink>(context)
-      ..join(object: (rsl) => rsl.recipe)
-      ..join(object: (rsl) => rsl.step);
-    
-    if (recipeId != null) {
-      query.where((rsl) => rsl.recipe!.id).equalTo(recipeId);
-    }
-    
-    if (stepId != null) {
-      query.where((rsl) => rsl.step!.id).equalTo(stepId);
-    }
-    
-    query.sortBy((rsl) => rsl.number, QuerySortOrder.ascending);
-    
-    final links = await query.fetch();
-    return Response.ok(links);
+    final store = context.persistentStore as PostgreSQLPersistentStore;
+    final byNumber = recipeId != null;
+    final page = CollectionPage(keys: byNumber ? const ['number', 'id'] : const ['id'], fetch: (after, limit) async {
+      final where = <String>[];
+      final values = <String, dynamic>{'limit': limit};
+      if (recipeId != null) {
+        where.add('l.recipe_id = @recipeId');
+        values['recipeId'] = recipeId;
+      }
+      if (stepId != null) {
+        where.add('l.step_id = @stepId');
+        values['stepId'] = stepId;
+      }
+      if (after != null) {
+        where.add(byNumber ? '(l.number, l.id) > (@afterNumber, @afterId)' : 'l.id > @afterId');
+        values['afterId'] = after.id;
+        if (byNumber) {
+          values['afterNumber'] = after.number;
+        }
+      }
+      final rows = await store.execute(
+        'SELECT l.id, l.number, r.id, r.name, r.duration, r.photo, s.id, s.name, s.duration '
+        'FROM _recipesteplink l '
+        'JOIN _recipe r ON r.id = l.recipe_id '
+        'JOIN _recipestep s ON s.id = l.step_id '
+        '${where.isNotEmpty ? 'WHERE ' + where.join(' AND ') : ''} '
+        'ORDER BY ${byNumber ? 'l.number, l.id' : 'l.id'} LIMIT @limit',
+        substitutionValues: values,
+      ) as List<List<dynamic>>;
+      return rows.map((r) => {
+        'id': r[0],
+        'recipe': {'id': r[2], 'name': r[3], 'duration': r[4], 'photo': r[5]},
+        'step': {'id': r[6], 'name': r[7], 'duration': r[8]},
+        'number': r[1],
+      }).toList();
+    });
+    return page.respond(request!);
   }
 
   @Operation.get('id')
@@ -174,6 +211,7 @@ class RecipeStepLinkController extends ResourceController {
         return Response.serverError(body: {'error': 'Insert failed'});
       }
       final newId = rows.first.first as int;
+      responses.invalidateRecipes([recipeId]);
       return await _selectLinkById(newId);
     } catch (e) {
       return Response.badRequest(body: {'error': e.toString()});
@@ -210,12 +248,12 @@ class RecipeStepLinkController extends ResourceController {
     }
     try {
       final store = context.persistentStore as PostgreSQLPersistentStore;
-      final updated = await store.execute(
+      // Связь может переехать в другой рецепт: сбрасываем и старый, и новый
+      final before = await _recipeIdsOf(id);
+      await store.execute(
           'UPDATE _recipesteplink SET ${updates.join(', ')} WHERE id = @id',
           substitutionValues: values);
-      if (updated.isEmpty) {
-        // UPDATE returns empty list; confirm existence
-      }
+      responses.invalidateRecipes([...before, rId]);
       return await _selectLinkById(id);
     } catch (e) {
       return Response.badRequest(body: {'error': e.toString()});
@@ -224,6 +262,7 @@ class RecipeStepLinkController extends ResourceController {
 
   @Operation.delete('id')
   Future<Response> deleteRecipeStepLink(@Bind.path('id') int id) async {
+    final recipeIds = await _recipeIdsOf(id);
     final query = Query<RecipeStepLink>(context)
       ..where((rsl) => rsl.id).equalTo(id);
     
@@ -232,6 +271,7 @@ class RecipeStepLinkController extends ResourceController {
     if (deletedCount == 0) {
       return Response.notFound(body: {'error': 'RecipeStepLink not found'});
     }
+    responses.invalidateRecipes(recipeIds);
     
     return Response.ok({'message': 'RecipeStepLink deleted successfully'});
   }
@@ -247,76 +287,195 @@ class RecipeStepLinkController extends ResourceController {
     return Response.ok(links);
   }
 
+  /// Связи пачкой: весь массив проверяется до записи, затем один
+  /// INSERT ... VALUES вместе с выборкой рецептов и шагов — одним запросом и,
+  /// значит, одной транзакцией: ошибка в любой строке откатывает всю пачку.
   @Operation.post('batch')
   Future<Response> batchCreateRecipeStepLinks(@Bind.body() List<Map<String, dynamic>> links) async {
-    try {
-      final store = context.persistentStore as PostgreSQLPersistentStore;
-      final ids = <int>[];
-      for (final link in links) {
-        final recipeId = int.tryParse((link['recipeId'] ?? link['recipe']?['id'])?.toString() ?? '');
-        final stepId = int.tryParse((link['stepId'] ?? link['step']?['id'])?.toString() ?? '');
-        final number = () {
-          final n = link['number'];
-          if (n is num) return n.toInt();
-          if (n is String) return int.tryParse(n);
-          return 0;
-        }();
-        if (recipeId == null || stepId == null) {
-          return Response.badRequest(body: {'error': 'recipeId/stepId required'});
-        }
-        final rows = await store.execute(
-          'INSERT INTO _recipesteplink (recipe_id, step_id, number) '
-          'VALUES (CAST(@recipe_id AS int4), CAST(@step_id AS int4), CAST(@number AS int4)) RETURNING id',
-          substitutionValues: {
-            'recipe_id': recipeId,
-            'step_id': stepId,
-            'number': number,
-          },
-        ) as List<List<dynamic>>;
-        if (rows.isNotEmpty) ids.add(rows.first.first as int);
+    if (links.length > maxBatchSize) {
+      return Response.badRequest(body: {'error': 'At most $maxBatchSize items per batch'});
+    }
+
+    final values = <String, dynamic>{};
+    final rows = <String>[];
+    final recipeIds = <int>{};
+    for (var i = 0; i < links.length; i++) {
+      final link = links[i];
+      final recipeId = int.tryParse((link['recipeId'] ?? link['recipe']?['id'])?.toString() ?? '');
+      final stepId = int.tryParse((link['stepId'] ?? link['step']?['id'])?.toString() ?? '');
+      final number = () {
+        final n = link['number'];
+        if (n == null) return 0;
+        if (n is num) return n.toInt();
+        if (n is String) return int.tryParse(n);
+        return null;
+      }();
+      if (recipeId == null || stepId == null) {
+        return Response.badRequest(body: {'error': 'recipeId/stepId required', 'index': i});
       }
-      final results = <Map<String, dynamic>>[];
-      for (final id in ids) {
-        final res = await _selectLinkById(id);
-        if (res.statusCode == 200) {
-          results.add((res.body as Map).cast<String, dynamic>());
-        }
+      if (number == null) {
+        return Response.badRequest(body: {'error': 'Invalid number', 'index': i});
       }
-      return Response.ok(results);
+      values['recipe$i'] = recipeId;
+      values['step$i'] = stepId;
+      values['number$i'] = number;
+      rows.add('(CAST(@recipe$i AS int4), CAST(@step$i AS int4), CAST(@number$i AS int4))');
+      recipeIds.add(recipeId);
+    }
+    if (rows.isEmpty) {
+      return Response.ok([]);
+    }
+
+    try {
+      final store = context.persistentStore as PostgreSQLPersistentStore;
+      // id из sequence выдаются в порядке VALUES: ORDER BY id сохраняет порядок запроса
+      final inserted = await store.execute(
+        'WITH inserted AS ('
+        'INSERT INTO _recipesteplink (recipe_id, step_id, number) VALUES ${rows.join(', ')} '
+        'RETURNING id, number, recipe_id, step_id) '
+        'SELECT rsl.id, rsl.number, r.id, r.name, s.id, s.name '
+        'FROM inserted rsl '
+        'JOIN _recipe r ON r.id = rsl.recipe_id '
+        'JOIN _recipestep s ON s.id = rsl.step_id '
+        'ORDER BY rsl.id',
+        substitutionValues: values,
+      ) as List<List<dynamic>>;
+      responses.invalidateRecipes(recipeIds);
+
+      return Response.ok(inserted.map((row) => {
+        'id': row[0],
+        'number': row[1],
+        'recipe': {'id': row[2], 'name': row[3]},
+        'step': {'id': row[4], 'name': row[5]},
+      }).toList());
     } catch (e) {
       return Response.badRequest(body: {'error': e.toString()});
     }
   }
 
+  /// Порядок шагов рецепта одной транзакцией. В теле, кроме recipeId, одно из:
+  /// - stepOrders: [{linkId, number}] — явные номера;
+  /// - move: {linkId, before | after} — перенос шага перед/после другого;
+  /// - renumber: true — номера gap, 2 * gap, ... в текущем порядке.
+  /// gap (по умолчанию 1) — шаг нумерации для move и renumber.
+  ///
+  /// Связи рецепта блокируются (FOR UPDATE), новые номера считает
+  /// [StepOrder], а записываются только изменившиеся — одним
+  /// UPDATE ... FROM (VALUES ...). Повторяющиеся номера не допускаются,
+  /// и читатели не видят рецепт посреди перестановки.
   @Operation.put()
   Future<Response> reorderSteps(@Bind.body() Map<String, dynamic> body) async {
-    final recipeId = body['recipeId'] as int?;
-    final stepOrders = body['stepOrders'] as List<dynamic>?;
-    
-    if (recipeId == null || stepOrders == null) {
+    final recipeId = _asInt(body['recipeId']);
+    final gap = body['gap'] == null ? 1 : _asInt(body['gap']);
+    final stepOrders = body['stepOrders'];
+    final move = body['move'];
+    final renumber = body['renumber'] == true;
+    final operations = (stepOrders != null ? 1 : 0) + (move != null ? 1 : 0) + (renumber ? 1 : 0);
+    if (recipeId == null || operations != 1) {
       return Response.badRequest(
-        body: {'error': 'recipeId and stepOrders are required'},
+        body: {'error': 'recipeId and one of stepOrders, move or renumber are required'},
       );
     }
-    
-    final store = context.persistentStore as PostgreSQLPersistentStore;
-    for (final order in stepOrders) {
-      final linkId = int.tryParse(order['linkId'].toString());
-      final newNumber = int.tryParse(order['number'].toString());
-      if (linkId == null || newNumber == null) {
-        return Response.badRequest(body: {'error': 'Invalid linkId/number'});
+    if (gap == null || gap < 1) {
+      return Response.badRequest(body: {'error': 'gap must be a positive integer'});
+    }
+
+    if (stepOrders != null && stepOrders is! List) {
+      return Response.badRequest(body: {'error': 'stepOrders must be an array'});
+    }
+    final assigned = stepOrders == null ? null : <int, int>{};
+    if (assigned != null) {
+      for (final order in stepOrders as List) {
+        final linkId = order is Map ? _asInt(order['linkId']) : null;
+        final newNumber = order is Map ? _asInt(order['number']) : null;
+        if (linkId == null || newNumber == null) {
+          return Response.badRequest(body: {'error': 'Invalid linkId/number'});
+        }
+        if (assigned.containsKey(linkId)) {
+          return Response.badRequest(body: {'error': 'Duplicate linkId $linkId'});
+        }
+        assigned[linkId] = newNumber;
       }
-      await store.execute(
-        'UPDATE _recipesteplink SET number = CAST(@number AS int4) WHERE id = @id AND recipe_id = @recipe_id',
-        substitutionValues: {
-          'number': newNumber,
-          'id': linkId,
-          'recipe_id': recipeId,
-        },
-      );
     }
-    
-    return Response.ok({'message': 'Steps reordered successfully'});
+    final moveId = move is Map ? _asInt(move['linkId']) : null;
+    final before = move is Map ? _asInt(move['before']) : null;
+    final after = move is Map ? _asInt(move['after']) : null;
+    if (move != null && (moveId == null || (before == null) == (after == null))) {
+      return Response.badRequest(body: {'error': 'move requires linkId and one of before/after'});
+    }
+
+    final store = context.persistentStore as PooledPostgreSQLPersistentStore;
+    var updated = 0;
+    final Map<int, int> numbers;
+    try {
+      numbers = await store.runTransaction((connection) async {
+        final rows = await connection.query(
+          'SELECT id, number FROM _recipesteplink WHERE recipe_id = CAST(@recipeId AS int8) FOR UPDATE',
+          substitutionValues: {'recipeId': recipeId},
+        );
+        final current = {for (final row in rows) row[0] as int: row[1] as int};
+        final order = StepOrder(current);
+        final Map<int, int> changes;
+        if (assigned != null) {
+          for (final linkId in assigned.keys) {
+            if (!order.contains(linkId)) {
+              throw StepOrderException('Link $linkId does not belong to the recipe');
+            }
+          }
+          changes = order.assign(assigned);
+        } else if (moveId != null) {
+          changes = order.move(moveId, before: before, after: after, gap: gap);
+        } else {
+          changes = order.respace(gap: gap);
+        }
+
+        if (changes.isNotEmpty) {
+          final values = <String, dynamic>{};
+          final rowsSql = <String>[];
+          var i = 0;
+          changes.forEach((linkId, number) {
+            values['id$i'] = linkId;
+            values['number$i'] = number;
+            rowsSql.add('(CAST(@id$i AS int8), CAST(@number$i AS int4))');
+            i++;
+          });
+          await connection.query(
+            'UPDATE _recipesteplink l SET number = v.number '
+            'FROM (VALUES ${rowsSql.join(', ')}) AS v(id, number) WHERE l.id = v.id',
+            substitutionValues: values,
+          );
+        }
+        updated = changes.length;
+        return {...current, ...changes};
+      });
+    } on StepOrderException catch (e) {
+      return Response.badRequest(body: {'error': e.message});
+    }
+    if (updated > 0) {
+      responses.invalidateRecipes([recipeId]);
+    }
+
+    return Response.ok({
+      'message': 'Steps reordered successfully',
+      'updated': updated,
+      'steps': StepOrder(numbers).order.map((id) => {'linkId': id, 'number': numbers[id]}).toList(),
+    });
+  }
+
+  static int? _asInt(dynamic value) {
+    if (value is int) return value;
+    if (value is num) return value.toInt();
+    if (value is String) return int.tryParse(value);
+    return null;
+  }
+
+  Future<List<int?>> _recipeIdsOf(int linkId) async {
+    final store = context.persistentStore as PostgreSQLPersistentStore;
+    final rows = await store.execute(
+      'SELECT recipe_id FROM _recipesteplink WHERE id = @id',
+      substitutionValues: {'id': linkId},
+    ) as List<List<dynamic>>;
+    return rows.map((row) => row.first as int?).toList();
   }
 
   Future<Response> _selectLinkById(int id) async {
@@ -350,6 +509,7 @@ class RecipeStepLinkController extends ResourceController {
       ..where((rsl) => rsl.recipe!.id).equalTo(recipeId);
     
     final deletedCount = await query.delete();
+    responses.invalidateRecipes([recipeId]);
     
     return Response.ok({'message': 'Deleted $deletedCount steps for recipe'});
   }
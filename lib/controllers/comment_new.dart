@@ -2,12 +2,14 @@ import 'package:conduit_core/conduit_core.dart';
 import 'package:conduit_open_api/src/v3/response.dart';
 import 'package:conduit_open_api/v3.dart';
 import 'package:conduit_postgresql/conduit_postgresql.dart';
-import '../model/comment.dart';
+import '../utils/collection_page.dart';
+import '../utils/response_cache.dart';
 
 class CommentController extends ResourceController {
-  CommentController(this.context);
+  CommentController(this.context, this.responses);
   
   final ManagedContext context;
+  final ResponseCache responses;
   
   @override
   Map<String, APIResponse> documentOperationResponses(
@@ -62,6 +64,7 @@ class CommentController extends ResourceController {
     return null;
   }
   
+  /// Новые комментарии первыми; limit/cursor и потоковая выдача — см. CollectionPage
   @Operation.get()
   Future<Response> getAllComments({
     @Bind.query('recipeId') int? recipeId,
@@ -72,22 +75,34 @@ class CommentController extends ResourceController {
     final values = <String, dynamic>{};
     if (recipeId != null) { where.add('c.recipe_id = @recipeId'); values['recipeId'] = recipeId; }
     if (userId != null) { where.add('c.user_id = @userId'); values['userId'] = userId; }
-    final sql = 'SELECT c.id, c.text, c.photo, c.date_time, u.id as user_id, r.id as recipe_id, r.name '
-        'FROM _comment c '
-        'JOIN _user u ON u.id = c.user_id '
-        'JOIN _recipe r ON r.id = c.recipe_id '
-        '${where.isNotEmpty ? 'WHERE ' + where.join(' AND ') : ''} '
-        'ORDER BY c.date_time DESC';
-    final rows = await store.execute(sql, substitutionValues: values) as List<List<dynamic>>;
-    final data = rows.map((r) => {
-      'id': r[0],
-      'text': r[1],
-      'photo': r[2],
-      'dateTime': r[3]?.toString(),
-      'user': {'id': r[4]},
-      'recipe': {'id': r[5], 'name': r[6]},
-    }).toList();
-    return Response.ok(data);
+    final page = CollectionPage(keys: const ['dateTime', 'id'], fetch: (after, limit) async {
+      final conditions = [
+        ...where,
+        if (after != null) '(c.date_time, c.id) < (CAST(@afterDateTime AS timestamp), CAST(@afterId AS int8))',
+      ];
+      final sql = 'SELECT c.id, c.text, c.photo, c.date_time, u.id as user_id, r.id as recipe_id, r.name '
+          'FROM _comment c '
+          'JOIN _user u ON u.id = c.user_id '
+          'JOIN _recipe r ON r.id = c.recipe_id '
+          '${conditions.isNotEmpty ? 'WHERE ' + conditions.join(' AND ') : ''} '
+          'ORDER BY c.date_time DESC, c.id DESC '
+          'LIMIT @limit';
+      final rows = await store.execute(sql, substitutionValues: {
+        ...values,
+        if (after != null) 'afterDateTime': after.values['dateTime'],
+        if (after != null) 'afterId': after.id,
+        'limit': limit,
+      }) as List<List<dynamic>>;
+      return rows.map((r) => {
+        'id': r[0],
+        'text': r[1],
+        'photo': r[2],
+        'dateTime': r[3]?.toString(),
+        'user': {'id': r[4]},
+        'recipe': {'id': r[5], 'name': r[6]},
+      }).toList();
+    });
+    return page.respond(request!);
   }
   
   @Operation.get('id')
@@ -151,6 +166,7 @@ class CommentController extends ResourceController {
       substitutionValues: {'uid': userId, 'rid': recipeId, 'text': text, 'photo': photo},
     ) as List<List<dynamic>>;
     final id = rows.first.first as int;
+    responses.invalidateRecipes([recipeId]);
     return await getCommentByID(id);
   }
   
@@ -165,20 +181,27 @@ class CommentController extends ResourceController {
     if (body.containsKey('photo')) { updates.add('photo = @photo'); values['photo'] = body['photo']?.toString(); }
     if (updates.isEmpty) return Response.badRequest(body: {'error': 'No fields to update'});
     final store = context.persistentStore as PostgreSQLPersistentStore;
-    await store.execute('UPDATE _comment SET ${updates.join(', ')} WHERE id = @id', substitutionValues: values);
+    final updated = await store.execute(
+      'UPDATE _comment SET ${updates.join(', ')} WHERE id = @id RETURNING recipe_id',
+      substitutionValues: values,
+    ) as List<List<dynamic>>;
+    responses.invalidateRecipes(updated.map((row) => row.first as int?));
     return await getCommentByID(id);
   }
   
   @Operation.delete('id')
   Future<Response> deleteComment(@Bind.path('id') int id) async {
-    final query = Query<Comment>(context)
-      ..where((c) => c.id).equalTo(id);
-    
-    final deletedCount = await query.delete();
+    // RETURNING recipe_id: какой рецепт сбросить в кеше ответов
+    final store = context.persistentStore as PostgreSQLPersistentStore;
+    final deleted = await store.execute(
+      'DELETE FROM _comment WHERE id = @id RETURNING recipe_id',
+      substitutionValues: {'id': id},
+    ) as List<List<dynamic>>;
     
-    if (deletedCount == 0) {
+    if (deleted.isEmpty) {
       return Response.notFound(body: {'error': 'Comment not found'});
     }
+    responses.invalidateRecipes(deleted.map((row) => row.first as int?));
     
     return Response.ok({'message': 'Comment deleted successfully', 'id': id});
   }
@@ -3,6 +3,7 @@ import 'package:conduit_open_api/src/v3/response.dart';
 import 'package:conduit_open_api/v3.dart';
 import 'package:conduit_postgresql/conduit_postgresql.dart';
 import '../model/favorite.dart';
+import '../utils/collection_page.dart';
 
 class FavoriteController extends ResourceController {
   FavoriteController(this.context);
@@ -35,20 +36,33 @@ class FavoriteController extends ResourceController {
   }
   
   @Operation.get()
-  Future<Response> getAllFavorites() async {
+  Future<Response> getAllFavorites({
+    @Bind.query('userId') int? userId,
+    @Bind.query('recipeId') int? recipeId,
+  }) async {
     final store = context.persistentStore as PostgreSQLPersistentStore;
-    final rows = await store.execute(
-      'SELECT f.id, u.id as user_id, r.id as recipe_id, r.name '
-      'FROM _favorite f '
-      'JOIN _user u ON u.id = f.user_id '
-      'JOIN _recipe r ON r.id = f.recipe_id'
-    ) as List<List<dynamic>>;
-    final data = rows.map((r) => {
-      'id': r[0],
-      'user': {'id': r[1]},
-      'recipe': {'id': r[2], 'name': r[3]},
-    }).toList();
-    return Response.ok(data);
+    final page = CollectionPage(fetch: (after, limit) async {
+      final where = <String>[];
+      final values = <String, dynamic>{'limit': limit};
+      if (userId != null) { where.add('f.user_id = @userId'); values['userId'] = userId; }
+      if (recipeId != null) { where.add('f.recipe_id = @recipeId'); values['recipeId'] = recipeId; }
+      if (after != null) { where.add('f.id > @afterId'); values['afterId'] = after.id; }
+      final rows = await store.execute(
+        'SELECT f.id, u.id as user_id, r.id as recipe_id, r.name '
+        'FROM _favorite f '
+        'JOIN _user u ON u.id = f.user_id '
+        'JOIN _recipe r ON r.id = f.recipe_id '
+        '${where.isNotEmpty ? 'WHERE ' + where.join(' AND ') : ''} '
+        'ORDER BY f.id LIMIT @limit',
+        substitutionValues: values,
+      ) as List<List<dynamic>>;
+      return rows.map((r) => {
+        'id': r[0],
+        'user': {'id': r[1]},
+        'recipe': {'id': r[2], 'name': r[3]},
+      }).toList();
+    });
+    return page.respond(request!);
   }
   
   @Operation.get('id')
@@ -87,18 +101,13 @@ class FavoriteController extends ResourceController {
     if (u.isEmpty) return Response.badRequest(body: {'error': 'Invalid user ID'});
     final r = await store.execute('SELECT 1 FROM _recipe WHERE id=@id LIMIT 1', substitutionValues: {'id': recipeId});
     if (r.isEmpty) return Response.badRequest(body: {'error': 'Invalid recipe ID'});
-    // Check duplicate
-    final dup = await store.execute(
-      'SELECT 1 FROM _favorite WHERE user_id=@uid AND recipe_id=@rid LIMIT 1',
-      substitutionValues: {'uid': userId, 'rid': recipeId},
-    );
-    if (dup.isNotEmpty) return Response.conflict(body: {'error': 'Recipe already in favorites'});
-    // Insert
+    // Дубль отсекает уникальный индекс (user_id, recipe_id): строка не вставится
     final rows = await store.execute(
       'INSERT INTO _favorite (user_id, recipe_id) '
-      'VALUES (CAST(@uid AS int4), CAST(@rid AS int4)) RETURNING id',
+      'VALUES (CAST(@uid AS int4), CAST(@rid AS int4)) ON CONFLICT DO NOTHING RETURNING id',
       substitutionValues: {'uid': userId, 'rid': recipeId},
     ) as List<List<dynamic>>;
+    if (rows.isEmpty) return Response.conflict(body: {'error': 'Recipe already in favorites'});
     final id = rows.first.first as int;
     final out = await store.execute(
       'SELECT f.id, u.id as user_id, r.id as recipe_id, r.name '
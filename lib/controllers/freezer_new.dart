@@ -5,6 +5,7 @@ import 'package:conduit_postgresql/conduit_postgresql.dart';
 import '../model/freezer.dart';
 import '../model/user.dart';
 import '../model/ingredient.dart';
+import '../utils/collection_page.dart';
 
 class FreezerController extends ResourceController {
   FreezerController(this.context);
@@ -42,20 +43,33 @@ class FreezerController extends ResourceController {
   }
   
   @Operation.get()
-  Future<Response> getAllFreezerItems() async {
+  Future<Response> getAllFreezerItems({
+    @Bind.query('userId') int? userId,
+    @Bind.query('ingredientId') int? ingredientId,
+  }) async {
     final store = context.persistentStore as PostgreSQLPersistentStore;
-    final rows = await store.execute(
-      'SELECT f.id, f.count, u.id as user_id, i.id as ingredient_id, i.name '
-      'FROM _freezer f '
-      'JOIN _user u ON u.id = f.user_id '
-      'JOIN _ingredient i ON i.id = f.ingredient_id') as List<List<dynamic>>;
-    final results = rows.map((r) => {
-      'id': r[0],
-      'count': (r[1] as num?)?.toDouble(),
-      'user': {'id': r[2]},
-      'ingredient': {'id': r[3], 'name': r[4]},
-    }).toList();
-    return Response.ok(results);
+    final page = CollectionPage(fetch: (after, limit) async {
+      final where = <String>[];
+      final values = <String, dynamic>{'limit': limit};
+      if (userId != null) { where.add('f.user_id = @userId'); values['userId'] = userId; }
+      if (ingredientId != null) { where.add('f.ingredient_id = @ingredientId'); values['ingredientId'] = ingredientId; }
+      if (after != null) { where.add('f.id > @afterId'); values['afterId'] = after.id; }
+      final rows = await store.execute(
+        'SELECT f.id, f.count, u.id as user_id, i.id as ingredient_id, i.name '
+        'FROM _freezer f '
+        'JOIN _user u ON u.id = f.user_id '
+        'JOIN _ingredient i ON i.id = f.ingredient_id '
+        '${where.isNotEmpty ? 'WHERE ' + where.join(' AND ') : ''} '
+        'ORDER BY f.id LIMIT @limit',
+        substitutionValues: values) as List<List<dynamic>>;
+      return rows.map((r) => {
+        'id': r[0],
+        'count': (r[1] as num?)?.toDouble(),
+        'user': {'id': r[2]},
+        'ingredient': {'id': r[3], 'name': r[4]},
+      }).toList();
+    });
+    return page.respond(request!);
   }
   
   @Operation.get('id')
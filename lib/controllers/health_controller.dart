@@ -1,10 +1,16 @@
 import 'package:conduit_core/conduit_core.dart';
 import 'package:conduit_postgresql/conduit_postgresql.dart';
 
+import '../utils/pooled_store.dart';
+import '../utils/response_cache.dart';
+import '../utils/token_cache.dart';
+
 class HealthController extends ResourceController {
-  HealthController(this.context);
+  HealthController(this.context, {this.tokenCache, this.responseCache});
 
   final ManagedContext context;
+  final TokenCache? tokenCache;
+  final ResponseCache? responseCache;
 
   @Operation.get()
   Future<Response> checkHealth() async {
@@ -20,6 +26,7 @@ class HealthController extends ResourceController {
   }
 
   Future<Response> _performHealthCheck() async {
+    final store = context.persistentStore;
     try {
       // Проверяем подключение к базе данных простым запросом
       final query = context.persistentStore.execute("SELECT 1 as health_check");
@@ -43,7 +50,10 @@ class HealthController extends ResourceController {
         'database_writable': true,
         'timestamp': DateTime.now().toIso8601String(),
         'service': 'foodapi',
-        'version': '0.3.0'
+        'version': '0.3.0',
+        if (tokenCache != null) 'authCache': tokenCache!.stats,
+        if (responseCache != null) 'responseCache': responseCache!.stats,
+        if (store is PooledPostgreSQLPersistentStore) 'databasePool': store.stats,
       });
     } catch (e) {
       // Если есть проблема с БД, возвращаем 500 Internal Server Error
@@ -54,7 +64,10 @@ class HealthController extends ResourceController {
         'error': e.toString(),
         'timestamp': DateTime.now().toIso8601String(),
         'service': 'foodapi',
-        'version': '0.3.0'
+        'version': '0.3.0',
+        if (tokenCache != null) 'authCache': tokenCache!.stats,
+        if (responseCache != null) 'responseCache': responseCache!.stats,
+        if (store is PooledPostgreSQLPersistentStore) 'databasePool': store.stats,
       }); // По умолчанию serverError возвращает 500
     }
   }
@@ -4,12 +4,21 @@ import 'package:conduit_open_api/v3.dart';
 import '../model/ingredient.dart';
 import '../model/freezer.dart';
 import '../middleware/naming_middleware.dart';
+import '../utils/collection_page.dart';
 import '../utils/naming_converter.dart';
+import '../utils/response_cache.dart';
 
 class IngredientController extends NamingController {
-  IngredientController(this.context);
+  IngredientController(this.context, this.responses);
   
   final ManagedContext context;
+  final ResponseCache responses;
+
+  /// Ключи Ingredient.asMap() с вложенной единицей измерения
+  static final KeyMap _namingKeys = KeyMap(['id', 'name', 'caloriesForUnit', 'measureunit', 'one', 'few', 'many']);
+
+  @override
+  KeyMap? get namingKeys => _namingKeys;
   
   @override
   Map<String, APIResponse> documentOperationResponses(
@@ -45,27 +54,48 @@ class IngredientController extends NamingController {
   
   @Operation.get()
   Future<Response> getAllIngredients() async {
-    final query = Query<Ingredient>(context)
-      ..join(object: (i) => i.measureunit);
-    
-    final ingredients = await query.fetch();
-    
-    return createResponseWithNamingConversion(200, ingredients.map((i) => i.asMap()).toList());
+    final page = CollectionPage(fetch: (after, limit) async {
+      final query = Query<Ingredient>(context)
+        ..join(object: (i) => i.measureunit)
+        ..sortBy((i) => i.id, QuerySortOrder.ascending)
+        ..fetchLimit = limit;
+      if (after != null) {
+        query.where((i) => i.id).greaterThan(after.id);
+      }
+
+      final ingredients = await query.fetch();
+
+      return ingredients.map((i) => NamingConverter.convertMapKeysToCamel(i.asMap(), keys: _namingKeys)).toList();
+    });
+    // Справочник небольшой: и страницы, и весь список без limit кешируются
+    // с ETag (304), как до пагинации. Потоком мимо кеша идёт только NDJSON.
+    if (CollectionPage.wantsNdjson(request!)) {
+      return page.respond(request!);
+    }
+    const tags = [ResponseCache.ingredients, ResponseCache.measureUnits, ResponseCache.ingredientList];
+    return responses.respond(request!, tags, () async {
+      if (CollectionPage.isPaged(request!)) {
+        return page.respond(request!);
+      }
+      return Response.ok(await page.fetchAll());
+    });
   }
   
   @Operation.get('id')
   Future<Response> getIngredientByID(@Bind.path('id') int id) async {
-    final query = Query<Ingredient>(context)
-      ..where((i) => i.id).equalTo(id)
-      ..join(object: (i) => i.measureunit);
+    return responses.respond(request!, const [ResponseCache.ingredients, ResponseCache.measureUnits], () async {
+      final query = Query<Ingredient>(context)
+        ..where((i) => i.id).equalTo(id)
+        ..join(object: (i) => i.measureunit);
     
-    final ingredient = await query.fetchOne();
+      final ingredient = await query.fetchOne();
     
-    if (ingredient == null) {
-      return createResponseWithNamingConversion(404, {'error': 'Ingredient not found'});
-    }
+      if (ingredient == null) {
+        return createResponseWithNamingConversion(404, {'error': 'Ingredient not found'});
+      }
     
-    return createResponseWithNamingConversion(200, ingredient.asMap());
+      return createResponseWithNamingConversion(200, ingredient.asMap());
+    });
   }
   
   @Operation.post()
@@ -145,6 +175,7 @@ class IngredientController extends NamingController {
           }
         }
         
+        responses.invalidate(const [ResponseCache.ingredientList]);
         return createResponseWithNamingConversion(200, responseData);
       }
       
@@ -227,6 +258,7 @@ class IngredientController extends NamingController {
           }
         }
         
+        responses.invalidate(const [ResponseCache.ingredients]);
         return createResponseWithNamingConversion(200, responseData);
       }
       
@@ -282,6 +314,7 @@ class IngredientController extends NamingController {
         return createResponseWithNamingConversion(404, {'error': 'Ingredient not found'});
       }
       
+      responses.invalidate(const [ResponseCache.ingredients]);
       return createResponseWithNamingConversion(200, {'message': 'Ingredient deleted successfully', 'id': id});
     } catch (e) {
       print("Error deleting ingredient: $e");
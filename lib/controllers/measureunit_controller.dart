@@ -3,11 +3,13 @@ import 'package:conduit_open_api/src/v3/response.dart';
 import 'package:conduit_open_api/src/v3/schema.dart';
 import 'package:conduit_postgresql/conduit_postgresql.dart';
 import '../model/ingredient.dart';
+import '../utils/response_cache.dart';
 
 class MeasureUnitController extends ResourceController {
-  MeasureUnitController(this.context);
+  MeasureUnitController(this.context, this.responses);
   
   final ManagedContext context;
+  final ResponseCache responses;
   
   @override
   Map<String, APIResponse> documentOperationResponses(
@@ -29,24 +31,28 @@ class MeasureUnitController extends ResourceController {
   
   @Operation.get()
   Future<Response> getAllUnits() async {
-    final query = Query<MeasureUnit>(context);
-    final units = await query.fetch();
+    return responses.respond(request!, const [ResponseCache.measureUnits, ResponseCache.measureUnitList], () async {
+      final query = Query<MeasureUnit>(context);
+      final units = await query.fetch();
     
-    return Response.ok(units.map((u) => u.asMap()).toList());
+      return Response.ok(units.map((u) => u.asMap()).toList());
+    });
   }
   
   @Operation.get('id')
   Future<Response> getUnitByID(@Bind.path('id') int id) async {
-    final query = Query<MeasureUnit>(context)
-      ..where((u) => u.id).equalTo(id);
+    return responses.respond(request!, const [ResponseCache.measureUnits], () async {
+      final query = Query<MeasureUnit>(context)
+        ..where((u) => u.id).equalTo(id);
     
-    final unit = await query.fetchOne();
+      final unit = await query.fetchOne();
     
-    if (unit == null) {
-      return Response.notFound(body: {'error': 'MeasureUnit not found'});
-    }
+      if (unit == null) {
+        return Response.notFound(body: {'error': 'MeasureUnit not found'});
+      }
     
-    return Response.ok(unit.asMap());
+      return Response.ok(unit.asMap());
+    });
   }
   
   @Operation.post()
@@ -67,6 +73,7 @@ class MeasureUnitController extends ResourceController {
       ) as List<List<dynamic>>;
       if (rows.isEmpty) return Response.serverError(body: {'error': 'Insert failed'});
       final r = rows.first;
+      responses.invalidate(const [ResponseCache.measureUnitList]);
       return Response.ok({'id': r[0], 'one': r[1], 'few': r[2], 'many': r[3]});
     } catch (e) {
       return Response.badRequest(body: {'error': e.toString()});
@@ -90,6 +97,7 @@ class MeasureUnitController extends ResourceController {
       final res = await store.execute('SELECT id, one, few, many FROM _measureunit WHERE id = @id', substitutionValues: {'id': id}) as List<List<dynamic>>;
       if (res.isEmpty) return Response.notFound(body: {'error': 'MeasureUnit not found'});
       final r = res.first;
+      responses.invalidate(const [ResponseCache.measureUnits]);
       return Response.ok({'id': r[0], 'one': r[1], 'few': r[2], 'many': r[3]});
     } catch (e) {
       return Response.badRequest(body: {'error': e.toString()});
@@ -119,6 +127,7 @@ class MeasureUnitController extends ResourceController {
     if (deletedCount == 0) {
       return Response.notFound(body: {'error': 'MeasureUnit not found'});
     }
+    responses.invalidate(const [ResponseCache.measureUnits]);
     
     return Response.ok({'message': 'MeasureUnit deleted successfully', 'id': id});
   }
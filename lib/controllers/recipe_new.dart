@@ -3,12 +3,20 @@ import 'package:conduit_open_api/src/v3/response.dart';
 import '../model/recipe.dart';
 import '../model/ingredient.dart';
 import '../model/comment.dart';
-import '../model/favorite.dart';
+import '../utils/count_cache.dart';
+import '../utils/page_cursor.dart';
+import '../utils/recipe_search.dart';
+import '../utils/response_cache.dart';
 
 class RecipeController extends ResourceController {
-  RecipeController(this.context);
+  RecipeController(this.context, this.totals, this.responses);
   
   final ManagedContext context;
+  final CountCache totals;
+  final ResponseCache responses;
+
+  /// Предел id в одном DELETE /recipe?ids=
+  static const int maxBulkIds = 1000;
   
   @override
   Map<String, APIResponse> documentOperationResponses(
@@ -63,6 +71,8 @@ class RecipeController extends ResourceController {
     
     try {
       final insertedRecipe = await query.insert();
+      totals.clear();
+      responses.invalidate(const [ResponseCache.recipes]);
       return Response.ok(insertedRecipe);
     } catch (e) {
       return Response.serverError(body: {'error': e.toString()});
@@ -76,80 +86,138 @@ class RecipeController extends ResourceController {
     @Bind.query('search') String? search,
     @Bind.query('minTime') int? minTime,
     @Bind.query('maxTime') int? maxTime,
+    @Bind.query('cursor') String? cursor,
+    @Bind.query('total') String? total,
   }) async {
-    final pageNum = page ?? 1;
-    final pageSize = limit ?? 20;
-    final offset = (pageNum - 1) * pageSize;
-    
-    final query = Query<Recipe>(context)
-      ..offset = offset
-      ..fetchLimit = pageSize
-      ..sortBy((r) => r.id, QuerySortOrder.descending);
-    
-    // Add search filter
-    if (search != null && search.isNotEmpty) {
-      query.where((r) => r.name).contains(search, caseSensitive: false);
-    }
-    
-    // Add time filters
-    if (minTime != null) {
-      query.where((r) => r.duration).greaterThanEqualTo(minTime);
-    }
-    if (maxTime != null) {
-      query.where((r) => r.duration).lessThanEqualTo(maxTime);
-    }
-    
-    // Count total for pagination
-    final countQuery = Query<Recipe>(context);
-    if (search != null && search.isNotEmpty) {
-      countQuery.where((r) => r.name).contains(search, caseSensitive: false);
-    }
-    if (minTime != null) {
-      countQuery.where((r) => r.duration).greaterThanEqualTo(minTime);
-    }
-    if (maxTime != null) {
-      countQuery.where((r) => r.duration).lessThanEqualTo(maxTime);
-    }
-    final totalCount = await countQuery.reduce.count();
-    
-    final recipes = await query.fetch();
-    
-    return Response.ok({
-      'data': recipes.map((r) => r.asMap()).toList(),
-      'pagination': {
-        'page': pageNum,
+    return responses.respond(request!, const [ResponseCache.recipes], () async {
+      final pageSize = limit ?? 20;
+      if (!PageCursor.isValidLimit(pageSize)) {
+        return Response.badRequest(body: {'error': PageCursor.limitError});
+      }
+      PageCursor? after;
+      if (cursor != null && cursor.isNotEmpty) {
+        try {
+          after = PageCursor.decode(cursor);
+        } on FormatException {
+          return Response.badRequest(body: {'error': 'Invalid cursor'});
+        }
+      }
+      // Без cursor работает прежняя постраничная выдача через OFFSET
+      final pageNum = after == null ? (page ?? 1) : null;
+
+      void applyFilters(Query<Recipe> q) {
+        if (search != null && search.isNotEmpty) {
+          q.where((r) => r.name).contains(search, caseSensitive: false);
+        }
+        if (minTime != null) {
+          q.where((r) => r.duration).greaterThanEqualTo(minTime);
+        }
+        if (maxTime != null) {
+          q.where((r) => r.duration).lessThanEqualTo(maxTime);
+        }
+      }
+
+      // Берём на одну строку больше, чтобы узнать, есть ли следующая страница
+      final query = Query<Recipe>(context)
+        ..fetchLimit = pageSize + 1
+        ..sortBy((r) => r.id, QuerySortOrder.descending);
+      applyFilters(query);
+      if (after != null) {
+        query.where((r) => r.id).lessThan(after.id);
+      } else {
+        query.offset = (pageNum! - 1) * pageSize;
+      }
+
+      final rows = await query.fetch();
+      final recipes = rows.take(pageSize).toList();
+      final pagination = <String, dynamic>{
+        if (pageNum != null) 'page': pageNum,
         'limit': pageSize,
-        'total': totalCount,
-        'totalPages': (totalCount / pageSize).ceil(),
+        'nextCursor': rows.length > pageSize ? PageCursor({'id': recipes.last.id}).encode() : null,
+      };
+
+      final filtered = (search != null && search.isNotEmpty) || minTime != null || maxTime != null;
+      final error = await addRecipeTotal(
+        pagination,
+        context: context,
+        totals: totals,
+        mode: total ?? (pageNum != null ? 'exact' : 'none'),
+        key: 'recipe|$search|$minTime|$maxTime',
+        filtered: filtered,
+        count: () {
+          final countQuery = Query<Recipe>(context);
+          applyFilters(countQuery);
+          return countQuery.reduce.count();
+        },
+      );
+      if (error != null) {
+        return error;
       }
+
+      return Response.ok({
+        'data': recipes.map((r) => r.asMap()).toList(),
+        'pagination': pagination,
+      });
     });
   }
   
   @Operation.get('id')
-  Future<Response> getRecipeByID(@Bind.path('id') int id) async {
-    final query = Query<Recipe>(context)
-      ..where((r) => r.id).equalTo(id)
-      ..join(set: (r) => r.recipeStepLinks)
-        .join(object: (rsl) => rsl.step)
-      ..join(set: (r) => r.recipeIngredients)
-        .join(object: (ri) => ri.ingredient)
-          .join(object: (i) => i.measureunit)
-      ..join(set: (r) => r.comments);
-    
-    final recipe = await query.fetchOne();
-    
-    if (recipe == null) {
-      return Response.notFound(body: {'error': 'Recipe not found'});
-    }
+  Future<Response> getRecipeByID(
+    @Bind.path('id') int id, {
+    @Bind.query('commentsLimit') int? commentsLimit,
+  }) async {
+    // Названия ингредиентов, единиц измерения и шагов тоже входят в ответ
+    final tags = [
+      ResponseCache.recipeTag(id),
+      ResponseCache.ingredients,
+      ResponseCache.measureUnits,
+      ResponseCache.steps,
+    ];
+    return responses.respond(request!, tags, () async {
+      final recipe = await (Query<Recipe>(context)..where((r) => r.id).equalTo(id)).fetchOne();
     
-    // Sort steps by number
-    if (recipe.recipeStepLinks != null) {
-      final sortedLinks = recipe.recipeStepLinks!.toList()
-        ..sort((a, b) => (a.number ?? 0).compareTo(b.number ?? 0));
-      recipe.recipeStepLinks = ManagedSet.from(sortedLinks);
-    }
+      if (recipe == null) {
+        return Response.notFound(body: {'error': 'Recipe not found'});
+      }
     
-    return Response.ok(recipe);
+      // Каждая коллекция — отдельный запрос по индексу миграции 11: общий JOIN
+      // давал шаги × ингредиенты × комментарии строк. Запросы идут параллельно
+      // на разных соединениях пула.
+      final stepsQuery = Query<RecipeStepLink>(context)
+        ..where((rsl) => rsl.recipe!.id).equalTo(id)
+        ..sortBy((rsl) => rsl.number, QuerySortOrder.ascending)
+        ..sortBy((rsl) => rsl.id, QuerySortOrder.ascending)
+        ..join(object: (rsl) => rsl.step);
+      final ingredientsQuery = Query<RecipeIngredient>(context)
+        ..where((ri) => ri.recipe!.id).equalTo(id)
+        ..sortBy((ri) => ri.id, QuerySortOrder.ascending)
+        ..join(object: (ri) => ri.ingredient)
+          .join(object: (i) => i.measureunit);
+    
+      // Комментарии — только последние commentsLimit (по умолчанию 20, не
+      // больше 100) и общее число; остальные — GET /comment?recipeId=
+      final commentsCap = (commentsLimit ?? 20).clamp(0, 100);
+      final commentsQuery = Query<Comment>(context)
+        ..where((c) => c.recipe!.id).equalTo(id)
+        ..sortBy((c) => c.dateTime, QuerySortOrder.descending)
+        ..sortBy((c) => c.id, QuerySortOrder.descending)
+        ..fetchLimit = commentsCap;
+      final commentCountQuery = Query<Comment>(context)
+        ..where((c) => c.recipe!.id).equalTo(id);
+    
+      final results = await Future.wait<dynamic>([
+        stepsQuery.fetch(),
+        ingredientsQuery.fetch(),
+        // fetchLimit = 0 у Conduit означает «без ограничения»
+        commentsCap > 0 ? commentsQuery.fetch() : Future.value(<Comment>[]),
+        commentCountQuery.reduce.count(),
+      ]);
+      recipe.recipeStepLinks = ManagedSet.from(results[0] as List<RecipeStepLink>);
+      recipe.recipeIngredients = ManagedSet.from(results[1] as List<RecipeIngredient>);
+      recipe.comments = ManagedSet.from(results[2] as List<Comment>);
+    
+      return Response.ok(recipe.asMap()..['commentCount'] = results[3] as int);
+    });
   }
   
   @Operation.put('id')
@@ -186,6 +254,8 @@ class RecipeController extends ResourceController {
       if (recipe == null) {
         return Response.notFound(body: {'error': 'Recipe not found'});
       }
+      totals.clear();
+      responses.invalidate([ResponseCache.recipes, ResponseCache.recipeTag(id)]);
       
       return Response.ok(recipe);
     } catch (e) {
@@ -193,47 +263,86 @@ class RecipeController extends ResourceController {
     }
   }
   
+  /// Шаги, ингредиенты, комментарии и избранное рецепта удаляет сама база
+  /// (ON DELETE CASCADE, миграция 12), так что удаление — один атомарный DELETE
   @Operation.delete('id')
   Future<Response> deleteRecipe(@Bind.path('id') int id) async {
-    // Delete related data first (due to foreign key constraints)
-    // Comments
-    final commentsQuery = Query<Comment>(context)
-      ..where((c) => c.recipe!.id).equalTo(id);
-    await commentsQuery.delete();
-    
-    // Recipe ingredients
-    final ingredientsQuery = Query<RecipeIngredient>(context)
-      ..where((ri) => ri.recipe!.id).equalTo(id);
-    await ingredientsQuery.delete();
-    
-    // Recipe step links
-    final stepsQuery = Query<RecipeStepLink>(context)
-      ..where((rsl) => rsl.recipe!.id).equalTo(id);
-    await stepsQuery.delete();
-    
-    // Favorites
-    final favoritesQuery = Query<Favorite>(context)
-      ..where((f) => f.recipe!.id).equalTo(id);
-    await favoritesQuery.delete();
-    
-    // Finally delete the recipe
-    final query = Query<Recipe>(context)
-      ..where((r) => r.id).equalTo(id);
-    
-    final deletedCount = await query.delete();
-    
-    if (deletedCount == 0) {
+    final deleted = await context.persistentStore.execute(
+      'DELETE FROM _recipe WHERE id = CAST(@id AS int8) RETURNING id',
+      substitutionValues: {'id': id},
+    ) as List<List<dynamic>>;
+
+    if (deleted.isEmpty) {
       return Response.notFound(body: {'error': 'Recipe not found'});
     }
-    
+    totals.clear();
+    responses.invalidate([ResponseCache.recipes, ResponseCache.recipeTag(id)]);
+
     return Response.ok({'message': 'Recipe deleted successfully', 'id': id});
   }
+
+  /// Удаление рецептов пачкой: ?ids=1,2,3 и/или фильтры search, minTime,
+  /// maxTime как у GET /recipe — нужен хотя бы один. Все подходящие рецепты
+  /// вместе со связанными строками удаляются одним DELETE ... RETURNING.
+  @Operation.delete()
+  Future<Response> deleteRecipes({
+    @Bind.query('ids') String? ids,
+    @Bind.query('search') String? search,
+    @Bind.query('minTime') int? minTime,
+    @Bind.query('maxTime') int? maxTime,
+  }) async {
+    final conditions = <String>[];
+    final values = <String, dynamic>{};
+    if (ids != null && ids.isNotEmpty) {
+      final parsed = ids.split(',').map((id) => int.tryParse(id.trim())).toList();
+      if (parsed.contains(null)) {
+        return Response.badRequest(body: {'error': 'ids must be a comma-separated list of integers'});
+      }
+      if (parsed.length > maxBulkIds) {
+        return Response.badRequest(body: {'error': 'At most $maxBulkIds ids per request'});
+      }
+      final params = <String>[];
+      for (var i = 0; i < parsed.length; i++) {
+        values['id$i'] = parsed[i];
+        params.add('CAST(@id$i AS int8)');
+      }
+      conditions.add('id IN (${params.join(', ')})');
+    }
+    if (search != null && search.isNotEmpty) {
+      values['search'] = '%${RecipeSearch.escapeLike(search)}%';
+      conditions.add('name ILIKE CAST(@search AS text)');
+    }
+    if (minTime != null) {
+      values['minTime'] = minTime;
+      conditions.add('duration >= CAST(@minTime AS int4)');
+    }
+    if (maxTime != null) {
+      values['maxTime'] = maxTime;
+      conditions.add('duration <= CAST(@maxTime AS int4)');
+    }
+    if (conditions.isEmpty) {
+      return Response.badRequest(body: {'error': 'ids or a filter (search, minTime, maxTime) is required'});
+    }
+
+    final deleted = await context.persistentStore.execute(
+      'DELETE FROM _recipe WHERE ${conditions.join(' AND ')} RETURNING id',
+      substitutionValues: values,
+    ) as List<List<dynamic>>;
+    final deletedIds = deleted.map((row) => row.first as int).toList();
+    if (deletedIds.isNotEmpty) {
+      totals.clear();
+      responses.invalidate([ResponseCache.recipes, ...deletedIds.map(ResponseCache.recipeTag)]);
+    }
+
+    return Response.ok({'deleted': deletedIds.length, 'ids': deletedIds});
+  }
 }
 
 class RecipeSearchController extends ResourceController {
-  RecipeSearchController(this.context);
+  RecipeSearchController(this.context, this.totals);
   
   final ManagedContext context;
+  final CountCache totals;
   
   @override
   Map<String, APIResponse> documentOperationResponses(
@@ -253,75 +362,127 @@ class RecipeSearchController extends ResourceController {
   Future<Response> searchRecipes({
     @Bind.query('q') String? query,
     @Bind.query('ingredients') String? ingredients,
+    @Bind.query('ingredientIds') String? ingredientIds,
+    @Bind.query('ingredientMode') String? ingredientMode,
     @Bind.query('maxTime') int? maxTime,
     @Bind.query('page') int? page,
     @Bind.query('limit') int? limit,
+    @Bind.query('cursor') String? cursor,
+    @Bind.query('total') String? total,
   }) async {
-    final pageNum = page ?? 1;
     final pageSize = limit ?? 20;
-    final offset = (pageNum - 1) * pageSize;
-    
-    final recipeQuery = Query<Recipe>(context)
-      ..offset = offset
-      ..fetchLimit = pageSize
-      ..sortBy((r) => r.name, QuerySortOrder.ascending);
-    
-    // Search by name or in steps
-    if (query != null && query.isNotEmpty) {
-      recipeQuery.where((r) => r.name).contains(query, caseSensitive: false);
+    if (!PageCursor.isValidLimit(pageSize)) {
+      return Response.badRequest(body: {'error': PageCursor.limitError});
     }
-    
-    // Filter by max time
-    if (maxTime != null) {
-      recipeQuery.where((r) => r.duration).lessThanEqualTo(maxTime);
-    }
-    
-    // Filter by ingredients - this would need a more complex join
-    // For now, we'll fetch all and filter in memory (not ideal for large datasets)
-    if (ingredients != null && ingredients.isNotEmpty) {
-      final ingredientList = ingredients.split(',').map((i) => i.trim().toLowerCase()).toList();
-      recipeQuery.join(set: (r) => r.recipeIngredients)
-        .join(object: (ri) => ri.ingredient);
+    final mode = ingredientMode ?? 'any';
+    if (!RecipeSearch.ingredientModes.contains(mode)) {
+      return Response.badRequest(body: {'error': 'ingredientMode must be any, all or none'});
     }
-    
-    final recipes = await recipeQuery.fetch();
-    
-    // Filter by ingredients if specified (in-memory filtering)
-    List<Recipe> filteredRecipes = recipes;
-    if (ingredients != null && ingredients.isNotEmpty) {
-      final ingredientList = ingredients.split(',').map((i) => i.trim().toLowerCase()).toList();
-      filteredRecipes = recipes.where((recipe) {
-        final recipeIngredients = recipe.recipeIngredients ?? [];
-        return recipeIngredients.any((ri) {
-          final ingredientName = ri.ingredient?.name?.toLowerCase() ?? '';
-          return ingredientList.any((searchIngredient) => 
-            ingredientName.contains(searchIngredient));
-        });
-      }).toList();
+    final ids = <int>[];
+    for (final part in (ingredientIds ?? '').split(',').map((p) => p.trim()).where((p) => p.isNotEmpty)) {
+      final id = int.tryParse(part);
+      if (id == null) {
+        return Response.badRequest(body: {'error': 'ingredientIds must be comma-separated integers'});
+      }
+      ids.add(id);
     }
-    
-    // Count total
-    final countQuery = Query<Recipe>(context);
-    if (query != null && query.isNotEmpty) {
-      countQuery.where((r) => r.name).contains(query, caseSensitive: false);
+    final names = (ingredients ?? '')
+        .split(',')
+        .map((i) => i.trim().toLowerCase())
+        .where((i) => i.isNotEmpty)
+        .toList();
+
+    final search = RecipeSearch(
+      context,
+      text: query,
+      maxTime: maxTime,
+      ingredientIds: ids,
+      ingredientNames: names,
+      ingredientMode: mode,
+    );
+    PageCursor? after;
+    if (cursor != null && cursor.isNotEmpty) {
+      try {
+        after = PageCursor.decode(cursor, keys: search.cursorKeys);
+      } on FormatException {
+        return Response.badRequest(body: {'error': 'Invalid cursor'});
+      }
     }
-    if (maxTime != null) {
-      countQuery.where((r) => r.duration).lessThanEqualTo(maxTime);
+    final pageNum = after == null ? (page ?? 1) : null;
+
+    // С q — по релевантности (rank, id), без q — по (name, id)
+    final hits = await search.fetch(
+      limit: pageSize + 1,
+      offset: pageNum == null ? 0 : (pageNum - 1) * pageSize,
+      after: after,
+    );
+    final recipes = hits.take(pageSize).map((h) => h.recipe).toList();
+    final nextCursor = hits.length > pageSize ? hits[pageSize - 1].cursor.encode() : null;
+
+    final pagination = <String, dynamic>{
+      if (pageNum != null) 'page': pageNum,
+      'limit': pageSize,
+      'nextCursor': nextCursor,
+    };
+    final error = await addRecipeTotal(
+      pagination,
+      context: context,
+      totals: totals,
+      mode: total ?? (pageNum != null ? 'exact' : 'none'),
+      key: search.cacheKey,
+      filtered: search.filtered,
+      count: search.count,
+    );
+    if (error != null) {
+      return error;
     }
-    final totalCount = await countQuery.reduce.count();
-    
+
     return Response.ok({
-      'data': filteredRecipes.map((r) => r.asMap()).toList(),
-      'pagination': {
-        'page': pageNum,
-        'limit': pageSize,
-        'total': totalCount,
-        'totalPages': (totalCount / pageSize).ceil(),
-      }
+      'data': recipes.map((r) => r.asMap()).toList(),
+      'pagination': pagination,
     });
   }
 }
 
+/// Добавляет в pagination поле total (и totalPages, если выдача постраничная).
+///
+/// [mode]: exact — COUNT(*) под фильтр из кеша [totals], estimate — оценка
+/// планировщика из pg_class (для выборки без фильтров, иначе как exact),
+/// none — без total. Неизвестный mode — ответ 400.
+Future<Response?> addRecipeTotal(
+  Map<String, dynamic> pagination, {
+  required ManagedContext context,
+  required CountCache totals,
+  required String mode,
+  required String key,
+  required bool filtered,
+  required Future<int> Function() count,
+}) async {
+  if (mode == 'none') {
+    return null;
+  }
+  if (mode != 'exact' && mode != 'estimate') {
+    return Response.badRequest(body: {'error': 'total must be exact, estimate or none'});
+  }
+  int? value;
+  if (mode == 'estimate' && !filtered) {
+    final rows = await context.persistentStore
+        .execute("SELECT reltuples::bigint FROM pg_class WHERE oid = '_recipe'::regclass") as List<List<dynamic>>;
+    final estimate = rows.isEmpty ? -1 : rows.first.first as int;
+    // -1: таблицу ещё не анализировали
+    if (estimate >= 0) {
+      value = estimate;
+      pagination['totalIsEstimate'] = true;
+    }
+  }
+  value ??= await totals.get(key, count);
+  pagination['total'] = value;
+  if (pagination.containsKey('page')) {
+    pagination['totalPages'] = (value / (pagination['limit'] as int)).ceil();
+  }
+  return null;
+}
+
 // User-specific controller that will require authentication
 class UserRecipesController extends ResourceController {
   UserRecipesController(this.context);
@@ -6,6 +6,7 @@ import 'package:uuid/uuid.dart';
 
 import '../model/user.dart';
 import '../middleware/naming_middleware.dart';
+import '../utils/token_cache.dart';
 
 class UserInfoController extends NamingController {
   UserInfoController(this.context);
@@ -77,9 +78,10 @@ class UserInfoController extends NamingController {
 }
 
 class UserController extends NamingController {
-  UserController(this.context);
+  UserController(this.context, this.tokenCache);
 
   ManagedContext context;
+  final TokenCache<User> tokenCache;
 
   @override
   Map<String, APIResponse> documentOperationResponses(context, operation) {
@@ -116,10 +118,14 @@ class UserController extends NamingController {
         return createResponseWithNamingConversion(409, {"error": "login is already registered"});
       }
       // Вставка (храним только обязательные поля для совместимости со схемой)
+      // Одновременную регистрацию того же логина отсекает уникальный индекс
       final rows = await store.execute(
-        'INSERT INTO _user (login, password) VALUES (@login, @password) RETURNING id, login',
+        'INSERT INTO _user (login, password) VALUES (@login, @password) ON CONFLICT DO NOTHING RETURNING id, login',
         substitutionValues: {'login': login, 'password': password},
       ) as List<List<dynamic>>;
+      if (rows.isEmpty) {
+        return createResponseWithNamingConversion(409, {"error": "login is already registered"});
+      }
       final r = rows.first;
       return createResponseWithNamingConversion(200, {"status": "ok", "user": {"id": r[0], "login": r[1]}});
     } catch (e) {
@@ -149,6 +155,9 @@ class UserController extends NamingController {
       final userId = rows.first.first as int;
       final token = const Uuid().v4();
       await store.execute('UPDATE _user SET token=@token WHERE id=@id', substitutionValues: {'token': token, 'id': userId});
+      // Старый токен пользователя больше не действует
+      tokenCache.invalidateUser(userId);
+      tokenCache.invalidateToken(token);
       return createResponseWithNamingConversion(200, {'token': token});
     } catch (e) {
       print("Error authenticating user: $e");
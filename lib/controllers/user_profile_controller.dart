@@ -4,11 +4,16 @@ import '../model/user.dart';
 import '../model/recipe.dart';
 import '../model/favorite.dart';
 import '../model/comment.dart';
+import '../utils/freezer_matcher.dart';
+import '../utils/page_cursor.dart';
+import '../utils/response_cache.dart';
+import '../utils/token_cache.dart';
 
 class UserProfileController extends ResourceController {
-  UserProfileController(this.context);
+  UserProfileController(this.context, this.tokenCache);
   
   final ManagedContext context;
+  final TokenCache<User> tokenCache;
   
   @Operation.get()
   Future<Response> getProfile() async {
@@ -56,6 +61,8 @@ class UserProfileController extends ResourceController {
       return Response.badRequest(body: {'error': 'No fields to update'});
     }
     await store.execute('UPDATE _user SET ' + sets.join(', ') + ' WHERE id = @id', substitutionValues: vals);
+    // В кеше токенов лежит пользователь со старыми полями профиля
+    tokenCache.invalidateUser(user.id!);
     final rows = await store.execute(
       'SELECT id, login, first_name, last_name, phone, avatar_url, birthday FROM _user WHERE id=@id',
       substitutionValues: {'id': user.id},
@@ -90,6 +97,7 @@ class UserProfileController extends ResourceController {
       ..values.token = null;
     
     await query.updateOne();
+    tokenCache.invalidateUser(user.id!);
     
     return Response.ok({'message': 'Logged out successfully'});
   }
@@ -184,9 +192,10 @@ class UserFavoritesController extends ResourceController {
 }
 
 class UserCommentsController extends ResourceController {
-  UserCommentsController(this.context);
+  UserCommentsController(this.context, this.responses);
   
   final ManagedContext context;
+  final ResponseCache responses;
   
   @Operation.get()
   Future<Response> getUserComments() async {
@@ -238,6 +247,7 @@ class UserCommentsController extends ResourceController {
       substitutionValues: {'uid': user.id, 'rid': recipeId, 'text': text},
     ) as List<List<dynamic>>;
     final id = rows.first.first as int;
+    responses.invalidateRecipes([recipeId]);
     final result = await store.execute(
       'SELECT c.id, c.text, c.photo, c.date_time, u.id as user_id, r.id as recipe_id, r.name '
       'FROM _comment c JOIN _user u ON u.id=c.user_id JOIN _recipe r ON r.id=c.recipe_id '
@@ -257,17 +267,74 @@ class UserCommentsController extends ResourceController {
       return Response.unauthorized(body: {'error': 'Authentication required'});
     }
     
-    // Check if comment belongs to user
-    final query = Query<Comment>(context)
-      ..where((c) => c.id).equalTo(commentId)
-      ..where((c) => c.user!.id).equalTo(user.id!);
-    
-    final deletedCount = await query.delete();
+    // Удаляем только свой комментарий; RETURNING recipe_id — для кеша ответов
+    final store = context.persistentStore as PostgreSQLPersistentStore;
+    final deleted = await store.execute(
+      'DELETE FROM _comment WHERE id = @id AND user_id = @uid RETURNING recipe_id',
+      substitutionValues: {'id': commentId, 'uid': user.id},
+    ) as List<List<dynamic>>;
     
-    if (deletedCount == 0) {
+    if (deleted.isEmpty) {
       return Response.notFound(body: {'error': 'Comment not found or does not belong to you'});
     }
+    responses.invalidateRecipes(deleted.map((row) => row.first as int?));
     
     return Response.ok({'message': 'Comment deleted successfully'});
   }
 }
+
+/// Рецепты, которые можно приготовить из морозилки пользователя
+class UserFreezerRecipesController extends ResourceController {
+  UserFreezerRecipesController(this.context);
+  
+  final ManagedContext context;
+  
+  @Operation.get()
+  Future<Response> getCookableRecipes({
+    @Bind.query('maxMissing') int? maxMissing,
+    @Bind.query('checkQuantity') bool checkQuantity = false,
+    @Bind.query('page') int? page,
+    @Bind.query('limit') int? limit,
+    @Bind.query('cursor') String? cursor,
+  }) async {
+    final user = request!.attachments['user'] as User?;
+    
+    if (user == null) {
+      return Response.unauthorized(body: {'error': 'Authentication required'});
+    }
+    if (maxMissing != null && maxMissing < 0) {
+      return Response.badRequest(body: {'error': 'maxMissing must be zero or positive'});
+    }
+    
+    final pageSize = limit ?? 20;
+    if (!PageCursor.isValidLimit(pageSize)) {
+      return Response.badRequest(body: {'error': PageCursor.limitError});
+    }
+    PageCursor? after;
+    if (cursor != null && cursor.isNotEmpty) {
+      try {
+        after = PageCursor.decode(cursor, keys: FreezerMatcher.cursorKeys);
+      } on FormatException {
+        return Response.badRequest(body: {'error': 'Invalid cursor'});
+      }
+    }
+    final pageNum = after == null ? (page ?? 1) : null;
+    
+    final matcher = FreezerMatcher(context, userId: user.id!, maxMissing: maxMissing, checkQuantity: checkQuantity);
+    final matches = await matcher.fetch(
+      limit: pageSize + 1,
+      offset: pageNum == null ? 0 : (pageNum - 1) * pageSize,
+      after: after,
+    );
+    final pageMatches = matches.take(pageSize).toList();
+    
+    return Response.ok({
+      'data': pageMatches.map((m) => m.asMap()).toList(),
+      'pagination': {
+        if (pageNum != null) 'page': pageNum,
+        'limit': pageSize,
+        'nextCursor': matches.length > pageSize ? pageMatches.last.cursor.encode() : null,
+      },
+    });
+  }
+}
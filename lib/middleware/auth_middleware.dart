@@ -1,36 +1,46 @@
 import 'package:conduit_core/conduit_core.dart';
 import '../model/user.dart';
+import '../utils/token_cache.dart';
 
 class AuthMiddleware extends Controller {
-  AuthMiddleware(this.context);
-  
+  AuthMiddleware(this.context, this.tokenCache);
+
   final ManagedContext context;
-  
+  final TokenCache<User> tokenCache;
+
   @override
   Future<Request?> handle(Request request) async {
     // Get token from header
     final authHeader = request.raw.headers.value('authorization');
-    
+
     if (authHeader == null || !authHeader.startsWith('Bearer ')) {
       // Pass through; downstream controllers will check for user
       return request;
     }
-    
+
     final token = authHeader.substring(7); // Remove 'Bearer ' prefix
-    
-    // Find user by token
-    final query = Query<User>(context)
-      ..where((u) => u.token).equalTo(token);
-    
-    final user = await query.fetchOne();
-    
+
+    User? user;
+    final cached = tokenCache.lookup(token);
+    if (cached != null) {
+      user = cached.value;
+    } else {
+      // Find user by token
+      final generation = tokenCache.generation;
+      final query = Query<User>(context)
+        ..where((u) => u.token).equalTo(token);
+
+      user = await query.fetchOne();
+      tokenCache.put(token, user, userId: user?.id, generation: generation);
+    }
+
     if (user == null) {
       return request;
     }
-    
+
     // Add user to request for use in controllers
     request.attachments['user'] = user;
-    
+
     return request;
   }
 }
@@ -0,0 +1,85 @@
+import 'dart:async';
+import 'dart:isolate';
+
+import 'package:conduit_core/conduit_core.dart';
+
+import '../utils/shutdown_coordinator.dart';
+
+/// Первый контроллер канала: считает запросы в работе и проводит drain.
+///
+/// После команды drain новые запросы получают 503 с Connection: close,
+/// HTTP-сервер isolate перестаёт принимать соединения, а когда последний
+/// запрос завершится (или истечёт [timeout]), вызывается onDrained —
+/// канал закрывает в нём пул соединений с базой.
+class DrainController extends Controller {
+  DrainController({this.timeout = const Duration(seconds: 20)});
+
+  final Duration timeout;
+
+  int _inFlight = 0;
+  bool _draining = false;
+  Completer<void>? _idle;
+  ReceivePort? _commands;
+
+  int get inFlight => _inFlight;
+  bool get isDraining => _draining;
+
+  @override
+  Future<RequestOrResponse?> handle(Request request) async {
+    if (_draining) {
+      return Response(503, {'Connection': 'close', 'Retry-After': '1'}, {'error': 'Server is shutting down'});
+    }
+    _inFlight++;
+    request.raw.response.done.then((_) {}, onError: (_) {}).whenComplete(_finished);
+    return request;
+  }
+
+  /// Регистрирует isolate у ShutdownCoordinator; без координатора (тесты) ничего не делает
+  void attach(
+    SendPort? coordinator, {
+    required Future<void> Function() stopListening,
+    required Future<void> Function() onDrained,
+  }) {
+    if (coordinator == null) {
+      return;
+    }
+    _commands = ReceivePort()
+      ..listen((message) async {
+        if (message == ShutdownCoordinator.drainCommand) {
+          await drain(stopListening: stopListening, onDrained: onDrained);
+          coordinator.send([ShutdownCoordinator.drainedMessage, Isolate.current.hashCode]);
+        }
+      });
+    coordinator.send([ShutdownCoordinator.registerMessage, _commands!.sendPort]);
+  }
+
+  Future<void> drain({
+    required Future<void> Function() stopListening,
+    required Future<void> Function() onDrained,
+  }) async {
+    if (_draining) {
+      return;
+    }
+    _draining = true;
+    // HttpServer.close без force: активные соединения дорабатывают
+    unawaited(stopListening());
+    if (_inFlight > 0) {
+      _idle = Completer<void>();
+      await _idle!.future.timeout(timeout, onTimeout: () {
+        logger.warning('Drain timeout: $_inFlight request(s) still in flight');
+      });
+    }
+    await onDrained();
+  }
+
+  void close() {
+    _commands?.close();
+  }
+
+  void _finished() {
+    _inFlight--;
+    if (_inFlight == 0 && _idle != null && !_idle!.isCompleted) {
+      _idle!.complete();
+    }
+  }
+}
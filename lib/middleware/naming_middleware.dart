@@ -3,6 +3,9 @@ import '../utils/naming_converter.dart';
 
 /// Controller-helper для обработки camelCase ↔ snake_case конвертации
 class NamingController extends ResourceController {
+  /// Заранее посчитанные имена ключей модели контроллера; остальные ключи
+  /// конвертируются через кеш NamingConverter
+  KeyMap? get namingKeys => null;
   
   /// Декодирует request body с поддержкой camelCase конвертации
   Future<Map<String, dynamic>> decodeBodyWithNamingConversion() async {
@@ -10,7 +13,7 @@ class NamingController extends ResourceController {
       final originalBody = await request!.body.decode<Map<String, dynamic>>();
       
       // Конвертируем camelCase поля в snake_case
-      return NamingConverter.convertMapKeysToSnake(originalBody);
+      return NamingConverter.convertMapKeysToSnake(originalBody, keys: namingKeys);
     } catch (e) {
       print("Warning: Could not convert request body: $e");
       // Если конвертация не удалась, возвращаем как есть
@@ -21,7 +24,7 @@ class NamingController extends ResourceController {
   /// Создает Response с конвертацией snake_case в camelCase
   Response createResponseWithNamingConversion(int statusCode, dynamic body, {Map<String, Object>? headers}) {
     try {
-      final convertedBody = NamingConverter.convertResponseToCamelCase(body);
+      final convertedBody = NamingConverter.convertResponseToCamelCase(body, keys: namingKeys);
       return Response(statusCode, headers, convertedBody);
     } catch (e) {
       print("Warning: Could not convert response body: $e");
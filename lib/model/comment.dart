@@ -12,7 +12,7 @@ class _Comment {
   @Relate(#comments)
   User? user;
 
-  @Relate(#comments)
+  @Relate(#comments, onDelete: DeleteRule.cascade)
   Recipe? recipe;
 
   @Column()
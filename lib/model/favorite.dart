@@ -9,7 +9,7 @@ class _Favorite {
   @primaryKey
   int? id;
 
-  @Relate(#favoriteRecipes)
+  @Relate(#favoriteRecipes, onDelete: DeleteRule.cascade)
   Recipe? recipe;
 
   @Relate(#favoriteRecipes)
@@ -50,7 +50,7 @@ class _RecipeIngredient {
   @Relate(#recipeIngredients)
   Ingredient? ingredient;
 
-  @Relate(#recipeIngredients)
+  @Relate(#recipeIngredients, onDelete: DeleteRule.cascade)
   Recipe? recipe;
 
   @Column(databaseType: ManagedPropertyType.doublePrecision)
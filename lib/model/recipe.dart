@@ -50,10 +50,10 @@ class _RecipeStepLink {
   @primaryKey
   int? id;
 
-  @Relate(#recipeStepLinks)
+  @Relate(#recipeStepLinks, onDelete: DeleteRule.cascade)
   Recipe? recipe;
 
-  @Relate(#recipeStepLinks)
+  @Relate(#recipeStepLinks, onDelete: DeleteRule.cascade)
   RecipeStep? step;
 
   @Column()
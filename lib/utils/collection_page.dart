@@ -0,0 +1,153 @@
+import 'dart:async';
+import 'dart:convert';
+import 'dart:io';
+
+import 'package:conduit_core/conduit_core.dart';
+
+import 'page_cursor.dart';
+
+/// Строки после курсора [after] (null — с начала), не больше [limit], в
+/// порядке ключа пагинации
+typedef PageFetch = Future<List<Map<String, dynamic>>> Function(PageCursor? after, int limit);
+
+/// Общий контракт выдачи списков: страница по limit/cursor или потоковая
+/// выдача всей коллекции.
+///
+/// * `?limit=N[&cursor=...]` — страница `{"data": [...], "pagination":
+///   {"limit": N, "nextCursor": ...}}`, как у /recipe; nextCursor = null на
+///   последней странице.
+/// * без limit и cursor — прежний JSON-массив, но он пишется в ответ пачками
+///   по [batchSize] строк по мере чтения из базы (chunked), и память не
+///   зависит от размера коллекции.
+/// * `?format=ndjson` или `Accept: application/x-ndjson` — по объекту на
+///   строку; вместе с limit курсор следующей страницы приходит в заголовке
+///   X-Next-Cursor.
+///
+/// Контроллер задаёт ключ пагинации [keys] (поля строки, уникальные в
+/// сумме, последним — id) и [fetch], который читает строки после курсора.
+class CollectionPage {
+  CollectionPage({required this.fetch, this.keys = const ['id'], this.batchSize = 500});
+
+  static const int defaultLimit = 50;
+  static const int maxLimit = PageCursor.maxLimit;
+  static const String nextCursorHeader = 'x-next-cursor';
+  static final ContentType ndjson = ContentType('application', 'x-ndjson', charset: 'utf-8');
+
+  final PageFetch fetch;
+  final List<String> keys;
+  final int batchSize;
+
+  /// Запрошена страница (limit или cursor), а не вся коллекция
+  static bool isPaged(Request request) {
+    final params = request.raw.uri.queryParameters;
+    return params.containsKey('limit') || (params['cursor'] ?? '').isNotEmpty;
+  }
+
+  /// NDJSON выбирается ещё и по Accept, поэтому такие ответы не кешируются
+  /// по URL
+  static bool wantsNdjson(Request request) =>
+      request.raw.uri.queryParameters['format'] == 'ndjson' ||
+      (request.raw.headers.value(HttpHeaders.acceptHeader) ?? '').contains(ndjson.mimeType);
+
+  /// Ответ на GET [request] в режиме, который выбран его параметрами
+  Future<Response> respond(Request request) async {
+    final asNdjson = wantsNdjson(request);
+    if (!isPaged(request)) {
+      return _stream(asNdjson);
+    }
+
+    final params = request.raw.uri.queryParameters;
+    final rawLimit = params['limit'];
+    final rawCursor = params['cursor'];
+    final limit = rawLimit == null ? defaultLimit : int.tryParse(rawLimit);
+    if (limit == null || !PageCursor.isValidLimit(limit)) {
+      return Response.badRequest(body: {'error': PageCursor.limitError});
+    }
+    PageCursor? after;
+    if (rawCursor != null && rawCursor.isNotEmpty) {
+      try {
+        after = PageCursor.decode(rawCursor, keys: keys);
+      } on FormatException {
+        return Response.badRequest(body: {'error': 'Invalid cursor'});
+      }
+    }
+
+    // Берём на одну строку больше, чтобы узнать, есть ли следующая страница
+    final rows = await fetch(after, limit + 1);
+    final data = rows.take(limit).toList();
+    final nextCursor = rows.length > limit ? cursorOf(data.last).encode() : null;
+    if (asNdjson) {
+      return Response.ok(
+        utf8.encode(data.map((row) => '${json.encode(row)}\n').join()),
+        headers: {if (nextCursor != null) nextCursorHeader: nextCursor},
+      )
+        ..contentType = ndjson
+        ..encodeBody = false;
+    }
+    return Response.ok({
+      'data': data,
+      'pagination': {'limit': limit, 'nextCursor': nextCursor},
+    });
+  }
+
+  /// Вся коллекция одним списком — для небольших справочников, ответ на
+  /// которые целиком кладётся в ResponseCache
+  Future<List<Map<String, dynamic>>> fetchAll() async {
+    final all = <Map<String, dynamic>>[];
+    PageCursor? after;
+    while (true) {
+      final rows = await fetch(after, batchSize);
+      all.addAll(rows);
+      if (rows.length < batchSize) {
+        return all;
+      }
+      after = cursorOf(rows.last);
+    }
+  }
+
+  PageCursor cursorOf(Map<String, dynamic> row) => PageCursor({for (final key in keys) key: row[key]});
+
+  Response _stream(bool asNdjson) {
+    return Response.ok(_encode(asNdjson))
+      ..contentType = asNdjson ? ndjson : ContentType.json
+      ..encodeBody = false;
+  }
+
+  /// Коллекция пачками по [batchSize]: каждая пачка — отдельный keyset-запрос
+  /// после последней отданной строки, поэтому в памяти не больше одной
+  /// пачки. Ошибка базы посреди ответа обрывает соединение — статус уже
+  /// отправлен.
+  Stream<List<int>> _encode(bool asNdjson) async* {
+    if (!asNdjson) {
+      yield utf8.encode('[');
+    }
+    PageCursor? after;
+    var first = true;
+    while (true) {
+      final rows = await fetch(after, batchSize);
+      if (rows.isEmpty) {
+        break;
+      }
+      final chunk = StringBuffer();
+      for (final row in rows) {
+        if (asNdjson) {
+          chunk..write(json.encode(row))..write('\n');
+        } else {
+          if (!first) {
+            chunk.write(',');
+          }
+          chunk.write(json.encode(row));
+        }
+        first = false;
+      }
+      yield utf8.encode(chunk.toString());
+      if (rows.length < batchSize) {
+        break;
+      }
+      after = cursorOf(rows.last);
+    }
+    if (!asNdjson) {
+      yield utf8.encode(']');
+    }
+  }
+}
@@ -0,0 +1,53 @@
+import 'dart:async';
+import 'dart:collection';
+
+/// Кеш COUNT(*) по набору фильтров с коротким TTL.
+///
+/// Полный подсчёт строк под фильтр стоит столько же, сколько просмотр всех
+/// подходящих строк, а клиентам с бесконечной прокруткой точное число не
+/// нужно. Одновременные промахи по одному ключу ждут один общий запрос.
+class CountCache {
+  CountCache({this.ttl = const Duration(seconds: 30), this.maxEntries = 1000});
+
+  final Duration ttl;
+  final int maxEntries;
+
+  final LinkedHashMap<String, _CachedCount> _entries = LinkedHashMap<String, _CachedCount>();
+  int hits = 0;
+  int misses = 0;
+
+  Future<int> get(String key, Future<int> Function() count) {
+    final cached = _entries[key];
+    if (cached != null && cached.expiresAt.isAfter(DateTime.now())) {
+      hits++;
+      return cached.value;
+    }
+    misses++;
+    final value = count();
+    _entries.remove(key);
+    _entries[key] = _CachedCount(value, DateTime.now().add(ttl));
+    // Ошибку не кешируем: следующий запрос посчитает заново
+    value.catchError((_) {
+      if (identical(_entries[key]?.value, value)) {
+        _entries.remove(key);
+      }
+      return 0;
+    });
+    while (_entries.length > maxEntries) {
+      _entries.remove(_entries.keys.first);
+    }
+    return value;
+  }
+
+  /// Сбрасывается при создании, изменении и удалении рецептов
+  void clear() => _entries.clear();
+
+  Map<String, dynamic> get stats => {'size': _entries.length, 'hits': hits, 'misses': misses};
+}
+
+class _CachedCount {
+  _CachedCount(this.value, this.expiresAt);
+
+  final Future<int> value;
+  final DateTime expiresAt;
+}
@@ -0,0 +1,113 @@
+import 'dart:io';
+
+import 'package:conduit_postgresql/conduit_postgresql.dart';
+
+import 'pooled_store.dart';
+
+/// Параметры подключения к PostgreSQL из переменных окружения.
+///
+/// Одни и те же значения читают главный isolate (проверка лимита
+/// соединений при старте) и каждый FoodapiChannel (свой пул).
+class DatabaseConfig {
+  DatabaseConfig({
+    required this.host,
+    required this.port,
+    required this.user,
+    required this.password,
+    required this.name,
+    required this.poolSize,
+    required this.statementCacheSize,
+    required this.reservedConnections,
+  });
+
+  factory DatabaseConfig.fromEnvironment([Map<String, String>? environment]) {
+    final env = environment ?? Platform.environment;
+    return DatabaseConfig(
+      host: env['DATABASE_HOST'] ?? 'localhost',
+      port: int.parse(env['DATABASE_PORT'] ?? '5433'),
+      user: env['DATABASE_USER'] ?? 'food',
+      password: env['DATABASE_PASSWORD'] ?? 'yaigoo2E',
+      name: env['DATABASE_NAME'] ?? 'food',
+      poolSize: int.parse(env['DATABASE_POOL_SIZE'] ?? '4'),
+      statementCacheSize: int.parse(env['DATABASE_STATEMENT_CACHE_SIZE'] ?? '200'),
+      reservedConnections: int.parse(env['DATABASE_RESERVED_CONNECTIONS'] ?? '3'),
+    );
+  }
+
+  final String host;
+  final int port;
+  final String user;
+  final String password;
+  final String name;
+
+  /// Соединений в пуле одного isolate
+  final int poolSize;
+
+  /// Prepared statements на одно соединение
+  final int statementCacheSize;
+
+  /// Соединения, которые оставляем свободными для миграций и psql
+  final int reservedConnections;
+
+  PooledPostgreSQLPersistentStore createStore() {
+    return PooledPostgreSQLPersistentStore(user, password, host, port, name,
+        poolSize: poolSize, statementCacheSize: statementCacheSize, useSSL: false);
+  }
+
+  /// Проверяет, что [isolates] пулов по [poolSize] соединений поместятся в
+  /// max_connections сервера вместе с уже открытыми соединениями (например,
+  /// предыдущей версии при выкатке) и [reservedConnections].
+  Future<ConnectionBudget> checkConnectionBudget(int isolates) async {
+    final store = PostgreSQLPersistentStore(user, password, host, port, name, useSSL: false);
+    try {
+      final rows = await store.execute(
+        "SELECT current_setting('max_connections')::int, "
+        "current_setting('superuser_reserved_connections')::int, "
+        "(SELECT count(*) FROM pg_stat_activity "
+        "WHERE backend_type = 'client backend' AND pid <> pg_backend_pid())::int",
+      ) as List<List<dynamic>>;
+      final budget = ConnectionBudget(
+        maxConnections: rows.first[0] as int,
+        superuserReserved: rows.first[1] as int,
+        inUse: rows.first[2] as int,
+        required: isolates * poolSize + reservedConnections,
+      );
+      if (budget.required > budget.available) {
+        throw ConnectionBudgetException(
+          '$isolates isolate(s) x DATABASE_POOL_SIZE=$poolSize + $reservedConnections reserved = '
+          '${budget.required} connections, but PostgreSQL allows only ${budget.available} more '
+          '(max_connections=${budget.maxConnections}, superuser_reserved_connections=${budget.superuserReserved}, '
+          'in use=${budget.inUse}). Lower SERVER_ISOLATES or DATABASE_POOL_SIZE, or raise max_connections.',
+        );
+      }
+      return budget;
+    } finally {
+      await store.close();
+    }
+  }
+}
+
+class ConnectionBudget {
+  ConnectionBudget({
+    required this.maxConnections,
+    required this.superuserReserved,
+    required this.inUse,
+    required this.required,
+  });
+
+  final int maxConnections;
+  final int superuserReserved;
+  final int inUse;
+  final int required;
+
+  int get available => maxConnections - superuserReserved - inUse;
+}
+
+class ConnectionBudgetException implements Exception {
+  ConnectionBudgetException(this.message);
+
+  final String message;
+
+  @override
+  String toString() => 'ConnectionBudgetException: $message';
+}
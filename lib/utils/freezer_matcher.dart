@@ -0,0 +1,146 @@
+import 'package:conduit_core/conduit_core.dart';
+
+import 'page_cursor.dart';
+
+/// Подбор рецептов по содержимому морозилки пользователя.
+///
+/// Считается одним запросом: строки _recipeingredient с ингредиентами из
+/// морозилки берутся по индексу (ingredient_id, recipe_id) и группируются
+/// по рецепту, а число всех ингредиентов рецепта лежит в
+/// _recipe.ingredient_count (миграция 10). Рецепты без единого совпадения
+/// в выдачу не попадают. Порядок — по покрытию (coverage, id).
+class FreezerMatcher {
+  FreezerMatcher(this.context, {required this.userId, this.maxMissing, this.checkQuantity = false});
+
+  final ManagedContext context;
+  final int userId;
+
+  /// Сколько ингредиентов рецепта может не хватать; null — без ограничения
+  final int? maxMissing;
+
+  /// Ингредиент считается найденным, только если в морозилке его не меньше,
+  /// чем _recipeingredient.count
+  final bool checkQuantity;
+
+  static const List<String> cursorKeys = ['rank', 'id'];
+
+  static const String _have = "WITH have AS ("
+      "SELECT ingredient_id, sum(count) AS amount FROM _freezer "
+      "WHERE user_id = CAST(@userId AS int8) AND ingredient_id IS NOT NULL GROUP BY ingredient_id)";
+
+  String get _enough => checkQuantity ? " AND h.amount >= ri.count" : "";
+
+  Future<List<FreezerMatch>> fetch({required int limit, int offset = 0, PageCursor? after}) async {
+    final values = <String, dynamic>{'userId': userId, 'limit': limit, 'offset': offset};
+    final conditions = <String>[];
+    if (maxMissing != null) {
+      values['maxMissing'] = maxMissing;
+      conditions.add("total - present <= CAST(@maxMissing AS int4)");
+    }
+    if (after != null) {
+      values['cursorRank'] = after.rank;
+      values['cursorId'] = after.id;
+      conditions.add("(coverage < CAST(@cursorRank AS float8) "
+          "OR (coverage = CAST(@cursorRank AS float8) AND id > CAST(@cursorId AS int8)))");
+    }
+    final where = conditions.isEmpty ? '' : 'WHERE ${conditions.join(' AND ')}';
+
+    final rows = await context.persistentStore.execute(
+      "$_have, matched AS ("
+      "SELECT ri.recipe_id, count(*) AS present FROM have h "
+      "JOIN _recipeingredient ri ON ri.ingredient_id = h.ingredient_id$_enough "
+      "WHERE ri.recipe_id IS NOT NULL GROUP BY ri.recipe_id) "
+      "SELECT id, name, duration, photo, present, total, coverage FROM ("
+      "SELECT r.id, r.name, r.duration, r.photo, m.present::int4 AS present, "
+      "GREATEST(r.ingredient_count, m.present)::int4 AS total, "
+      "m.present::float8 / GREATEST(r.ingredient_count, m.present) AS coverage "
+      "FROM matched m JOIN _recipe r ON r.id = m.recipe_id) hits "
+      "$where ORDER BY coverage DESC, id LIMIT @limit OFFSET @offset",
+      substitutionValues: values,
+    ) as List<List<dynamic>>;
+
+    final matches = rows
+        .map((row) => FreezerMatch(
+              id: row[0] as int,
+              name: row[1] as String?,
+              duration: row[2] as int?,
+              photo: row[3] as String?,
+              present: row[4] as int,
+              total: row[5] as int,
+              coverage: (row[6] as num).toDouble(),
+            ))
+        .toList();
+    await _addMissing(matches);
+    return matches;
+  }
+
+  /// Недостающие ингредиенты — одним запросом для всех рецептов страницы
+  Future<void> _addMissing(List<FreezerMatch> matches) async {
+    final pending = matches.where((m) => m.present < m.total).toList();
+    if (pending.isEmpty) {
+      return;
+    }
+    final values = <String, dynamic>{'userId': userId};
+    final ids = <String>[];
+    for (var i = 0; i < pending.length; i++) {
+      values['recipe$i'] = pending[i].id;
+      ids.add('CAST(@recipe$i AS int8)');
+    }
+    final rows = await context.persistentStore.execute(
+      "$_have SELECT ri.recipe_id, ri.ingredient_id, i.name, ri.count, coalesce(h.amount, 0)::float8 "
+      "FROM _recipeingredient ri "
+      "LEFT JOIN have h ON h.ingredient_id = ri.ingredient_id "
+      "LEFT JOIN _ingredient i ON i.id = ri.ingredient_id "
+      "WHERE ri.recipe_id IN (${ids.join(', ')}) "
+      "AND (h.ingredient_id IS NULL${checkQuantity ? ' OR h.amount < ri.count' : ''}) "
+      "ORDER BY ri.recipe_id, ri.id",
+      substitutionValues: values,
+    ) as List<List<dynamic>>;
+
+    final byId = {for (final m in pending) m.id: m};
+    for (final row in rows) {
+      byId[row[0] as int]?.missing.add({
+        'id': row[1],
+        'name': row[2],
+        'count': row[3],
+        'inFreezer': row[4],
+      });
+    }
+  }
+}
+
+class FreezerMatch {
+  FreezerMatch({
+    required this.id,
+    required this.name,
+    required this.duration,
+    required this.photo,
+    required this.present,
+    required this.total,
+    required this.coverage,
+  });
+
+  final int id;
+  final String? name;
+  final int? duration;
+  final String? photo;
+
+  /// Ингредиентов рецепта есть в морозилке / всего в рецепте
+  final int present;
+  final int total;
+  final double coverage;
+  final List<Map<String, dynamic>> missing = [];
+
+  PageCursor get cursor => PageCursor({'rank': coverage, 'id': id});
+
+  Map<String, dynamic> asMap() => {
+        'id': id,
+        'name': name,
+        'duration': duration,
+        'photo': photo,
+        'matched': present,
+        'ingredientCount': total,
+        'coverage': coverage,
+        'missing': missing,
+      };
+}
@@ -1,104 +1,176 @@
 /// Utility functions for converting between camelCase and snake_case
+///
+/// Key conversions are memoized: responses repeat the same few dozen keys,
+/// so each distinct key is converted once per isolate. Maps are rebuilt only
+/// when a key (or a nested value) actually changes; a map that is already
+/// in the target case is returned as is.
 class NamingConverter {
-  
+  /// Upper bound for each memo cache; keys past it are converted every time
+  static const int maxCachedKeys = 4096;
+
+  static final Map<String, String> _snakeKeys = {};
+  static final Map<String, String> _camelKeys = {};
+
+  static const int _a = 0x61, _upperA = 0x41, _upperZ = 0x5a, _underscore = 0x5f;
+
   /// Convert camelCase string to snake_case
   /// Example: firstName -> first_name, avatarUrl -> avatar_url
   static String camelToSnake(String camelCase) {
-    return camelCase.replaceAllMapped(
-      RegExp(r'([A-Z])'),
-      (match) => '_${match.group(1)!.toLowerCase()}',
-    );
+    return _snakeKeys[camelCase] ?? _remember(_snakeKeys, camelCase, _toSnake(camelCase));
   }
-  
+
   /// Convert snake_case string to camelCase
   /// Example: first_name -> firstName, avatar_url -> avatarUrl
   static String snakeToCamel(String snakeCase) {
     if (!snakeCase.contains('_')) return snakeCase;
-    
-    final parts = snakeCase.split('_');
-    return parts.first + 
-           parts.skip(1).map((part) => 
-             part.isNotEmpty ? '${part[0].toUpperCase()}${part.substring(1)}' : ''
-           ).join();
+    return _camelKeys[snakeCase] ?? _remember(_camelKeys, snakeCase, _toCamel(snakeCase));
   }
-  
-  /// Recursively convert Map keys from camelCase to snake_case
-  static Map<String, dynamic> convertMapKeysToSnake(Map<String, dynamic> input) {
-    final result = <String, dynamic>{};
-    
-    input.forEach((key, value) {
-      final snakeKey = camelToSnake(key);
-      
-      if (value is Map<String, dynamic>) {
-        result[snakeKey] = convertMapKeysToSnake(value);
-      } else if (value is List) {
-        result[snakeKey] = value.map((item) {
-          if (item is Map<String, dynamic>) {
-            return convertMapKeysToSnake(item);
-          }
-          return item;
-        }).toList();
+
+  /// Number of memoized keys in both directions
+  static int get cachedKeys => _snakeKeys.length + _camelKeys.length;
+
+  static void clearCache() {
+    _snakeKeys.clear();
+    _camelKeys.clear();
+  }
+
+  static String _remember(Map<String, String> cache, String key, String value) {
+    if (cache.length < maxCachedKeys) {
+      cache[key] = value;
+    }
+    return value;
+  }
+
+  static String _toSnake(String input) {
+    final units = input.codeUnits;
+    var upper = 0;
+    for (final unit in units) {
+      if (unit >= _upperA && unit <= _upperZ) upper++;
+    }
+    if (upper == 0) return input;
+
+    final out = List<int>.filled(units.length + upper, _underscore);
+    var j = 0;
+    for (final unit in units) {
+      if (unit >= _upperA && unit <= _upperZ) {
+        j++; // '_' is already there
+        out[j++] = unit + (_a - _upperA);
       } else {
-        result[snakeKey] = value;
+        out[j++] = unit;
       }
-    });
-    
-    return result;
+    }
+    return String.fromCharCodes(out);
   }
-  
+
+  static String _toCamel(String input) {
+    final parts = input.split('_');
+    final out = StringBuffer(parts.first);
+    for (final part in parts.skip(1)) {
+      if (part.isEmpty) continue;
+      out
+        ..write(part[0].toUpperCase())
+        ..write(part.substring(1));
+    }
+    return out.toString();
+  }
+
+  /// Recursively convert Map keys from camelCase to snake_case
+  static Map<String, dynamic> convertMapKeysToSnake(Map<String, dynamic> input, {KeyMap? keys}) {
+    return _convertMap(input, keys?.toSnake ?? camelToSnake);
+  }
+
   /// Recursively convert Map keys from snake_case to camelCase
-  static Map<String, dynamic> convertMapKeysToCamel(Map<String, dynamic> input) {
-    final result = <String, dynamic>{};
-    
-    input.forEach((key, value) {
-      final camelKey = snakeToCamel(key);
-      
-      if (value is Map<String, dynamic>) {
-        result[camelKey] = convertMapKeysToCamel(value);
-      } else if (value is List) {
-        result[camelKey] = value.map((item) {
-          if (item is Map<String, dynamic>) {
-            return convertMapKeysToCamel(item);
-          }
-          return item;
-        }).toList();
-      } else {
-        result[camelKey] = value;
+  static Map<String, dynamic> convertMapKeysToCamel(Map<String, dynamic> input, {KeyMap? keys}) {
+    return _convertMap(input, keys?.toCamel ?? snakeToCamel);
+  }
+
+  /// Copies [input] only from the first key or value that changes
+  static Map<String, dynamic> _convertMap(Map<String, dynamic> input, String Function(String) convert) {
+    Map<String, dynamic>? result;
+    var index = 0;
+    for (final entry in input.entries) {
+      final key = convert(entry.key);
+      final value = _convertValue(entry.value, convert);
+      if (result == null && (key != entry.key || !identical(value, entry.value))) {
+        result = <String, dynamic>{};
+        for (final previous in input.entries.take(index)) {
+          result[previous.key] = previous.value;
+        }
+      }
+      result?[key] = value;
+      index++;
+    }
+    return result ?? input;
+  }
+
+  static dynamic _convertValue(dynamic value, String Function(String) convert) {
+    if (value is Map<String, dynamic>) {
+      return _convertMap(value, convert);
+    } else if (value is List) {
+      return _convertList(value, convert);
+    }
+    return value;
+  }
+
+  /// Only maps inside lists are converted, as before
+  static List _convertList(List input, String Function(String) convert) {
+    List? result;
+    for (var i = 0; i < input.length; i++) {
+      final item = input[i];
+      final converted = item is Map<String, dynamic> ? _convertMap(item, convert) : item;
+      if (result == null && !identical(converted, item)) {
+        result = List<dynamic>.from(input.take(i));
       }
-    });
-    
-    return result;
+      result?.add(converted);
+    }
+    return result ?? input;
   }
-  
+
   /// Convert response data (outgoing to client)
   /// This ensures API responses use camelCase for Flutter clients
-  static dynamic convertResponseToCamelCase(dynamic data) {
+  static dynamic convertResponseToCamelCase(dynamic data, {KeyMap? keys}) {
+    final convert = keys?.toCamel ?? snakeToCamel;
     if (data is Map<String, dynamic>) {
-      return convertMapKeysToCamel(data);
+      return _convertMap(data, convert);
     } else if (data is List) {
-      return data.map((item) {
-        if (item is Map<String, dynamic>) {
-          return convertMapKeysToCamel(item);
-        }
-        return item;
-      }).toList();
+      return _convertList(data, convert);
     }
     return data;
   }
-  
+
   /// Convert request data (incoming from client)
   /// This allows Flutter clients to send camelCase but converts to snake_case for DB
-  static dynamic convertRequestToSnakeCase(dynamic data) {
+  static dynamic convertRequestToSnakeCase(dynamic data, {KeyMap? keys}) {
+    final convert = keys?.toSnake ?? camelToSnake;
     if (data is Map<String, dynamic>) {
-      return convertMapKeysToSnake(data);
+      return _convertMap(data, convert);
     } else if (data is List) {
-      return data.map((item) {
-        if (item is Map<String, dynamic>) {
-          return convertMapKeysToSnake(item);
-        }
-        return item;
-      }).toList();
+      return _convertList(data, convert);
     }
     return data;
   }
-}
\ No newline at end of file
+}
+
+/// Key names of one model in both cases, computed once
+///
+/// Keys outside the map fall back to the memoized [NamingConverter] lookups,
+/// so a KeyMap only has to list the keys a controller actually returns.
+class KeyMap {
+  KeyMap(Iterable<String> keys)
+      : _snake = {for (final key in keys) key: NamingConverter._toSnake(key)},
+        _camel = {
+          for (final key in keys) ...{
+            key: _camelOf(key),
+            NamingConverter._toSnake(key): _camelOf(key),
+          },
+        };
+
+  final Map<String, String> _snake;
+  final Map<String, String> _camel;
+
+  static String _camelOf(String key) => key.contains('_') ? NamingConverter._toCamel(key) : key;
+
+  String toSnake(String key) => _snake[key] ?? NamingConverter.camelToSnake(key);
+
+  String toCamel(String key) => _camel[key] ?? NamingConverter.snakeToCamel(key);
+}
@@ -0,0 +1,54 @@
+import 'dart:convert';
+
+/// Непрозрачный курсор keyset-пагинации.
+///
+/// Клиент получает его как pagination.nextCursor и без изменений передаёт
+/// в ?cursor=. Внутри — base64url от JSON с ключом последней строки
+/// страницы: {"id": 42} для /recipe, {"name": "Борщ", "id": 42} для поиска
+/// без текста, {"rank": 0.61, "id": 42} для поиска по релевантности и
+/// {"number": 3, "id": 42} для связей шагов (см. CollectionPage).
+class PageCursor {
+  PageCursor(this.values);
+
+  /// Границы ?limit= для всех постраничных списков
+  static const int minLimit = 1;
+  static const int maxLimit = 1000;
+  static const String limitError = 'limit must be between $minLimit and $maxLimit';
+
+  static bool isValidLimit(int limit) => limit >= minLimit && limit <= maxLimit;
+
+  final Map<String, dynamic> values;
+
+  int get id => values['id'] as int;
+  String get name => values['name'] as String;
+  double get rank => (values['rank'] as num).toDouble();
+  int get number => values['number'] as int;
+
+  String encode() => base64Url.encode(utf8.encode(json.encode(values))).replaceAll('=', '');
+
+  /// Разбирает курсор и проверяет, что в нём есть [keys]; иначе FormatException
+  static PageCursor decode(String cursor, {List<String> keys = const ['id']}) {
+    final padded = cursor.padRight((cursor.length + 3) ~/ 4 * 4, '=');
+    final Object? decoded;
+    try {
+      decoded = json.decode(utf8.decode(base64Url.decode(padded)));
+    } on FormatException {
+      throw const FormatException('Invalid cursor');
+    }
+    if (decoded is! Map<String, dynamic>) {
+      throw const FormatException('Invalid cursor');
+    }
+    for (final key in keys) {
+      final value = decoded[key];
+      final valid = key == 'id' || key == 'number'
+          ? value is int
+          : key == 'rank'
+              ? value is num
+              : value is String;
+      if (!valid) {
+        throw const FormatException('Invalid cursor');
+      }
+    }
+    return PageCursor(decoded);
+  }
+}
@@ -0,0 +1,300 @@
+import 'dart:async';
+import 'dart:collection';
+
+import 'package:conduit_core/conduit_core.dart';
+import 'package:conduit_postgresql/conduit_postgresql.dart';
+import 'package:postgres/postgres.dart';
+
+/// PostgreSQLPersistentStore с пулом соединений.
+///
+/// Обычный store держит одно соединение, и все запросы isolate стоят к нему
+/// в очереди. Здесь каждый вызов execute/executeQuery берёт свободное
+/// соединение из пула на время запроса (или ждёт, пока оно освободится).
+/// Контроллеры по-прежнему приводят context.persistentStore к
+/// PostgreSQLPersistentStore, поэтому store остаётся его наследником.
+///
+/// Несколько SQL-команд в одной транзакции выполняйте через [runTransaction]
+/// или [withConnection]: отдельные execute могут попасть на разные
+/// соединения. ManagedContext.transaction тоже берёт соединение из пула на
+/// всю транзакцию (см. [transaction]).
+///
+/// Сырой SQL из [execute] выполняется как именованный prepared statement:
+/// драйвер разбирает текст запроса один раз на соединение и дальше
+/// переиспользует его. Чтобы SQL, собранный из значений, не раздувал память
+/// сервера, на соединении готовится не больше [statementCacheSize] разных
+/// текстов, остальные выполняются без подготовки.
+class PooledPostgreSQLPersistentStore extends PostgreSQLPersistentStore {
+  PooledPostgreSQLPersistentStore(
+    String username,
+    String password,
+    String host,
+    int port,
+    String databaseName, {
+    this.poolSize = 4,
+    this.statementCacheSize = 200,
+    bool useSSL = false,
+  })  : assert(poolSize > 0),
+        super(username, password, host, port, databaseName, useSSL: useSSL);
+
+  /// Максимум соединений этого store (одного isolate)
+  final int poolSize;
+
+  /// Максимум prepared statements на одно соединение
+  final int statementCacheSize;
+
+  static final Object _leaseKey = Object();
+  static const Duration _defaultTimeout = Duration(seconds: 30);
+
+  /// Тексты SQL, подготовленные на соединении
+  final Expando<Set<String>> _prepared = Expando<Set<String>>();
+
+  final List<PostgreSQLConnection> _idle = [];
+  final Set<PostgreSQLConnection> _busy = {};
+  final Queue<Completer<PostgreSQLConnection>> _waiters = Queue();
+  int _opening = 0;
+  bool _closed = false;
+
+  // Метрики
+  int _acquired = 0;
+  int _waited = 0;
+  int _waitMicros = 0;
+  int _maxWaitMicros = 0;
+  int _statements = 0;
+  int _statementHits = 0;
+  int _unprepared = 0;
+
+  int get openConnections => _idle.length + _busy.length;
+
+  /// Состояние пула и кеша statements для /healthz
+  Map<String, dynamic> get stats {
+    final prepared = [..._idle, ..._busy].fold<int>(0, (sum, c) => sum + (_prepared[c]?.length ?? 0));
+    return {
+      'poolSize': poolSize,
+      'active': _busy.length,
+      'idle': _idle.length,
+      'waiting': _waiters.length,
+      'acquired': _acquired,
+      'waited': _waited,
+      'avgWaitMs': _acquired == 0 ? 0.0 : _waitMicros / _acquired / 1000,
+      'maxWaitMs': _maxWaitMicros / 1000,
+      'statements': {
+        'executed': _statements,
+        'hits': _statementHits,
+        'unprepared': _unprepared,
+        'prepared': prepared,
+        'hitRate': _statements == 0 ? 0.0 : _statementHits / _statements,
+      },
+    };
+  }
+
+  /// Выполняет [body] на одном соединении из пула
+  Future<T> withConnection<T>(Future<T> Function(PostgreSQLExecutionContext connection) body) {
+    return _leased(() async => body(await getDatabaseConnection()));
+  }
+
+  /// Выполняет [body] в транзакции на одном соединении из пула.
+  /// Исключение внутри [body] откатывает транзакцию и пробрасывается дальше.
+  Future<T> runTransaction<T>(Future<T> Function(PostgreSQLExecutionContext connection) body) {
+    return _leased(() async {
+      final connection = await getDatabaseConnection();
+      late T result;
+      await connection.transaction((tx) async {
+        result = await body(tx);
+      });
+      return result;
+    });
+  }
+
+  @override
+  Future<dynamic> execute(String sql, {Map<String, dynamic>? substitutionValues, Duration? timeout}) {
+    return _leased(() async {
+      final connection = await getDatabaseConnection();
+      try {
+        final results = await connection.query(
+          sql,
+          substitutionValues: substitutionValues,
+          allowReuse: _reuse(connection, sql),
+          timeoutInSeconds: (timeout ?? _defaultTimeout).inSeconds,
+        );
+        return results.map((row) => row.toList()).toList();
+      } on PostgreSQLException catch (e) {
+        // Драйвер не кеширует statement, который не удалось выполнить
+        _prepared[connection]?.remove(sql);
+        final interpreted = _interpretException(e);
+        if (interpreted != null) {
+          throw interpreted;
+        }
+        rethrow;
+      }
+    });
+  }
+
+  @override
+  Future<dynamic> executeQuery(String formatString, Map<String, dynamic>? values, int timeoutInSeconds,
+      {PersistentStoreQueryReturnType? returnType = PersistentStoreQueryReturnType.rows}) {
+    return _leased(() => super.executeQuery(formatString, values, timeoutInSeconds, returnType: returnType));
+  }
+
+  /// Транзакция ORM (ManagedContext.transaction) на соединении, взятом из
+  /// пула до её конца. Без этого унаследованная реализация получила бы от
+  /// [getDatabaseConnection] соединение, уже возвращённое в пул: другие
+  /// запросы вставали бы в очередь за транзакцией, а active/idle в /healthz
+  /// не учитывали бы её.
+  @override
+  Future<T?> transaction<T>(
+    ManagedContext transactionContext,
+    Future<T> Function(ManagedContext transaction) transactionBlock,
+  ) {
+    return _leased(() => super.transaction(transactionContext, transactionBlock));
+  }
+
+  @override
+  Future<PostgreSQLConnection> getDatabaseConnection() async {
+    final leased = Zone.current[_leaseKey];
+    if (leased is PostgreSQLConnection) {
+      return leased;
+    }
+    // Вызов вне execute и транзакций (например, миграции): соединение сразу
+    // возвращается в пул, драйвер сам поставит запросы в очередь этого
+    // соединения. Транзакции сюда не попадают — их держит [transaction]
+    final connection = await _acquire();
+    _release(connection);
+    return connection;
+  }
+
+  @override
+  Future close() async {
+    _closed = true;
+    while (_waiters.isNotEmpty) {
+      _waiters.removeFirst().completeError(StateError('Connection pool is closed'));
+    }
+    final connections = [..._idle, ..._busy];
+    _idle.clear();
+    _busy.clear();
+    await Future.wait(connections.map((c) => c.close()));
+    await super.close();
+  }
+
+  Future<T> _leased<T>(Future<T> Function() body) async {
+    if (Zone.current[_leaseKey] != null) {
+      return body();
+    }
+    final connection = await _acquire();
+    try {
+      return await runZoned(body, zoneValues: {_leaseKey: connection});
+    } finally {
+      _release(connection);
+    }
+  }
+
+  /// Готовить ли statement: уже подготовленный текст — попадание в кеш
+  bool _reuse(PostgreSQLConnection connection, String sql) {
+    _statements++;
+    final prepared = _prepared[connection] ??= <String>{};
+    if (prepared.contains(sql)) {
+      _statementHits++;
+      return true;
+    }
+    if (prepared.length < statementCacheSize) {
+      prepared.add(sql);
+      return true;
+    }
+    _unprepared++;
+    return false;
+  }
+
+  /// Те же исключения, что у PostgreSQLPersistentStore.execute
+  QueryException? _interpretException(PostgreSQLException exception) {
+    final column = exception.columnName ?? '';
+    switch (exception.code) {
+      case PostgreSQLErrorCode.uniqueViolation:
+        return QueryException.conflict('entity_already_exists', [column], underlyingException: exception);
+      case PostgreSQLErrorCode.notNullViolation:
+        return QueryException.input('non_null_violation', [column], underlyingException: exception);
+      case PostgreSQLErrorCode.foreignKeyViolation:
+        return QueryException.input('foreign_key_violation', [column], underlyingException: exception);
+    }
+    return null;
+  }
+
+  Future<PostgreSQLConnection> _acquire() async {
+    final stopwatch = Stopwatch()..start();
+    final connection = await _take();
+    final micros = stopwatch.elapsedMicroseconds;
+    _acquired++;
+    _waitMicros += micros;
+    if (micros > _maxWaitMicros) {
+      _maxWaitMicros = micros;
+    }
+    return connection;
+  }
+
+  Future<PostgreSQLConnection> _take() async {
+    if (_closed) {
+      throw StateError('Connection pool is closed');
+    }
+    while (_idle.isNotEmpty) {
+      final connection = _idle.removeLast();
+      if (!connection.isClosed) {
+        _busy.add(connection);
+        return connection;
+      }
+    }
+    if (_busy.length + _opening < poolSize) {
+      _opening++;
+      try {
+        final connection = await _open();
+        _busy.add(connection);
+        return connection;
+      } catch (e) {
+        // Никто не вернёт соединение в пул — ожидающие получат ту же ошибку
+        if (_busy.isEmpty) {
+          while (_waiters.isNotEmpty) {
+            _waiters.removeFirst().completeError(e);
+          }
+        }
+        rethrow;
+      } finally {
+        _opening--;
+      }
+    }
+    final waiter = Completer<PostgreSQLConnection>();
+    _waiters.add(waiter);
+    _waited++;
+    return waiter.future;
+  }
+
+  void _release(PostgreSQLConnection connection) {
+    if (!_busy.remove(connection) || _closed) {
+      return;
+    }
+    if (connection.isClosed) {
+      // Соединение оборвалось: ожидающий получит новое
+      if (_waiters.isNotEmpty) {
+        final waiter = _waiters.removeFirst();
+        _take().then(waiter.complete, onError: waiter.completeError);
+      }
+      return;
+    }
+    if (_waiters.isNotEmpty) {
+      _busy.add(connection);
+      _waiters.removeFirst().complete(connection);
+    } else {
+      _idle.add(connection);
+    }
+  }
+
+  Future<PostgreSQLConnection> _open() async {
+    final connection = PostgreSQLConnection(
+      host!,
+      port!,
+      databaseName!,
+      username: username,
+      password: password,
+      timeZone: timeZone,
+      useSSL: isSSLConnection,
+    );
+    await connection.open();
+    return connection;
+  }
+}
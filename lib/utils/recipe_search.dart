@@ -0,0 +1,168 @@
+import 'package:conduit_core/conduit_core.dart';
+
+import '../model/recipe.dart';
+import 'page_cursor.dart';
+
+/// Поиск рецептов для /recipe/search по индексам миграции 8.
+///
+/// С текстом запроса рецепт находится, если его search_vector (название,
+/// ингредиенты, шаги) совпадает с префиксным tsquery или название похоже
+/// на запрос по триграммам (опечатки). Выдача упорядочена по релевантности
+/// (rank, id); без текста — по (name, id), как раньше.
+///
+/// Фильтр по ингредиентам тоже считается в базе через индекс
+/// _recipeingredient(ingredient_id, recipe_id), поэтому страницы полные,
+/// а total учитывает фильтр.
+class RecipeSearch {
+  RecipeSearch(
+    this.context, {
+    String? text,
+    this.maxTime,
+    this.ingredientIds = const [],
+    this.ingredientNames = const [],
+    this.ingredientMode = 'any',
+  }) : text = text?.trim() ?? '';
+
+  /// any — хотя бы один из ингредиентов, all — все, none — ни одного
+  static const List<String> ingredientModes = ['any', 'all', 'none'];
+
+  final ManagedContext context;
+  final String text;
+  final int? maxTime;
+  final List<int> ingredientIds;
+
+  /// Части названий: "сыр" находит «Сыр твёрдый», "мароковь" — «Морковь»
+  final List<String> ingredientNames;
+  final String ingredientMode;
+
+  bool get ranked => text.isNotEmpty;
+
+  bool get filtered => ranked || maxTime != null || ingredientIds.isNotEmpty || ingredientNames.isNotEmpty;
+
+  /// Ключ для CountCache: одинаковые фильтры — одинаковый total
+  String get cacheKey => 'search|$text|$maxTime|$ingredientMode|${ingredientIds.join(',')}|${ingredientNames.join(',')}';
+
+  /// Ключи курсора, которые ожидает [fetch]
+  List<String> get cursorKeys => ranked ? const ['rank', 'id'] : const ['name', 'id'];
+
+  static final RegExp _word = RegExp(r'[\p{L}\p{N}]+', unicode: true);
+
+  /// "Борщ, укр" → "борщ:* & укр:*". Всё, кроме букв и цифр, отбрасывается,
+  /// поэтому пользовательский ввод не может сломать синтаксис tsquery.
+  static String prefixQuery(String text) {
+    return _word.allMatches(text.toLowerCase()).map((m) => '${m.group(0)}:*').join(' & ');
+  }
+
+  String get _rank => ranked
+      ? "(coalesce(ts_rank(r.search_vector, to_tsquery('russian', @tsquery)), 0) "
+          "+ similarity(r.name, CAST(@text AS text)))::float8"
+      : "0::float8";
+
+  List<String> _conditions(Map<String, dynamic> values) {
+    final conditions = <String>[];
+    if (ranked) {
+      values['tsquery'] = prefixQuery(text);
+      values['text'] = text;
+      conditions.add("(r.search_vector @@ to_tsquery('russian', @tsquery) OR r.name % CAST(@text AS text))");
+    }
+    if (maxTime != null) {
+      values['maxTime'] = maxTime;
+      conditions.add("r.duration <= CAST(@maxTime AS int4)");
+    }
+
+    // Каждое условие выбирает строки _recipeingredient одного ингредиента
+    // (или ингредиентов, подходящих под часть названия)
+    final matches = <String>[];
+    for (var i = 0; i < ingredientIds.length; i++) {
+      values['ingredientId$i'] = ingredientIds[i];
+      matches.add("ri.ingredient_id = CAST(@ingredientId$i AS int8)");
+    }
+    for (var i = 0; i < ingredientNames.length; i++) {
+      values['ingredientName$i'] = ingredientNames[i];
+      values['ingredientPattern$i'] = '%${escapeLike(ingredientNames[i])}%';
+      matches.add("ri.ingredient_id IN (SELECT i.id FROM _ingredient i "
+          "WHERE i.name ILIKE CAST(@ingredientPattern$i AS text) OR i.name % CAST(@ingredientName$i AS text))");
+    }
+    if (matches.isNotEmpty) {
+      if (ingredientMode == 'all') {
+        for (final match in matches) {
+          conditions.add("r.id IN (SELECT ri.recipe_id FROM _recipeingredient ri WHERE $match)");
+        }
+      } else if (ingredientMode == 'none') {
+        // NOT EXISTS, а не NOT IN: recipe_id в связях бывает NULL
+        conditions.add("NOT EXISTS (SELECT 1 FROM _recipeingredient ri "
+            "WHERE ri.recipe_id = r.id AND (${matches.join(' OR ')}))");
+      } else {
+        conditions.add("r.id IN (SELECT ri.recipe_id FROM _recipeingredient ri WHERE ${matches.join(' OR ')})");
+      }
+    }
+    return conditions;
+  }
+
+  /// Экранирует %, _ и \ для ILIKE
+  static String escapeLike(String value) =>
+      value.replaceAll(r'\', r'\\').replaceAll('%', r'\%').replaceAll('_', r'\_');
+
+  static String _where(List<String> conditions) =>
+      conditions.isEmpty ? '' : 'WHERE ${conditions.join(' AND ')}';
+
+  /// Страница результатов: [limit] строк после [after] или со сдвигом [offset]
+  Future<List<RecipeSearchHit>> fetch({required int limit, int offset = 0, PageCursor? after}) async {
+    final values = <String, dynamic>{'limit': limit, 'offset': offset};
+    final conditions = _conditions(values);
+    final String sql;
+    if (ranked) {
+      // rank нельзя сравнивать в WHERE того же SELECT, поэтому подзапрос
+      var keyset = '';
+      if (after != null) {
+        values['cursorRank'] = after.rank;
+        values['cursorId'] = after.id;
+        keyset = 'WHERE (rank < CAST(@cursorRank AS float8) '
+            'OR (rank = CAST(@cursorRank AS float8) AND id > CAST(@cursorId AS int8)))';
+      }
+      sql = "SELECT id, name, duration, photo, rank FROM ("
+          "SELECT r.id, r.name, r.duration, r.photo, $_rank AS rank FROM _recipe r ${_where(conditions)}"
+          ") hits $keyset ORDER BY rank DESC, id LIMIT @limit OFFSET @offset";
+    } else {
+      if (after != null) {
+        values['cursorName'] = after.name;
+        values['cursorId'] = after.id;
+        conditions.add("(r.name, r.id) > (CAST(@cursorName AS text), CAST(@cursorId AS int8))");
+      }
+      sql = "SELECT r.id, r.name, r.duration, r.photo, $_rank FROM _recipe r ${_where(conditions)} "
+          "ORDER BY r.name, r.id LIMIT @limit OFFSET @offset";
+    }
+
+    final rows = await context.persistentStore.execute(sql, substitutionValues: values) as List<List<dynamic>>;
+    return rows.map((row) {
+      final recipe = Recipe()
+        ..id = row[0] as int
+        ..name = row[1] as String?
+        ..duration = row[2] as int?
+        ..photo = row[3] as String?;
+      return RecipeSearchHit(recipe, (row[4] as num).toDouble(), ranked: ranked);
+    }).toList();
+  }
+
+  /// Число рецептов под фильтр без учёта страницы
+  Future<int> count() async {
+    final values = <String, dynamic>{};
+    final conditions = _conditions(values);
+    final rows = await context.persistentStore.execute(
+      "SELECT count(*) FROM _recipe r ${_where(conditions)}",
+      substitutionValues: values,
+    ) as List<List<dynamic>>;
+    return rows.first.first as int;
+  }
+}
+
+class RecipeSearchHit {
+  RecipeSearchHit(this.recipe, this.rank, {required this.ranked});
+
+  final Recipe recipe;
+  final double rank;
+  final bool ranked;
+
+  PageCursor get cursor => PageCursor(
+      ranked ? {'rank': rank, 'id': recipe.id} : {'name': recipe.name, 'id': recipe.id});
+}
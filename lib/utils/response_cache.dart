@@ -0,0 +1,221 @@
+import 'dart:collection';
+import 'dart:convert';
+import 'dart:io';
+
+import 'package:conduit_core/conduit_core.dart';
+
+/// Кеш готовых JSON-ответов GET с weak ETag и ответом 304.
+///
+/// Ключ — путь с query-строкой, значение — уже закодированное тело, так что
+/// повторный просмотр рецепта не обращается к базе и не сериализует граф
+/// объектов заново. Ограничен суммарным размером тел (вытесняется давно не
+/// использованный ответ) и временем жизни записи — на случай записей в базу
+/// в обход API.
+///
+/// Каждый ответ помечен тегами ([recipes], [recipeTag], [ingredients], ...);
+/// запись, меняющая данные, сбрасывает свои теги через [invalidate]. Кеш
+/// живёт в одном isolate; об инвалидациях в других isolate сообщает
+/// [onInvalidated] (канал рассылает их через messageHub).
+class ResponseCache {
+  ResponseCache({
+    this.maxBytes = 64 * 1024 * 1024,
+    this.ttl = const Duration(minutes: 5),
+    DateTime Function()? clock,
+  }) : _clock = clock ?? DateTime.now;
+
+  /// Списки рецептов (GET /recipe)
+  static const String recipes = 'recipes';
+
+  /// Данные существующих ингредиентов и единиц измерения: видны и в
+  /// справочниках, и в GET /recipe/{id}, поэтому сбрасываются только при
+  /// изменении и удалении
+  static const String ingredients = 'ingredients';
+  static const String measureUnits = 'measureUnits';
+
+  /// Состав списков GET /ingredient и GET /measure_unit: новая строка не
+  /// меняет ни один рецепт, и создание сбрасывает только эти теги
+  static const String ingredientList = 'ingredientList';
+  static const String measureUnitList = 'measureUnitList';
+
+  /// Названия шагов видны в GET /recipe/{id}
+  static const String steps = 'steps';
+
+  /// Один рецепт (GET /recipe/{id}) со всеми шагами, ингредиентами и комментариями
+  static String recipeTag(int id) => 'recipe:$id';
+
+  final int maxBytes;
+  final Duration ttl;
+  final DateTime Function() _clock;
+
+  /// Вызывается при локальной инвалидации (не при рассылке из других isolate)
+  void Function(List<String> tags)? onInvalidated;
+
+  final LinkedHashMap<String, _CachedResponse> _entries = LinkedHashMap<String, _CachedResponse>();
+  final Map<String, Set<String>> _keysByTag = {};
+
+  int _generation = 0;
+  int _bytes = 0;
+  int hits = 0;
+  int misses = 0;
+  int notModified = 0;
+  int bytesSaved = 0;
+  int evictions = 0;
+  int invalidations = 0;
+
+  /// Ответ на GET [request]: из кеша или от [build], с заголовком ETag.
+  /// Если If-None-Match совпадает с ETag — 304 без тела. Кешируются только
+  /// ответы 200.
+  Future<Response> respond(Request request, List<String> tags, Future<Response> Function() build) async {
+    final key = request.raw.uri.toString();
+    var entry = _lookup(key);
+    if (entry == null) {
+      misses++;
+      final generation = _generation;
+      final response = await build();
+      if (response.statusCode != 200 || response.body == null) {
+        return response;
+      }
+      final body = utf8.encode(json.encode(response.body, toEncodable: _toEncodable));
+      entry = _CachedResponse(body, _etag(body), tags, _clock().add(ttl));
+      // Инвалидация во время build: ответ мог уже устареть
+      if (generation == _generation) {
+        _store(key, entry);
+      }
+    } else {
+      hits++;
+    }
+
+    if (_matches(request.raw.headers.value(HttpHeaders.ifNoneMatchHeader), entry.etag)) {
+      notModified++;
+      bytesSaved += entry.body.length;
+      return Response(HttpStatus.notModified, {HttpHeaders.etagHeader: entry.etag}, null);
+    }
+    return Response.ok(entry.body, headers: {HttpHeaders.etagHeader: entry.etag})
+      ..contentType = ContentType.json
+      ..encodeBody = false;
+  }
+
+  /// Сбрасывает все ответы с любым из [tags]
+  void invalidate(List<String> tags, {bool broadcast = true}) {
+    _generation++;
+    invalidations++;
+    for (final tag in tags) {
+      final keys = _keysByTag.remove(tag);
+      if (keys == null) {
+        continue;
+      }
+      for (final key in keys.toList()) {
+        _remove(key);
+      }
+    }
+    if (broadcast) {
+      onInvalidated?.call(tags);
+    }
+  }
+
+  /// Сбрасывает GET /recipe/{id} для каждого из [ids] (null пропускаются)
+  void invalidateRecipes(Iterable<int?> ids) {
+    final tags = ids.whereType<int>().toSet().map(recipeTag).toList();
+    if (tags.isNotEmpty) {
+      invalidate(tags);
+    }
+  }
+
+  Map<String, dynamic> get stats {
+    final lookups = hits + misses;
+    return {
+      'size': _entries.length,
+      'bytes': _bytes,
+      'hits': hits,
+      'misses': misses,
+      'hitRatio': lookups == 0 ? 0.0 : hits / lookups,
+      'notModified': notModified,
+      'bytesSaved': bytesSaved,
+      'evictions': evictions,
+      'invalidations': invalidations,
+    };
+  }
+
+  _CachedResponse? _lookup(String key) {
+    final entry = _entries[key];
+    if (entry == null) {
+      return null;
+    }
+    if (!entry.expiresAt.isAfter(_clock())) {
+      _remove(key);
+      return null;
+    }
+    // Переставляем в конец: LinkedHashMap хранит порядок использования
+    _entries.remove(key);
+    _entries[key] = entry;
+    return entry;
+  }
+
+  void _store(String key, _CachedResponse entry) {
+    if (entry.body.length > maxBytes) {
+      return;
+    }
+    _remove(key);
+    _entries[key] = entry;
+    _bytes += entry.body.length;
+    for (final tag in entry.tags) {
+      _keysByTag.putIfAbsent(tag, () => <String>{}).add(key);
+    }
+    while (_bytes > maxBytes) {
+      _remove(_entries.keys.first);
+      evictions++;
+    }
+  }
+
+  void _remove(String key) {
+    final entry = _entries.remove(key);
+    if (entry == null) {
+      return;
+    }
+    _bytes -= entry.body.length;
+    for (final tag in entry.tags) {
+      final keys = _keysByTag[tag];
+      keys?.remove(key);
+      if (keys != null && keys.isEmpty) {
+        _keysByTag.remove(tag);
+      }
+    }
+  }
+
+  static Object? _toEncodable(Object? value) {
+    if (value is Serializable) {
+      return value.asMap();
+    }
+    if (value is DateTime) {
+      return value.toIso8601String();
+    }
+    throw UnsupportedError('Cannot encode ${value.runtimeType} in a cached response');
+  }
+
+  /// W/"<длина>-<FNV-1a>": сравнение слабое, побайтное совпадение не обещаем
+  static String _etag(List<int> body) {
+    var hash = 0x811c9dc5;
+    for (final byte in body) {
+      hash = ((hash ^ byte) * 0x01000193) & 0xffffffff;
+    }
+    return 'W/"${body.length.toRadixString(16)}-${hash.toRadixString(16)}"';
+  }
+
+  static bool _matches(String? ifNoneMatch, String etag) {
+    if (ifNoneMatch == null) {
+      return false;
+    }
+    final opaque = etag.substring(2);
+    return ifNoneMatch.split(',').map((tag) => tag.trim()).any((tag) =>
+        tag == '*' || (tag.startsWith('W/') ? tag.substring(2) : tag) == opaque);
+  }
+}
+
+class _CachedResponse {
+  _CachedResponse(this.body, this.etag, this.tags, this.expiresAt);
+
+  final List<int> body;
+  final String etag;
+  final List<String> tags;
+  final DateTime expiresAt;
+}
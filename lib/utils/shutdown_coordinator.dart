@@ -0,0 +1,73 @@
+import 'dart:async';
+import 'dart:io';
+import 'dart:isolate';
+
+/// Плавная остановка сервера из главного isolate.
+///
+/// Каждый FoodapiChannel регистрирует у координатора свой SendPort (см.
+/// DrainController). По SIGTERM/SIGINT координатор рассылает команду drain,
+/// ждёт ответа от всех isolate (или [timeout]) и только после этого
+/// вызывает остановку приложения. Повторный сигнал завершает процесс сразу.
+class ShutdownCoordinator {
+  ShutdownCoordinator() {
+    _port.listen(_onMessage);
+  }
+
+  static const String registerMessage = 'register';
+  static const String drainedMessage = 'drained';
+  static const String drainCommand = 'drain';
+
+  final ReceivePort _port = ReceivePort();
+  final List<SendPort> _isolates = [];
+  final Completer<void> _allDrained = Completer<void>();
+  int _drained = 0;
+  bool _stopping = false;
+
+  /// Передаётся в isolate через ApplicationOptions.context
+  SendPort get sendPort => _port.sendPort;
+
+  void _onMessage(dynamic message) {
+    if (message is! List || message.length != 2) {
+      return;
+    }
+    if (message[0] == registerMessage && message[1] is SendPort) {
+      _isolates.add(message[1] as SendPort);
+    } else if (message[0] == drainedMessage) {
+      _drained++;
+      if (_drained >= _isolates.length && !_allDrained.isCompleted) {
+        _allDrained.complete();
+      }
+    }
+  }
+
+  /// Просит все isolate перестать принимать соединения и дождаться текущих запросов
+  Future<void> drain(Duration timeout) async {
+    if (_isolates.isEmpty && !_allDrained.isCompleted) {
+      _allDrained.complete();
+    }
+    for (final port in _isolates) {
+      port.send(drainCommand);
+    }
+    await _allDrained.future.timeout(timeout, onTimeout: () {
+      print('Drain timed out after ${timeout.inSeconds}s: $_drained of ${_isolates.length} isolate(s) finished');
+    });
+  }
+
+  /// Подписывается на SIGTERM и SIGINT; [onStop] вызывается после drain
+  void listen(Future<void> Function() onStop, {required Duration timeout}) {
+    final signals = [ProcessSignal.sigint, if (!Platform.isWindows) ProcessSignal.sigterm];
+    for (final signal in signals) {
+      signal.watch().listen((received) async {
+        if (_stopping) {
+          exit(1);
+        }
+        _stopping = true;
+        print('Received $received, draining ${_isolates.length} isolate(s)...');
+        await drain(timeout);
+        await onStop();
+        _port.close();
+        exit(0);
+      });
+    }
+  }
+}
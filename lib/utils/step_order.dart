@@ -0,0 +1,123 @@
+/// Перенумерация шагов рецепта (_recipesteplink.number) без обращения к базе.
+///
+/// Получает текущие номера связей рецепта и возвращает только изменившиеся
+/// номера {linkId: number}, чтобы контроллер записал их одним UPDATE.
+/// Номера не обязаны идти подряд: при нумерации с шагом (gap = 10 даёт
+/// 10, 20, 30, ...) перенос шага почти всегда меняет одну строку — новый
+/// номер берётся посередине между соседями.
+class StepOrder {
+  /// [numbers] — {linkId: number} всех связей рецепта
+  StepOrder(Map<int, int> numbers)
+      : _numbers = Map<int, int>.from(numbers),
+        _order = numbers.keys.toList()
+          ..sort((a, b) {
+            final byNumber = numbers[a]!.compareTo(numbers[b]!);
+            return byNumber != 0 ? byNumber : a.compareTo(b);
+          });
+
+  final Map<int, int> _numbers;
+  final List<int> _order;
+
+  /// Связи в текущем порядке шагов
+  List<int> get order => List.unmodifiable(_order);
+
+  bool contains(int linkId) => _numbers.containsKey(linkId);
+
+  /// Явные номера из stepOrders. Связи, которых нет в [assigned], сохраняют
+  /// свои номера; итоговые номера рецепта не должны повторяться.
+  Map<int, int> assign(Map<int, int> assigned) {
+    final result = Map<int, int>.from(_numbers)..addAll(assigned);
+    final seen = <int, int>{};
+    for (final entry in result.entries) {
+      final other = seen[entry.value];
+      if (other != null) {
+        throw StepOrderException('Links $other and ${entry.key} would both have number ${entry.value}');
+      }
+      seen[entry.value] = entry.key;
+    }
+    return _changed(result);
+  }
+
+  /// Переносит [linkId] перед [before] или после [after] (ровно одно из двух).
+  ///
+  /// Если между новыми соседями есть свободный номер, меняется только
+  /// [linkId]. Иначе при [gap] > 1 весь рецепт перенумеровывается с шагом
+  /// [gap], а без него сдвигается минимальный непрерывный участок — вперёд
+  /// или назад, где строк меньше.
+  Map<int, int> move(int linkId, {int? before, int? after, int gap = 1}) {
+    if ((before == null) == (after == null)) {
+      throw StepOrderException('Exactly one of before/after is required');
+    }
+    final anchor = before ?? after!;
+    for (final id in [linkId, anchor]) {
+      if (!contains(id)) {
+        throw StepOrderException('Link $id does not belong to the recipe');
+      }
+    }
+    if (anchor == linkId) {
+      throw StepOrderException('Cannot move a link relative to itself');
+    }
+    final order = List<int>.from(_order)..remove(linkId);
+    final index = order.indexOf(anchor) + (after != null ? 1 : 0);
+    order.insert(index, linkId);
+
+    final lower = index > 0 ? _numbers[order[index - 1]]! : 0;
+    final upper = index + 1 < order.length ? _numbers[order[index + 1]] : null;
+    final current = _numbers[linkId]!;
+    if (current > lower && (upper == null || current < upper)) {
+      return {};
+    }
+    if (upper == null) {
+      return {linkId: lower + gap};
+    }
+    if (upper - lower > 1) {
+      return {linkId: lower + (upper - lower) ~/ 2};
+    }
+    if (gap > 1) {
+      return _changed(_spaced(order, gap));
+    }
+
+    final forward = <int, int>{linkId: lower + 1};
+    var previous = lower + 1;
+    for (var i = index + 1; i < order.length; i++) {
+      final number = _numbers[order[i]]!;
+      if (number > previous) {
+        break;
+      }
+      previous++;
+      forward[order[i]] = previous;
+    }
+
+    final backward = <int, int>{linkId: upper - 1};
+    var next = upper - 1;
+    for (var i = index - 1; i >= 0; i--) {
+      final number = _numbers[order[i]]!;
+      if (number < next) {
+        break;
+      }
+      next--;
+      backward[order[i]] = next;
+    }
+    return next >= 0 && backward.length < forward.length ? backward : forward;
+  }
+
+  /// Номера gap, 2 * gap, ... в текущем порядке
+  Map<int, int> respace({int gap = 1}) => _changed(_spaced(_order, gap));
+
+  static Map<int, int> _spaced(List<int> order, int gap) =>
+      {for (var i = 0; i < order.length; i++) order[i]: (i + 1) * gap};
+
+  Map<int, int> _changed(Map<int, int> numbers) => {
+        for (final entry in numbers.entries)
+          if (_numbers[entry.key] != entry.value) entry.key: entry.value,
+      };
+}
+
+class StepOrderException implements Exception {
+  StepOrderException(this.message);
+
+  final String message;
+
+  @override
+  String toString() => 'StepOrderException: $message';
+}
@@ -0,0 +1,154 @@
+import 'dart:collection';
+
+/// Кеш bearer-токен → пользователь для AuthMiddleware.
+///
+/// Ограничен по числу записей (вытесняется давно не использованный токен)
+/// и по времени жизни записи. Неизвестные токены тоже кешируются (value ==
+/// null) с более коротким TTL, чтобы поток запросов с протухшим токеном из
+/// мобильного клиента не ходил в базу на каждый запрос.
+///
+/// Кеш живёт в одном isolate; об инвалидациях в других isolate сообщает
+/// [onUserInvalidated] (канал рассылает их через messageHub).
+class TokenCache<V> {
+  TokenCache({
+    this.maxEntries = 10000,
+    this.ttl = const Duration(seconds: 60),
+    this.negativeTtl = const Duration(seconds: 10),
+    DateTime Function()? clock,
+  }) : _clock = clock ?? DateTime.now;
+
+  final int maxEntries;
+  final Duration ttl;
+  final Duration negativeTtl;
+  final DateTime Function() _clock;
+
+  /// Вызывается при локальной инвалидации пользователя (не при рассылке из других isolate)
+  void Function(int userId)? onUserInvalidated;
+
+  final LinkedHashMap<String, CachedToken<V>> _entries = LinkedHashMap<String, CachedToken<V>>();
+  final Map<int, Set<String>> _tokensByUser = {};
+
+  int _generation = 0;
+  int hits = 0;
+  int negativeHits = 0;
+  int misses = 0;
+  int evictions = 0;
+  int invalidations = 0;
+
+  /// Номер поколения: увеличивается при каждой инвалидации. Запрос к базе,
+  /// начатый до инвалидации, не должен записать в кеш устаревший результат.
+  int get generation => _generation;
+
+  int get length => _entries.length;
+
+  /// Запись из кеша или null, если токена нет или запись устарела.
+  /// У найденной записи value == null означает «токен неизвестен».
+  CachedToken<V>? lookup(String token) {
+    final entry = _entries.remove(token);
+    if (entry == null || !entry.expiresAt.isAfter(_clock())) {
+      if (entry != null) {
+        _unindex(token, entry.userId);
+      }
+      misses++;
+      return null;
+    }
+    // Переставляем в конец: LinkedHashMap хранит порядок использования
+    _entries[token] = entry;
+    if (entry.value == null) {
+      negativeHits++;
+    } else {
+      hits++;
+    }
+    return entry;
+  }
+
+  /// Сохраняет результат поиска токена. [generation] — значение [generation]
+  /// до запроса к базе; если с тех пор была инвалидация, результат не кешируется.
+  void put(String token, V? value, {int? userId, int? generation}) {
+    if (generation != null && generation != _generation) {
+      return;
+    }
+    final old = _entries.remove(token);
+    if (old != null) {
+      _unindex(token, old.userId);
+    }
+    final expiresAt = _clock().add(value == null ? negativeTtl : ttl);
+    _entries[token] = CachedToken<V>(value, userId, expiresAt);
+    if (userId != null) {
+      _tokensByUser.putIfAbsent(userId, () => <String>{}).add(token);
+    }
+    while (_entries.length > maxEntries) {
+      final oldest = _entries.keys.first;
+      final evicted = _entries.remove(oldest)!;
+      _unindex(oldest, evicted.userId);
+      evictions++;
+    }
+  }
+
+  /// Удаляет запись токена (в том числе отрицательную)
+  void invalidateToken(String token) {
+    _generation++;
+    final entry = _entries.remove(token);
+    if (entry != null) {
+      _unindex(token, entry.userId);
+      invalidations++;
+    }
+  }
+
+  /// Удаляет все токены пользователя: новый токен при входе, выход, смена профиля
+  void invalidateUser(int userId, {bool broadcast = true}) {
+    _generation++;
+    final tokens = _tokensByUser.remove(userId);
+    if (tokens != null) {
+      for (final token in tokens) {
+        if (_entries.remove(token) != null) {
+          invalidations++;
+        }
+      }
+    }
+    if (broadcast) {
+      onUserInvalidated?.call(userId);
+    }
+  }
+
+  void clear() {
+    _generation++;
+    _entries.clear();
+    _tokensByUser.clear();
+  }
+
+  Map<String, dynamic> get stats {
+    final lookups = hits + negativeHits + misses;
+    return {
+      'size': _entries.length,
+      'maxEntries': maxEntries,
+      'hits': hits,
+      'negativeHits': negativeHits,
+      'misses': misses,
+      'evictions': evictions,
+      'invalidations': invalidations,
+      'hitRatio': lookups == 0 ? 0.0 : (hits + negativeHits) / lookups,
+    };
+  }
+
+  void _unindex(String token, int? userId) {
+    if (userId == null) {
+      return;
+    }
+    final tokens = _tokensByUser[userId];
+    if (tokens != null) {
+      tokens.remove(token);
+      if (tokens.isEmpty) {
+        _tokensByUser.remove(userId);
+      }
+    }
+  }
+}
+
+class CachedToken<V> {
+  CachedToken(this.value, this.userId, this.expiresAt);
+
+  final V? value;
+  final int? userId;
+  final DateTime expiresAt;
+}
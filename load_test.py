@@ -0,0 +1,347 @@
+#!/usr/bin/env python3
+"""
+Нагрузочный тест Food API.
+
+Сценарии повторяют функциональные проверки из test_*_api.py и
+scripts/demo_recipe_flow.sh и выбираются случайно с заданными весами:
+
+    browse    GET /recipe?page=N
+    detail    GET /recipe/{id}
+    search    GET /recipe/search?q=...
+    comment   POST /user/comments
+    favorite  POST/DELETE /user/favorites/{id} (переключение)
+
+Нагрузка задаётся либо числом виртуальных пользователей (--users, каждый
+выполняет сценарии друг за другом), либо целевым RPS (--rps, сценарии
+запускаются по расписанию независимо от ответов). По каждому эндпоинту
+печатаются p50/p95/p99 и доля ошибок; --output сохраняет результат в JSON,
+--baseline сравнивает его с прошлым прогоном и завершается с кодом 1, если
+задержка или доля ошибок выросли больше порога.
+
+Пример (docker-compose поднимает API на localhost:8888):
+    python3 load_test.py http://localhost:8888 --users 50 --duration 60 -o run.json
+    python3 load_test.py http://localhost:8888 --rps 300 --duration 60 --baseline run.json
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import random
+import sys
+import time
+import uuid
+
+try:
+    import aiohttp
+except ImportError:  # нужен только для самой нагрузки
+    aiohttp = None
+
+from foodapi_client import DEFAULT_BASE_URL, FoodApiClient
+
+DEFAULT_MIX = {'browse': 40, 'detail': 30, 'search': 15, 'comment': 5, 'favorite': 10}
+DEFAULT_DURATION = 30
+DEFAULT_WARMUP = 5
+DEFAULT_CONNECTIONS = 100
+DEFAULT_THRESHOLD = 20.0   # % роста p95/p99, считающийся регрессией
+PAGE_LIMIT = 20
+SAMPLE_PAGES = 5
+REQUEST_TIMEOUT = 30
+
+
+def parse_mix(value):
+    """'browse=50,detail=30' → {'browse': 50, 'detail': 30}"""
+    mix = {}
+    for part in value.split(','):
+        name, _, weight = part.partition('=')
+        name = name.strip()
+        if name not in DEFAULT_MIX:
+            raise argparse.ArgumentTypeError(f"неизвестный сценарий {name!r}; есть: {', '.join(DEFAULT_MIX)}")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return None
+    rank = math.ceil(p / 100 * len(sorted_values))
+    return sorted_values[min(len(sorted_values), max(rank, 1)) - 1]
+
+
+class EndpointStats:
+    __slots__ = ('latencies', 'errors', 'statuses')
+
+    def __init__(self):
+        self.latencies = []
+        self.errors = 0
+        self.statuses = {}
+
+    def summary(self, elapsed):
+        values = sorted(self.latencies)
+        count = len(values)
+        return {
+            'count': count,
+            'rps': round(count / elapsed, 2) if elapsed else 0,
+            'errors': self.errors,
+            'errorRate': round(self.errors / count, 4) if count else 0,
+            'p50': _ms(percentile(values, 50)),
+            'p95': _ms(percentile(values, 95)),
+            'p99': _ms(percentile(values, 99)),
+            'max': _ms(values[-1] if values else None),
+            'statuses': dict(sorted(self.statuses.items())),
+        }
+
+
+def _ms(seconds):
+    return round(seconds * 1000, 2) if seconds is not None else None
+
+
+class LoadStats:
+    def __init__(self):
+        self.endpoints = {}
+        self.recording = False
+        self.started = None
+        self.stopped = None
+        self.dropped = 0
+
+    def start_recording(self):
+        self.recording = True
+        self.started = time.perf_counter()
+
+    def stop_recording(self):
+        self.recording = False
+        self.stopped = time.perf_counter()
+
+    def record(self, endpoint, latency, status):
+        if not self.recording:
+            return
+        stats = self.endpoints.get(endpoint)
+        if stats is None:
+            stats = self.endpoints[endpoint] = EndpointStats()
+        stats.latencies.append(latency)
+        stats.statuses[str(status)] = stats.statuses.get(str(status), 0) + 1
+        if status == 'error' or status >= 400:
+            stats.errors += 1
+
+    def report(self, params):
+        elapsed = (self.stopped or time.perf_counter()) - (self.started or time.perf_counter())
+        endpoints = {name: s.summary(elapsed) for name, s in sorted(self.endpoints.items())}
+        total = sum(e['count'] for e in endpoints.values())
+        errors = sum(e['errors'] for e in endpoints.values())
+        return {
+            'params': params,
+            'elapsed': round(elapsed, 2),
+            'total': {'count': total, 'rps': round(total / elapsed, 2) if elapsed else 0,
+                      'errors': errors, 'errorRate': round(errors / total, 4) if total else 0,
+                      'dropped': self.dropped},
+            'endpoints': endpoints,
+        }
+
+
+class Scenarios:
+    """Сценарии нагрузки; данные для них собираются заранее в prepare()"""
+
+    def __init__(self, session, base_url, stats, rng):
+        self.session = session
+        self.base_url = base_url
+        self.stats = stats
+        self.rng = rng
+        self.recipe_ids = []
+        self.search_terms = []
+        self.total_pages = 1
+        self.token = None
+        self.favorites = set()
+
+    def prepare(self, api: FoodApiClient, with_user: bool):
+        first = api.recipes(page=1, limit=PAGE_LIMIT)
+        self.total_pages = max(1, (first.pagination.total_pages if first.pagination else None) or 1)
+        recipes = list(first.data)
+        for page in range(2, min(self.total_pages, SAMPLE_PAGES) + 1):
+            recipes.extend(api.recipes(page=page, limit=PAGE_LIMIT).data)
+        self.recipe_ids = [r.id for r in recipes]
+        self.search_terms = sorted({word.lower() for r in recipes for word in (r.name or '').split()
+                                    if len(word) >= 3})
+        if with_user:
+            login = f"load_{uuid.uuid4().hex[:12]}@example.com"
+            api.register(login, 'load-test')
+            self.token = api.authenticate(login, 'load-test')
+
+    async def call(self, endpoint, method, path, auth=False, **kwargs):
+        if auth:
+            kwargs['headers'] = {'Authorization': f"Bearer {self.token}"}
+        started = time.perf_counter()
+        try:
+            async with self.session.request(method, f"{self.base_url}{path}", **kwargs) as r:
+                await r.read()
+                status = r.status
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            status = 'error'
+        self.stats.record(endpoint, time.perf_counter() - started, status)
+
+    async def browse(self):
+        page = self.rng.randint(1, self.total_pages)
+        await self.call('GET /recipe', 'GET', '/recipe', params={'page': page, 'limit': PAGE_LIMIT})
+
+    async def detail(self):
+        await self.call('GET /recipe/{id}', 'GET', f"/recipe/{self.rng.choice(self.recipe_ids)}")
+
+    async def search(self):
+        q = self.rng.choice(self.search_terms) if self.search_terms else 'суп'
+        await self.call('GET /recipe/search', 'GET', '/recipe/search', params={'q': q, 'limit': PAGE_LIMIT})
+
+    async def comment(self):
+        await self.call('POST /user/comments', 'POST', '/user/comments',
+                        auth=True, json={'recipeId': self.rng.choice(self.recipe_ids), 'text': 'load test'})
+
+    async def favorite(self):
+        recipe_id = self.rng.choice(self.recipe_ids)
+        # Состояние меняется до запроса, чтобы параллельные сценарии не добавили рецепт дважды
+        if recipe_id in self.favorites:
+            self.favorites.discard(recipe_id)
+            await self.call('DELETE /user/favorites/{id}', 'DELETE', f"/user/favorites/{recipe_id}", auth=True)
+        else:
+            self.favorites.add(recipe_id)
+            await self.call('POST /user/favorites/{id}', 'POST', f"/user/favorites/{recipe_id}", auth=True)
+
+
+async def run_users(scenarios, pick, users, deadline, think_time):
+    async def user():
+        while time.perf_counter() < deadline:
+            await getattr(scenarios, pick())()
+            if think_time:
+                await asyncio.sleep(think_time)
+
+    await asyncio.gather(*(user() for _ in range(users)))
+
+
+async def run_rps(scenarios, pick, rps, deadline, max_in_flight, stats):
+    """Открытая модель: сценарии стартуют по расписанию, не дожидаясь ответов"""
+    interval = 1 / rps
+    in_flight = set()
+    next_start = time.perf_counter()
+    while next_start < deadline:
+        delay = next_start - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if len(in_flight) >= max_in_flight:
+            if stats.recording:
+                stats.dropped += 1
+        else:
+            task = asyncio.ensure_future(getattr(scenarios, pick())())
+            in_flight.add(task)
+            task.add_done_callback(in_flight.discard)
+        next_start += interval
+    if in_flight:
+        await asyncio.gather(*in_flight)
+
+
+async def run_load(args, mix):
+    stats = LoadStats()
+    rng = random.Random(args.seed)
+    names = list(mix)
+    weights = [mix[n] for n in names]
+
+    def pick():
+        return rng.choices(names, weights)[0]
+
+    connector = aiohttp.TCPConnector(limit=args.connections, ttl_dns_cache=300)
+    timeout = aiohttp.ClientTimeout(total=REQUEST_TIMEOUT)
+    async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+        scenarios = Scenarios(session, args.base_url.rstrip('/'), stats, rng)
+        with FoodApiClient(args.base_url) as api:
+            scenarios.prepare(api, with_user=bool(mix.get('comment') or mix.get('favorite')))
+        if not scenarios.recipe_ids:
+            raise SystemExit('В базе нет рецептов: сначала заполните её (например, import_recipes.py)')
+
+        loop = asyncio.get_running_loop()
+        started = time.perf_counter()
+        loop.call_later(args.warmup, stats.start_recording)
+        deadline = started + args.warmup + args.duration
+        if args.rps:
+            await run_rps(scenarios, pick, args.rps, deadline, args.connections * 2, stats)
+        else:
+            await run_users(scenarios, pick, args.users, deadline, args.think_time)
+        stats.stop_recording()
+    return stats
+
+
+def print_report(report):
+    print(f"\n{'endpoint':<30} {'count':>8} {'rps':>8} {'err %':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for name, e in report['endpoints'].items():
+        print(f"{name:<30} {e['count']:>8} {e['rps']:>8.1f} {e['errorRate'] * 100:>7.2f} "
+              f"{e['p50'] or 0:>9.1f} {e['p95'] or 0:>9.1f} {e['p99'] or 0:>9.1f}")
+    t = report['total']
+    print(f"{'TOTAL':<30} {t['count']:>8} {t['rps']:>8.1f} {t['errorRate'] * 100:>7.2f}")
+    if t['dropped']:
+        print(f"Не запущено из-за переполнения: {t['dropped']} (сервер не успевает за --rps)")
+
+
+def compare(report, baseline, threshold):
+    """Печатает изменения относительно baseline; возвращает список регрессий"""
+    regressions = []
+    print(f"\n{'endpoint':<30} {'p50 Δ%':>8} {'p95 Δ%':>8} {'p99 Δ%':>8} {'err Δ':>8}")
+    for name, e in report['endpoints'].items():
+        base = baseline.get('endpoints', {}).get(name)
+        if base is None:
+            print(f"{name:<30} {'(нет в baseline)':>34}")
+            continue
+        deltas = {}
+        for key in ('p50', 'p95', 'p99'):
+            deltas[key] = (e[key] - base[key]) / base[key] * 100 if e[key] and base[key] else 0.0
+        err_delta = (e['errorRate'] - base['errorRate']) * 100
+        print(f"{name:<30} {deltas['p50']:>+8.1f} {deltas['p95']:>+8.1f} {deltas['p99']:>+8.1f} {err_delta:>+8.2f}")
+        if deltas['p95'] > threshold or deltas['p99'] > threshold:
+            regressions.append(f"{name}: p95 {deltas['p95']:+.1f}%, p99 {deltas['p99']:+.1f}%")
+        if err_delta > 1.0:
+            regressions.append(f"{name}: доля ошибок {err_delta:+.2f} п.п.")
+    return regressions
+
+
+def main():
+    ap = argparse.ArgumentParser(description='Load test for Food API')
+    ap.add_argument('base_url', nargs='?', default=DEFAULT_BASE_URL)
+    mode = ap.add_mutually_exclusive_group()
+    mode.add_argument('--users', type=int, default=10, help='Виртуальных пользователей (закрытая модель)')
+    mode.add_argument('--rps', type=float, help='Целевых сценариев в секунду (открытая модель)')
+    ap.add_argument('--duration', type=float, default=DEFAULT_DURATION, help='Длительность замера, с')
+    ap.add_argument('--warmup', type=float, default=DEFAULT_WARMUP, help='Прогрев без учёта в статистике, с')
+    ap.add_argument('--think-time', type=float, default=0.0, help='Пауза пользователя между сценариями, с')
+    ap.add_argument('--mix', type=parse_mix, default=DEFAULT_MIX,
+                    help='Веса сценариев, например browse=50,detail=30,search=20')
+    ap.add_argument('--connections', type=int, default=DEFAULT_CONNECTIONS, help='Размер пула соединений')
+    ap.add_argument('--seed', type=int, default=1, help='Seed выбора сценариев и данных')
+    ap.add_argument('-o', '--output', help='Сохранить результат в JSON')
+    ap.add_argument('--baseline', help='JSON прошлого прогона для сравнения')
+    ap.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                    help='Рост p95/p99 в %%, считающийся регрессией')
+    args = ap.parse_args()
+
+    if aiohttp is None:
+        print('Для нагрузочного теста нужен пакет aiohttp (pip install aiohttp)')
+        sys.exit(2)
+
+    mode_desc = f"rps={args.rps}" if args.rps else f"users={args.users}"
+    print(f"Нагрузка на {args.base_url}: {mode_desc}, {args.duration:g} с (+{args.warmup:g} с прогрев), "
+          f"сценарии {args.mix}")
+    stats = asyncio.run(run_load(args, args.mix))
+    params = {'baseUrl': args.base_url, 'users': None if args.rps else args.users, 'rps': args.rps,
+              'duration': args.duration, 'warmup': args.warmup, 'mix': args.mix, 'seed': args.seed}
+    report = stats.report(params)
+    print_report(report)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"\nРезультат сохранён в {args.output}")
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            regressions = compare(report, json.load(f), args.threshold)
+        if regressions:
+            print('\nРегрессии:')
+            for line in regressions:
+                print(f"  - {line}")
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,152 @@
+import 'dart:async';
+import 'package:conduit_core/conduit_core.dart';
+
+/// Полнотекстовый поиск по рецептам.
+///
+/// _recipe.search_vector — русский tsvector из названия (вес A), названий
+/// ингредиентов (B) и текста шагов (C) с GIN-индексом, плюс триграммный
+/// индекс по названию для опечаток и ILIKE '%...%'. Вектор пересчитывают
+/// триггеры: на самом рецепте, на связях с ингредиентами и шагами
+/// (statement-level, один пересчёт на рецепт за оператор) и на
+/// переименовании ингредиента или шага.
+class Migration8 extends Migration {
+  @override
+  Future upgrade() async {
+    database.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm");
+    database.execute("ALTER TABLE _recipe ADD COLUMN IF NOT EXISTS search_vector tsvector");
+
+    database.execute("""
+CREATE OR REPLACE FUNCTION recipe_search_vector(rid bigint, rname text) RETURNS tsvector
+LANGUAGE sql STABLE AS \$\$
+  SELECT setweight(to_tsvector('russian', coalesce(rname, '')), 'A')
+    || setweight(to_tsvector('russian', coalesce((
+         SELECT string_agg(i.name, ' ')
+         FROM _recipeingredient ri JOIN _ingredient i ON i.id = ri.ingredient_id
+         WHERE ri.recipe_id = rid), '')), 'B')
+    || setweight(to_tsvector('russian', coalesce((
+         SELECT string_agg(s.name, ' ')
+         FROM _recipesteplink l JOIN _recipestep s ON s.id = l.step_id
+         WHERE l.recipe_id = rid), '')), 'C')
+\$\$""");
+
+    database.execute("""
+CREATE OR REPLACE FUNCTION refresh_recipe_search(ids bigint[]) RETURNS void
+LANGUAGE sql AS \$\$
+  UPDATE _recipe SET search_vector = recipe_search_vector(id, name) WHERE id = ANY(ids)
+\$\$""");
+
+    // Сам рецепт: вектор считается до записи строки
+    database.execute("""
+CREATE OR REPLACE FUNCTION recipe_search_on_recipe() RETURNS trigger
+LANGUAGE plpgsql AS \$\$
+BEGIN
+  NEW.search_vector := recipe_search_vector(NEW.id, NEW.name);
+  RETURN NEW;
+END
+\$\$""");
+    database.execute("""
+CREATE TRIGGER recipe_search_recipe BEFORE INSERT OR UPDATE OF name ON _recipe
+FOR EACH ROW EXECUTE FUNCTION recipe_search_on_recipe()""");
+
+    // Связи: переходные таблицы дают все затронутые рецепты оператора разом,
+    // так что пакетная вставка 30 ингредиентов пересчитывает рецепт один раз
+    database.execute("""
+CREATE OR REPLACE FUNCTION recipe_search_on_link_insert() RETURNS trigger
+LANGUAGE plpgsql AS \$\$
+BEGIN
+  PERFORM refresh_recipe_search(ARRAY(SELECT DISTINCT recipe_id FROM new_rows WHERE recipe_id IS NOT NULL));
+  RETURN NULL;
+END
+\$\$""");
+    database.execute("""
+CREATE OR REPLACE FUNCTION recipe_search_on_link_update() RETURNS trigger
+LANGUAGE plpgsql AS \$\$
+BEGIN
+  PERFORM refresh_recipe_search(ARRAY(
+    SELECT recipe_id FROM new_rows WHERE recipe_id IS NOT NULL
+    UNION SELECT recipe_id FROM old_rows WHERE recipe_id IS NOT NULL));
+  RETURN NULL;
+END
+\$\$""");
+    database.execute("""
+CREATE OR REPLACE FUNCTION recipe_search_on_link_delete() RETURNS trigger
+LANGUAGE plpgsql AS \$\$
+BEGIN
+  PERFORM refresh_recipe_search(ARRAY(SELECT DISTINCT recipe_id FROM old_rows WHERE recipe_id IS NOT NULL));
+  RETURN NULL;
+END
+\$\$""");
+    for (final table in ['_recipeingredient', '_recipesteplink']) {
+      database.execute("""
+CREATE TRIGGER ${table}_search_insert AFTER INSERT ON $table
+REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION recipe_search_on_link_insert()""");
+      database.execute("""
+CREATE TRIGGER ${table}_search_update AFTER UPDATE ON $table
+REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION recipe_search_on_link_update()""");
+      database.execute("""
+CREATE TRIGGER ${table}_search_delete AFTER DELETE ON $table
+REFERENCING OLD TABLE AS old_rows
+FOR EACH STATEMENT EXECUTE FUNCTION recipe_search_on_link_delete()""");
+    }
+
+    // Переименование ингредиента или шага меняет вектор всех рецептов с ним
+    database.execute("""
+CREATE OR REPLACE FUNCTION recipe_search_on_ingredient() RETURNS trigger
+LANGUAGE plpgsql AS \$\$
+BEGIN
+  PERFORM refresh_recipe_search(ARRAY(
+    SELECT DISTINCT recipe_id FROM _recipeingredient WHERE ingredient_id = NEW.id AND recipe_id IS NOT NULL));
+  RETURN NULL;
+END
+\$\$""");
+    database.execute("""
+CREATE TRIGGER ingredient_search_rename AFTER UPDATE OF name ON _ingredient
+FOR EACH ROW WHEN (OLD.name IS DISTINCT FROM NEW.name) EXECUTE FUNCTION recipe_search_on_ingredient()""");
+    database.execute("""
+CREATE OR REPLACE FUNCTION recipe_search_on_step() RETURNS trigger
+LANGUAGE plpgsql AS \$\$
+BEGIN
+  PERFORM refresh_recipe_search(ARRAY(
+    SELECT DISTINCT recipe_id FROM _recipesteplink WHERE step_id = NEW.id AND recipe_id IS NOT NULL));
+  RETURN NULL;
+END
+\$\$""");
+    database.execute("""
+CREATE TRIGGER recipestep_search_rename AFTER UPDATE OF name ON _recipestep
+FOR EACH ROW WHEN (OLD.name IS DISTINCT FROM NEW.name) EXECUTE FUNCTION recipe_search_on_step()""");
+
+    // Заполняем уже существующие рецепты, затем строим индексы
+    database.execute("UPDATE _recipe SET search_vector = recipe_search_vector(id, name)");
+    database.execute("CREATE INDEX IF NOT EXISTS recipe_search_vector_idx ON _recipe USING gin (search_vector)");
+    database.execute("CREATE INDEX IF NOT EXISTS recipe_name_trgm_idx ON _recipe USING gin (name gin_trgm_ops)");
+    database.execute("ANALYZE _recipe");
+  }
+
+  @override
+  Future downgrade() async {
+    database.execute("DROP TRIGGER IF EXISTS recipestep_search_rename ON _recipestep");
+    database.execute("DROP TRIGGER IF EXISTS ingredient_search_rename ON _ingredient");
+    for (final table in ['_recipeingredient', '_recipesteplink']) {
+      for (final event in ['insert', 'update', 'delete']) {
+        database.execute("DROP TRIGGER IF EXISTS ${table}_search_$event ON $table");
+      }
+    }
+    database.execute("DROP TRIGGER IF EXISTS recipe_search_recipe ON _recipe");
+    database.execute("DROP FUNCTION IF EXISTS recipe_search_on_step()");
+    database.execute("DROP FUNCTION IF EXISTS recipe_search_on_ingredient()");
+    database.execute("DROP FUNCTION IF EXISTS recipe_search_on_link_delete()");
+    database.execute("DROP FUNCTION IF EXISTS recipe_search_on_link_update()");
+    database.execute("DROP FUNCTION IF EXISTS recipe_search_on_link_insert()");
+    database.execute("DROP FUNCTION IF EXISTS recipe_search_on_recipe()");
+    database.execute("DROP FUNCTION IF EXISTS refresh_recipe_search(bigint[])");
+    database.execute("DROP FUNCTION IF EXISTS recipe_search_vector(bigint, text)");
+    database.execute("DROP INDEX IF EXISTS recipe_name_trgm_idx");
+    database.execute("DROP INDEX IF EXISTS recipe_search_vector_idx");
+    database.execute("ALTER TABLE _recipe DROP COLUMN IF EXISTS search_vector");
+  }
+
+  @override
+  Future seed() async {}
+}
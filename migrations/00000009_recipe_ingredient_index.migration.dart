@@ -0,0 +1,27 @@
+import 'dart:async';
+import 'package:conduit_core/conduit_core.dart';
+
+/// Индексы для фильтра /recipe/search по ингредиентам.
+///
+/// (ingredient_id, recipe_id) отдаёт рецепты с ингредиентом одним
+/// index-only scan без обращения к таблице; триграммный индекс по
+/// _ingredient.name находит ингредиенты по части названия и с опечатками.
+class Migration9 extends Migration {
+  @override
+  Future upgrade() async {
+    database.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm");
+    database.execute(
+        "CREATE INDEX IF NOT EXISTS recipeingredient_ingredient_recipe_idx ON _recipeingredient (ingredient_id, recipe_id)");
+    database.execute("CREATE INDEX IF NOT EXISTS ingredient_name_trgm_idx ON _ingredient USING gin (name gin_trgm_ops)");
+    database.execute("ANALYZE _recipeingredient");
+  }
+
+  @override
+  Future downgrade() async {
+    database.execute("DROP INDEX IF EXISTS ingredient_name_trgm_idx");
+    database.execute("DROP INDEX IF EXISTS recipeingredient_ingredient_recipe_idx");
+  }
+
+  @override
+  Future seed() async {}
+}
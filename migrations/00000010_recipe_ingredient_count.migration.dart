@@ -0,0 +1,74 @@
+import 'dart:async';
+import 'package:conduit_core/conduit_core.dart';
+
+/// Число ингредиентов рецепта для подбора рецептов по морозилке.
+///
+/// _recipe.ingredient_count хранит COUNT(*) строк _recipeingredient рецепта,
+/// чтобы покрытие (найдено / всего) считалось только по совпавшим строкам,
+/// без просмотра всех ингредиентов каждого рецепта-кандидата. Счётчик
+/// поддерживает statement-level триггер на _recipeingredient.
+class Migration10 extends Migration {
+  @override
+  Future upgrade() async {
+    database.execute("ALTER TABLE _recipe ADD COLUMN IF NOT EXISTS ingredient_count integer NOT NULL DEFAULT 0");
+    database.execute("CREATE INDEX IF NOT EXISTS recipeingredient_recipe_idx ON _recipeingredient (recipe_id)");
+
+    database.execute("""
+CREATE OR REPLACE FUNCTION refresh_recipe_ingredient_count(ids bigint[]) RETURNS void
+LANGUAGE sql AS \$\$
+  UPDATE _recipe r SET ingredient_count = (SELECT count(*) FROM _recipeingredient ri WHERE ri.recipe_id = r.id)
+  WHERE r.id = ANY(ids)
+\$\$""");
+
+    // new_rows/old_rows есть не у всех событий, но plpgsql разбирает запрос
+    // только при первом выполнении ветки
+    database.execute("""
+CREATE OR REPLACE FUNCTION recipe_ingredient_count_on_change() RETURNS trigger
+LANGUAGE plpgsql AS \$\$
+BEGIN
+  IF TG_OP = 'INSERT' THEN
+    PERFORM refresh_recipe_ingredient_count(ARRAY(SELECT DISTINCT recipe_id FROM new_rows WHERE recipe_id IS NOT NULL));
+  ELSIF TG_OP = 'DELETE' THEN
+    PERFORM refresh_recipe_ingredient_count(ARRAY(SELECT DISTINCT recipe_id FROM old_rows WHERE recipe_id IS NOT NULL));
+  ELSE
+    PERFORM refresh_recipe_ingredient_count(ARRAY(
+      SELECT recipe_id FROM new_rows WHERE recipe_id IS NOT NULL
+      UNION SELECT recipe_id FROM old_rows WHERE recipe_id IS NOT NULL));
+  END IF;
+  RETURN NULL;
+END
+\$\$""");
+    database.execute("""
+CREATE TRIGGER recipeingredient_count_insert AFTER INSERT ON _recipeingredient
+REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION recipe_ingredient_count_on_change()""");
+    database.execute("""
+CREATE TRIGGER recipeingredient_count_update AFTER UPDATE OF recipe_id ON _recipeingredient
+REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION recipe_ingredient_count_on_change()""");
+    database.execute("""
+CREATE TRIGGER recipeingredient_count_delete AFTER DELETE ON _recipeingredient
+REFERENCING OLD TABLE AS old_rows
+FOR EACH STATEMENT EXECUTE FUNCTION recipe_ingredient_count_on_change()""");
+
+    database.execute("""
+UPDATE _recipe r SET ingredient_count = c.n
+FROM (SELECT recipe_id, count(*) AS n FROM _recipeingredient WHERE recipe_id IS NOT NULL GROUP BY recipe_id) c
+WHERE c.recipe_id = r.id""");
+    database.execute("ANALYZE _recipe");
+  }
+
+  @override
+  Future downgrade() async {
+    for (final event in ['insert', 'update', 'delete']) {
+      database.execute("DROP TRIGGER IF EXISTS recipeingredient_count_$event ON _recipeingredient");
+    }
+    database.execute("DROP FUNCTION IF EXISTS recipe_ingredient_count_on_change()");
+    database.execute("DROP FUNCTION IF EXISTS refresh_recipe_ingredient_count(bigint[])");
+    database.execute("DROP INDEX IF EXISTS recipeingredient_recipe_idx");
+    database.execute("ALTER TABLE _recipe DROP COLUMN IF EXISTS ingredient_count");
+  }
+
+  @override
+  Future seed() async {}
+}
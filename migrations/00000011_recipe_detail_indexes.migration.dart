@@ -0,0 +1,21 @@
+import 'dart:async';
+import 'package:conduit_core/conduit_core.dart';
+
+/// Индексы для GET /recipe/{id}: шаги и комментарии рецепта читаются
+/// отдельными запросами сразу в нужном порядке, без сортировки.
+class Migration11 extends Migration {
+  @override
+  Future upgrade() async {
+    database.execute("CREATE INDEX IF NOT EXISTS recipesteplink_recipe_number_idx ON _recipesteplink (recipe_id, number, id)");
+    database.execute("CREATE INDEX IF NOT EXISTS comment_recipe_date_idx ON _comment (recipe_id, date_time DESC, id DESC)");
+  }
+
+  @override
+  Future downgrade() async {
+    database.execute("DROP INDEX IF EXISTS comment_recipe_date_idx");
+    database.execute("DROP INDEX IF EXISTS recipesteplink_recipe_number_idx");
+  }
+
+  @override
+  Future seed() async {}
+}
@@ -0,0 +1,45 @@
+import 'dart:async';
+import 'package:conduit_core/conduit_core.dart';
+
+/// Каскадное удаление строк рецепта.
+///
+/// Связи с шагами и ингредиентами, комментарии и избранное принадлежат
+/// рецепту: с ON DELETE SET NULL удаление рецепта оставляло их с
+/// recipe_id = NULL. Теперь их удаляет сама база в том же DELETE, а
+/// оставшиеся «сироты» удаляются здесь. Связь с шагом тоже каскадная:
+/// без шага она не нужна.
+class Migration12 extends Migration {
+  static const _owned = {
+    "_RecipeIngredient": ["recipe"],
+    "_RecipeStepLink": ["recipe", "step"],
+    "_Comment": ["recipe"],
+    "_Favorite": ["recipe"],
+  };
+
+  @override
+  Future upgrade() async {
+    _owned.forEach((table, columns) {
+      final orphaned = columns.map((column) => "${column}_id IS NULL").join(" OR ");
+      database.execute("DELETE FROM $table WHERE $orphaned");
+      for (final column in columns) {
+        database.alterColumn(table, column, (c) {
+          c.deleteRule = DeleteRule.cascade;
+        });
+      }
+    });
+  }
+
+  @override
+  Future downgrade() async {
+    _owned.forEach((table, columns) {
+      for (final column in columns) {
+        database.alterColumn(table, column, (c) {
+          c.deleteRule = DeleteRule.nullify;
+        });
+      }
+    });
+  }
+
+  @override
+  Future seed() async {}
+}
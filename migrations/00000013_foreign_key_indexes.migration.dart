@@ -0,0 +1,67 @@
+import 'dart:async';
+import 'package:conduit_core/conduit_core.dart';
+
+/// Индексы для внешних ключей и поиска пользователя.
+///
+/// Связи рецепта с ингредиентами, шагами и комментариями уже покрыты
+/// миграциями 9–11. Здесь — избранное (уникальная пара пользователь/рецепт
+/// заодно запрещает дубли при одновременных запросах), комментарии и
+/// морозилка пользователя, step_id для каскадного удаления шага,
+/// _user.login/_user.token, по которым идут вход и каждая проверка токена,
+/// и (name, id) для /recipe/search без текста, упорядоченного по названию.
+class Migration13 extends Migration {
+  @override
+  Future upgrade() async {
+    // Дубли избранного остались от проверки «SELECT, потом INSERT»
+    database.execute("""
+DELETE FROM _favorite a USING _favorite b
+WHERE a.user_id = b.user_id AND a.recipe_id = b.recipe_id AND a.id > b.id""");
+    database.execute("CREATE UNIQUE INDEX IF NOT EXISTS favorite_user_recipe_idx ON _favorite (user_id, recipe_id)");
+    database.execute("CREATE INDEX IF NOT EXISTS favorite_recipe_idx ON _favorite (recipe_id)");
+
+    database.execute("CREATE INDEX IF NOT EXISTS comment_user_date_idx ON _comment (user_id, date_time DESC, id DESC)");
+    database.execute("CREATE INDEX IF NOT EXISTS freezer_user_ingredient_idx ON _freezer (user_id, ingredient_id) INCLUDE (count)");
+    database.execute("CREATE INDEX IF NOT EXISTS freezer_ingredient_idx ON _freezer (ingredient_id)");
+    database.execute("CREATE INDEX IF NOT EXISTS recipesteplink_step_idx ON _recipesteplink (step_id)");
+    database.execute("CREATE INDEX IF NOT EXISTS recipe_name_id_idx ON _recipe (name, id)");
+
+    database.execute("CREATE UNIQUE INDEX IF NOT EXISTS user_token_idx ON _user (token) WHERE token IS NOT NULL");
+    // Регистрация проверяет дубли логина, но без блокировки; если дубли уже
+    // есть, индекс остаётся неуникальным, чтобы миграция не падала
+    database.execute("""
+DO \$\$
+BEGIN
+  IF EXISTS (SELECT 1 FROM _user WHERE login IS NOT NULL GROUP BY login HAVING count(*) > 1) THEN
+    RAISE NOTICE '_user.login has duplicates, creating a non-unique index';
+    CREATE INDEX IF NOT EXISTS user_login_idx ON _user (login);
+  ELSE
+    CREATE UNIQUE INDEX IF NOT EXISTS user_login_idx ON _user (login);
+  END IF;
+END
+\$\$""");
+
+    for (final table in ['_favorite', '_comment', '_freezer', '_recipesteplink', '_recipe', '_user']) {
+      database.execute("ANALYZE $table");
+    }
+  }
+
+  @override
+  Future downgrade() async {
+    for (final index in [
+      'user_login_idx',
+      'user_token_idx',
+      'recipe_name_id_idx',
+      'recipesteplink_step_idx',
+      'freezer_ingredient_idx',
+      'freezer_user_ingredient_idx',
+      'comment_user_date_idx',
+      'favorite_recipe_idx',
+      'favorite_user_recipe_idx',
+    ]) {
+      database.execute("DROP INDEX IF EXISTS $index");
+    }
+  }
+
+  @override
+  Future seed() async {}
+}
@@ -0,0 +1,22 @@
+import 'dart:async';
+import 'package:conduit_core/conduit_core.dart';
+
+/// Индекс для GET /comment без фильтров.
+///
+/// Общий список комментариев отдаётся пачками по keyset (date_time, id)
+/// от новых к старым; без индекса каждая пачка сортировала бы всю таблицу.
+/// Выборки по рецепту и автору покрыты миграциями 11 и 13.
+class Migration14 extends Migration {
+  @override
+  Future upgrade() async {
+    database.execute("CREATE INDEX IF NOT EXISTS comment_date_idx ON _comment (date_time DESC, id DESC)");
+  }
+
+  @override
+  Future downgrade() async {
+    database.execute("DROP INDEX IF EXISTS comment_date_idx");
+  }
+
+  @override
+  Future seed() async {}
+}
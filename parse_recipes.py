@@ -1,206 +1,767 @@
 #!/usr/bin/env python3
+import argparse
+import asyncio
+import functools
 import requests
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, CData, NavigableString
 import json
+import os
 import time
 import re
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import urlsplit
+
+from scraper_cache import (CacheMiss, FetchedPage, HttpCache, cached_parse,
+                           DEFAULT_CACHE_PATH, DEFAULT_MAX_BYTES)
+
+try:
+    import aiohttp
+except ImportError:  # асинхронный режим доступен только с aiohttp
+    aiohttp = None
+
+try:
+    import lxml
+except ImportError:  # дерево через lxml — необязательное ускорение
+    lxml = None
 
 # Категории рецептов для парсинга
 CATEGORIES = [
     {'name': 'закуски', 'url': 'https://blog-food.ru/recipes/zakuski'},
-    {'name': 'салаты', 'url': 'https://blog-food.ru/recipes/salatyi'}, 
+    {'name': 'салаты', 'url': 'https://blog-food.ru/recipes/salatyi'},
     {'name': 'первые блюда', 'url': 'https://blog-food.ru/recipes/first-dishes'},
     {'name': 'основные блюда', 'url': 'https://blog-food.ru/recipes/main-dishes'},
     {'name': 'выпечка', 'url': 'https://blog-food.ru/recipes/vypechka'}
 ]
 
-def parse_category_page(category_url):
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+}
+
+# Параметры асинхронного режима по умолчанию
+DEFAULT_CONCURRENCY_PER_HOST = 4
+DEFAULT_RATE_PER_HOST = 2.0   # запросов в секунду на хост
+DEFAULT_BURST = 4
+REQUEST_TIMEOUT = 10
+
+# Параметры конвейерного режима (--pipeline)
+DEFAULT_QUEUE_SIZE = 32   # максимум загруженных, но ещё не разобранных страниц
+
+
+class CrawlStats:
+    """Счётчики пропускной способности краулера"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.pages = 0
+        self.bytes = 0
+        self.errors = 0
+        self.not_modified = 0   # ответы 304 или то же содержимое, что в кэше
+        self.from_cache = 0     # страницы, взятые из кэша без сети (--offline)
+
+    def add_page(self, size):
+        self.pages += 1
+        self.bytes += size
+
+    def report(self):
+        elapsed = max(time.perf_counter() - self.started, 1e-9)
+        print(f"\nЗагружено страниц: {self.pages} ({self.bytes / 1024:.1f} КБ), ошибок: {self.errors}")
+        if self.not_modified or self.from_cache:
+            print(f"Без изменений: {self.not_modified}, из кэша (offline): {self.from_cache}")
+        print(f"Время: {elapsed:.2f} с, "
+              f"{self.pages / elapsed:.2f} стр/с, "
+              f"{self.bytes / 1024 / elapsed:.1f} КБ/с")
+
+
+class TokenBucket:
+    """Ограничитель частоты запросов (token bucket) для одного хоста.
+
+    rate — сколько токенов добавляется в секунду, burst — ёмкость корзины.
+    """
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class AsyncCrawler:
+    """Асинхронный загрузчик страниц с пулом keep-alive соединений.
+
+    Ограничивает число одновременных запросов и частоту запросов на каждый хост.
+    """
+
+    def __init__(self, concurrency_per_host=DEFAULT_CONCURRENCY_PER_HOST,
+                 rate_per_host=DEFAULT_RATE_PER_HOST, burst=DEFAULT_BURST, stats=None,
+                 cache=None, offline=False):
+        if aiohttp is None and not offline:
+            raise RuntimeError('Для асинхронного режима нужен пакет aiohttp (pip install aiohttp)')
+        self.concurrency_per_host = concurrency_per_host
+        self.rate_per_host = rate_per_host
+        self.burst = burst
+        self.stats = stats or CrawlStats()
+        self.cache = cache
+        self.offline = offline
+        self.session = None
+        self._semaphores = {}
+        self._buckets = {}
+
+    async def __aenter__(self):
+        if self.offline:
+            return self
+        connector = aiohttp.TCPConnector(
+            limit_per_host=self.concurrency_per_host,
+            keepalive_timeout=30,
+            ttl_dns_cache=300,
+        )
+        self.session = aiohttp.ClientSession(
+            connector=connector,
+            headers=HEADERS,
+            timeout=aiohttp.ClientTimeout(total=REQUEST_TIMEOUT),
+        )
+        return self
+
+    async def __aexit__(self, *exc):
+        if self.session is not None:
+            await self.session.close()
+
+    def _host_limits(self, url):
+        host = urlsplit(url).netloc
+        if host not in self._semaphores:
+            self._semaphores[host] = asyncio.Semaphore(self.concurrency_per_host)
+            self._buckets[host] = TokenBucket(self.rate_per_host, self.burst)
+        return self._semaphores[host], self._buckets[host]
+
+    async def fetch(self, url):
+        """Загружает страницу (с условным GET, если она есть в кэше)"""
+        entry = lookup_cached(url, self.cache, self.offline, self.stats)
+        if self.offline:
+            return FetchedPage(url, entry.body, entry.content_hash, unchanged=True)
+        semaphore, bucket = self._host_limits(url)
+        async with semaphore:
+            await bucket.acquire()
+            headers = entry.conditional_headers() if entry else {}
+            async with self.session.get(url, headers=headers) as response:
+                response.raise_for_status()
+                content = await response.read()
+                return remember_response(url, response.status, content, response.headers,
+                                         entry, self.cache, self.stats)
+
+
+def lookup_cached(url, cache, offline, stats):
+    """Ищет страницу в кэше; в режиме offline отсутствие записи — ошибка"""
+    entry = cache.lookup(url) if cache is not None else None
+    if offline:
+        if entry is None:
+            raise CacheMiss(f"нет в кэше: {url}")
+        cache.touch(url)
+        if stats is not None:
+            stats.from_cache += 1
+    return entry
+
+
+def remember_response(url, status, content, headers, entry, cache, stats):
+    """Обрабатывает ответ сервера: 304 берётся из кэша, 200 сохраняется в кэш"""
+    if stats is not None:
+        stats.add_page(len(content))
+    if status == 304 and entry is not None:
+        cache.touch(url)
+        if stats is not None:
+            stats.not_modified += 1
+        return FetchedPage(url, entry.body, entry.content_hash, unchanged=True)
+    if cache is None:
+        return FetchedPage(url, content, None)
+    digest, unchanged = cache.store(url, content, headers.get('ETag'), headers.get('Last-Modified'))
+    if unchanged and stats is not None:
+        stats.not_modified += 1
+    return FetchedPage(url, content, digest, unchanged)
+
+
+def fetch_page(url, stats=None, cache=None, offline=False):
+    """Синхронно загружает страницу (с условным GET, если она есть в кэше)"""
+    entry = lookup_cached(url, cache, offline, stats)
+    if offline:
+        return FetchedPage(url, entry.body, entry.content_hash, unchanged=True)
+    headers = dict(HEADERS, **entry.conditional_headers()) if entry else HEADERS
+    response = requests.get(url, headers=headers, timeout=REQUEST_TIMEOUT)
+    response.raise_for_status()
+    return remember_response(url, response.status_code, response.content, response.headers,
+                             entry, cache, stats)
+
+
+def extract_recipe_links(content, category_url):
+    """Извлекает ссылки на рецепты из HTML страницы категории"""
+    soup = BeautifulSoup(content, 'html.parser')
+
+    # Находим все ссылки на рецепты
+    recipe_links = []
+    recipe_titles = {}
+
+    # Ищем ссылки в различных возможных контейнерах
+    links = soup.find_all('a', href=True)
+
+    for link in links:
+        href = link.get('href', '')
+        text = link.get_text().strip()
+
+        # Проверяем что это ссылка на рецепт и у неё есть осмысленное название
+        # Исключаем ссылки на категории и навигацию
+        if ('recipes/' in href and
+            not href.endswith('/recipes') and
+            not href.endswith('/zakuski') and
+            not href.endswith('/salatyi') and
+            not href.endswith('/first-dishes') and
+            not href.endswith('/main-dishes') and
+            not href.endswith('/vypechka') and
+            len(text) > 10 and
+            'рецепт' not in text.lower() and
+            'кухн' not in text.lower() and
+            'блюд' not in text.lower() and
+            'закуск' not in text.lower() and
+            'салат' not in text.lower() and
+            'выпечк' not in text.lower() and
+            not text.isdigit()):
+
+            # Преобразуем относительные ссылки в абсолютные
+            if href.startswith('/'):
+                full_url = 'https://blog-food.ru' + href
+            elif href.startswith('recipes/'):
+                full_url = 'https://blog-food.ru/' + href
+            else:
+                full_url = href
+
+            # Сохраняем и название рецепта
+            recipe_links.append(full_url)
+            recipe_titles[full_url] = text
+
+    # Убираем дубликаты и берем только первые 6
+    unique_links = list(dict.fromkeys(recipe_links))[:6]
+    print(f"Найдено {len(unique_links)} рецептов в категории {category_url}")
+
+    for url in unique_links:
+        title = recipe_titles.get(url, 'Без названия')
+        print(f"  - {title}")
+
+    return unique_links
+
+
+def parse_recipe_html(content, recipe_url):
+    """Разбирает HTML страницы рецепта в словарь recipe"""
+    soup = BeautifulSoup(content, 'html.parser')
+
+    recipe = {
+        'url': recipe_url,
+        'title': '',
+        'duration': 0,  # в минутах
+        'photo': '',
+        'ingredients': [],
+        'steps': []
+    }
+
+    # Название рецепта
+    title_elem = soup.find('h1') or soup.find(class_=re.compile(r'title', re.I))
+    if title_elem:
+        recipe['title'] = title_elem.get_text().strip()
+
+    # Время приготовления
+    time_text = soup.get_text()
+    time_matches = re.findall(r'(\d+)\s*мин', time_text)
+    if time_matches:
+        recipe['duration'] = int(time_matches[0]) * 60  # конвертируем в секунды
+
+    # Главная фотография
+    img_elem = soup.find('img')
+    if img_elem and img_elem.get('src'):
+        src = img_elem['src']
+        if src.startswith('/'):
+            recipe['photo'] = 'https://blog-food.ru' + src
+        elif src.startswith('images/'):
+            recipe['photo'] = 'https://blog-food.ru/' + src
+        else:
+            recipe['photo'] = src
+
+    # Парсинг ингредиентов и шагов из текста
+    text_content = soup.get_text()
+
+    # Ищем секцию ингредиентов (обычно после слова "ингредиенты" или перед шагами)
+    lines = text_content.split('\n')
+
+    ingredients_section = False
+    steps_section = False
+
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+
+        # Определяем секции
+        if any(word in line.lower() for word in ['ингредиент', 'состав', 'продукт']):
+            ingredients_section = True
+            steps_section = False
+            continue
+        elif any(word in line.lower() for word in ['приготовление', 'способ', 'шаг', 'инструкция']):
+            ingredients_section = False
+            steps_section = True
+            continue
+
+        # Парсим ингредиенты
+        if ingredients_section and ('гр' in line or 'мл' in line or 'шт' in line or 'ст' in line):
+            recipe['ingredients'].append(line)
+
+        # Парсим шаги
+        if steps_section and len(line) > 10:  # фильтруем короткие строки
+            if not line.isdigit():  # не добавляем номера шагов
+                recipe['steps'].append(line)
+
+    # Если не нашли ингредиенты, пробуем более простой подход
+    if not recipe['ingredients']:
+        # Ищем строки с единицами измерения
+        for line in lines:
+            line = line.strip()
+            if any(unit in line for unit in ['гр.', 'мл.', 'шт.', 'ст. л.', 'ч. л.', 'кг.', 'л.']):
+                recipe['ingredients'].append(line)
+
+    # Если не нашли шаги, берем длинные строки из середины текста
+    if not recipe['steps']:
+        long_lines = [line.strip() for line in lines if len(line.strip()) > 30]
+        recipe['steps'] = long_lines[:6]  # берем первые 6 длинных строк как шаги
+
+    print(f"Спарсен рецепт: {recipe['title']}")
+    return recipe
+
+
+# Предкомпилированные шаблоны для быстрого парсера: каждое множество ключевых
+# слов собрано в одно регулярное выражение, и строка проверяется за один проход
+# вместо цепочки any(word in line.lower() ...).
+TITLE_CLASS_RE = re.compile(r'title', re.I)
+DURATION_RE = re.compile(r'(\d+)\s*мин')
+INGREDIENTS_SECTION_RE = re.compile('ингредиент|состав|продукт')
+STEPS_SECTION_RE = re.compile('приготовление|способ|шаг|инструкция')
+SECTION_UNIT_RE = re.compile('гр|мл|шт|ст')
+FALLBACK_UNIT_RE = re.compile('|'.join(
+    re.escape(unit) for unit in ['гр.', 'мл.', 'шт.', 'ст. л.', 'ч. л.', 'кг.', 'л.']))
+
+# Парсеры дерева для быстрого режима; lxml используется, только если установлен
+TREE_BUILDERS = ('html.parser', 'lxml')
+
+
+def _has_title_class(tag):
+    classes = tag.get('class')
+    if not classes:
+        return False
+    if isinstance(classes, str):
+        return TITLE_CLASS_RE.search(classes) is not None
+    return any(TITLE_CLASS_RE.search(c) for c in classes)
+
+
+def parse_recipe_html_fast(content, recipe_url, tree_builder='html.parser'):
+    """Однопроходный вариант parse_recipe_html с тем же результатом.
+
+    Дерево обходится один раз: за этот проход собирается весь текст страницы
+    и находятся первый h1, первый элемент с классом *title* и первое
+    изображение. Секции и единицы измерения ищутся предкомпилированными
+    шаблонами. С tree_builder='lxml' дерево строится быстрее, но на
+    некорректной разметке lxml может разобрать текст иначе, чем html.parser.
+    """
+    soup = BeautifulSoup(content, tree_builder)
+    string_types = (getattr(soup, 'interesting_string_types', None)
+                    or (NavigableString, CData))
+
+    recipe = {
+        'url': recipe_url,
+        'title': '',
+        'duration': 0,  # в минутах
+        'photo': '',
+        'ingredients': [],
+        'steps': []
+    }
+
+    chunks = []
+    h1 = None
+    title_class_elem = None
+    img_elem = None
+    for node in soup.descendants:
+        if isinstance(node, NavigableString):
+            if type(node) in string_types:
+                chunks.append(node)
+            continue
+        if node.name == 'h1':
+            if h1 is None:
+                h1 = node
+        elif node.name == 'img':
+            if img_elem is None:
+                img_elem = node
+        if title_class_elem is None and h1 is None and _has_title_class(node):
+            title_class_elem = node
+    text_content = ''.join(chunks)
+
+    # Название рецепта
+    title_elem = h1 or title_class_elem
+    if title_elem is not None:
+        recipe['title'] = title_elem.get_text().strip()
+
+    # Время приготовления
+    time_match = DURATION_RE.search(text_content)
+    if time_match:
+        recipe['duration'] = int(time_match.group(1)) * 60  # конвертируем в секунды
+
+    # Главная фотография
+    if img_elem is not None and img_elem.get('src'):
+        src = img_elem['src']
+        if src.startswith('/'):
+            recipe['photo'] = 'https://blog-food.ru' + src
+        elif src.startswith('images/'):
+            recipe['photo'] = 'https://blog-food.ru/' + src
+        else:
+            recipe['photo'] = src
+
+    lines = [line.strip() for line in text_content.split('\n')]
+
+    ingredients_section = False
+    steps_section = False
+    ingredients = recipe['ingredients']
+    steps = recipe['steps']
+
+    for line in lines:
+        if not line:
+            continue
+
+        # Определяем секции
+        lowered = line.lower()
+        if INGREDIENTS_SECTION_RE.search(lowered):
+            ingredients_section = True
+            steps_section = False
+            continue
+        elif STEPS_SECTION_RE.search(lowered):
+            ingredients_section = False
+            steps_section = True
+            continue
+
+        if ingredients_section and SECTION_UNIT_RE.search(line):
+            ingredients.append(line)
+
+        if steps_section and len(line) > 10 and not line.isdigit():
+            steps.append(line)
+
+    if not ingredients:
+        ingredients.extend(line for line in lines if FALLBACK_UNIT_RE.search(line))
+
+    if not steps:
+        recipe['steps'] = [line for line in lines if len(line) > 30][:6]
+
+    print(f"Спарсен рецепт: {recipe['title']}")
+    return recipe
+
+
+def select_recipe_parser(name='classic', use_lxml=False):
+    """Возвращает функцию разбора страницы рецепта по имени режима"""
+    if name == 'classic':
+        if use_lxml:
+            raise ValueError('lxml is only supported by the fast parser')
+        return parse_recipe_html
+    if use_lxml:
+        if lxml is None:
+            raise RuntimeError('Для --lxml нужен пакет lxml (pip install lxml)')
+        return functools.partial(parse_recipe_html_fast, tree_builder='lxml')
+    return parse_recipe_html_fast
+
+
+def parse_category_page(category_url, stats=None, cache=None, offline=False):
     """Парсит страницу категории и извлекает ссылки на рецепты"""
     try:
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
-        
-        response = requests.get(category_url, headers=headers, timeout=10)
-        response.raise_for_status()
-        
-        soup = BeautifulSoup(response.content, 'html.parser')
-        
-        # Находим все ссылки на рецепты
-        recipe_links = []
-        recipe_titles = {}
-        
-        # Ищем ссылки в различных возможных контейнерах
-        links = soup.find_all('a', href=True)
-        
-        for link in links:
-            href = link.get('href', '')
-            text = link.get_text().strip()
-            
-            # Проверяем что это ссылка на рецепт и у неё есть осмысленное название
-            # Исключаем ссылки на категории и навигацию
-            if ('recipes/' in href and 
-                not href.endswith('/recipes') and 
-                not href.endswith('/zakuski') and
-                not href.endswith('/salatyi') and
-                not href.endswith('/first-dishes') and
-                not href.endswith('/main-dishes') and
-                not href.endswith('/vypechka') and
-                len(text) > 10 and
-                'рецепт' not in text.lower() and
-                'кухн' not in text.lower() and
-                'блюд' not in text.lower() and
-                'закуск' not in text.lower() and
-                'салат' not in text.lower() and
-                'выпечк' not in text.lower() and
-                not text.isdigit()):
-                
-                # Преобразуем относительные ссылки в абсолютные
-                if href.startswith('/'):
-                    full_url = 'https://blog-food.ru' + href
-                elif href.startswith('recipes/'):
-                    full_url = 'https://blog-food.ru/' + href
-                else:
-                    full_url = href
-                
-                # Сохраняем и название рецепта
-                recipe_links.append(full_url)
-                recipe_titles[full_url] = text
-        
-        # Убираем дубликаты и берем только первые 6
-        unique_links = list(dict.fromkeys(recipe_links))[:6]
-        print(f"Найдено {len(unique_links)} рецептов в категории {category_url}")
-        
-        for url in unique_links:
-            title = recipe_titles.get(url, 'Без названия')
-            print(f"  - {title}")
-        
-        return unique_links
+        page = fetch_page(category_url, stats, cache, offline)
+        return cached_parse(cache, page, extract_recipe_links)
     except Exception as e:
         print(f"Ошибка при парсинге категории {category_url}: {e}")
+        if stats is not None:
+            stats.errors += 1
         return []
 
-def parse_recipe_page(recipe_url):
+def parse_recipe_page(recipe_url, stats=None, cache=None, offline=False, parser=parse_recipe_html):
     """Парсит страницу отдельного рецепта"""
     try:
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
-        
-        response = requests.get(recipe_url, headers=headers, timeout=10)
-        response.raise_for_status()
-        
-        soup = BeautifulSoup(response.content, 'html.parser')
-        
-        recipe = {
-            'url': recipe_url,
-            'title': '',
-            'duration': 0,  # в минутах
-            'photo': '',
-            'ingredients': [],
-            'steps': []
-        }
-        
-        # Название рецепта
-        title_elem = soup.find('h1') or soup.find(class_=re.compile(r'title', re.I))
-        if title_elem:
-            recipe['title'] = title_elem.get_text().strip()
-        
-        # Время приготовления
-        time_text = soup.get_text()
-        time_matches = re.findall(r'(\d+)\s*мин', time_text)
-        if time_matches:
-            recipe['duration'] = int(time_matches[0]) * 60  # конвертируем в секунды
-        
-        # Главная фотография
-        img_elem = soup.find('img')
-        if img_elem and img_elem.get('src'):
-            src = img_elem['src']
-            if src.startswith('/'):
-                recipe['photo'] = 'https://blog-food.ru' + src
-            elif src.startswith('images/'):
-                recipe['photo'] = 'https://blog-food.ru/' + src
-            else:
-                recipe['photo'] = src
-        
-        # Парсинг ингредиентов и шагов из текста
-        text_content = soup.get_text()
-        
-        # Ищем секцию ингредиентов (обычно после слова "ингредиенты" или перед шагами)
-        lines = text_content.split('\n')
-        
-        ingredients_section = False
-        steps_section = False
-        
-        for line in lines:
-            line = line.strip()
-            if not line:
-                continue
-                
-            # Определяем секции
-            if any(word in line.lower() for word in ['ингредиент', 'состав', 'продукт']):
-                ingredients_section = True
-                steps_section = False
-                continue
-            elif any(word in line.lower() for word in ['приготовление', 'способ', 'шаг', 'инструкция']):
-                ingredients_section = False
-                steps_section = True
-                continue
-            
-            # Парсим ингредиенты
-            if ingredients_section and ('гр' in line or 'мл' in line or 'шт' in line or 'ст' in line):
-                recipe['ingredients'].append(line)
-            
-            # Парсим шаги
-            if steps_section and len(line) > 10:  # фильтруем короткие строки
-                if not line.isdigit():  # не добавляем номера шагов
-                    recipe['steps'].append(line)
-        
-        # Если не нашли ингредиенты, пробуем более простой подход
-        if not recipe['ingredients']:
-            # Ищем строки с единицами измерения
-            for line in lines:
-                line = line.strip()
-                if any(unit in line for unit in ['гр.', 'мл.', 'шт.', 'ст. л.', 'ч. л.', 'кг.', 'л.']):
-                    recipe['ingredients'].append(line)
-        
-        # Если не нашли шаги, берем длинные строки из середины текста
-        if not recipe['steps']:
-            long_lines = [line.strip() for line in lines if len(line.strip()) > 30]
-            recipe['steps'] = long_lines[:6]  # берем первые 6 длинных строк как шаги
-        
-        print(f"Спарсен рецепт: {recipe['title']}")
-        return recipe
-        
+        page = fetch_page(recipe_url, stats, cache, offline)
+        return cached_parse(cache, page, parser)
     except Exception as e:
         print(f"Ошибка при парсинге рецепта {recipe_url}: {e}")
+        if stats is not None:
+            stats.errors += 1
         return None
 
-def main():
-    """Главная функция парсинга"""
+
+async def parse_category_page_async(crawler, category_url):
+    """Асинхронный вариант parse_category_page"""
+    try:
+        page = await crawler.fetch(category_url)
+        return cached_parse(crawler.cache, page, extract_recipe_links)
+    except Exception as e:
+        print(f"Ошибка при парсинге категории {category_url}: {e}")
+        crawler.stats.errors += 1
+        return []
+
+
+async def parse_recipe_page_async(crawler, recipe_url, parser=parse_recipe_html):
+    """Асинхронный вариант parse_recipe_page"""
+    try:
+        page = await crawler.fetch(recipe_url)
+        return cached_parse(crawler.cache, page, parser)
+    except Exception as e:
+        print(f"Ошибка при парсинге рецепта {recipe_url}: {e}")
+        crawler.stats.errors += 1
+        return None
+
+
+def crawl_sync(categories, stats, cache=None, offline=False, parser=parse_recipe_html):
+    """Последовательный обход категорий (исходный режим)"""
     all_recipes = []
-    
-    for category in CATEGORIES:
+
+    for category in categories:
         print(f"\nПарсим категорию: {category['name']}")
-        
+
         # Получаем ссылки на рецепты из категории
-        recipe_links = parse_category_page(category['url'])
-        
+        recipe_links = parse_category_page(category['url'], stats, cache, offline)
+
         # Парсим каждый рецепт
         for link in recipe_links:
-            time.sleep(1)  # задержка между запросами
-            
-            recipe = parse_recipe_page(link)
+            if not offline:
+                time.sleep(1)  # задержка между запросами
+
+            recipe = parse_recipe_page(link, stats, cache, offline, parser)
             if recipe and recipe['title']:
                 recipe['category'] = category['name']
                 all_recipes.append(recipe)
-    
+
+    return all_recipes
+
+
+async def crawl_async(categories, stats, concurrency_per_host, rate_per_host, burst,
+                      cache=None, offline=False, parser=parse_recipe_html):
+    """Параллельный обход: все страницы загружаются конкурентно,
+    частота запросов ограничивается только token bucket'ом на хост."""
+    async with AsyncCrawler(concurrency_per_host, rate_per_host, burst, stats,
+                            cache, offline) as crawler:
+        link_lists = await asyncio.gather(
+            *(parse_category_page_async(crawler, c['url']) for c in categories))
+
+        jobs = [(category, link)
+                for category, links in zip(categories, link_lists)
+                for link in links]
+        recipes = await asyncio.gather(
+            *(parse_recipe_page_async(crawler, link, parser) for _, link in jobs))
+
+    all_recipes = []
+    for (category, _), recipe in zip(jobs, recipes):
+        if recipe and recipe['title']:
+            recipe['category'] = category['name']
+            all_recipes.append(recipe)
+    return all_recipes
+
+
+class NdjsonWriter:
+    """Пишет рецепты в NDJSON по одному на строку, сразу сбрасывая на диск.
+
+    При resume=True уже записанные URL пропускаются, а оборванная при сбое
+    последняя строка отрезается.
+    """
+
+    def __init__(self, path, resume=False):
+        self.path = path
+        self.written_urls = set()
+        self.written = 0
+        if resume and os.path.exists(path):
+            self._load_existing()
+            mode = 'a'
+        else:
+            mode = 'w'
+        self.file = open(path, mode, encoding='utf-8')
+
+    def _load_existing(self):
+        valid_end = 0
+        with open(self.path, 'rb') as f:
+            for raw in f:
+                if not raw.endswith(b'\n'):
+                    break
+                try:
+                    record = json.loads(raw)
+                except ValueError:
+                    break
+                self.written_urls.add(record.get('url'))
+                valid_end += len(raw)
+        with open(self.path, 'r+b') as f:
+            f.truncate(valid_end)
+        print(f"Продолжаем: уже записано {len(self.written_urls)} рецептов в {self.path}")
+
+    def write(self, recipe):
+        self.file.write(json.dumps(recipe, ensure_ascii=False) + '\n')
+        self.file.flush()
+        self.written_urls.add(recipe['url'])
+        self.written += 1
+
+    def close(self):
+        self.file.close()
+
+
+async def crawl_pipeline(categories, stats, concurrency_per_host, rate_per_host, burst,
+                         writer, cache=None, offline=False, parser=parse_recipe_html,
+                         workers=None, queue_size=DEFAULT_QUEUE_SIZE):
+    """Конвейер загрузка → разбор → запись.
+
+    Загрузчики кладут HTML в ограниченную очередь, разбор идёт в пуле
+    процессов на всех ядрах, готовые рецепты сразу дописываются в NDJSON.
+    В памяти одновременно находится не больше queue_size страниц.
+    """
+    loop = asyncio.get_running_loop()
+    workers = workers or os.cpu_count() or 1
+    links = asyncio.Queue()
+    pages = asyncio.Queue(maxsize=queue_size)
+
+    async def fetch_worker(crawler):
+        while True:
+            item = await links.get()
+            if item is None:
+                return
+            category, url = item
+            try:
+                page = await crawler.fetch(url)
+            except Exception as e:
+                print(f"Ошибка при загрузке рецепта {url}: {e}")
+                stats.errors += 1
+                continue
+            # Очередь ограничена: если разбор не успевает, загрузчик ждёт здесь
+            await pages.put((category, page))
+
+    async def parse_worker(pool):
+        while True:
+            item = await pages.get()
+            if item is None:
+                return
+            category, page = item
+            try:
+                recipe = cache.load_parsed(page.url, page.content_hash) \
+                    if cache is not None and page.unchanged else None
+                if recipe is None:
+                    recipe = await loop.run_in_executor(pool, parser, page.content, page.url)
+                    if cache is not None and recipe is not None:
+                        cache.save_parsed(page.url, page.content_hash, recipe)
+            except Exception as e:
+                print(f"Ошибка при парсинге рецепта {page.url}: {e}")
+                stats.errors += 1
+                continue
+            if recipe and recipe['title']:
+                recipe['category'] = category['name']
+                writer.write(recipe)
+
+    async with AsyncCrawler(concurrency_per_host, rate_per_host, burst, stats,
+                            cache, offline) as crawler:
+        link_lists = await asyncio.gather(
+            *(parse_category_page_async(crawler, c['url']) for c in categories))
+        for category, category_links in zip(categories, link_lists):
+            for link in category_links:
+                if link not in writer.written_urls:
+                    links.put_nowait((category, link))
+
+        fetchers = max(1, concurrency_per_host)
+        for _ in range(fetchers):
+            links.put_nowait(None)
+
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            parsers = [asyncio.create_task(parse_worker(pool)) for _ in range(workers)]
+            await asyncio.gather(*(fetch_worker(crawler) for _ in range(fetchers)))
+            for _ in range(workers):
+                await pages.put(None)
+            await asyncio.gather(*parsers)
+
+
+def main():
+    """Главная функция парсинга"""
+    ap = argparse.ArgumentParser(description='Парсер рецептов blog-food.ru')
+    ap.add_argument('--async', dest='use_async', action='store_true',
+                    help='Асинхронный режим с пулом соединений и ограничением частоты')
+    ap.add_argument('--concurrency', type=int, default=DEFAULT_CONCURRENCY_PER_HOST,
+                    help='Максимум одновременных запросов на хост')
+    ap.add_argument('--rate', type=float, default=DEFAULT_RATE_PER_HOST,
+                    help='Запросов в секунду на хост')
+    ap.add_argument('--burst', type=int, default=DEFAULT_BURST,
+                    help='Допустимый всплеск запросов сверх --rate')
+    ap.add_argument('--cache', default=DEFAULT_CACHE_PATH,
+                    help='Файл HTTP-кэша (SQLite)')
+    ap.add_argument('--cache-size', type=int, default=DEFAULT_MAX_BYTES // (1024 * 1024),
+                    help='Максимальный размер кэша, МБ')
+    ap.add_argument('--no-cache', action='store_true', help='Не использовать HTTP-кэш')
+    ap.add_argument('--offline', action='store_true',
+                    help='Работать только по кэшу, без сетевых запросов')
+    ap.add_argument('--parser', choices=['classic', 'fast'], default='classic',
+                    help='Парсер страниц рецептов: classic или однопроходный fast')
+    ap.add_argument('--lxml', action='store_true',
+                    help='Строить дерево через lxml (только для --parser fast)')
+    ap.add_argument('--pipeline', action='store_true',
+                    help='Конвейер: параллельная загрузка, разбор в пуле процессов, '
+                         'потоковая запись NDJSON')
+    ap.add_argument('--workers', type=int, default=None,
+                    help='Процессов разбора в режиме --pipeline (по умолчанию — число ядер)')
+    ap.add_argument('--queue-size', type=int, default=DEFAULT_QUEUE_SIZE,
+                    help='Максимум страниц, ожидающих разбора, в режиме --pipeline')
+    ap.add_argument('--resume', action='store_true',
+                    help='Дописать в существующий NDJSON, пропустив уже записанные рецепты')
+    ap.add_argument('-o', '--output', default=None,
+                    help='Файл результата (по умолчанию parsed_recipes.json, '
+                         'для --pipeline — parsed_recipes.ndjson)')
+    args = ap.parse_args()
+    if args.offline and args.no_cache:
+        ap.error('--offline requires the cache')
+    if args.lxml and args.parser != 'fast':
+        ap.error('--lxml requires --parser fast')
+    if args.resume and not args.pipeline:
+        ap.error('--resume requires --pipeline')
+    parser = select_recipe_parser(args.parser, args.lxml)
+    output = args.output or ('parsed_recipes.ndjson' if args.pipeline else 'parsed_recipes.json')
+
+    stats = CrawlStats()
+    cache = None if args.no_cache else HttpCache(args.cache, args.cache_size * 1024 * 1024)
+    if args.pipeline:
+        writer = NdjsonWriter(output, args.resume)
+        try:
+            asyncio.run(crawl_pipeline(
+                CATEGORIES, stats, args.concurrency, args.rate, args.burst, writer,
+                cache, args.offline, parser, args.workers, args.queue_size))
+        finally:
+            writer.close()
+            if cache is not None:
+                cache.close()
+        print(f"\nЗаписано {writer.written} рецептов в {output}")
+        stats.report()
+        return
+
+    try:
+        if args.use_async:
+            all_recipes = asyncio.run(
+                crawl_async(CATEGORIES, stats, args.concurrency, args.rate, args.burst,
+                            cache, args.offline, parser))
+        else:
+            all_recipes = crawl_sync(CATEGORIES, stats, cache, args.offline, parser)
+    finally:
+        if cache is not None:
+            cache.close()
+
     # Сохраняем результаты в JSON файл
-    with open('/Users/dmitrii/api/parsed_recipes.json', 'w', encoding='utf-8') as f:
+    with open(output, 'w', encoding='utf-8') as f:
         json.dump(all_recipes, f, ensure_ascii=False, indent=2)
-    
+
     print(f"\nВсего спарсено {len(all_recipes)} рецептов")
-    print("Результаты сохранены в parsed_recipes.json")
+    print(f"Результаты сохранены в {output}")
+    stats.report()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,22 @@
+#!/usr/bin/env python3
+"""
+Уникальные имена для сущностей, которые создают интеграционные тесты.
+
+test_all.py передаёт идентификатор прогона в переменной TEST_RUN_ID, так
+что все записи одного прогона можно найти по нему. К нему добавляется
+случайный суффикс процесса и счётчик, поэтому имена не совпадают, даже
+если наборы тестов запущены параллельно в одну и ту же секунду.
+"""
+
+import itertools
+import os
+import uuid
+
+RUN_ID = os.environ.get('TEST_RUN_ID') or uuid.uuid4().hex[:8]
+_PROCESS = uuid.uuid4().hex[:4]
+_counter = itertools.count(1)
+
+
+def unique_suffix() -> str:
+    """'3f9a1c2e-b41d-1', '3f9a1c2e-b41d-2', ..."""
+    return f"{RUN_ID}-{_PROCESS}-{next(_counter)}"
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Постоянный HTTP-кэш для парсера рецептов (parse_recipes.py).
+
+Хранит тело страницы, ETag и Last-Modified по URL в SQLite, чтобы повторные
+обходы делали условные запросы (If-None-Match / If-Modified-Since) и не
+разбирали заново страницы, которые не изменились. Результат разбора
+сохраняется рядом с телом и привязан к хэшу содержимого.
+
+Размер кэша ограничен: при превышении лимита удаляются записи, к которым
+дольше всего не обращались (LRU).
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+DEFAULT_CACHE_PATH = '.scraper_cache.sqlite3'
+DEFAULT_MAX_BYTES = 200 * 1024 * 1024
+
+
+class CacheMiss(Exception):
+    """Страницы нет в кэше (в режиме --offline)"""
+
+
+class CacheEntry:
+    __slots__ = ('url', 'body', 'etag', 'last_modified', 'content_hash')
+
+    def __init__(self, url, body, etag, last_modified, content_hash):
+        self.url = url
+        self.body = body
+        self.etag = etag
+        self.last_modified = last_modified
+        self.content_hash = content_hash
+
+    def conditional_headers(self) -> Dict[str, str]:
+        """Заголовки условного GET для повторной загрузки"""
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+
+class FetchedPage:
+    """Результат загрузки страницы.
+
+    unchanged=True означает, что сервер ответил 304 или вернул то же
+    содержимое, что уже лежит в кэше, — повторный разбор не нужен.
+    """
+    __slots__ = ('url', 'content', 'content_hash', 'unchanged')
+
+    def __init__(self, url, content, content_hash, unchanged=False):
+        self.url = url
+        self.content = content
+        self.content_hash = content_hash
+        self.unchanged = unchanged
+
+
+def content_hash(content: bytes) -> str:
+    return hashlib.sha256(content).hexdigest()
+
+
+class HttpCache:
+    """Кэш страниц на диске с LRU-вытеснением по суммарному размеру"""
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self.db = sqlite3.connect(path)
+        self.db.execute('PRAGMA journal_mode=WAL')
+        self.db.execute(
+            'CREATE TABLE IF NOT EXISTS entries ('
+            ' url TEXT PRIMARY KEY,'
+            ' body BLOB NOT NULL,'
+            ' etag TEXT,'
+            ' last_modified TEXT,'
+            ' content_hash TEXT NOT NULL,'
+            ' size INTEGER NOT NULL,'
+            ' fetched_at REAL NOT NULL,'
+            ' accessed_at REAL NOT NULL,'
+            ' parsed TEXT)'
+        )
+        self.db.execute('CREATE INDEX IF NOT EXISTS entries_accessed_at ON entries (accessed_at)')
+        self.db.commit()
+
+    def close(self):
+        self.db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def lookup(self, url: str) -> Optional[CacheEntry]:
+        row = self.db.execute(
+            'SELECT url, body, etag, last_modified, content_hash FROM entries WHERE url = ?',
+            (url,)).fetchone()
+        return CacheEntry(*row) if row else None
+
+    def touch(self, url: str):
+        self.db.execute('UPDATE entries SET accessed_at = ? WHERE url = ?', (time.time(), url))
+        self.db.commit()
+
+    def store(self, url: str, body: bytes, etag: Optional[str], last_modified: Optional[str]) -> Tuple[str, bool]:
+        """Сохраняет ответ 200. Возвращает (хэш, совпал_ли_он_с_прежним)."""
+        digest = content_hash(body)
+        previous = self.db.execute('SELECT content_hash FROM entries WHERE url = ?', (url,)).fetchone()
+        unchanged = previous is not None and previous[0] == digest
+        now = time.time()
+        if unchanged:
+            # Тело то же — обновляем только валидаторы, разобранный результат сохраняем
+            self.db.execute(
+                'UPDATE entries SET etag = ?, last_modified = ?, fetched_at = ?, accessed_at = ? WHERE url = ?',
+                (etag, last_modified, now, now, url))
+        else:
+            self.db.execute(
+                'INSERT OR REPLACE INTO entries '
+                '(url, body, etag, last_modified, content_hash, size, fetched_at, accessed_at, parsed) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?, NULL)',
+                (url, body, etag, last_modified, digest, len(body), now, now))
+        self.db.commit()
+        if not unchanged:
+            self.evict()
+        return digest, unchanged
+
+    def load_parsed(self, url: str, digest: str) -> Any:
+        row = self.db.execute(
+            'SELECT parsed FROM entries WHERE url = ? AND content_hash = ?', (url, digest)).fetchone()
+        if row is None or row[0] is None:
+            return None
+        return json.loads(row[0])
+
+    def save_parsed(self, url: str, digest: str, parsed: Any):
+        self.db.execute(
+            'UPDATE entries SET parsed = ? WHERE url = ? AND content_hash = ?',
+            (json.dumps(parsed, ensure_ascii=False), url, digest))
+        self.db.commit()
+
+    def total_size(self) -> int:
+        return self.db.execute('SELECT COALESCE(SUM(size), 0) FROM entries').fetchone()[0]
+
+    def evict(self):
+        """Удаляет самые давно использованные записи, пока кэш не влезет в лимит"""
+        excess = self.total_size() - self.max_bytes
+        if excess <= 0:
+            return
+        freed = 0
+        victims = []
+        for url, size in self.db.execute('SELECT url, size FROM entries ORDER BY accessed_at'):
+            victims.append((url,))
+            freed += size
+            if freed >= excess:
+                break
+        self.db.executemany('DELETE FROM entries WHERE url = ?', victims)
+        self.db.commit()
+
+    def iter_pages(self) -> Iterator[Tuple[str, bytes]]:
+        """Все сохранённые страницы (url, body) — корпус для бенчмарков"""
+        yield from self.db.execute('SELECT url, body FROM entries ORDER BY url')
+
+
+def cached_parse(cache: Optional[HttpCache], page: FetchedPage, parser):
+    """Разбирает страницу, переиспользуя сохранённый результат для неизменившихся страниц"""
+    if cache is not None and page.unchanged:
+        parsed = cache.load_parsed(page.url, page.content_hash)
+        if parsed is not None:
+            return parsed
+    parsed = parser(page.content, page.url)
+    if cache is not None and parsed is not None:
+        cache.save_parsed(page.url, page.content_hash, parsed)
+    return parsed
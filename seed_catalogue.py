@@ -0,0 +1,508 @@
+#!/usr/bin/env python3
+"""
+Синтетический большой каталог для нагрузочных замеров.
+
+Заполняет _user, _recipe, _recipestep, _recipesteplink, _ingredient,
+_recipeingredient, _comment, _favorite и _freezer правдоподобно
+перекошенными данными:
+
+- популярность ингредиентов, шагов и рецептов распределена по Ципфу
+  (немного очень частых и длинный хвост редких);
+- число шагов и ингредиентов в рецепте различается от рецепта к рецепту;
+- комментарии и избранное тоже распределены по Ципфу между пользователями,
+  так что у нескольких активных пользователей тысячи записей.
+
+Строки генерируются потоком и загружаются через COPY ... FROM STDIN
+порциями (--chunk-rows), поэтому миллионы строк не держатся в памяти.
+Данные полностью определяются --seed: у каждой таблицы свой генератор,
+и одинаковые параметры дают побайтно одинаковый каталог.
+
+Имена колонок берутся из information_schema: схема init.sql и схема после
+миграций Conduit называют их по-разному (caloriesForUnit /
+calories_for_unit, dateTime / date_time). NOT NULL колонки, о которых
+сидер не знает, заполняются нейтральными значениями по типу.
+
+Пример (база из docker-compose):
+    python3 seed_catalogue.py --scale large --seed 42
+    python3 seed_catalogue.py --recipes 20000 --comments 100000 --dump seed_out
+"""
+
+import argparse
+import bisect
+import datetime
+import itertools
+import os
+import random
+import sys
+import time
+
+try:
+    import psycopg
+except ImportError:
+    psycopg = None
+try:
+    import psycopg2
+except ImportError:
+    psycopg2 = None
+
+SCALES = {
+    'small': dict(users=1_000, recipes=10_000, steps=5_000, ingredients=2_000,
+                  recipe_ingredients=100_000, comments=50_000, favorites=20_000, freezer=5_000),
+    'medium': dict(users=20_000, recipes=100_000, steps=30_000, ingredients=10_000,
+                   recipe_ingredients=1_000_000, comments=500_000, favorites=200_000, freezer=50_000),
+    'large': dict(users=200_000, recipes=1_000_000, steps=200_000, ingredients=20_000,
+                  recipe_ingredients=10_000_000, comments=5_000_000, favorites=2_000_000, freezer=500_000),
+}
+DEFAULT_CHUNK_ROWS = 50_000
+ZIPF_EXPONENT = 1.07
+MIN_STEPS, MAX_STEPS, MEAN_STEPS = 2, 20, 6
+BASE_TIME = datetime.datetime(2025, 1, 1)
+
+MEASURE_UNITS = [
+    ('грамм', 'грамма', 'граммов'),
+    ('килограмм', 'килограмма', 'килограммов'),
+    ('миллилитр', 'миллилитра', 'миллилитров'),
+    ('литр', 'литра', 'литров'),
+    ('штука', 'штуки', 'штук'),
+    ('столовая ложка', 'столовые ложки', 'столовых ложек'),
+    ('чайная ложка', 'чайные ложки', 'чайных ложек'),
+    ('стакан', 'стакана', 'стаканов'),
+]
+INGREDIENT_BASES = ['мука', 'сахар', 'соль', 'молоко', 'яйцо', 'масло', 'сметана', 'творог', 'сыр',
+                    'картофель', 'морковь', 'лук', 'чеснок', 'капуста', 'свёкла', 'томат', 'огурец',
+                    'перец', 'рис', 'гречка', 'курица', 'говядина', 'свинина', 'рыба', 'грибы',
+                    'яблоко', 'лимон', 'мёд', 'орехи', 'зелень']
+INGREDIENT_KINDS = ['', 'пшеничная', 'сливочное', 'твёрдый', 'молодой', 'красный', 'копчёная',
+                    'свежий', 'сушёный', 'домашний', 'морской']
+DISHES = ['суп', 'салат', 'пирог', 'каша', 'рагу', 'запеканка', 'котлеты', 'блины', 'омлет',
+          'плов', 'борщ', 'паста', 'тушёное мясо', 'оладьи', 'соус']
+STYLES = ['домашний', 'быстрый', 'праздничный', 'постный', 'летний', 'бабушкин', 'острый', 'нежный']
+STEP_VERBS = ['Нарезать', 'Обжарить', 'Смешать', 'Отварить', 'Запечь', 'Взбить', 'Потушить',
+              'Посолить', 'Натереть', 'Охладить', 'Замесить', 'Процедить']
+COMMENT_TEXTS = ['Очень вкусно!', 'Готовлю уже третий раз', 'Добавила больше чеснока',
+                 'Не получилось, тесто расползлось', 'Отличный рецепт для ужина',
+                 'Слишком солёно, в следующий раз уменьшу соль', 'Дети в восторге', 'Спасибо!']
+
+# Логическая колонка → возможные имена в базе (первое — имя после миграций)
+COLUMN_ALIASES = {
+    '_user': {'login': ['login'], 'password': ['password'], 'first_name': ['first_name', 'firstName'],
+              'last_name': ['last_name', 'lastName'], 'phone': ['phone'],
+              'avatar': ['avatar_url', 'avatarUrl', 'avatar'], 'birthday': ['birthday']},
+    '_recipe': {'name': ['name'], 'duration': ['duration'], 'photo': ['photo']},
+    '_recipestep': {'name': ['name'], 'duration': ['duration']},
+    '_recipesteplink': {'number': ['number'], 'recipe_id': ['recipe_id'], 'step_id': ['step_id']},
+    '_measureunit': {'one': ['one'], 'few': ['few'], 'many': ['many']},
+    '_ingredient': {'name': ['name'], 'calories': ['calories_for_unit', 'caloriesForUnit'],
+                    'measureunit_id': ['measureunit_id', 'measureUnit_id']},
+    '_recipeingredient': {'count': ['count'], 'ingredient_id': ['ingredient_id'], 'recipe_id': ['recipe_id']},
+    '_comment': {'text': ['text'], 'date_time': ['date_time', 'dateTime', 'datetime'], 'photo': ['photo'],
+                 'user_id': ['user_id'], 'recipe_id': ['recipe_id']},
+    '_favorite': {'recipe_id': ['recipe_id'], 'user_id': ['user_id']},
+    '_freezer': {'count': ['count'], 'user_id': ['user_id'], 'ingredient_id': ['ingredient_id']},
+}
+
+TYPE_FILLERS = {
+    'character varying': '', 'text': '', 'integer': 0, 'bigint': 0, 'smallint': 0,
+    'double precision': 0.0, 'real': 0.0, 'numeric': 0, 'boolean': False,
+    'date': datetime.date(2000, 1, 1), 'timestamp without time zone': BASE_TIME,
+    'timestamp with time zone': BASE_TIME,
+}
+
+
+class Zipf:
+    """Ципф на 1..n: выборка k значений через накопленные веса и bisect"""
+
+    def __init__(self, n, exponent=ZIPF_EXPONENT):
+        self.n = n
+        self.cum_weights = list(itertools.accumulate(1 / (k ** exponent) for k in range(1, n + 1)))
+        self.total = self.cum_weights[-1]
+
+    def sample(self, rng, k=1):
+        cum, total, n = self.cum_weights, self.total, self.n
+        return [min(bisect.bisect(cum, rng.random() * total), n - 1) for _ in range(k)]
+
+
+def table_rng(seed, table):
+    """Свой генератор на таблицу: изменение одной таблицы не сдвигает данные остальных"""
+    return random.Random(f"{seed}:{table}")
+
+
+def shuffled_ranks(rng, n):
+    """Перестановка рангов → id, чтобы популярные записи не шли подряд с начала таблицы"""
+    ids = list(range(n))
+    rng.shuffle(ids)
+    return ids
+
+
+def bounded_geometric(rng, mean, low, high):
+    p = 1 / max(mean - low + 1, 1)
+    value = low
+    while value < high and rng.random() > p:
+        value += 1
+    return value
+
+
+# --- генераторы строк (логические колонки) ---
+
+def gen_users(args, first_id):
+    for i in range(args.users):
+        uid = first_id + i
+        yield {'login': f"seed_{args.seed}_{uid}@example.com", 'password': 'seed',
+               'first_name': f"Пользователь{uid}", 'last_name': 'Тестовый', 'phone': f"+7900{uid:07d}",
+               'avatar': None, 'birthday': datetime.date(1970 + uid % 35, 1 + uid % 12, 1 + uid % 28)}
+
+
+def gen_measure_units():
+    for one, few, many in MEASURE_UNITS:
+        yield {'one': one, 'few': few, 'many': many}
+
+
+def gen_ingredients(args, unit_ids):
+    rng = table_rng(args.seed, '_ingredient')
+    for i in range(args.ingredients):
+        base = INGREDIENT_BASES[i % len(INGREDIENT_BASES)]
+        kind = INGREDIENT_KINDS[(i // len(INGREDIENT_BASES)) % len(INGREDIENT_KINDS)]
+        name = f"{base} {kind}".strip() if i < len(INGREDIENT_BASES) * len(INGREDIENT_KINDS) \
+            else f"{base} {kind} №{i}".replace('  ', ' ')
+        yield {'name': name, 'calories': round(rng.uniform(0, 900), 1), 'measureunit_id': rng.choice(unit_ids)}
+
+
+def gen_steps(args):
+    rng = table_rng(args.seed, '_recipestep')
+    for i in range(args.steps):
+        verb = STEP_VERBS[i % len(STEP_VERBS)]
+        what = INGREDIENT_BASES[(i // len(STEP_VERBS)) % len(INGREDIENT_BASES)]
+        yield {'name': f"{verb} {what} (вариант {i})", 'duration': rng.randint(1, 60) * 60}
+
+
+def gen_recipes(args):
+    rng = table_rng(args.seed, '_recipe')
+    for i in range(args.recipes):
+        name = f"{rng.choice(STYLES).capitalize()} {rng.choice(DISHES)}: {rng.choice(INGREDIENT_BASES)} №{i}"
+        yield {'name': name, 'duration': rng.randint(5, 240) * 60,
+               'photo': f"https://example.com/recipes/{i}.jpg" if rng.random() < 0.8 else None}
+
+
+def gen_step_links(args, first_recipe, first_step):
+    rng = table_rng(args.seed, '_recipesteplink')
+    zipf = Zipf(args.steps)
+    ranks = shuffled_ranks(rng, args.steps)
+    for r in range(args.recipes):
+        count = bounded_geometric(rng, MEAN_STEPS, MIN_STEPS, MAX_STEPS)
+        for number, rank in enumerate(zipf.sample(rng, count), start=1):
+            yield {'number': number, 'recipe_id': first_recipe + r, 'step_id': first_step + ranks[rank]}
+
+
+def gen_recipe_ingredients(args, first_recipe, first_ingredient):
+    """Всего ~args.recipe_ingredients строк; в рецепте от 1 до 3×среднего разных ингредиентов"""
+    rng = table_rng(args.seed, '_recipeingredient')
+    zipf = Zipf(args.ingredients)
+    ranks = shuffled_ranks(rng, args.ingredients)
+    mean = max(args.recipe_ingredients / max(args.recipes, 1), 1)
+    for r in range(args.recipes):
+        count = max(1, min(int(rng.expovariate(1 / mean)) + 1, int(mean * 3), args.ingredients))
+        seen = set()
+        attempts = 0
+        while len(seen) < count and attempts < count * 4:
+            attempts += 1
+            rank = zipf.sample(rng)[0]
+            if rank in seen:
+                continue
+            seen.add(rank)
+            yield {'count': rng.choice((1, 2, 3, 5, 10, 50, 100, 200, 500)),
+                   'ingredient_id': first_ingredient + ranks[rank], 'recipe_id': first_recipe + r}
+
+
+def gen_comments(args, first_user, first_recipe):
+    rng = table_rng(args.seed, '_comment')
+    users = Zipf(args.users)
+    recipes = Zipf(args.recipes)
+    user_ranks = shuffled_ranks(rng, args.users)
+    recipe_ranks = shuffled_ranks(rng, args.recipes)
+    span = 3 * 365 * 24 * 3600
+    for _ in range(args.comments):
+        yield {'text': rng.choice(COMMENT_TEXTS),
+               'date_time': BASE_TIME - datetime.timedelta(seconds=rng.randrange(span)),
+               'photo': None,
+               'user_id': first_user + user_ranks[users.sample(rng)[0]],
+               'recipe_id': first_recipe + recipe_ranks[recipes.sample(rng)[0]]}
+
+
+def gen_favorites(args, first_user, first_recipe):
+    """Пары (пользователь, рецепт) без повторов; активные пользователи и популярные рецепты — по Ципфу"""
+    rng = table_rng(args.seed, '_favorite')
+    users = Zipf(args.users)
+    recipes = Zipf(args.recipes)
+    user_ranks = shuffled_ranks(rng, args.users)
+    recipe_ranks = shuffled_ranks(rng, args.recipes)
+    seen = set()
+    attempts = 0
+    while len(seen) < args.favorites and attempts < args.favorites * 3:
+        attempts += 1
+        pair = (user_ranks[users.sample(rng)[0]], recipe_ranks[recipes.sample(rng)[0]])
+        if pair in seen:
+            continue
+        seen.add(pair)
+        yield {'user_id': first_user + pair[0], 'recipe_id': first_recipe + pair[1]}
+
+
+def gen_freezer(args, first_user, first_ingredient):
+    rng = table_rng(args.seed, '_freezer')
+    ingredients = Zipf(args.ingredients)
+    ranks = shuffled_ranks(rng, args.ingredients)
+    seen = set()
+    attempts = 0
+    while len(seen) < args.freezer and attempts < args.freezer * 3:
+        attempts += 1
+        pair = (rng.randrange(args.users), ranks[ingredients.sample(rng)[0]])
+        if pair in seen:
+            continue
+        seen.add(pair)
+        yield {'count': rng.randint(1, 20), 'user_id': first_user + pair[0], 'ingredient_id': first_ingredient + pair[1]}
+
+
+# --- COPY ---
+
+def copy_escape(value):
+    if value is None:
+        return '\\N'
+    if isinstance(value, bool):
+        return 't' if value else 'f'
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.isoformat(sep=' ') if isinstance(value, datetime.datetime) else value.isoformat()
+    text = str(value)
+    if '\\' in text or '\t' in text or '\n' in text or '\r' in text:
+        text = text.replace('\\', '\\\\').replace('\t', '\\t').replace('\n', '\\n').replace('\r', '\\r')
+    return text
+
+
+class TableLayout:
+    """Соответствие логических колонок реальным и значения для остальных NOT NULL колонок"""
+
+    def __init__(self, table, columns):
+        self.table = table
+        aliases = COLUMN_ALIASES[table]
+        by_name = {c[0]: c for c in columns}
+        self.mapping = []
+        for logical, candidates in aliases.items():
+            real = next((c for c in candidates if c in by_name), None)
+            if real is not None:
+                self.mapping.append((logical, real))
+        mapped = {real for _, real in self.mapping}
+        self.fillers = [(name, TYPE_FILLERS.get(data_type, ''))
+                        for name, data_type, nullable, default in columns
+                        if name != 'id' and name not in mapped and nullable == 'NO' and default is None]
+        self.columns = ['id'] + [real for _, real in self.mapping] + [name for name, _ in self.fillers]
+
+    @classmethod
+    def assumed(cls, table):
+        """Без базы (--dump): имена колонок как после миграций"""
+        columns = [('id', 'bigint', 'NO', 'nextval')]
+        columns += [(candidates[0], None, 'YES', None) for candidates in COLUMN_ALIASES[table].values()]
+        return cls(table, columns)
+
+    def lines(self, rows, first_id):
+        tail = [copy_escape(v) for _, v in self.fillers]
+        for i, row in enumerate(rows):
+            values = [str(first_id + i)] + [copy_escape(row.get(logical)) for logical, _ in self.mapping] + tail
+            yield '\t'.join(values) + '\n'
+
+    def copy_sql(self):
+        cols = ', '.join(f'"{c}"' for c in self.columns)
+        return f'COPY "{self.table}" ({cols}) FROM STDIN'
+
+
+def chunks(lines, size):
+    buffer = []
+    for line in lines:
+        buffer.append(line)
+        if len(buffer) >= size:
+            yield ''.join(buffer), len(buffer)
+            buffer = []
+    if buffer:
+        yield ''.join(buffer), len(buffer)
+
+
+class _ChunkReader:
+    """Файлоподобный поток для psycopg2.copy_expert поверх генератора порций"""
+
+    def __init__(self, parts, on_chunk):
+        self.parts = parts
+        self.on_chunk = on_chunk
+        self.pending = ''
+
+    def read(self, size=-1):
+        while size < 0 or len(self.pending) < size:
+            try:
+                text, count = next(self.parts)
+            except StopIteration:
+                break
+            self.pending += text
+            self.on_chunk(count)
+        if size < 0:
+            data, self.pending = self.pending, ''
+        else:
+            data, self.pending = self.pending[:size], self.pending[size:]
+        return data
+
+    readline = read
+
+
+class Database:
+    def __init__(self, dsn):
+        if psycopg is not None:
+            self.conn = psycopg.connect(dsn)
+        elif psycopg2 is not None:
+            self.conn = psycopg2.connect(dsn)
+        else:
+            raise RuntimeError('Нужен драйвер PostgreSQL: pip install "psycopg[binary]" (или psycopg2-binary)')
+
+    def query(self, sql, params=None):
+        with self.conn.cursor() as cur:
+            cur.execute(sql, params)
+            return cur.fetchall() if cur.description else []
+
+    def columns(self, table):
+        return self.query(
+            'SELECT column_name, data_type, is_nullable, column_default FROM information_schema.columns '
+            'WHERE table_schema = current_schema() AND table_name = %s ORDER BY ordinal_position', (table,))
+
+    def next_id(self, table):
+        return self.query(f'SELECT COALESCE(MAX(id), 0) + 1 FROM "{table}"')[0][0]
+
+    def copy(self, sql, parts, on_chunk):
+        with self.conn.cursor() as cur:
+            if psycopg is not None:
+                with cur.copy(sql) as copy:
+                    for text, count in parts:
+                        copy.write(text)
+                        on_chunk(count)
+            else:
+                cur.copy_expert(sql, _ChunkReader(iter(parts), on_chunk), size=1 << 20)
+
+    def finish_table(self, table):
+        self.query(f"SELECT setval(pg_get_serial_sequence('\"{table}\"', 'id'), "
+                   f'(SELECT COALESCE(MAX(id), 1) FROM "{table}"))')
+        self.conn.commit()
+
+
+class Seeder:
+    def __init__(self, args, db=None):
+        self.args = args
+        self.db = db
+        self.first_ids = {}
+        self.dumped = []
+
+    def layout(self, table):
+        if self.db is None:
+            return TableLayout.assumed(table)
+        return TableLayout(table, self.db.columns(table))
+
+    def first_id(self, table):
+        if table not in self.first_ids:
+            self.first_ids[table] = self.db.next_id(table) if self.db is not None else 1
+        return self.first_ids[table]
+
+    def load(self, table, rows):
+        layout = self.layout(table)
+        first_id = self.first_id(table)
+        parts = chunks(layout.lines(rows, first_id), self.args.chunk_rows)
+        started = time.perf_counter()
+        loaded = 0
+
+        def progress(count):
+            nonlocal loaded
+            loaded += count
+            elapsed = max(time.perf_counter() - started, 1e-9)
+            print(f"\r  {table:<18} {loaded:>12,} строк  {loaded / elapsed:>10,.0f} строк/с", end='', flush=True)
+
+        if self.db is None:
+            path = os.path.join(self.args.dump, f"{table}.tsv")
+            with open(path, 'w', encoding='utf-8') as f:
+                for text, count in parts:
+                    f.write(text)
+                    progress(count)
+            self.dumped.append('\\' + layout.copy_sql().replace('STDIN', f"'{table}.tsv'"))
+        else:
+            self.db.copy(layout.copy_sql(), parts, progress)
+            self.db.finish_table(table)
+        print()
+        return loaded
+
+    def measure_unit_ids(self):
+        if self.db is not None:
+            ids = [row[0] for row in self.db.query('SELECT id FROM "_measureunit" ORDER BY id')]
+            if ids:
+                return ids
+        first = self.first_id('_measureunit')
+        count = self.load('_measureunit', gen_measure_units())
+        return list(range(first, first + count))
+
+    def run(self):
+        args = self.args
+        unit_ids = self.measure_unit_ids()
+        user0 = self.first_id('_user')
+        self.load('_user', gen_users(args, user0))
+        ingredient0 = self.first_id('_ingredient')
+        self.load('_ingredient', gen_ingredients(args, unit_ids))
+        step0 = self.first_id('_recipestep')
+        self.load('_recipestep', gen_steps(args))
+        recipe0 = self.first_id('_recipe')
+        self.load('_recipe', gen_recipes(args))
+        self.load('_recipesteplink', gen_step_links(args, recipe0, step0))
+        self.load('_recipeingredient', gen_recipe_ingredients(args, recipe0, ingredient0))
+        self.load('_comment', gen_comments(args, user0, recipe0))
+        self.load('_favorite', gen_favorites(args, user0, recipe0))
+        self.load('_freezer', gen_freezer(args, user0, ingredient0))
+        if self.db is None:
+            with open(os.path.join(args.dump, 'load.sql'), 'w', encoding='utf-8') as f:
+                f.write('\n'.join(self.dumped) + '\n')
+        elif args.analyze:
+            self.db.conn.autocommit = True
+            self.db.query('ANALYZE')
+
+
+def default_dsn():
+    env = os.environ
+    return (f"host={env.get('DATABASE_HOST', 'localhost')} port={env.get('DATABASE_PORT', '5433')} "
+            f"user={env.get('DATABASE_USER', 'food')} password={env.get('DATABASE_PASSWORD', 'yaigoo2E')} "
+            f"dbname={env.get('DATABASE_NAME', 'food')}")
+
+
+def main():
+    ap = argparse.ArgumentParser(description='Seed Food API database with a large synthetic catalogue')
+    ap.add_argument('--dsn', default=None, help='Строка подключения (по умолчанию из DATABASE_*)')
+    ap.add_argument('--scale', choices=SCALES, default='small', help='Готовый набор размеров')
+    for name in SCALES['small']:
+        ap.add_argument(f"--{name.replace('_', '-')}", type=int, help=f"Переопределить число строк ({name})")
+    ap.add_argument('--seed', type=int, default=1, help='Seed генератора: одинаковый seed — одинаковые данные')
+    ap.add_argument('--chunk-rows', type=int, default=DEFAULT_CHUNK_ROWS, help='Строк в одной порции COPY')
+    ap.add_argument('--dump', metavar='DIR',
+                    help='Записать данные в DIR/*.tsv и DIR/load.sql (для psql -f) вместо загрузки в базу')
+    ap.add_argument('--no-analyze', dest='analyze', action='store_false', help='Не запускать ANALYZE после загрузки')
+    args = ap.parse_args()
+
+    for name, value in SCALES[args.scale].items():
+        if getattr(args, name) is None:
+            setattr(args, name, value)
+    if min(args.users, args.recipes, args.steps, args.ingredients) < 1:
+        ap.error('users, recipes, steps и ingredients должны быть больше нуля')
+
+    print(f"Каталог: {args.recipes:,} рецептов, {args.recipe_ingredients:,} связей с ингредиентами, "
+          f"{args.comments:,} комментариев, seed={args.seed}")
+    started = time.perf_counter()
+    if args.dump:
+        os.makedirs(args.dump, exist_ok=True)
+        Seeder(args).run()
+    else:
+        try:
+            db = Database(args.dsn or default_dsn())
+        except RuntimeError as e:
+            print(e)
+            sys.exit(2)
+        Seeder(args, db).run()
+    print(f"Готово за {time.perf_counter() - started:.1f} с")
+
+
+if __name__ == '__main__':
+    main()
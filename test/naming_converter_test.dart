@@ -0,0 +1,69 @@
+import 'package:foodapi/utils/naming_converter.dart';
+import 'package:test/test.dart';
+
+void main() {
+  setUp(NamingConverter.clearCache);
+
+  test("key conversion matches the regex-based rules", () {
+    expect(NamingConverter.camelToSnake('avatarUrl'), 'avatar_url');
+    expect(NamingConverter.camelToSnake('ABC'), '_a_b_c');
+    expect(NamingConverter.camelToSnake('id'), 'id');
+    expect(NamingConverter.snakeToCamel('first_name'), 'firstName');
+    expect(NamingConverter.snakeToCamel('a__b'), 'aB');
+    expect(NamingConverter.snakeToCamel('_private'), 'Private');
+    expect(NamingConverter.snakeToCamel('имя_поля'), 'имяПоля');
+  });
+
+  test("converted keys are memoized", () {
+    NamingConverter.camelToSnake('caloriesForUnit');
+    NamingConverter.camelToSnake('caloriesForUnit');
+    NamingConverter.snakeToCamel('calories_for_unit');
+    expect(NamingConverter.cachedKeys, 2);
+  });
+
+  test("maps already in camelCase are returned without copying", () {
+    final body = {
+      'id': 1,
+      'measureunit': {'id': 2, 'one': 'г'},
+      'tags': [
+        {'id': 3},
+        'x',
+      ],
+    };
+    expect(identical(NamingConverter.convertMapKeysToCamel(body), body), isTrue);
+    expect(identical(NamingConverter.convertResponseToCamelCase([body]).first, body), isTrue);
+  });
+
+  test("only changed branches are rebuilt", () {
+    final unit = {'id': 2, 'one': 'г'};
+    final body = {
+      'id': 1,
+      'measureunit': unit,
+      'recipe_links': [
+        {'recipe_id': 5},
+      ],
+    };
+    final converted = NamingConverter.convertMapKeysToCamel(body);
+    expect(converted, {
+      'id': 1,
+      'measureunit': {'id': 2, 'one': 'г'},
+      'recipeLinks': [
+        {'recipeId': 5},
+      ],
+    });
+    expect(identical(converted['measureunit'], unit), isTrue);
+    expect(body.containsKey('recipe_links'), isTrue);
+  });
+
+  test("key map covers both cases and falls back for unknown keys", () {
+    final keys = KeyMap(['caloriesForUnit', 'avatar_url']);
+    expect(keys.toSnake('caloriesForUnit'), 'calories_for_unit');
+    expect(keys.toCamel('calories_for_unit'), 'caloriesForUnit');
+    expect(keys.toCamel('avatar_url'), 'avatarUrl');
+    expect(keys.toCamel('first_name'), 'firstName');
+    expect(
+      NamingConverter.convertMapKeysToSnake({'caloriesForUnit': 1.5, 'measureUnitId': 2}, keys: keys),
+      {'calories_for_unit': 1.5, 'measure_unit_id': 2},
+    );
+  });
+}
@@ -0,0 +1,44 @@
+import 'package:foodapi/utils/step_order.dart';
+import 'package:test/test.dart';
+
+void main() {
+  test("move into a free slot changes one link", () {
+    final order = StepOrder({1: 10, 2: 20, 3: 30});
+    expect(order.move(3, before: 2), {3: 15});
+    expect(order.move(1, after: 3), {1: 31});
+  });
+
+  test("move in dense numbering shifts only the affected range", () {
+    final order = StepOrder({1: 1, 2: 2, 3: 3, 4: 4, 5: 5, 6: 6});
+    expect(order.move(5, before: 3), {5: 3, 3: 4, 4: 5});
+    expect(order.move(2, after: 4), {2: 5, 5: 6, 6: 7});
+  });
+
+  test("move to the front uses number 0 instead of shifting every link", () {
+    final order = StepOrder({1: 1, 2: 2, 3: 3, 4: 4});
+    expect(order.move(4, before: 1), {4: 0});
+  });
+
+  test("move without room respaces the recipe when gap is set", () {
+    final order = StepOrder({1: 10, 2: 11, 3: 20});
+    expect(order.move(3, before: 2, gap: 10), {2: 30});
+  });
+
+  test("move to the current position changes nothing", () {
+    final order = StepOrder({1: 1, 2: 2, 3: 3});
+    expect(order.move(2, after: 1), isEmpty);
+  });
+
+  test("assign rejects duplicate numbers", () {
+    final order = StepOrder({1: 1, 2: 2, 3: 3});
+    expect(order.assign({1: 3, 3: 1}), {1: 3, 3: 1});
+    expect(() => order.assign({1: 2}), throwsA(isA<StepOrderException>()));
+  });
+
+  test("respace keeps the order and skips unchanged links", () {
+    final order = StepOrder({5: 1, 6: 1, 7: 7});
+    expect(order.order, [5, 6, 7]);
+    expect(order.respace(gap: 10), {5: 10, 6: 20, 7: 30});
+    expect(order.respace(), {6: 2, 7: 3});
+  });
+}
@@ -0,0 +1,64 @@
+import 'package:foodapi/utils/token_cache.dart';
+import 'package:test/test.dart';
+
+void main() {
+  late DateTime now;
+  late TokenCache<String> cache;
+
+  setUp(() {
+    now = DateTime(2025, 1, 1);
+    cache = TokenCache<String>(
+      maxEntries: 2,
+      ttl: const Duration(seconds: 60),
+      negativeTtl: const Duration(seconds: 5),
+      clock: () => now,
+    );
+  });
+
+  test("hit after put, miss after ttl", () {
+    cache.put('t1', 'alice', userId: 1);
+    expect(cache.lookup('t1')?.value, 'alice');
+    now = now.add(const Duration(seconds: 61));
+    expect(cache.lookup('t1'), isNull);
+    expect(cache.hits, 1);
+    expect(cache.misses, 1);
+  });
+
+  test("unknown tokens are cached with a shorter ttl", () {
+    cache.put('bad', null);
+    final entry = cache.lookup('bad');
+    expect(entry, isNotNull);
+    expect(entry!.value, isNull);
+    expect(cache.negativeHits, 1);
+    now = now.add(const Duration(seconds: 6));
+    expect(cache.lookup('bad'), isNull);
+  });
+
+  test("least recently used token is evicted", () {
+    cache.put('t1', 'alice', userId: 1);
+    cache.put('t2', 'bob', userId: 2);
+    cache.lookup('t1');
+    cache.put('t3', 'carol', userId: 3);
+    expect(cache.lookup('t2'), isNull);
+    expect(cache.lookup('t1')?.value, 'alice');
+    expect(cache.evictions, 1);
+  });
+
+  test("invalidateUser drops user tokens and notifies other isolates", () {
+    final notified = <int>[];
+    cache.onUserInvalidated = notified.add;
+    cache.put('t1', 'alice', userId: 1);
+    cache.invalidateUser(1);
+    expect(cache.lookup('t1'), isNull);
+    expect(notified, [1]);
+    cache.invalidateUser(1, broadcast: false);
+    expect(notified, [1]);
+  });
+
+  test("result fetched before invalidation is not cached", () {
+    final generation = cache.generation;
+    cache.invalidateUser(1);
+    cache.put('t1', 'alice', userId: 1, generation: generation);
+    expect(cache.lookup('t1'), isNull);
+  });
+}
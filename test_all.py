@@ -1,21 +1,132 @@
 #!/usr/bin/env python3
+"""
+Запуск интеграционных тестов API.
+
+Наборы test_*_api.py запускаются отдельными процессами. С --jobs N они идут
+параллельно, а их вывод печатается построчно с префиксом набора, так что
+общее время равно времени самого долгого набора. --shard i/n оставляет
+i-ю из n частей списка для запуска на нескольких машинах. Время каждого
+набора пишется в отчёт (--junit, --json).
+
+Все наборы одного прогона получают общий TEST_RUN_ID (см. run_names.py).
+
+Пример:
+    python3 test_all.py http://localhost:8888 --user-id 1 --jobs 8 --junit report.xml
+"""
+
 import argparse
+import json
+import os
 import subprocess
 import sys
+import threading
+import time
+import uuid
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
+
+from foodapi_client import FoodApiClient
+
+FAIL_MARK = '❌ FAIL'
+
+
+class SuiteResult:
+    __slots__ = ('name', 'cmd', 'ok', 'returncode', 'seconds', 'output')
+
+    def __init__(self, name, cmd, ok, returncode, seconds, output):
+        self.name = name
+        self.cmd = cmd
+        self.ok = ok
+        self.returncode = returncode
+        self.seconds = seconds
+        self.output = output
+
+
+def suite_name(cmd):
+    return os.path.splitext(os.path.basename(cmd[1]))[0]
 
 
-def run_cmd(cmd):
-    p = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
-    out = p.stdout
-    print(out)
-    failed = (p.returncode != 0) or ('❌ FAIL' in out)
-    return (not failed), out
+def run_cmd(cmd, env, prefix=None, print_lock=None):
+    """Запускает набор; с prefix печатает вывод построчно по мере появления"""
+    started = time.perf_counter()
+    if prefix is None:
+        p = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, env=env)
+        out = p.stdout
+        print(out)
+        returncode = p.returncode
+    else:
+        lines = []
+        with subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True,
+                              env=env, bufsize=1) as p:
+            for line in p.stdout:
+                lines.append(line)
+                with print_lock:
+                    print(f"[{prefix}] {line}", end='', flush=True)
+        returncode = p.returncode
+        out = ''.join(lines)
+    seconds = time.perf_counter() - started
+    failed = (returncode != 0) or (FAIL_MARK in out)
+    return SuiteResult(suite_name(cmd), cmd, not failed, returncode, seconds, out)
+
+
+def sweep(base, run_id):
+    """Удаляет рецепты прогона, которые наборы не успели убрать (упали на середине).
+    Имена всех тестовых сущностей содержат run_id, так что хватает одного DELETE /recipe"""
+    try:
+        deleted = FoodApiClient(base).delete_recipes(search=run_id)
+    except Exception as e:
+        print(f"Sweep failed: {e}")
+        return
+    if deleted:
+        print(f"Swept {len(deleted)} leftover recipes of run {run_id}")
+
+
+def parse_shard(value):
+    try:
+        index, count = (int(x) for x in value.split('/'))
+    except ValueError:
+        raise argparse.ArgumentTypeError('ожидается i/n, например 1/3')
+    if count < 1 or not 1 <= index <= count:
+        raise argparse.ArgumentTypeError('нужно 1 <= i <= n')
+    return index, count
+
+
+def write_junit(path, results, wall_time):
+    failures = sum(1 for r in results if not r.ok)
+    suite = ET.Element('testsuite', name='api-integration', tests=str(len(results)),
+                       failures=str(failures), time=f"{wall_time:.3f}")
+    for r in results:
+        case = ET.SubElement(suite, 'testcase', classname='api', name=r.name, time=f"{r.seconds:.3f}")
+        if not r.ok:
+            failure = ET.SubElement(case, 'failure', message=f"exit code {r.returncode}")
+            failure.text = '\n'.join(line for line in r.output.splitlines() if FAIL_MARK in line) or r.output[-4000:]
+        ET.SubElement(case, 'system-out').text = r.output
+    ET.ElementTree(suite).write(path, encoding='utf-8', xml_declaration=True)
+
+
+def write_json(path, results, wall_time, run_id, shard):
+    report = {
+        'runId': run_id,
+        'shard': f"{shard[0]}/{shard[1]}",
+        'wallTime': round(wall_time, 3),
+        'passed': sum(1 for r in results if r.ok),
+        'total': len(results),
+        'suites': [{'name': r.name, 'cmd': r.cmd, 'ok': r.ok, 'returncode': r.returncode,
+                    'seconds': round(r.seconds, 3)} for r in results],
+    }
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
 
 
 def main():
     ap = argparse.ArgumentParser(description='Run API integration tests')
     ap.add_argument('base_url', nargs='?', default='https://foodapi.dzolotov.pro')
     ap.add_argument('--user-id', type=int, help='Existing user id for favorites/comments/freezer tests')
+    ap.add_argument('--jobs', '-j', type=int, default=1, help='Сколько наборов запускать параллельно')
+    ap.add_argument('--shard', type=parse_shard, default=(1, 1), metavar='i/n',
+                    help='Запустить только i-ю из n частей наборов')
+    ap.add_argument('--junit', metavar='PATH', help='Записать JUnit XML отчёт')
+    ap.add_argument('--json', metavar='PATH', help='Записать JSON отчёт')
     args = ap.parse_args()
 
     base = args.base_url
@@ -37,17 +148,41 @@ def main():
     # Always include protected flow (creates own user and token)
     jobs.append(['python3', 'test_user_protected_api.py', base])
 
-    total = 0
-    passed = 0
-    for cmd in jobs:
-        print('=' * 60)
-        print('RUN', ' '.join(cmd))
-        ok, _ = run_cmd(cmd)
-        total += 1
-        passed += 1 if ok else 0
+    index, count = args.shard
+    jobs = jobs[index - 1::count]
+
+    run_id = os.environ.get('TEST_RUN_ID') or uuid.uuid4().hex[:8]
+    env = dict(os.environ, TEST_RUN_ID=run_id, PYTHONUNBUFFERED='1')
+    print(f"RUN ID {run_id}, shard {index}/{count}: {len(jobs)} suites, jobs={args.jobs}")
+
+    started = time.perf_counter()
+    if args.jobs > 1:
+        print_lock = threading.Lock()
+        width = max((len(suite_name(cmd)) for cmd in jobs), default=0)
+        with ThreadPoolExecutor(args.jobs) as pool:
+            results = list(pool.map(
+                lambda cmd: run_cmd(cmd, env, suite_name(cmd).ljust(width), print_lock), jobs))
+    else:
+        results = []
+        for cmd in jobs:
+            print('=' * 60)
+            print('RUN', ' '.join(cmd))
+            results.append(run_cmd(cmd, env))
+    wall_time = time.perf_counter() - started
+    if count == 1:
+        sweep(base, run_id)
+
+    total = len(results)
+    passed = sum(1 for r in results if r.ok)
 
     print('\n' + '=' * 60)
-    print(f'SUMMARY: {passed}/{total} suites passed')
+    for r in results:
+        print(f"{'✅' if r.ok else '❌'} {r.name:<32} {r.seconds:>7.2f} s")
+    print(f'SUMMARY: {passed}/{total} suites passed in {wall_time:.2f} s')
+    if args.junit:
+        write_junit(args.junit, results, wall_time)
+    if args.json:
+        write_json(args.json, results, wall_time, run_id, args.shard)
     sys.exit(0 if passed == total else 1)
 
 
@@ -1,14 +1,17 @@
 #!/usr/bin/env python3
 """
-Интеграционный тест для комментариев: создание, получение, обновление и удаление.
+Интеграционный тест для комментариев: создание, получение (в том числе
+постранично и потоком), обновление и удаление.
 Требует существующего userId и создаёт временный рецепт.
 """
 
 import sys
-import time
-import requests
+
+from foodapi_client import FoodApiClient
+from run_names import unique_suffix
 
 BASE_URL = sys.argv[1] if len(sys.argv) > 1 else "https://foodapi.dzolotov.pro"
+api = FoodApiClient(BASE_URL)
 USER_ID = int(sys.argv[2]) if len(sys.argv) > 2 else None
 
 
@@ -21,8 +24,8 @@ def resolve_user_id() -> int | None:
 
 
 def create_recipe() -> int | None:
-    name = f"Comm Test Recipe {int(time.time())}"
-    r = requests.post(f"{BASE_URL}/recipe", json={"name": name, "duration": 300, "photo": "https://ex.com/p.jpg"})
+    name = f"Comm Test Recipe {unique_suffix()}"
+    r = api.post(f"/recipe", json={"name": name, "duration": 300, "photo": "https://ex.com/p.jpg"})
     if r.status_code == 200 and r.json().get("id"):
         rid = r.json()["id"]
         log("CREATE Recipe", True, f"id={rid}")
@@ -32,7 +35,7 @@ def create_recipe() -> int | None:
 
 
 def create_comment(user_id: int, recipe_id: int) -> int | None:
-    r = requests.post(f"{BASE_URL}/comment", json={
+    r = api.post(f"/comment", json={
         "userId": user_id,
         "recipeId": recipe_id,
         "text": "Great!",
@@ -47,28 +50,58 @@ def create_comment(user_id: int, recipe_id: int) -> int | None:
 
 
 def get_comment(cid: int) -> bool:
-    r = requests.get(f"{BASE_URL}/comment/{cid}")
+    r = api.get(f"/comment/{cid}")
     ok = r.status_code == 200 and r.json().get("id") == cid
     log("GET Comment", ok)
     return ok
 
 
+def list_pages(uid: int, rid: int, cid: int) -> bool:
+    """Страницы по cursor, потоковый JSON-массив и NDJSON отдают одно и то же"""
+    extra = [create_comment(uid, rid) for _ in range(2)]
+    if not all(extra):
+        log("LIST Comments pages", False, "could not create comments")
+        return False
+    expected = sorted([cid, *extra], reverse=True)
+
+    r = api.get("/comment", params={"recipeId": rid})
+    plain = [c["id"] for c in r.json()] if r.status_code == 200 else None
+
+    paged, cursor, pages = [], None, 0
+    while pages < 5:
+        page = api.page("/comment", limit=2, cursor=cursor, recipeId=rid)
+        paged += [c["id"] for c in page["data"]]
+        pages += 1
+        cursor = page["pagination"]["nextCursor"]
+        if not cursor:
+            break
+
+    streamed = [c["id"] for c in api.stream("/comment", recipeId=rid)]
+    bad = api.get("/comment", params={"cursor": "not-a-cursor"})
+
+    ok = plain == expected and paged == expected and streamed == expected and pages == 2 \
+        and bad.status_code == 400
+    log("LIST Comments pages", ok,
+        f"plain={plain} paged={paged} streamed={streamed} pages={pages} bad={bad.status_code}")
+    return ok
+
+
 def update_comment(cid: int) -> bool:
-    r = requests.put(f"{BASE_URL}/comment/{cid}", json={"text": "Updated"})
+    r = api.put(f"/comment/{cid}", json={"text": "Updated"})
     ok = r.status_code == 200 and r.json().get("text") == "Updated"
     log("UPDATE Comment", ok)
     return ok
 
 
 def delete_comment(cid: int) -> bool:
-    r = requests.delete(f"{BASE_URL}/comment/{cid}")
+    r = api.delete(f"/comment/{cid}")
     ok = r.status_code == 200
     log("DELETE Comment", ok)
     return ok
 
 
 def delete_recipe(rid: int) -> bool:
-    r = requests.delete(f"{BASE_URL}/recipe/{rid}")
+    r = api.delete(f"/recipe/{rid}")
     ok = r.status_code == 200
     log("DELETE Recipe", ok)
     return ok
@@ -91,6 +124,7 @@ def main():
         delete_recipe(rid)
         sys.exit(1)
     get_comment(cid)
+    list_pages(uid, rid, cid)
     update_comment(cid)
     delete_comment(cid)
     delete_recipe(rid)
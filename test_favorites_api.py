@@ -5,10 +5,12 @@
 """
 
 import sys
-import time
-import requests
+
+from foodapi_client import FoodApiClient
+from run_names import unique_suffix
 
 BASE_URL = sys.argv[1] if len(sys.argv) > 1 else "https://foodapi.dzolotov.pro"
+api = FoodApiClient(BASE_URL)
 USER_ID = int(sys.argv[2]) if len(sys.argv) > 2 else None
 
 
@@ -21,8 +23,8 @@ def resolve_user_id() -> int | None:
 
 
 def create_recipe() -> int | None:
-    name = f"Fav Test Recipe {int(time.time())}"
-    r = requests.post(f"{BASE_URL}/recipe", json={"name": name, "duration": 300, "photo": "https://ex.com/p.jpg"})
+    name = f"Fav Test Recipe {unique_suffix()}"
+    r = api.post(f"/recipe", json={"name": name, "duration": 300, "photo": "https://ex.com/p.jpg"})
     if r.status_code == 200 and r.json().get("id"):
         rid = r.json()["id"]
         log("CREATE Recipe", True, f"id={rid}")
@@ -32,7 +34,7 @@ def create_recipe() -> int | None:
 
 
 def add_favorite(user_id: int, recipe_id: int) -> int | None:
-    r = requests.post(f"{BASE_URL}/favorite", json={"userId": user_id, "recipeId": recipe_id})
+    r = api.post(f"/favorite", json={"userId": user_id, "recipeId": recipe_id})
     if r.status_code == 200 and r.json().get("id"):
         fid = r.json()["id"]
         log("CREATE Favorite", True, f"id={fid}")
@@ -42,21 +44,21 @@ def add_favorite(user_id: int, recipe_id: int) -> int | None:
 
 
 def list_all_favorites_contains(fid: int) -> bool:
-    r = requests.get(f"{BASE_URL}/favorite")
+    r = api.get(f"/favorite")
     ok = r.status_code == 200 and any(item.get('id') == fid for item in (r.json() if isinstance(r.json(), list) else []))
     log("GET Favorites includes created", ok)
     return ok
 
 
 def delete_favorite(fid: int) -> bool:
-    r = requests.delete(f"{BASE_URL}/favorite/{fid}")
+    r = api.delete(f"/favorite/{fid}")
     ok = r.status_code == 200
     log("DELETE Favorite", ok)
     return ok
 
 
 def delete_recipe(rid: int) -> bool:
-    r = requests.delete(f"{BASE_URL}/recipe/{rid}")
+    r = api.delete(f"/recipe/{rid}")
     ok = r.status_code == 200
     log("DELETE Recipe", ok)
     return ok
@@ -5,10 +5,12 @@
 """
 
 import sys
-import time
-import requests
+
+from foodapi_client import FoodApiClient
+from run_names import unique_suffix
 
 BASE_URL = sys.argv[1] if len(sys.argv) > 1 else "https://foodapi.dzolotov.pro"
+api = FoodApiClient(BASE_URL)
 USER_ID = int(sys.argv[2]) if len(sys.argv) > 2 else None
 
 
@@ -21,8 +23,8 @@ def resolve_user_id():
 
 
 def create_ingredient() -> int | None:
-    r = requests.post(f"{BASE_URL}/ingredient", json={
-        "name": f"Frz-{int(time.time())}",
+    r = api.post(f"/ingredient", json={
+        "name": f"Frz-{unique_suffix()}",
         "caloriesForUnit": 1.0
     })
     if r.status_code == 200 and r.json().get("id"):
@@ -34,7 +36,7 @@ def create_ingredient() -> int | None:
 
 
 def add_freezer(uid: int, iid: int) -> int | None:
-    r = requests.post(f"{BASE_URL}/freezer", json={
+    r = api.post(f"/freezer", json={
         "userId": uid,
         "ingredientId": iid,
         "count": 2.5
@@ -48,28 +50,28 @@ def add_freezer(uid: int, iid: int) -> int | None:
 
 
 def get_freezer(fid: int) -> bool:
-    r = requests.get(f"{BASE_URL}/freezer/{fid}")
+    r = api.get(f"/freezer/{fid}")
     ok = r.status_code == 200 and r.json().get("id") == fid
     log("GET Freezer Item", ok)
     return ok
 
 
 def update_freezer(fid: int) -> bool:
-    r = requests.put(f"{BASE_URL}/freezer/{fid}", json={"count": 5.0})
+    r = api.put(f"/freezer/{fid}", json={"count": 5.0})
     ok = r.status_code == 200 and abs(r.json().get("count", 0) - 5.0) < 1e-6
     log("UPDATE Freezer Item", ok)
     return ok
 
 
 def delete_freezer(fid: int) -> bool:
-    r = requests.delete(f"{BASE_URL}/freezer/{fid}")
+    r = api.delete(f"/freezer/{fid}")
     ok = r.status_code == 200
     log("DELETE Freezer Item", ok)
     return ok
 
 
 def delete_ingredient(iid: int) -> bool:
-    r = requests.delete(f"{BASE_URL}/ingredient/{iid}")
+    r = api.delete(f"/ingredient/{iid}")
     ok = r.status_code == 200
     log("DELETE Ingredient", ok)
     return ok
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Тесты разбора строк ингредиентов (ingredient_tokenizer.py) и подсчёта
+количеств для импорта (import_recipes.ingredient_counts).
+
+Работают без сервера: единицы измерения — встроенный набор из
+bench_ingredient_tokenizer.py.
+
+    python3 test_ingredient_tokenizer.py
+"""
+
+import sys
+from collections import namedtuple
+
+from bench_ingredient_tokenizer import SAMPLE_UNITS
+from import_recipes import SKIP_NO_NAME, SKIP_UNIT, ingredient_counts, stored_count
+from ingredient_tokenizer import IngredientTokenizer
+
+GRAM, KILOGRAM, TABLESPOON, TEASPOON, PIECE, MILLILITER, LITER, GLASS = 1, 2, 3, 4, 5, 6, 7, 8
+
+Expected = namedtuple('Expected', 'name quantity quantity_max unit_id')
+
+TOKENIZE_CASES = {
+    # дроби и десятичные
+    "½ ч. л. соли": Expected("соли", 0.5, 0.5, TEASPOON),
+    "Сахар 1 1/2 стакана": Expected("Сахар", 1.5, 1.5, GLASS),
+    "Мука — 1/2 стакана": Expected("Мука", 0.5, 0.5, GLASS),
+    "1,5 кг картофеля": Expected("картофеля", 1.5, 1.5, KILOGRAM),
+    "Перец 2½ шт": Expected("Перец", 2.5, 2.5, PIECE),
+    # диапазоны — только без пробелов вокруг дефиса
+    "Яйца — 2-3 шт.": Expected("Яйца", 2.5, 3.0, PIECE),
+    "Лук 1–2 шт": Expected("Лук", 1.5, 2.0, PIECE),
+    # проценты и числа в названии
+    "Молоко 3,2% — 500 мл": Expected("Молоко 3,2%", 500.0, 500.0, MILLILITER),
+    "Сливки 33% — 200 мл": Expected("Сливки 33%", 200.0, 200.0, MILLILITER),
+    "Яйцо С1 — 2 шт": Expected("Яйцо С1", 2.0, 2.0, PIECE),
+    "Масло 82,5% 100 г": Expected("Масло 82,5%", 100.0, 100.0, GRAM),
+    # только количество и единица
+    "200 гр.": Expected("", 200.0, 200.0, GRAM),
+    "1 ст. л.": Expected("", 1.0, 1.0, TABLESPOON),
+    # сокращения и формы единиц
+    "200 гр. муки": Expected("муки", 200.0, 200.0, GRAM),
+    "Мука — 200г": Expected("Мука", 200.0, 200.0, GRAM),
+    "Мёд 2 ст.л.": Expected("Мёд", 2.0, 2.0, TABLESPOON),
+    "Вода — 1 л": Expected("Вода", 1.0, 1.0, LITER),
+    "Чеснок 3 зубчика": Expected("Чеснок", 3.0, 3.0, 9),
+    # без единицы и без количества
+    "Яйца 2": Expected("Яйца", 2.0, 2.0, None),
+    "Соль по вкусу": Expected("Соль по вкусу", None, None, None),
+    "   ": Expected("", None, None, None),
+}
+
+
+def log(name: str, ok: bool, msg: str = ""):
+    print(f"{'✅ PASS' if ok else '❌ FAIL'} | {name}{(' | ' + msg) if msg else ''}")
+
+
+def tokenize_lines(tokenizer):
+    ok = True
+    for line, expected in TOKENIZE_CASES.items():
+        parsed = tokenizer.tokenize(line)
+        got = Expected(parsed.name, parsed.quantity, parsed.quantity_max, parsed.unit_id)
+        passed = got == expected
+        log(f"TOKENIZE {line.strip() or '<blank>'}", passed, "" if passed else f"got {got}")
+        ok = ok and passed
+    return ok
+
+
+def counts(tokenizer):
+    """Суммы по ингредиенту в его единице, пропуск строк без названия и в чужой единице"""
+    ids = {"мука": 10, "сахар": 11, "яйца": 12}
+    units = {10: GRAM, 11: TEASPOON, 12: PIECE}
+    lines = ["Мука — 200 г", "Мука — 100 гр.", "Мука — 1 стакан", "Сахар ½ ч. л.",
+             "Яйца 2", "Яйца — 1-2 шт.", "200 гр.", "", "  "]
+    got, skipped = ingredient_counts(tokenizer.tokenize_batch(lines), ids, units.get)
+
+    ok = got == {10: 300, 11: 1, 12: 4}
+    log("COUNTS same unit summed and rounded", ok, f"counts={got}")
+    expected_skipped = [("Мука — 1 стакан", SKIP_UNIT), ("200 гр.", SKIP_NO_NAME)]
+    passed = skipped == expected_skipped
+    log("COUNTS skipped lines reported", passed, f"skipped={skipped}")
+    ok = ok and passed
+
+    passed = [stored_count(q) for q in (0.5, 1.5, 2.4, 3.25)] == [1, 2, 2, 3]
+    log("COUNTS stored_count rounding", passed)
+    return ok and passed
+
+
+def main():
+    tokenizer = IngredientTokenizer(SAMPLE_UNITS)
+    results = [tokenize_lines(tokenizer), counts(tokenizer)]
+    sys.exit(0 if all(results) else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -4,10 +4,12 @@
 """
 
 import sys
-import time
-import requests
+
+from foodapi_client import FoodApiClient
+from run_names import unique_suffix
 
 BASE_URL = sys.argv[1] if len(sys.argv) > 1 else "https://foodapi.dzolotov.pro"
+api = FoodApiClient(BASE_URL)
 
 
 def log(name: str, ok: bool, msg: str = ""):
@@ -15,8 +17,8 @@ def log(name: str, ok: bool, msg: str = ""):
 
 
 def create_measure_unit():
-    name = str(int(time.time()))
-    r = requests.post(f"{BASE_URL}/measure_unit", json={
+    name = unique_suffix()
+    r = api.post(f"/measure_unit", json={
         "one": f"one-{name}",
         "few": f"few-{name}",
         "many": f"many-{name}"
@@ -26,15 +28,15 @@ def create_measure_unit():
     return r.json().get("id") if ok else None
 
 def list_measure_units():
-    r = requests.get(f"{BASE_URL}/measure_unit")
+    r = api.get(f"/measure_unit")
     ok = r.status_code == 200 and isinstance(r.json(), list)
     log("LIST MeasureUnits", ok)
     return ok
 
 
 def create_ingredient(mu_id: int):
-    r = requests.post(f"{BASE_URL}/ingredient", json={
-        "name": f"Ing-{int(time.time())}",
+    r = api.post(f"/ingredient", json={
+        "name": f"Ing-{unique_suffix()}",
         "caloriesForUnit": 1.23,
         "measureUnit": {"id": mu_id}
     })
@@ -44,35 +46,49 @@ def create_ingredient(mu_id: int):
 
 
 def get_ingredient(iid: int):
-    r = requests.get(f"{BASE_URL}/ingredient/{iid}")
+    r = api.get(f"/ingredient/{iid}")
     ok = r.status_code == 200 and r.json().get("id") == iid
     log("GET Ingredient", ok)
     return ok
 
 
+def list_ingredients_conditional(iid: int):
+    """Весь список без limit отдаётся из кеша с ETag и 304, NDJSON — потоком"""
+    r = api.get("/ingredient")
+    etag = r.headers.get("ETag")
+    ids = [i["id"] for i in r.json()] if r.status_code == 200 else []
+    again = api.get("/ingredient", headers={"If-None-Match": etag or ""})
+    # Параллельные наборы могут поменять справочник между запросами: тогда 200 с новым ETag
+    revalidated = again.status_code == 304 or (again.status_code == 200 and again.headers.get("ETag") != etag)
+    streamed = [i["id"] for i in api.stream("/ingredient")]
+    ok = iid in ids and bool(etag) and revalidated and iid in streamed
+    log("LIST Ingredients (ETag/304, NDJSON)", ok, f"etag={etag} status={again.status_code}")
+    return ok
+
+
 def update_ingredient(iid: int):
-    r = requests.put(f"{BASE_URL}/ingredient/{iid}", json={"name": "UpdatedName"})
+    r = api.put(f"/ingredient/{iid}", json={"name": "UpdatedName"})
     ok = r.status_code == 200 and r.json().get("name") == "UpdatedName"
     log("UPDATE Ingredient", ok)
     return ok
 
 
 def try_delete_measure_unit(mu_id: int):
-    r = requests.delete(f"{BASE_URL}/measure_unit/{mu_id}")
+    r = api.delete(f"/measure_unit/{mu_id}")
     ok = r.status_code == 409
     log("DELETE MeasureUnit (in-use -> conflict)", ok)
     return ok
 
 
 def delete_ingredient(iid: int):
-    r = requests.delete(f"{BASE_URL}/ingredient/{iid}")
+    r = api.delete(f"/ingredient/{iid}")
     ok = r.status_code == 200
     log("DELETE Ingredient", ok)
     return ok
 
 
 def delete_measure_unit(mu_id: int):
-    r = requests.delete(f"{BASE_URL}/measure_unit/{mu_id}")
+    r = api.delete(f"/measure_unit/{mu_id}")
     ok = r.status_code == 200
     log("DELETE MeasureUnit", ok)
     return ok
@@ -93,6 +109,7 @@ def main():
         delete_measure_unit(mu)
         sys.exit(1)
     get_ingredient(ing)
+    list_ingredients_conditional(ing)
     update_ingredient(ing)
     try_delete_measure_unit(mu)
     delete_ingredient(ing)
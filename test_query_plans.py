@@ -0,0 +1,525 @@
+#!/usr/bin/env python3
+"""
+Регрессионные тесты планов запросов.
+
+Каждый кейс — SQL, который выполняет контроллер (в кейсе указан источник),
+с параметрами из засеянной базы. Запрос выполняется под
+EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) в транзакции, которая потом
+откатывается, и кейс падает, если:
+
+- какая-то из его таблиц читается Seq Scan;
+- оценка стоимости плана (Total Cost) или число прочитанных страниц
+  (shared hit + read) больше бюджета кейса.
+
+Бюджеты подобраны для каталога seed_catalogue.py --scale small и medium;
+для large их можно ослабить через --budget-scale. На почти пустой базе
+планировщик законно выбирает Seq Scan, поэтому набор требует не меньше
+--min-recipes рецептов. Подключение — как у seed_catalogue.py (DATABASE_*
+или --dsn), нужен psycopg или psycopg2.
+
+Перед EXPLAIN каждый кейс сверяется с кодом, который он повторяет
+(check_source): SQL из контроллера должен собираться из строковых литералов
+указанного метода, а для запросов ORM — на месте должны быть вызовы
+построителя, из которых выведен SQL кейса. Расхождение — провал набора ещё
+до подключения к базе; --sources-only делает только эту сверку.
+
+Пример:
+    python3 seed_catalogue.py --scale small --seed 42
+    python3 test_query_plans.py --json plans.json
+    python3 test_query_plans.py --sources-only
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+import uuid
+
+from seed_catalogue import Database, default_dsn
+
+
+class PlanCase:
+    """SQL кейса и место в коде, откуда он взят.
+
+    source — "путь к .dart [метод или класс]". Если pins пуст, sql должен
+    собираться из строковых литералов этой области кода (см. check_source).
+    Запросы, которые строит ORM Conduit, в коде текстом не встречаются: для
+    них pins — вызовы построителя (where/sortBy/join/fetchLimit), из которых
+    выведены условия, порядок и соединения sql, и проверяется, что эти
+    вызовы на месте. params — значения, которые подставляет сам код (limit).
+    """
+
+    __slots__ = ('name', 'source', 'sql', 'tables', 'max_cost', 'max_buffers', 'params', 'pins')
+
+    def __init__(self, name, source, sql, tables, max_cost, max_buffers, params=None, pins=()):
+        self.name = name
+        self.source = source
+        self.sql = sql
+        self.tables = tables
+        self.max_cost = max_cost
+        self.max_buffers = max_buffers
+        self.params = params or {}
+        self.pins = list(pins)
+
+
+# Параметры кейсов: первая подходящая строка засеянной базы
+PARAMS_SQL = {
+    'recipe': 'SELECT recipe_id FROM _recipesteplink WHERE recipe_id IS NOT NULL ORDER BY id LIMIT 1',
+    'recipe_name': 'SELECT name FROM _recipe WHERE name IS NOT NULL ORDER BY id LIMIT 1',
+    'step': 'SELECT step_id FROM _recipesteplink WHERE step_id IS NOT NULL ORDER BY id LIMIT 1',
+    'ingredient': 'SELECT ingredient_id FROM _recipeingredient WHERE ingredient_id IS NOT NULL ORDER BY id LIMIT 1',
+    'ingredient_name': 'SELECT name FROM _ingredient ORDER BY id LIMIT 1',
+    'comment_user': 'SELECT user_id FROM _comment WHERE user_id IS NOT NULL ORDER BY id LIMIT 1',
+    'favorite_user': 'SELECT user_id FROM _favorite WHERE user_id IS NOT NULL ORDER BY id LIMIT 1',
+    'favorite_recipe': 'SELECT recipe_id FROM _favorite WHERE user_id IS NOT NULL ORDER BY id LIMIT 1',
+    'freezer_user': 'SELECT user_id FROM _freezer WHERE user_id IS NOT NULL ORDER BY id LIMIT 1',
+    'freezer_ingredient': 'SELECT ingredient_id FROM _freezer WHERE user_id IS NOT NULL ORDER BY id LIMIT 1',
+    'login': 'SELECT login FROM _user WHERE login IS NOT NULL ORDER BY id LIMIT 1',
+}
+
+WORD = re.compile(r'\w+')
+
+# Страница CollectionPage по умолчанию — пачка batchSize + 1 строка
+BATCH = {'limit': 501}
+# RecipeSearch и FreezerMatcher: первая страница по 20
+SEARCH_PAGE = {'limit': 20, 'offset': 0}
+
+FREEZER_MATCH_SQL = (
+    "WITH have AS (SELECT ingredient_id, sum(count) AS amount FROM _freezer "
+    "WHERE user_id = CAST(%(freezer_user)s AS int8) AND ingredient_id IS NOT NULL GROUP BY ingredient_id), "
+    "matched AS (SELECT ri.recipe_id, count(*) AS present FROM have h "
+    "JOIN _recipeingredient ri ON ri.ingredient_id = h.ingredient_id "
+    "WHERE ri.recipe_id IS NOT NULL GROUP BY ri.recipe_id) "
+    "SELECT id, name, duration, photo, present, total, coverage FROM ("
+    "SELECT r.id, r.name, r.duration, r.photo, m.present::int4 AS present, "
+    "GREATEST(r.ingredient_count, m.present)::int4 AS total, "
+    "m.present::float8 / GREATEST(r.ingredient_count, m.present) AS coverage "
+    "FROM matched m JOIN _recipe r ON r.id = m.recipe_id) hits "
+    "ORDER BY coverage DESC, id LIMIT %(limit)s OFFSET %(offset)s"
+)
+
+RECIPE_COLUMNS = '_recipe.id,_recipe.name,_recipe.duration,_recipe.photo'
+
+CASES = [
+    PlanCase('recipe page', 'lib/controllers/recipe_new.dart getAllRecipes',
+             f'SELECT {RECIPE_COLUMNS} FROM _recipe ORDER BY _recipe.id DESC LIMIT 21',
+             ['_recipe'], 100, 50,
+             pins=['..fetchLimit = pageSize + 1',
+                   '..sortBy((r) => r.id, QuerySortOrder.descending)']),
+    PlanCase('recipe page ?search=', 'lib/controllers/recipe_new.dart getAllRecipes',
+             f'SELECT {RECIPE_COLUMNS} FROM _recipe WHERE _recipe.name ILIKE %(name_pattern)s '
+             'ORDER BY _recipe.id DESC LIMIT 21',
+             ['_recipe'], 20000, 5000,
+             pins=['q.where((r) => r.name).contains(search, caseSensitive: false)',
+                   '..fetchLimit = pageSize + 1',
+                   '..sortBy((r) => r.id, QuerySortOrder.descending)']),
+    PlanCase('recipe by id', 'lib/controllers/recipe_new.dart getRecipeByID',
+             f'SELECT {RECIPE_COLUMNS} FROM _recipe WHERE _recipe.id = %(recipe)s',
+             ['_recipe'], 20, 10,
+             pins=['(Query<Recipe>(context)..where((r) => r.id).equalTo(id)).fetchOne()']),
+    PlanCase('recipe steps', 'lib/controllers/recipe_new.dart getRecipeByID',
+             'SELECT t0.id,t0.number,t0.recipe_id,t0.step_id,t1.id,t1.name,t1.duration '
+             'FROM _recipesteplink t0 LEFT OUTER JOIN _recipestep t1 ON t0.step_id=t1.id '
+             'WHERE t0.recipe_id = %(recipe)s ORDER BY t0.number ASC,t0.id ASC',
+             ['_recipesteplink', '_recipestep'], 500, 200,
+             pins=['..where((rsl) => rsl.recipe!.id).equalTo(id)',
+                   '..sortBy((rsl) => rsl.number, QuerySortOrder.ascending)',
+                   '..sortBy((rsl) => rsl.id, QuerySortOrder.ascending)',
+                   '..join(object: (rsl) => rsl.step)']),
+    PlanCase('recipe ingredients', 'lib/controllers/recipe_new.dart getRecipeByID',
+             'SELECT t0.id,t0.count,t0.ingredient_id,t0.recipe_id,'
+             't1.id,t1.name,t1.calories_for_unit,t1.measureunit_id,t2.id,t2.one,t2.few,t2.many '
+             'FROM _recipeingredient t0 LEFT OUTER JOIN _ingredient t1 ON t0.ingredient_id=t1.id '
+             'LEFT OUTER JOIN _measureunit t2 ON t1.measureunit_id=t2.id '
+             'WHERE t0.recipe_id = %(recipe)s ORDER BY t0.id ASC',
+             ['_recipeingredient', '_ingredient'], 1000, 300,
+             pins=['..where((ri) => ri.recipe!.id).equalTo(id)',
+                   '..sortBy((ri) => ri.id, QuerySortOrder.ascending)',
+                   '..join(object: (ri) => ri.ingredient)',
+                   '.join(object: (i) => i.measureunit)']),
+    PlanCase('recipe latest comments', 'lib/controllers/recipe_new.dart getRecipeByID',
+             'SELECT _comment.id,_comment.text,_comment.photo,_comment.date_time,'
+             '_comment.user_id,_comment.recipe_id FROM _comment WHERE _comment.recipe_id = %(recipe)s '
+             'ORDER BY _comment.date_time DESC,_comment.id DESC LIMIT 20',
+             ['_comment'], 200, 100,
+             pins=['..where((c) => c.recipe!.id).equalTo(id)',
+                   '..sortBy((c) => c.dateTime, QuerySortOrder.descending)',
+                   '..sortBy((c) => c.id, QuerySortOrder.descending)',
+                   '..fetchLimit = commentsCap']),
+    PlanCase('recipe comment count', 'lib/controllers/recipe_new.dart getRecipeByID',
+             'SELECT count(*) FROM _comment WHERE _comment.recipe_id = %(recipe)s',
+             ['_comment'], 2000, 500,
+             pins=['final commentCountQuery = Query<Comment>(context) ..where((c) => c.recipe!.id).equalTo(id);',
+                   'commentCountQuery.reduce.count()']),
+    PlanCase('search by name', 'lib/utils/recipe_search.dart RecipeSearch',
+             'SELECT r.id, r.name, r.duration, r.photo, 0::float8 FROM _recipe r '
+             'ORDER BY r.name, r.id LIMIT %(limit)s OFFSET %(offset)s',
+             ['_recipe'], 100, 50, params=SEARCH_PAGE),
+    PlanCase('search ranked', 'lib/utils/recipe_search.dart RecipeSearch',
+             "SELECT id, name, duration, photo, rank FROM ("
+             "SELECT r.id, r.name, r.duration, r.photo, "
+             "(coalesce(ts_rank(r.search_vector, to_tsquery('russian', %(tsquery)s)), 0) "
+             "+ similarity(r.name, CAST(%(text)s AS text)))::float8 AS rank FROM _recipe r "
+             "WHERE (r.search_vector @@ to_tsquery('russian', %(tsquery)s) OR r.name %% CAST(%(text)s AS text))"
+             ") hits ORDER BY rank DESC, id LIMIT %(limit)s OFFSET %(offset)s",
+             ['_recipe'], 50000, 20000, params=SEARCH_PAGE),
+    PlanCase('search by ingredient', 'lib/utils/recipe_search.dart RecipeSearch',
+             'SELECT r.id, r.name, r.duration, r.photo, 0::float8 FROM _recipe r '
+             'WHERE r.id IN (SELECT ri.recipe_id FROM _recipeingredient ri '
+             'WHERE ri.ingredient_id = CAST(%(ingredient)s AS int8)) '
+             'ORDER BY r.name, r.id LIMIT %(limit)s OFFSET %(offset)s',
+             ['_recipeingredient'], 50000, 20000, params=SEARCH_PAGE),
+    PlanCase('search by ingredient name', 'lib/utils/recipe_search.dart RecipeSearch',
+             'SELECT count(*) FROM _recipe r WHERE r.id IN (SELECT ri.recipe_id FROM _recipeingredient ri '
+             'WHERE ri.ingredient_id IN (SELECT i.id FROM _ingredient i '
+             'WHERE i.name ILIKE CAST(%(ingredient_pattern)s AS text) '
+             'OR i.name %% CAST(%(ingredient_word)s AS text)))',
+             ['_recipeingredient'], 200000, 50000),
+    PlanCase('freezer matches', 'lib/utils/freezer_matcher.dart FreezerMatcher',
+             FREEZER_MATCH_SQL, ['_freezer'], 200000, 50000, params=SEARCH_PAGE),
+    PlanCase('comments of recipe', 'lib/controllers/comment_new.dart getAllComments',
+             'SELECT c.id, c.text, c.photo, c.date_time, u.id as user_id, r.id as recipe_id, r.name '
+             'FROM _comment c JOIN _user u ON u.id = c.user_id JOIN _recipe r ON r.id = c.recipe_id '
+             'WHERE c.recipe_id = %(recipe)s ORDER BY c.date_time DESC, c.id DESC LIMIT %(limit)s',
+             ['_comment', '_user'], 5000, 2000, params=BATCH),
+    PlanCase('comments of user', 'lib/controllers/comment_new.dart getAllComments',
+             'SELECT c.id, c.text, c.photo, c.date_time, u.id as user_id, r.id as recipe_id, r.name '
+             'FROM _comment c JOIN _user u ON u.id = c.user_id JOIN _recipe r ON r.id = c.recipe_id '
+             'WHERE c.user_id = %(comment_user)s ORDER BY c.date_time DESC, c.id DESC LIMIT %(limit)s',
+             ['_comment', '_recipe'], 20000, 5000, params=BATCH),
+    PlanCase('comments stream batch', 'lib/controllers/comment_new.dart getAllComments',
+             'SELECT c.id, c.text, c.photo, c.date_time, u.id as user_id, r.id as recipe_id, r.name '
+             'FROM _comment c JOIN _user u ON u.id = c.user_id JOIN _recipe r ON r.id = c.recipe_id '
+             'ORDER BY c.date_time DESC, c.id DESC LIMIT %(limit)s',
+             ['_comment'], 5000, 2000, params={'limit': 500}),
+    PlanCase('favorites of user', 'lib/controllers/favorite_new.dart getUserFavorites',
+             'SELECT f.id, r.id as recipe_id, r.name FROM _favorite f JOIN _recipe r ON r.id = f.recipe_id '
+             'WHERE f.user_id = %(favorite_user)s',
+             ['_favorite', '_recipe'], 20000, 5000),
+    PlanCase('favorites ?userId=', 'lib/controllers/favorite_new.dart getAllFavorites',
+             'SELECT f.id, u.id as user_id, r.id as recipe_id, r.name FROM _favorite f '
+             'JOIN _user u ON u.id = f.user_id JOIN _recipe r ON r.id = f.recipe_id '
+             'WHERE f.user_id = %(favorite_user)s ORDER BY f.id LIMIT %(limit)s',
+             ['_favorite', '_recipe'], 20000, 5000, params=BATCH),
+    PlanCase('favorite by user and recipe', 'lib/controllers/favorite_new.dart deleteFavoriteByUserAndRecipe',
+             'SELECT 1 FROM _favorite WHERE user_id = %(favorite_user)s AND recipe_id = %(favorite_recipe)s LIMIT 1',
+             ['_favorite'], 20, 10),
+    PlanCase('freezer of user', 'lib/controllers/freezer_new.dart getUserFreezer',
+             'SELECT f.id, f.count, i.id, i.name FROM _freezer f JOIN _ingredient i ON i.id = f.ingredient_id '
+             'WHERE f.user_id = %(freezer_user)s',
+             ['_freezer'], 2000, 500),
+    PlanCase('freezer ?userId=', 'lib/controllers/freezer_new.dart getAllFreezerItems',
+             'SELECT f.id, f.count, u.id as user_id, i.id as ingredient_id, i.name FROM _freezer f '
+             'JOIN _user u ON u.id = f.user_id JOIN _ingredient i ON i.id = f.ingredient_id '
+             'WHERE f.user_id = %(freezer_user)s ORDER BY f.id LIMIT %(limit)s',
+             ['_freezer'], 2000, 500, params=BATCH),
+    PlanCase('freezer item', 'lib/controllers/freezer_new.dart createFreezerItem',
+             'SELECT id, count FROM _freezer WHERE user_id = %(freezer_user)s '
+             'AND ingredient_id = %(freezer_ingredient)s LIMIT 1',
+             ['_freezer'], 20, 10),
+    PlanCase('user by token', 'lib/middleware/auth_middleware.dart AuthMiddleware',
+             'SELECT _user.id,_user.first_name,_user.last_name,_user.phone,_user.avatar_url,_user.birthday,'
+             '_user.token,_user.login,_user.password FROM _user WHERE _user.token = %(token)s',
+             ['_user'], 20, 10,
+             pins=['Query<User>(context) ..where((u) => u.token).equalTo(token);']),
+    PlanCase('login', 'lib/controllers/user.dart auth',
+             'SELECT id FROM _user WHERE login = %(login)s AND password = %(password)s LIMIT 1',
+             ['_user'], 20, 10),
+    # Удаление шага каскадом удаляет его связи с рецептами: Postgres ищет их сам
+    PlanCase('step links of step', 'lib/model/recipe.dart _RecipeStepLink',
+             'SELECT id FROM _recipesteplink WHERE step_id = %(step)s',
+             ['_recipesteplink'], 5000, 2000,
+             pins=['@Relate(#recipeStepLinks, onDelete: DeleteRule.cascade) RecipeStep? step;']),
+    PlanCase('recipe ingredients ?ingredientId=', 'lib/controller/recipe_ingredient_controller.dart getAllRecipeIngredients',
+             'SELECT ri.id, ri.count, i.id, i.name, r.id, r.name FROM _recipeingredient ri '
+             'JOIN _ingredient i ON i.id = ri.ingredient_id JOIN _recipe r ON r.id = ri.recipe_id '
+             'WHERE ri.ingredient_id = %(ingredient)s ORDER BY ri.id LIMIT %(limit)s',
+             ['_recipeingredient'], 500000, 200000, params=BATCH),
+]
+
+# Сверка кейсов с кодом: литералы Dart, интерполяция заменена на HOLE
+ROOT = os.path.dirname(os.path.abspath(__file__))
+HOLE = '\0'
+CONDITION_SPLIT = re.compile(r"\(|\)|'[^']*'|\b(?:WHERE|AND|OR)\b")
+
+
+def dart_scope(path, name=None):
+    """Текст файла или определения name (метода, класса) в нём"""
+    with open(os.path.join(ROOT, path), encoding='utf-8') as f:
+        lines = f.read().split('\n')
+    if not name:
+        return '\n'.join(lines)
+    definition = re.compile(rf'^(\s*)(?:class\s+|[\w<>?, ]*[\w>?]\s+){re.escape(name)}\b.*[({{]\s*$')
+    for i, line in enumerate(lines):
+        m = definition.match(line)
+        if not m or line.rstrip().endswith(('{}', ';')):
+            continue
+        end = re.compile(rf'^{m.group(1)}}};?\s*$')
+        for j in range(i + 1, len(lines)):
+            if end.match(lines[j]):
+                return '\n'.join(lines[i:j + 1])
+    raise LookupError(f'{name} not found in {path}')
+
+
+def dart_literals(code):
+    """Строковые литералы code: соседние ('a' 'b') склеены, ${...} и $name — HOLE"""
+    literals = []
+    _scan_code(code, 0, literals, nested=False)
+    return literals
+
+
+def _scan_code(code, i, literals, nested):
+    depth = 0
+    last = None  # (индекс в literals, конец) предыдущего литерала — для склейки соседних
+    while i < len(code):
+        if code.startswith('//', i):
+            i = code.find('\n', i)
+            i = len(code) if i < 0 else i
+            continue
+        if code.startswith('/*', i):
+            i = code.find('*/', i)
+            i = len(code) if i < 0 else i + 2
+            continue
+        c = code[i]
+        if c in '\'"':
+            raw = i > 0 and code[i - 1] == 'r' and not (i > 1 and (code[i - 2].isalnum() or code[i - 2] == '_'))
+            start = i
+            text, i = _scan_string(code, i, raw, literals)
+            if last is not None and not code[last[1]:start].strip():
+                literals[last[0]] += text
+                last = (last[0], i)
+            else:
+                literals.append(text)
+                last = (len(literals) - 1, i)
+            continue
+        if c == '{':
+            depth += 1
+        elif c == '}':
+            if nested and depth == 0:
+                return i + 1
+            depth -= 1
+        if not c.isspace():
+            last = None
+        i += 1
+    return i
+
+
+def _scan_string(code, i, raw, literals):
+    quote = code[i] * 3 if code.startswith(code[i] * 3, i) else code[i]
+    i += len(quote)
+    out = []
+    while i < len(code) and not code.startswith(quote, i):
+        c = code[i]
+        if c == '\\' and not raw:
+            out.append(code[i + 1])
+            i += 2
+        elif c == '$' and not raw and code.startswith('${', i):
+            i = _scan_code(code, i + 2, literals, nested=True)
+            out.append(HOLE)
+        elif c == '$' and not raw and re.match(r'[A-Za-z_]', code[i + 1:i + 2]):
+            i += 1 + len(re.match(r'\w+', code[i + 1:]).group(0))
+            out.append(HOLE)
+        else:
+            out.append(c)
+            i += 1
+    return ''.join(out), i + len(quote)
+
+
+def normalize_sql(sql):
+    """Параметры psycopg и Dart — '?', пробелы вокруг операторов и скобок — единообразно"""
+    sql = re.sub(r'%\(\w+\)s', '?', sql).replace('%%', '%')
+    sql = re.sub(r'@\w+', '?', sql)
+    sql = re.sub(r'\s*(<=|>=|<>|=|<|>)\s*', r' \1 ', sql)
+    sql = re.sub(r'\s*,\s*', ', ', sql)
+    sql = re.sub(r'\(\s+', '(', re.sub(r'\s+\)', ')', sql))
+    return re.sub(r'\s+', ' ', sql).strip()
+
+
+def template_pattern(literal):
+    parts = [re.escape(' '.join(part.split())) for part in literal.split(HOLE)]
+    return re.compile('(.*?)'.join(parts).replace(r'\ ', r'\s*'), re.S)
+
+
+def split_conditions(sql):
+    """Части sql между WHERE/AND/OR вне скобок"""
+    parts, depth, start = [], 0, 0
+    for m in CONDITION_SPLIT.finditer(sql):
+        token = m.group(0)
+        if token == '(':
+            depth += 1
+        elif token == ')':
+            depth -= 1
+        elif token[0] != "'" and depth == 0:
+            parts.append(sql[start:m.start()])
+            start = m.end()
+    parts.append(sql[start:])
+    return [part.strip() for part in parts if part.strip()]
+
+
+def produces(sql, templates, depth=6):
+    """sql собирается из литералов: целиком совпадает с одним из них, а
+    вставки на месте интерполяции — снова из литералов или условий через
+    WHERE/AND/OR"""
+    sql = sql.strip()
+    if not sql:
+        return True
+    if depth == 0:
+        return False
+    for template in templates:
+        m = template.fullmatch(sql)
+        if m and all(produces(group, templates, depth - 1) for group in m.groups()):
+            return True
+    parts = split_conditions(sql)
+    return parts != [sql] and all(produces(part, templates, depth - 1) for part in parts)
+
+
+def check_source(case):
+    """Расхождения кейса с кодом, который он повторяет"""
+    path, _, name = case.source.partition(' ')
+    try:
+        scope = dart_scope(path, name or None)
+    except (OSError, LookupError) as e:
+        return [str(e)]
+    if case.pins:
+        code = ''.join(scope.split())
+        return [f"pin not found: {pin}" for pin in case.pins if ''.join(pin.split()) not in code]
+    templates = [template_pattern(normalize_sql(literal)) for literal in dart_literals(scope)
+                 if literal.replace(HOLE, '').strip()]
+    if not produces(normalize_sql(case.sql), templates):
+        return [f"SQL is not built by {case.source}"]
+    return []
+
+
+def log(name: str, ok: bool, msg: str = ""):
+    print(f"{'✅ PASS' if ok else '❌ FAIL'} | {name}{(' | ' + msg) if msg else ''}")
+
+
+def load_params(db):
+    params = {}
+    for key, sql in PARAMS_SQL.items():
+        rows = db.query(sql)
+        if rows and rows[0][0] is not None:
+            params[key] = rows[0][0]
+    if 'recipe_name' in params:
+        words = WORD.findall(params['recipe_name'].lower())
+        params['name_pattern'] = f"%{words[0]}%" if words else '%'
+        params['text'] = ' '.join(words[:2])
+        params['tsquery'] = ' & '.join(f'{w}:*' for w in words[:2]) or 'x:*'
+    if 'ingredient_name' in params:
+        words = WORD.findall(params['ingredient_name'].lower())
+        params['ingredient_word'] = words[0] if words else ''
+        params['ingredient_pattern'] = f"%{params['ingredient_word']}%"
+    # Сидер не выдаёт токены: промах по индексу стоит столько же, сколько попадание
+    params['token'] = str(uuid.uuid4())
+    params['password'] = 'seed'
+    return params
+
+
+def walk(node):
+    yield node
+    for child in node.get('Plans', []):
+        yield from walk(child)
+
+
+def placeholders(sql):
+    return set(re.findall(r'%\((\w+)\)s', sql))
+
+
+def explain(db, case, params):
+    values = {**params, **case.params}
+    used = {key: values[key] for key in placeholders(case.sql)}
+    try:
+        rows = db.query(f'EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {case.sql}', used or None)
+    finally:
+        db.conn.rollback()
+    document = rows[0][0]
+    if isinstance(document, str):
+        document = json.loads(document)
+    return document[0]
+
+
+def check(case, result, budget_scale):
+    plan = result['Plan']
+    problems = []
+    seq_scans = sorted({node.get('Relation Name') for node in walk(plan)
+                        if node.get('Node Type') == 'Seq Scan' and node.get('Relation Name') in case.tables})
+    if seq_scans:
+        problems.append(f"Seq Scan on {', '.join(seq_scans)}")
+    cost = plan['Total Cost']
+    buffers = plan.get('Shared Hit Blocks', 0) + plan.get('Shared Read Blocks', 0)
+    if cost > case.max_cost * budget_scale:
+        problems.append(f"cost {cost:.0f} > {case.max_cost * budget_scale:.0f}")
+    if buffers > case.max_buffers * budget_scale:
+        problems.append(f"buffers {buffers} > {case.max_buffers * budget_scale:.0f}")
+    summary = {
+        'name': case.name,
+        'source': case.source,
+        'ok': not problems,
+        'problems': problems,
+        'cost': cost,
+        'buffers': buffers,
+        'rows': plan.get('Actual Rows'),
+        'ms': result.get('Execution Time'),
+        'nodes': sorted({node['Node Type'] for node in walk(plan)}),
+    }
+    return summary
+
+
+def main():
+    ap = argparse.ArgumentParser(description='EXPLAIN-based query plan regression tests')
+    ap.add_argument('--dsn', default=None, help='Строка подключения (по умолчанию из DATABASE_*)')
+    ap.add_argument('--budget-scale', type=float, default=1.0, help='Множитель бюджетов cost/buffers')
+    ap.add_argument('--min-recipes', type=int, default=5000, help='Минимум рецептов в базе')
+    ap.add_argument('-k', dest='only', default=None, help='Только кейсы, в имени которых есть подстрока')
+    ap.add_argument('--json', default=None, help='Записать планы и метрики в файл')
+    ap.add_argument('--sources-only', action='store_true', help='Только сверить кейсы с кодом, без базы')
+    args = ap.parse_args()
+
+    cases = [case for case in CASES if not args.only or args.only in case.name]
+    drifted = 0
+    for case in cases:
+        problems = check_source(case)
+        if problems:
+            drifted += 1
+            log(f"SOURCE {case.name}", False, '; '.join(problems))
+    print(f"SOURCES: {len(cases) - drifted}/{len(cases)} cases match the code")
+    if drifted or args.sources_only:
+        sys.exit(1 if drifted else 0)
+
+    db = Database(args.dsn or default_dsn())
+    recipes = db.query('SELECT count(*) FROM _recipe')[0][0]
+    if recipes < args.min_recipes:
+        print(f"В базе {recipes} рецептов, нужно не меньше {args.min_recipes}: "
+              f"сначала python3 seed_catalogue.py --scale small")
+        sys.exit(2)
+    db.query('ANALYZE')
+    db.conn.commit()
+    params = load_params(db)
+
+    results = []
+    for case in cases:
+        missing = sorted(placeholders(case.sql) - params.keys() - case.params.keys())
+        if missing:
+            print(f"⏭️  SKIP | {case.name} | no data for {', '.join(missing)}")
+            continue
+        try:
+            summary = check(case, explain(db, case, params), args.budget_scale)
+        except Exception as e:
+            summary = {'name': case.name, 'source': case.source, 'ok': False, 'problems': [str(e).strip()]}
+        results.append(summary)
+        detail = '; '.join(summary['problems']) if summary['problems'] else \
+            f"cost={summary['cost']:.0f} buffers={summary['buffers']} {summary['ms']:.2f} ms"
+        log(f"PLAN {case.name}", summary['ok'], detail)
+
+    passed = sum(1 for r in results if r['ok'])
+    print(f"SUMMARY: {passed}/{len(results)} plans within budget")
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'recipes': recipes, 'budgetScale': args.budget_scale, 'results': results},
+                      f, ensure_ascii=False, indent=2)
+    sys.exit(0 if passed == len(results) else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -4,11 +4,12 @@
 Тестирует CRUD операции: создание, получение, обновление и удаление рецептов
 """
 
-import requests
 import json
 import sys
 from typing import Dict, Any, Optional
-import time
+
+from foodapi_client import FoodApiClient
+from run_names import unique_suffix
 
 # Конфигурация
 BASE_URL = "https://foodapi.dzolotov.pro"
@@ -17,6 +18,7 @@ BASE_URL = "https://foodapi.dzolotov.pro"
 class RecipeAPITester:
     def __init__(self, base_url: str = BASE_URL):
         self.base_url = base_url
+        self.api = FoodApiClient(base_url)
         self.created_recipe_ids = []  # Для очистки после тестов
         self.test_results = []
         
@@ -34,14 +36,14 @@ class RecipeAPITester:
         test_name = "CREATE Recipe"
         
         recipe_data = {
-            "name": f"Тестовый рецепт Python {int(time.time())}",
+            "name": f"Тестовый рецепт Python {unique_suffix()}",
             "duration": 2400,
             "photo": "https://example.com/test-recipe.jpg"
         }
         
         try:
-            response = requests.post(
-                f"{self.base_url}/recipe",
+            response = self.api.post(
+                f"/recipe",
                 json=recipe_data,
                 headers={"Content-Type": "application/json"}
             )
@@ -75,13 +77,13 @@ class RecipeAPITester:
         test_name = f"GET Recipe/{recipe_id}"
         
         try:
-            response = requests.get(f"{self.base_url}/recipe/{recipe_id}")
+            response = self.api.get(f"/recipe/{recipe_id}")
             
             if response.status_code == 200:
                 data = response.json()
                 
                 # Проверяем наличие основных полей
-                required_fields = ["id", "name", "duration", "photo"]
+                required_fields = ["id", "name", "duration", "photo", "commentCount"]
                 if all(field in data for field in required_fields):
                     self.log_result(test_name, True, f"Recipe name: {data.get('name')}")
                     return True
@@ -96,19 +98,49 @@ class RecipeAPITester:
             self.log_result(test_name, False, f"Exception: {str(e)}")
             return False
             
+    def test_conditional_get(self, recipe_id: int) -> bool:
+        """Тест ETag: 304 на If-None-Match и новый ответ после изменения рецепта"""
+        test_name = f"GET Recipe/{recipe_id} (ETag)"
+        
+        try:
+            first = self.api.get(f"/recipe/{recipe_id}")
+            etag = first.headers.get("ETag")
+            if first.status_code != 200 or not etag:
+                self.log_result(test_name, False, f"Status {first.status_code}, ETag {etag!r}")
+                return False
+            
+            cached = self.api.get(f"/recipe/{recipe_id}", headers={"If-None-Match": etag})
+            if cached.status_code != 304 or cached.content:
+                self.log_result(test_name, False, f"Expected empty 304, got {cached.status_code}")
+                return False
+            
+            # Запись сбрасывает кеш: старый ETag больше не совпадает
+            self.api.put(f"/recipe/{recipe_id}", json={"duration": first.json()["duration"] + 1})
+            changed = self.api.get(f"/recipe/{recipe_id}", headers={"If-None-Match": etag})
+            if changed.status_code != 200 or changed.headers.get("ETag") == etag:
+                self.log_result(test_name, False, f"Stale response after update: {changed.status_code}")
+                return False
+            
+            self.log_result(test_name, True, f"{etag} -> {changed.headers.get('ETag')}")
+            return True
+                
+        except Exception as e:
+            self.log_result(test_name, False, f"Exception: {str(e)}")
+            return False
+            
     def test_update_recipe(self, recipe_id: int) -> bool:
         """Тест обновления рецепта"""
         test_name = f"UPDATE Recipe/{recipe_id}"
         
         update_data = {
-            "name": f"Обновленный рецепт {int(time.time())}",
+            "name": f"Обновленный рецепт {unique_suffix()}",
             "duration": 3600,
             "photo": "https://example.com/updated.jpg"
         }
         
         try:
-            response = requests.put(
-                f"{self.base_url}/recipe/{recipe_id}",
+            response = self.api.put(
+                f"/recipe/{recipe_id}",
                 json=update_data,
                 headers={"Content-Type": "application/json"}
             )
@@ -140,8 +172,8 @@ class RecipeAPITester:
         test_name = "GET Recipe List"
         
         try:
-            response = requests.get(
-                f"{self.base_url}/recipe",
+            response = self.api.get(
+                f"/recipe",
                 params={"limit": 5, "page": 1}
             )
             
@@ -171,13 +203,59 @@ class RecipeAPITester:
             self.log_result(test_name, False, f"Exception: {str(e)}")
             return False
             
+    def test_cursor_pagination(self) -> bool:
+        """Тест keyset-пагинации: следующая страница по cursor продолжает первую"""
+        test_name = "GET Recipe List (cursor)"
+        
+        try:
+            first = self.api.get("/recipe", params={"limit": 3, "page": 1}).json()
+            cursor = first["pagination"].get("nextCursor")
+            if not cursor:
+                self.log_result(test_name, True, "Only one page of recipes, nothing to follow")
+                return True
+            
+            response = self.api.get("/recipe", params={"limit": 3, "cursor": cursor, "total": "none"})
+            if response.status_code != 200:
+                self.log_result(test_name, False, f"Status code: {response.status_code}")
+                return False
+            second = response.json()
+            
+            # Рецепты идут по убыванию id; новые рецепты из параллельных тестов
+            # сдвигают page=2, но не страницу по cursor
+            first_ids = [r["id"] for r in first["data"]]
+            second_ids = [r["id"] for r in second["data"]]
+            if not second_ids or max(second_ids) >= min(first_ids):
+                self.log_result(test_name, False, f"Pages overlap: {first_ids} / {second_ids}")
+                return False
+            if "total" in second["pagination"]:
+                self.log_result(test_name, False, "total returned with total=none")
+                return False
+            
+            invalid = self.api.get("/recipe", params={"cursor": "not-a-cursor"})
+            if invalid.status_code != 400:
+                self.log_result(test_name, False, f"Invalid cursor status: {invalid.status_code}")
+                return False
+            
+            for limit in (0, -1, 1001):
+                bad_limit = self.api.get("/recipe", params={"limit": limit})
+                if bad_limit.status_code != 400:
+                    self.log_result(test_name, False, f"limit={limit} status: {bad_limit.status_code}")
+                    return False
+            
+            self.log_result(test_name, True, f"Pages {first_ids} -> {second_ids}")
+            return True
+                
+        except Exception as e:
+            self.log_result(test_name, False, f"Exception: {str(e)}")
+            return False
+            
     def test_search_recipes(self, search_term: str = "тест") -> bool:
         """Тест поиска рецептов"""
         test_name = f"SEARCH Recipes (query: '{search_term}')"
         
         try:
-            response = requests.get(
-                f"{self.base_url}/recipe",
+            response = self.api.get(
+                f"/recipe",
                 params={"search": search_term, "limit": 10}
             )
             
@@ -202,24 +280,70 @@ class RecipeAPITester:
             self.log_result(test_name, False, f"Exception: {str(e)}")
             return False
             
+    def test_fulltext_search(self) -> bool:
+        """Тест /recipe/search: префиксный полнотекстовый поиск и курсор по релевантности"""
+        test_name = "SEARCH Recipes (full-text)"
+        suffix = unique_suffix()
+        
+        try:
+            created = self.api.post("/recipe", json={"name": f"Пастернаковый пирог {suffix}", "duration": 600})
+            if created.status_code != 200:
+                self.log_result(test_name, False, f"Create status code: {created.status_code}")
+                return False
+            recipe_id = created.json()["id"]
+            self.created_recipe_ids.append(recipe_id)
+            
+            # Неполное слово и другой падеж находят рецепт благодаря стеммингу и префиксу
+            response = self.api.get("/recipe/search", params={"q": f"пастернак {suffix}", "limit": 10})
+            if response.status_code != 200:
+                self.log_result(test_name, False, f"Status code: {response.status_code}")
+                return False
+            ids = [r["id"] for r in response.json()["data"]]
+            if recipe_id not in ids:
+                self.log_result(test_name, False, f"Recipe {recipe_id} not found: {ids}")
+                return False
+            
+            zero_limit = self.api.get("/recipe/search", params={"q": "пирог", "limit": 0})
+            if zero_limit.status_code != 400:
+                self.log_result(test_name, False, f"limit=0 status: {zero_limit.status_code}")
+                return False
+            
+            # Курсор поиска по релевантности не подходит к выдаче без q
+            cursor = self.api.get("/recipe/search", params={"q": "пирог", "limit": 1}).json()["pagination"].get("nextCursor")
+            if cursor:
+                mismatched = self.api.get("/recipe/search", params={"cursor": cursor})
+                if mismatched.status_code != 400:
+                    self.log_result(test_name, False, f"Mismatched cursor status: {mismatched.status_code}")
+                    return False
+            
+            self.log_result(test_name, True, f"Found recipe {recipe_id} at position {ids.index(recipe_id) + 1}")
+            return True
+                
+        except Exception as e:
+            self.log_result(test_name, False, f"Exception: {str(e)}")
+            return False
+            
     def test_delete_recipe(self, recipe_id: int) -> bool:
         """Тест удаления рецепта"""
         test_name = f"DELETE Recipe/{recipe_id}"
         
         try:
-            response = requests.delete(f"{self.base_url}/recipe/{recipe_id}")
+            response = self.api.delete(f"/recipe/{recipe_id}")
             
             if response.status_code == 200:
                 # Проверяем, что рецепт действительно удален
-                check_response = requests.get(f"{self.base_url}/recipe/{recipe_id}")
+                check_response = self.api.get(f"/recipe/{recipe_id}")
+                
+                # Связанные строки удаляются каскадом вместе с рецептом
+                orphans = self.api.get("/recipe-ingredients", params={"recipeId": recipe_id}).json()
                 
-                if check_response.status_code == 404:
-                    self.log_result(test_name, True, "Recipe deleted and not found")
+                if check_response.status_code == 404 and not orphans:
+                    self.log_result(test_name, True, "Recipe and its ingredients deleted")
                     if recipe_id in self.created_recipe_ids:
                         self.created_recipe_ids.remove(recipe_id)
                     return True
                 else:
-                    self.log_result(test_name, False, "Recipe still exists after deletion")
+                    self.log_result(test_name, False, f"Recipe or {len(orphans)} ingredient links remain after deletion")
                     return False
             else:
                 self.log_result(test_name, False, f"Status code: {response.status_code}")
@@ -229,12 +353,40 @@ class RecipeAPITester:
             self.log_result(test_name, False, f"Exception: {str(e)}")
             return False
             
+    def test_bulk_delete(self) -> bool:
+        """Тест DELETE /recipe: удаление по списку id и по фильтру одним запросом"""
+        test_name = "DELETE /recipe (bulk)"
+        
+        try:
+            marker = f"Bulk {unique_suffix()}"
+            ids = [self.api.create_recipe(f"{marker} #{n}", 60).id for n in range(3)]
+            self.created_recipe_ids.extend(ids)
+            
+            if self.api.delete("/recipe").status_code != 400:
+                self.log_result(test_name, False, "DELETE /recipe without filters must be rejected")
+                return False
+            
+            by_ids = self.api.delete_recipes(ids[:2])
+            by_search = self.api.delete_recipes(search=marker)
+            remaining = [rid for rid in ids if self.api.get(f"/recipe/{rid}").status_code != 404]
+            if sorted(by_ids) != sorted(ids[:2]) or by_search != ids[2:] or remaining:
+                self.log_result(test_name, False, f"ids={by_ids}, search={by_search}, remaining={remaining}")
+                return False
+            
+            self.created_recipe_ids = [rid for rid in self.created_recipe_ids if rid not in ids]
+            self.log_result(test_name, True, f"Deleted {len(ids)} recipes in 2 requests")
+            return True
+                
+        except Exception as e:
+            self.log_result(test_name, False, f"Exception: {str(e)}")
+            return False
+            
     def test_invalid_recipe_id(self) -> bool:
         """Тест обработки несуществующего ID"""
         test_name = "GET Recipe/99999 (invalid)"
         
         try:
-            response = requests.get(f"{self.base_url}/recipe/99999")
+            response = self.api.get(f"/recipe/99999")
             
             if response.status_code == 404:
                 self.log_result(test_name, True, "Correctly returns 404")
@@ -258,8 +410,8 @@ class RecipeAPITester:
         }
         
         try:
-            response = requests.post(
-                f"{self.base_url}/recipe-ingredients",
+            response = self.api.post(
+                f"/recipe-ingredients",
                 json=ingredient_data,
                 headers={"Content-Type": "application/json"}
             )
@@ -286,17 +438,49 @@ class RecipeAPITester:
             self.log_result(test_name, False, f"Exception: {str(e)}")
             return False
             
+    def test_ingredient_filter(self, recipe_id: int) -> bool:
+        """Тест фильтра /recipe/search по ингредиентам (any/none) на стороне базы"""
+        test_name = f"SEARCH Recipes by ingredient (Recipe/{recipe_id})"
+        
+        try:
+            name = self.api.get(f"/recipe/{recipe_id}").json()["name"]
+            found = {}
+            for mode in ("any", "none"):
+                response = self.api.get("/recipe/search", params={
+                    "q": name, "ingredientIds": "3", "ingredientMode": mode, "limit": 50
+                })
+                if response.status_code != 200:
+                    self.log_result(test_name, False, f"{mode}: status code {response.status_code}")
+                    return False
+                found[mode] = recipe_id in [r["id"] for r in response.json()["data"]]
+            
+            if not found["any"] or found["none"]:
+                self.log_result(test_name, False, f"any={found['any']}, none={found['none']}")
+                return False
+            
+            invalid = self.api.get("/recipe/search", params={"ingredientMode": "some"})
+            if invalid.status_code != 400:
+                self.log_result(test_name, False, f"Invalid mode status: {invalid.status_code}")
+                return False
+            
+            self.log_result(test_name, True, "Matched with any, excluded with none")
+            return True
+                
+        except Exception as e:
+            self.log_result(test_name, False, f"Exception: {str(e)}")
+            return False
+            
     def cleanup(self):
         """Удаление всех созданных тестовых рецептов"""
         print("\n🧹 Cleaning up test data...")
-        for recipe_id in self.created_recipe_ids[:]:
-            try:
-                response = requests.delete(f"{self.base_url}/recipe/{recipe_id}")
-                if response.status_code == 200:
-                    print(f"  - Deleted test recipe {recipe_id}")
-                    self.created_recipe_ids.remove(recipe_id)
-            except:
-                pass
+        if not self.created_recipe_ids:
+            return
+        try:
+            deleted = self.api.delete_recipes(self.created_recipe_ids)
+            print(f"  - Deleted {len(deleted)} test recipes")
+            self.created_recipe_ids = [rid for rid in self.created_recipe_ids if rid not in deleted]
+        except Exception:
+            pass
                 
     def run_all_tests(self):
         """Запуск всех тестов"""
@@ -307,6 +491,7 @@ class RecipeAPITester:
         
         # 1. Тест списка рецептов
         self.test_get_recipe_list()
+        self.test_cursor_pagination()
         
         # 2. Создание рецепта
         recipe_id = self.test_create_recipe()
@@ -314,21 +499,25 @@ class RecipeAPITester:
         if recipe_id:
             # 3. Получение созданного рецепта
             self.test_get_recipe(recipe_id)
+            self.test_conditional_get(recipe_id)
             
             # 4. Обновление рецепта
             self.test_update_recipe(recipe_id)
             
             # 5. Добавление ингредиентов
-            self.test_recipe_with_ingredients(recipe_id)
+            if self.test_recipe_with_ingredients(recipe_id):
+                self.test_ingredient_filter(recipe_id)
             
             # 6. Удаление рецепта
             self.test_delete_recipe(recipe_id)
         
         # 7. Тест поиска
         self.test_search_recipes()
+        self.test_fulltext_search()
         
         # 8. Тест несуществующего ID
         self.test_invalid_recipe_id()
+        self.test_bulk_delete()
         
         # Очистка
         self.cleanup()
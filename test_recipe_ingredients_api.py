@@ -5,10 +5,12 @@
 """
 
 import sys
-import time
-import requests
+
+from foodapi_client import FoodApiClient
+from run_names import unique_suffix
 
 BASE_URL = sys.argv[1] if len(sys.argv) > 1 else "https://foodapi.dzolotov.pro"
+api = FoodApiClient(BASE_URL)
 
 
 def log(name: str, ok: bool, msg: str = ""):
@@ -16,51 +18,72 @@ def log(name: str, ok: bool, msg: str = ""):
 
 
 def create_recipe():
-    r = requests.post(f"{BASE_URL}/recipe", json={"name": f"RI Test {int(time.time())}", "duration": 600})
+    r = api.post(f"/recipe", json={"name": f"RI Test {unique_suffix()}", "duration": 600})
     return (r.status_code == 200, (r.json().get("id") if r.ok else None))
 
 
 def create_ingredient():
-    r = requests.post(f"{BASE_URL}/ingredient", json={"name": f"RI-Ingredient {int(time.time())}", "caloriesForUnit": 1.0})
+    r = api.post(f"/ingredient", json={"name": f"RI-Ingredient {unique_suffix()}", "caloriesForUnit": 1.0})
     return (r.status_code == 200, (r.json().get("id") if r.ok else None))
 
 
 def link_ri(rid: int, iid: int, count: float = 2.5):
-    r = requests.post(f"{BASE_URL}/recipe-ingredients", json={"recipe": {"id": rid}, "ingredient": {"id": iid}, "count": count})
+    r = api.post(f"/recipe-ingredients", json={"recipe": {"id": rid}, "ingredient": {"id": iid}, "count": count})
     return (r.status_code == 200, (r.json().get("id") if r.ok else None), (r.json().get("count") if r.ok else None))
 
 
 def list_global(rid: int):
-    r = requests.get(f"{BASE_URL}/recipe-ingredients", params={"recipeId": rid})
+    r = api.get(f"/recipe-ingredients", params={"recipeId": rid})
     ok = r.status_code == 200 and isinstance(r.json(), list)
     log("LIST /recipe-ingredients", ok)
     return ok
 
 
 def list_for_recipe(rid: int):
-    r = requests.get(f"{BASE_URL}/recipe-ingredients/recipe/{rid}")
+    r = api.get(f"/recipe-ingredients/recipe/{rid}")
     ok = r.status_code == 200 and isinstance(r.json(), list) and len(r.json()) >= 1
     log("LIST ingredients for recipe", ok)
     return ok
 
 
 def update_ri(ri_id: int):
-    r = requests.put(f"{BASE_URL}/recipe-ingredients/{ri_id}", json={"count": 5.75})
+    r = api.put(f"/recipe-ingredients/{ri_id}", json={"count": 5.75})
     ok = r.status_code == 200 and float(r.json().get("count", 0)) == 5.75
     log("UPDATE RecipeIngredient count to 5.75", ok)
     return ok
 
 
 def delete_ri(ri_id: int):
-    r = requests.delete(f"{BASE_URL}/recipe-ingredients/{ri_id}")
+    r = api.delete(f"/recipe-ingredients/{ri_id}")
     ok = r.status_code == 200
     log("DELETE RecipeIngredient", ok)
     return ok
 
 
+def batch_atomic(rid: int, iid: int):
+    """Batch вставляет все строки в порядке запроса, а ошибка в одной строке не оставляет ни одной"""
+    before = len(api.get(f"/recipe-ingredients/recipe/{rid}").json())
+    items = [{"recipe": {"id": rid}, "ingredient": {"id": iid}, "count": n} for n in (1, 2, 3)]
+    r = api.post("/recipe-ingredients/batch", json=items)
+    ok = r.status_code == 200 and [row.get("count") for row in r.json()] == [1, 2, 3] \
+        and all(row.get("recipe", {}).get("id") == rid for row in r.json())
+    log("BATCH RecipeIngredients", ok, f"status={r.status_code}")
+
+    bad = items + [{"recipe": {"id": rid}, "ingredient": {"id": 2**31 - 1}, "count": 4}]
+    r = api.post("/recipe-ingredients/batch", json=bad)
+    after = len(api.get(f"/recipe-ingredients/recipe/{rid}").json())
+    ok = r.status_code == 400 and after == before + 3
+    log("BATCH rollback on invalid ingredient", ok, f"status={r.status_code}, rows={after - before}")
+
+    r = api.post("/recipe-ingredients/batch", json=items[:1] + [{"recipe": {"id": rid}}])
+    ok = r.status_code == 400 and r.json().get("index") == 1
+    log("BATCH validation before insert", ok, f"status={r.status_code}")
+    return ok
+
+
 def cleanup(rid: int, iid: int):
-    requests.delete(f"{BASE_URL}/recipe/{rid}")
-    requests.delete(f"{BASE_URL}/ingredient/{iid}")
+    api.delete(f"/recipe/{rid}")
+    api.delete(f"/ingredient/{iid}")
 
 
 def main():
@@ -94,6 +117,7 @@ def main():
     list_for_recipe(rid)
     update_ri(ri_id)
     delete_ri(ri_id)
+    batch_atomic(rid, iid)
     cleanup(rid, iid)
 
 
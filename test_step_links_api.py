@@ -5,11 +5,13 @@
 """
 
 import sys
-import time
 from typing import Optional
-import requests
+
+from foodapi_client import FoodApiClient
+from run_names import unique_suffix
 
 BASE_URL = sys.argv[1] if len(sys.argv) > 1 else "https://foodapi.dzolotov.pro"
+api = FoodApiClient(BASE_URL)
 
 
 def log(name: str, ok: bool, msg: str = ""):
@@ -18,8 +20,8 @@ def log(name: str, ok: bool, msg: str = ""):
 
 
 def create_recipe() -> Optional[int]:
-    name = f"StepLink Test Recipe {int(time.time())}"
-    r = requests.post(f"{BASE_URL}/recipe", json={
+    name = f"StepLink Test Recipe {unique_suffix()}"
+    r = api.post(f"/recipe", json={
         "name": name,
         "duration": 600,
         "photo": "https://example.com/r.jpg"
@@ -33,8 +35,8 @@ def create_recipe() -> Optional[int]:
 
 
 def create_step() -> Optional[int]:
-    name = f"StepLink Test Step {int(time.time())}"
-    r = requests.post(f"{BASE_URL}/steps", json={
+    name = f"StepLink Test Step {unique_suffix()}"
+    r = api.post(f"/steps", json={
         "name": name,
         "duration": 60
     })
@@ -46,20 +48,20 @@ def create_step() -> Optional[int]:
     return None
 
 def get_steps_list() -> bool:
-    r = requests.get(f"{BASE_URL}/steps")
+    r = api.get(f"/steps")
     ok = r.status_code == 200 and isinstance(r.json(), list)
     log("GET Steps List", ok)
     return ok
 
 def get_step_by_id(step_id: int) -> bool:
-    r = requests.get(f"{BASE_URL}/steps/{step_id}")
+    r = api.get(f"/steps/{step_id}")
     ok = r.status_code == 200 and r.json().get("id") == step_id
     log("GET Step by ID", ok)
     return ok
 
 
 def create_link(recipe_id: int, step_id: int) -> Optional[int]:
-    r = requests.post(f"{BASE_URL}/recipe-step-links", json={
+    r = api.post(f"/recipe-step-links", json={
         "recipeId": recipe_id,
         "stepId": step_id,
         "number": 1
@@ -73,35 +75,65 @@ def create_link(recipe_id: int, step_id: int) -> Optional[int]:
 
 
 def get_links_for_recipe(recipe_id: int) -> bool:
-    r = requests.get(f"{BASE_URL}/recipe-step-links/recipe/{recipe_id}")
+    r = api.get(f"/recipe-step-links/recipe/{recipe_id}")
     ok = r.status_code == 200 and isinstance(r.json(), list)
     log("GET Links For Recipe", ok, f"count={len(r.json()) if ok else '?'}")
     return ok
 
 
 def update_link(link_id: int) -> bool:
-    r = requests.put(f"{BASE_URL}/recipe-step-links/{link_id}", json={"number": 2})
+    r = api.put(f"/recipe-step-links/{link_id}", json={"number": 2})
     ok = r.status_code == 200 and r.json().get("number") == 2
     log("UPDATE Link", ok)
     return ok
 
 
 def delete_link(link_id: int) -> bool:
-    r = requests.delete(f"{BASE_URL}/recipe-step-links/{link_id}")
+    r = api.delete(f"/recipe-step-links/{link_id}")
     ok = r.status_code == 200
     log("DELETE Link", ok)
     return ok
 
 
+def reorder_flow(recipe_id: int, step_id: int) -> bool:
+    """Перестановка шагов: move, renumber с gap и отказ при повторяющихся номерах"""
+    links = api.create_step_links(recipe_id, [step_id] * 4)
+    ids = [link.id for link in links]
+
+    def numbers():
+        return [row["linkId"] for row in api.renumber_steps(recipe_id, gap=1)["steps"]]
+
+    moved = api.move_step(recipe_id, ids[3], before=ids[0])
+    ok = [row["linkId"] for row in moved["steps"]] == [ids[3]] + ids[:3]
+    log("REORDER move before", ok, f"updated={moved.get('updated')}")
+
+    api.renumber_steps(recipe_id, gap=10)
+    moved = api.move_step(recipe_id, ids[0], after=ids[1], gap=10)
+    order_ok = [row["linkId"] for row in moved["steps"]] == [ids[3], ids[1], ids[0], ids[2]]
+    log("REORDER move with gap touches one row", order_ok and moved.get("updated") == 1,
+        f"updated={moved.get('updated')}")
+    ok = ok and order_ok and numbers() == [ids[3], ids[1], ids[0], ids[2]]
+
+    r = api.put("/recipe-step-links/reorder", json={
+        "recipeId": recipe_id, "stepOrders": [{"linkId": ids[0], "number": 2}]})
+    steps = api.renumber_steps(recipe_id, gap=1)["steps"]
+    dup_ok = r.status_code == 400 and [row["number"] for row in steps] == [1, 2, 3, 4]
+    log("REORDER rejects duplicate numbers", dup_ok, f"status={r.status_code}")
+
+    for link_id in ids:
+        api.delete(f"/recipe-step-links/{link_id}")
+    return ok and dup_ok
+
+
 def delete_step(step_id: int) -> bool:
-    r = requests.delete(f"{BASE_URL}/steps/{step_id}")
+    r = api.delete(f"/steps/{step_id}")
     ok = r.status_code == 200
     log("DELETE Step", ok)
     return ok
 
 
 def delete_recipe(recipe_id: int) -> bool:
-    r = requests.delete(f"{BASE_URL}/recipe/{recipe_id}")
+    r = api.delete(f"/recipe/{recipe_id}")
     ok = r.status_code == 200
     log("DELETE Recipe", ok)
     return ok
@@ -131,6 +163,7 @@ def main():
     get_links_for_recipe(rid)
     update_link(lid)
     delete_link(lid)
+    reorder_flow(rid, sid)
 
     # cleanup
     delete_step(sid)
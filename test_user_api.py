@@ -5,11 +5,13 @@
 """
 
 import sys
-import time
 import re
-import requests
+
+from foodapi_client import FoodApiClient
+from run_names import unique_suffix
 
 BASE_URL = sys.argv[1] if len(sys.argv) > 1 else "https://foodapi.dzolotov.pro"
+api = FoodApiClient(BASE_URL)
 
 
 def log(name: str, ok: bool, msg: str = ""):
@@ -17,7 +19,7 @@ def log(name: str, ok: bool, msg: str = ""):
 
 
 def register(login: str, password: str):
-    r = requests.post(f"{BASE_URL}/user", json={"login": login, "password": password})
+    r = api.post(f"/user", json={"login": login, "password": password})
     ok = r.status_code == 200 and r.json().get("user", {}).get("id") is not None
     if ok:
         uid = r.json()["user"]["id"]
@@ -28,28 +30,28 @@ def register(login: str, password: str):
 
 
 def register_duplicate(login: str, password: str):
-    r = requests.post(f"{BASE_URL}/user", json={"login": login, "password": password})
+    r = api.post(f"/user", json={"login": login, "password": password})
     ok = r.status_code == 409
     log("REGISTER duplicate", ok)
     return ok
 
 
 def auth_ok(login: str, password: str):
-    r = requests.put(f"{BASE_URL}/user", json={"login": login, "password": password})
+    r = api.put(f"/user", json={"login": login, "password": password})
     ok = r.status_code == 200 and isinstance(r.json().get("token"), str)
     log("AUTH ok", ok, (r.json().get("token") if ok else f"status={r.status_code}"))
     return ok
 
 
 def auth_bad(login: str, wrong_password: str):
-    r = requests.put(f"{BASE_URL}/user", json={"login": login, "password": wrong_password})
+    r = api.put(f"/user", json={"login": login, "password": wrong_password})
     ok = r.status_code == 403
     log("AUTH wrong password", ok)
     return ok
 
 
 def get_user(uid: int, expected_login: str):
-    r = requests.get(f"{BASE_URL}/user/{uid}")
+    r = api.get(f"/user/{uid}")
     ok = r.status_code == 200 and r.json().get("id") == uid and r.json().get("login") == expected_login
     log("GET /user/{id}", ok)
     return ok
@@ -61,7 +63,7 @@ def main():
     print(f"📍 Testing: {BASE_URL}")
     print("=" * 60)
 
-    login = f"user_{int(time.time())}@example.com"
+    login = f"user_{unique_suffix()}@example.com"
     password = "pass123"
 
     uid = register(login, password)
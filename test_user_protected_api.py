@@ -4,13 +4,16 @@
 - /user/profile GET/PUT, /user/profile/logout
 - /user/favorites add/list/delete
 - /user/comments create/list
+- /user/freezer/recipes
 """
 
 import sys
-import time
-import requests
+
+from foodapi_client import FoodApiClient
+from run_names import unique_suffix
 
 BASE_URL = sys.argv[1] if len(sys.argv) > 1 else "https://foodapi.dzolotov.pro"
+api = FoodApiClient(BASE_URL)
 
 
 def log(name: str, ok: bool, msg: str = ""):
@@ -18,12 +21,12 @@ def log(name: str, ok: bool, msg: str = ""):
 
 
 def register_and_auth():
-    login = f"prot_{int(time.time())}@example.com"
+    login = f"prot_{unique_suffix()}@example.com"
     password = "pass123"
-    r = requests.post(f"{BASE_URL}/user", json={"login": login, "password": password})
+    r = api.post(f"/user", json={"login": login, "password": password})
     ok_reg = r.status_code == 200
     log("REGISTER (protected)", ok_reg)
-    ra = requests.put(f"{BASE_URL}/user", json={"login": login, "password": password})
+    ra = api.put(f"/user", json={"login": login, "password": password})
     ok_auth = ra.status_code == 200 and ra.json().get("token")
     token = ra.json().get("token") if ok_auth else None
     log("AUTH (protected)", ok_auth)
@@ -35,47 +38,76 @@ def auth_headers(token: str):
 
 
 def profile_get(token: str):
-    r = requests.get(f"{BASE_URL}/user/profile", headers=auth_headers(token))
+    r = api.get(f"/user/profile", headers=auth_headers(token))
     ok = r.status_code == 200 and r.json().get("id")
     log("GET /user/profile", ok)
     return ok
 
 
 def profile_put(token: str):
-    r = requests.put(f"{BASE_URL}/user/profile", headers=auth_headers(token), json={"firstName": "Test"})
+    r = api.put(f"/user/profile", headers=auth_headers(token), json={"firstName": "Test"})
     ok = r.status_code == 200 and r.json().get("firstName") == "Test"
     log("PUT /user/profile", ok)
     return ok
 
 
 def make_recipe() -> int | None:
-    r = requests.post(f"{BASE_URL}/recipe", json={"name": f"Prot Recipe {int(time.time())}", "duration": 300})
+    r = api.post(f"/recipe", json={"name": f"Prot Recipe {unique_suffix()}", "duration": 300})
     return r.json().get("id") if r.status_code == 200 else None
 
 
 def favorites_flow(token: str, rid: int):
-    r = requests.post(f"{BASE_URL}/user/favorites/{rid}", headers=auth_headers(token))
+    r = api.post(f"/user/favorites/{rid}", headers=auth_headers(token))
     ok_add = r.status_code == 200
     log("POST /user/favorites/{rid}", ok_add)
-    r = requests.get(f"{BASE_URL}/user/favorites", headers=auth_headers(token))
+    r = api.get(f"/user/favorites", headers=auth_headers(token))
     ok_list = r.status_code == 200 and isinstance(r.json(), list)
     log("GET /user/favorites", ok_list)
-    r = requests.delete(f"{BASE_URL}/user/favorites/{rid}", headers=auth_headers(token))
+    r = api.delete(f"/user/favorites/{rid}", headers=auth_headers(token))
     ok_del = r.status_code == 200
     log("DELETE /user/favorites/{rid}", ok_del)
 
 
 def comments_flow(token: str, rid: int):
-    r = requests.post(f"{BASE_URL}/user/comments", headers=auth_headers(token), json={"recipeId": rid, "text": "Nice"})
+    r = api.post(f"/user/comments", headers=auth_headers(token), json={"recipeId": rid, "text": "Nice"})
     ok_create = r.status_code == 200 and r.json().get("id")
     log("POST /user/comments", ok_create)
-    r = requests.get(f"{BASE_URL}/user/comments", headers=auth_headers(token))
+    r = api.get(f"/user/comments", headers=auth_headers(token))
     ok_list = r.status_code == 200 and isinstance(r.json(), list)
     log("GET /user/comments", ok_list)
 
 
+def freezer_recipes_flow(token: str, rid: int):
+    uid = api.get(f"/user/profile", headers=auth_headers(token)).json().get("id")
+    r = api.post(f"/ingredient", json={"name": f"Prot Ingredient {unique_suffix()}", "caloriesForUnit": 1.0})
+    if r.status_code != 200:
+        log("GET /user/freezer/recipes", False, f"ingredient status={r.status_code}")
+        return
+    iid = r.json()["id"]
+    api.post(f"/recipe-ingredients", json={"recipe": {"id": rid}, "ingredient": {"id": iid}, "count": 2})
+    fid = api.post(f"/freezer", json={"userId": uid, "ingredientId": iid, "count": 1.0}).json().get("id")
+
+    # Ингредиент есть, но в количестве 1 из 2: без checkQuantity рецепт покрыт полностью
+    r = api.get(f"/user/freezer/recipes", headers=auth_headers(token), params={"maxMissing": 0, "limit": 50})
+    match = next((m for m in r.json().get("data", []) if m["id"] == rid), None) if r.status_code == 200 else None
+    log("GET /user/freezer/recipes", bool(match) and match["coverage"] == 1.0 and not match["missing"])
+    r = api.get(f"/user/freezer/recipes", headers=auth_headers(token),
+                params={"maxMissing": 0, "checkQuantity": "true", "limit": 50})
+    ids = [m["id"] for m in r.json().get("data", [])] if r.status_code == 200 else None
+    log("GET /user/freezer/recipes (checkQuantity)", ids is not None and rid not in ids)
+    r = api.get(f"/user/freezer/recipes", headers=auth_headers(token), params={"limit": 0})
+    log("GET /user/freezer/recipes (limit=0)", r.status_code == 400, f"status={r.status_code}")
+    r = api.get(f"/user/freezer/recipes")
+    log("GET /user/freezer/recipes without token", r.status_code == 401)
+
+    if fid:
+        api.delete(f"/freezer/{fid}")
+    api.delete(f"/recipe/{rid}")
+    api.delete(f"/ingredient/{iid}")
+
+
 def logout(token: str):
-    r = requests.post(f"{BASE_URL}/user/profile/logout", headers=auth_headers(token))
+    r = api.post(f"/user/profile/logout", headers=auth_headers(token))
     ok = r.status_code == 200
     log("POST /user/profile/logout", ok)
 
@@ -90,7 +122,8 @@ def main():
     if rid:
         favorites_flow(token, rid)
         comments_flow(token, rid)
-        requests.delete(f"{BASE_URL}/recipe/{rid}")
+        freezer_recipes_flow(token, rid)
+        api.delete(f"/recipe/{rid}")
     logout(token)
 
 